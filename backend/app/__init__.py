@@ -2,9 +2,9 @@
 import os
 from flask import Flask, jsonify
 from flask_cors import CORS
-from flask_jwt_extended import JWTManager
 from .config import config_by_name
 from .auth.jwt_callbacks import configure_jwt_callbacks
+from .auth.jwt_cache import JWTManagerConCache
 from .extensions import db, bcrypt, redis_client  # Usar instancias centralizadas
 
 def create_app(config_name=None):
@@ -23,18 +23,55 @@ def create_app(config_name=None):
         )
         app.config.from_object(config_by_name["development"])
 
+    # IP real del cliente detrás de los proxies de confianza (límites de tasa por IP)
+    saltos = app.config.get("PROXY_SALTOS", 0)
+    if saltos:
+        from werkzeug.middleware.proxy_fix import ProxyFix
+
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=saltos, x_proto=saltos)
+
     # Inicializar extensiones con la app
     db.init_app(app)
-    # Si usas redis_client, inicialízalo aquí si es necesario
-    # redis_client.init_app(app)  # Descomentar si se requiere inicialización
+    redis_client.init_app(app)
 
     # Habilitar CORS globalmente
     CORS(app)
 
-    jwt_manager = JWTManager()
+    # Cachea por worker los claims de tokens ya verificados (hasta su exp)
+    jwt_manager = JWTManagerConCache()
     jwt_manager.init_app(app)
     configure_jwt_callbacks(jwt_manager)
 
+    from .auth import user_cache
+    from .auth.revocation import revocaciones
+
+    user_cache.init_app(app)
+    revocaciones.init_app(app)
+
+    from .services.hashing_service import servicio_hashing, HashingSaturadoError
+
+    servicio_hashing.init_app(app)
+
+    from .services.ultimo_acceso_service import buffer_ultimo_acceso
+
+    buffer_ultimo_acceso.init_app(app)
+
+    from .services import clave_respuestas_service
+
+    clave_respuestas_service.init_app(app)
+
+    from .services import libro_calificaciones_service
+
+    libro_calificaciones_service.init_app(app)
+
+    from .utils import rate_limit
+
+    rate_limit.init_app(app)
+
+    from .utils import dataloader
+
+    dataloader.init_app(app)
+
     # Configurar la sesión de SQLAlchemy para Marshmallow
     from marshmallow_sqlalchemy import SQLAlchemyAutoSchema
 
@@ -45,6 +82,10 @@ def create_app(config_name=None):
 
     app.register_blueprint(api_bp, url_prefix="/api")
 
+    from .routes.documents import documents_bp
+
+    app.register_blueprint(documents_bp)
+
     # Registrar blueprint de autenticación si existe
     try:
         from .auth.routes import auth_bp
@@ -71,6 +112,14 @@ def create_app(config_name=None):
             return jsonify({"error": description, "status": 400}), 400
         return jsonify({"error": "Solicitud incorrecta", "status": 400}), 400
 
+    # Pool de hashing saturado: el cliente debe reintentar más tarde
+    @app.errorhandler(HashingSaturadoError)
+    def hashing_saturado_error(error):
+        respuesta = jsonify({"error": str(error), "status": 503})
+        respuesta.status_code = 503
+        respuesta.headers["Retry-After"] = str(error.retry_after)
+        return respuesta
+
     # Configurar contexto de aplicación para la base de datos
     with app.app_context():
         # Importar todos los modelos para que SQLAlchemy los registre
@@ -93,4 +142,22 @@ def create_app(config_name=None):
     def health_check():
         return jsonify(status="healthy", message="Backend funcionando!"), 200
 
+    # Contadores de proceso (cachés, servicios); cada worker reporta los suyos.
+    # Exponen detalles internos: solo para administradores
+    from .auth.decorators import roles_required
+
+    @app.route("/api/metrics", methods=["GET"])
+    @roles_required(["admin"])
+    def metrics():
+        from .utils.metrics import metricas
+
+        datos = metricas.snapshot()
+        datos.update(user_cache.estadisticas())
+        datos.update(revocaciones.estadisticas())
+        datos.update(servicio_hashing.estadisticas())
+        datos.update(redis_client.estadisticas())
+        datos.update(jwt_manager.estadisticas())
+        datos.update(clave_respuestas_service.estadisticas())
+        return jsonify(datos), 200
+
     return app
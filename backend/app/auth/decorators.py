@@ -1,7 +1,7 @@
 from functools import wraps
 from flask_jwt_extended import verify_jwt_in_request, get_jwt_identity
 from flask import jsonify
-from app.models.usuario import Usuario
+from app.auth.user_cache import obtener_perfil
 
 
 def roles_required(required_roles):
@@ -10,8 +10,9 @@ def roles_required(required_roles):
         def wrapper(*args, **kwargs):
             verify_jwt_in_request()
             user_id = get_jwt_identity()
-            user = Usuario.query.get(user_id)
-            if not user or user.rol not in required_roles:
+            # El perfil se resuelve desde g/LRU/Redis antes de consultar la BD
+            user = obtener_perfil(user_id)
+            if not user or not user.activo or user.rol not in required_roles:
                 return jsonify(msg="Acceso denegado: rol no autorizado."), 403
             return fn(*args, **kwargs)
 
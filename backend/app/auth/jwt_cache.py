@@ -0,0 +1,105 @@
+# app/auth/jwt_cache.py
+# Caché por worker de JWT ya verificados.
+#
+# La SPA consulta varios endpoints cada pocos segundos con el mismo access token, y
+# cada petición vuelve a decodificar el token, verificar la firma HMAC y validar los
+# claims. Este JWTManager guarda los claims decodificados en un LRU indexado por el
+# SHA-256 del token hasta su `exp`, de modo que las peticiones repetidas solo
+# calculan un digest.
+#
+# La caché sobrescribe `JWTManager._decode_jwt_from_config`, que es privado: la
+# versión de Flask-JWT-Extended está fijada en requirements.txt y
+# test_jwt_cache.py falla si la librería deja de llamarlo.
+#
+# Lo que NO se cachea y se sigue evaluando en cada petición:
+#   - la lista de revocación (token_in_blocklist_loader) y la carga del usuario,
+#     que Flask-JWT-Extended ejecuta después de decodificar;
+#   - el token CSRF de las cookies, que se compara contra los claims cacheados;
+#   - los decodificados con `allow_expired=True`.
+import hashlib
+import time
+from hmac import compare_digest
+
+from flask_jwt_extended import JWTManager
+from flask_jwt_extended.exceptions import CSRFError, JWTDecodeError
+
+from app.utils.cache import LRUConTTL
+from app.utils.metrics import metricas
+
+PREFIJO_METRICAS = "jwt_cache."
+
+
+def digest_token(encoded_token):
+    if isinstance(encoded_token, str):
+        encoded_token = encoded_token.encode("utf-8")
+    return hashlib.sha256(encoded_token).hexdigest()
+
+
+class JWTManagerConCache(JWTManager):
+    """JWTManager que reutiliza los claims de tokens verificados recientemente."""
+
+    def __init__(self, app=None, add_context_processor=False):
+        self.cache_habilitada = True
+        self._tokens = LRUConTTL(max_entradas=10000, ttl=0)
+        # jti -> digest, para descartar el token al cerrar sesión
+        self._digests = LRUConTTL(max_entradas=10000, ttl=0)
+        super().__init__(app, add_context_processor)
+
+    def init_app(self, app, add_context_processor=False):
+        super().init_app(app, add_context_processor)
+        self.cache_habilitada = app.config.get("JWT_CACHE_HABILITADA", True)
+        max_entradas = app.config.get("JWT_CACHE_MAX_ENTRADAS", 10000)
+        self._tokens = LRUConTTL(max_entradas=max_entradas, ttl=0)
+        self._digests = LRUConTTL(max_entradas=max_entradas, ttl=0)
+
+    def _decode_jwt_from_config(
+        self, encoded_token, csrf_value=None, allow_expired=False
+    ):
+        if not self.cache_habilitada or allow_expired:
+            return super()._decode_jwt_from_config(
+                encoded_token, csrf_value, allow_expired
+            )
+
+        clave = digest_token(encoded_token)
+        claims = self._tokens.obtener(clave)
+        if claims is None:
+            metricas.incrementar(PREFIJO_METRICAS + "fallos")
+            claims = super()._decode_jwt_from_config(encoded_token)
+            self._guardar(clave, claims)
+        else:
+            metricas.incrementar(PREFIJO_METRICAS + "aciertos")
+
+        if csrf_value:
+            if "csrf" not in claims:
+                raise JWTDecodeError("Missing claim: csrf")
+            if not compare_digest(claims["csrf"], csrf_value):
+                raise CSRFError("CSRF double submit tokens do not match")
+
+        # Copia: Flask-JWT-Extended y las vistas pueden modificar el diccionario
+        return dict(claims)
+
+    def _guardar(self, clave, claims):
+        exp = claims.get("exp")
+        if exp is None:
+            return
+        restante = exp - time.time()
+        if restante <= 0:
+            return
+        self._tokens.guardar(clave, dict(claims), ttl=restante)
+        if claims.get("jti"):
+            self._digests.guardar(claims["jti"], clave, ttl=restante)
+
+    def descartar(self, jti):
+        """Elimina de la caché el token con ese `jti` (p. ej. tras el logout)."""
+        clave = self._digests.obtener(jti)
+        if clave is not None:
+            self._tokens.invalidar(clave)
+            self._digests.invalidar(jti)
+
+    def estadisticas(self):
+        datos = metricas.snapshot(PREFIJO_METRICAS)
+        aciertos = datos.get(PREFIJO_METRICAS + "aciertos", 0)
+        total = aciertos + datos.get(PREFIJO_METRICAS + "fallos", 0)
+        datos[PREFIJO_METRICAS + "tasa_aciertos"] = aciertos / total if total else 0.0
+        datos[PREFIJO_METRICAS + "entradas"] = len(self._tokens)
+        return datos
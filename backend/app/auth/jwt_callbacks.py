@@ -1,17 +1,39 @@
 # backend/app/auth/jwt_callbacks.py
 from flask import jsonify
 from flask_jwt_extended import JWTManager
-from app.models.usuario import Usuario
+from app.auth.user_cache import obtener_perfil
+from app.auth.services import perfil_desde_claims
+from app.auth.revocation import revocaciones
+
 
 def configure_jwt_callbacks(jwt: JWTManager):
     @jwt.user_identity_loader
     def user_identity_lookup(user):
-        return user.id
+        # Acepta tanto la instancia de Usuario como su id
+        return getattr(user, "id", user)
 
     @jwt.user_lookup_loader
     def user_lookup_callback(_jwt_header, jwt_data):
         identity = jwt_data["sub"]
-        return Usuario.query.get(identity)
+        if "tv" in jwt_data:
+            # Autorización basada en claims firmados: sin consulta a la BD
+            return perfil_desde_claims(jwt_data)
+        # Tokens emitidos antes de incluir los claims de autorización
+        # Comparte la caché de perfiles con roles_required (una búsqueda por request)
+        return obtener_perfil(identity)
+
+    @jwt.user_lookup_error_loader
+    def user_lookup_error_callback(_jwt_header, jwt_data):
+        return jsonify({"error": "Token revocado o desactualizado"}), 401
+
+    @jwt.token_in_blocklist_loader
+    def token_in_blocklist_callback(_jwt_header, jwt_payload):
+        # Filtro de Bloom local; Redis solo se consulta ante un positivo
+        return revocaciones.esta_revocado(jwt_payload["jti"])
+
+    @jwt.revoked_token_loader
+    def revoked_token_callback(jwt_header, jwt_payload):
+        return jsonify({"error": "Token revocado"}), 401
 
     @jwt.expired_token_loader
     def expired_token_callback(jwt_header, jwt_payload):
@@ -23,4 +45,4 @@ def configure_jwt_callbacks(jwt: JWTManager):
 
     @jwt.unauthorized_loader
     def missing_token_callback(error):
-        return jsonify({"error": "Token faltante"}), 401
\ No newline at end of file
+        return jsonify({"error": "Token faltante"}), 401
@@ -0,0 +1,264 @@
+# app/auth/revocation.py
+# Verificación de tokens revocados (logout) con un filtro de Bloom local por worker.
+#
+# Flujo de `esta_revocado(jti)`:
+#   1. Filtro de Bloom en memoria: si el jti no está, el token NO fue revocado
+#      (sin falsos negativos) y no se consulta Redis.
+#   2. Solo ante un positivo del filtro se consulta Redis, que es la fuente de verdad.
+#
+# El filtro se mantiene al día con pub/sub de Redis (cada logout publica el jti) y se
+# reconstruye periódicamente con SCAN para descartar entradas expiradas y recuperar
+# mensajes perdidos durante una desconexión.
+#
+# Política sin filtro: si el filtro no se pudo cargar (p. ej. Redis caído al iniciar
+# el worker) cada consulta va directo a Redis y se reintenta la carga cada
+# JWT_REVOCACION_REINTENTO segundos. Si además Redis no responde no hay forma de
+# saber si el token fue revocado; JWT_REVOCACION_SIN_FILTRO decide:
+#   - "permitir" (por defecto): se acepta el token. Rechazarlo cerraría la sesión de
+#     todos los usuarios mientras Redis esté caído; el riesgo queda acotado a los
+#     tokens revocados que aún no expiran.
+#   - "rechazar": se responde 401 a todo token hasta que Redis vuelva.
+# `revocar` lanza RevocacionError (503) si no puede persistir la revocación: el
+# cliente debe reintentar el logout en lugar de creer que el token quedó anulado.
+import hashlib
+import math
+import os
+import threading
+import time
+
+from redis.exceptions import RedisError
+
+from app.extensions import redis_client
+from app.utils.metrics import metricas
+
+PREFIJO_REDIS = "jwt:revocado:"
+CANAL_REVOCACIONES = "jwt:revocaciones"
+PREFIJO_METRICAS = "revocacion."
+POLITICAS_SIN_FILTRO = ("permitir", "rechazar")
+
+
+class RevocacionError(Exception):
+    """La revocación no se pudo registrar; `codigo` es el estado HTTP."""
+
+    def __init__(self, mensaje, codigo=503):
+        super().__init__(mensaje)
+        self.mensaje = mensaje
+        self.codigo = codigo
+
+
+class FiltroBloom:
+    """Filtro de Bloom sobre un `bytearray` con doble hashing (Kirsch-Mitzenmacher)."""
+
+    def __init__(self, capacidad=100000, tasa_falsos_positivos=0.001):
+        capacidad = max(int(capacidad), 1)
+        self.num_bits = max(
+            8,
+            int(-capacidad * math.log(tasa_falsos_positivos) / (math.log(2) ** 2)),
+        )
+        self.num_hashes = max(1, round(self.num_bits / capacidad * math.log(2)))
+        self._bits = bytearray((self.num_bits + 7) // 8)
+        self.elementos = 0
+
+    def _posiciones(self, clave):
+        digest = hashlib.blake2b(clave.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return [(h1 + i * h2) % self.num_bits for i in range(self.num_hashes)]
+
+    def agregar(self, clave):
+        for posicion in self._posiciones(clave):
+            self._bits[posicion >> 3] |= 1 << (posicion & 7)
+        self.elementos += 1
+
+    def __contains__(self, clave):
+        return all(
+            self._bits[posicion >> 3] & (1 << (posicion & 7))
+            for posicion in self._posiciones(clave)
+        )
+
+
+class RevocacionTokens:
+    """Subsistema de revocación de JWT: filtro de Bloom local + Redis autoritativo."""
+
+    def __init__(self):
+        self.capacidad = 100000
+        self.tasa_falsos_positivos = 0.001
+        self.intervalo_reconstruccion = 300
+        self.pubsub_habilitado = True
+        self.politica_sin_filtro = "permitir"
+        self.intervalo_reintento = 5
+        self._ultimo_intento = 0.0
+        self._filtro = FiltroBloom(self.capacidad, self.tasa_falsos_positivos)
+        self._listo = False
+        self._pid = None
+        self._durante_reconstruccion = None
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.capacidad = app.config.get("JWT_REVOCACION_CAPACIDAD", 100000)
+        self.tasa_falsos_positivos = app.config.get(
+            "JWT_REVOCACION_TASA_FALSOS_POSITIVOS", 0.001
+        )
+        self.intervalo_reconstruccion = app.config.get(
+            "JWT_REVOCACION_INTERVALO_RECONSTRUCCION", 300
+        )
+        self.pubsub_habilitado = app.config.get("JWT_REVOCACION_PUBSUB", True)
+        self.politica_sin_filtro = app.config.get(
+            "JWT_REVOCACION_SIN_FILTRO", "permitir"
+        )
+        if self.politica_sin_filtro not in POLITICAS_SIN_FILTRO:
+            raise ValueError(
+                f"JWT_REVOCACION_SIN_FILTRO debe ser uno de {POLITICAS_SIN_FILTRO}"
+            )
+        self.intervalo_reintento = app.config.get("JWT_REVOCACION_REINTENTO", 5)
+        self._ultimo_intento = 0.0
+        self._filtro = FiltroBloom(self.capacidad, self.tasa_falsos_positivos)
+        self._listo = False
+        self._pid = None
+
+    # --- API pública ---
+
+    def revocar(self, jti, ttl):
+        """Marca el jti como revocado durante `ttl` segundos y lo difunde."""
+        self._agregar_local(jti)
+        try:
+            redis_client.setex(PREFIJO_REDIS + jti, ttl, "revoked")
+        except RedisError:
+            metricas.incrementar(PREFIJO_METRICAS + "errores_redis")
+            raise RevocacionError(
+                "No se pudo revocar el token; inténtelo de nuevo en unos segundos"
+            )
+        try:
+            redis_client.publish(CANAL_REVOCACIONES, jti)
+        except RedisError:
+            # La reconstrucción periódica de los demás workers lo recogerá
+            metricas.incrementar(PREFIJO_METRICAS + "errores_publicacion")
+
+    def esta_revocado(self, jti):
+        self._asegurar_iniciado()
+        metricas.incrementar(PREFIJO_METRICAS + "consultas")
+        if not self._listo:
+            self._reintentar_reconstruccion()
+
+        if self._listo and jti not in self._filtro:
+            metricas.incrementar(PREFIJO_METRICAS + "negativos_filtro")
+            return False
+
+        if self._listo:
+            metricas.incrementar(PREFIJO_METRICAS + "positivos_filtro")
+        try:
+            revocado = bool(redis_client.exists(PREFIJO_REDIS + jti))
+        except RedisError:
+            metricas.incrementar(PREFIJO_METRICAS + "errores_redis")
+            if self._listo:
+                # Un positivo del filtro que no se puede confirmar se rechaza
+                return True
+            # Sin filtro cargado no hay información (ver política al inicio)
+            metricas.incrementar(PREFIJO_METRICAS + "sin_informacion")
+            return self.politica_sin_filtro == "rechazar"
+
+        if revocado:
+            metricas.incrementar(PREFIJO_METRICAS + "confirmados")
+        elif self._listo:
+            metricas.incrementar(PREFIJO_METRICAS + "falsos_positivos")
+        return revocado
+
+    def reconstruir(self):
+        """Reconstruye el filtro a partir de las claves vigentes en Redis."""
+        # Los jti recibidos mientras se recorre Redis se reaplican al filtro nuevo
+        self._durante_reconstruccion = []
+        try:
+            jtis = [
+                clave[len(PREFIJO_REDIS) :]
+                for clave in redis_client.scan_iter(
+                    match=PREFIJO_REDIS + "*", count=1000
+                )
+            ]
+            # Se dimensiona con holgura para no degradar la tasa de falsos positivos
+            nuevo = FiltroBloom(
+                max(self.capacidad, 2 * len(jtis)), self.tasa_falsos_positivos
+            )
+            for jti in jtis + self._durante_reconstruccion:
+                nuevo.agregar(jti)
+            self._filtro = nuevo
+        finally:
+            self._durante_reconstruccion = None
+        self._listo = True
+        metricas.incrementar(PREFIJO_METRICAS + "reconstrucciones")
+
+    def estadisticas(self):
+        datos = metricas.snapshot(PREFIJO_METRICAS)
+        consultas = datos.get(PREFIJO_METRICAS + "consultas", 0)
+        positivos = datos.get(PREFIJO_METRICAS + "positivos_filtro", 0)
+        negativos = datos.get(PREFIJO_METRICAS + "negativos_filtro", 0)
+        falsos = datos.get(PREFIJO_METRICAS + "falsos_positivos", 0)
+        datos[PREFIJO_METRICAS + "tasa_resueltas_en_filtro"] = (
+            negativos / consultas if consultas else 0.0
+        )
+        datos[PREFIJO_METRICAS + "tasa_falsos_positivos"] = (
+            falsos / positivos if positivos else 0.0
+        )
+        datos[PREFIJO_METRICAS + "elementos_filtro"] = self._filtro.elementos
+        return datos
+
+    # --- Ciclo de vida por worker ---
+
+    def _agregar_local(self, jti):
+        self._filtro.agregar(jti)
+        pendientes = self._durante_reconstruccion
+        if pendientes is not None:
+            pendientes.append(jti)
+
+    def _reintentar_reconstruccion(self):
+        ahora = time.monotonic()
+        if ahora - self._ultimo_intento < self.intervalo_reintento:
+            return
+        self._ultimo_intento = ahora
+        try:
+            self.reconstruir()
+        except RedisError:
+            metricas.incrementar(PREFIJO_METRICAS + "errores_redis")
+
+    def _asegurar_iniciado(self):
+        # Los workers de gunicorn se crean con fork: cada proceso inicia su propio hilo
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._listo = False
+            self._ultimo_intento = 0.0
+            self._reintentar_reconstruccion()
+            if self.pubsub_habilitado:
+                hilo = threading.Thread(
+                    target=self._escuchar, name="revocacion-jwt", daemon=True
+                )
+                hilo.start()
+
+    def _escuchar(self):
+        espera = 1
+        while True:
+            try:
+                pubsub = redis_client.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(CANAL_REVOCACIONES)
+                # Recupera lo publicado mientras no había suscripción
+                self.reconstruir()
+                ultima_reconstruccion = time.monotonic()
+                espera = 1
+                while True:
+                    mensaje = pubsub.get_message(timeout=1.0)
+                    if mensaje and mensaje["type"] == "message":
+                        self._agregar_local(mensaje["data"])
+                    ahora = time.monotonic()
+                    if ahora - ultima_reconstruccion >= self.intervalo_reconstruccion:
+                        self.reconstruir()
+                        ultima_reconstruccion = ahora
+            except RedisError:
+                metricas.incrementar(PREFIJO_METRICAS + "reconexiones")
+                time.sleep(espera)
+                espera = min(espera * 2, 30)
+
+
+# Instancia única por proceso
+revocaciones = RevocacionTokens()
@@ -1,18 +1,26 @@
 # backend/app/auth/routes.py
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, current_app, jsonify, request
 from app.extensions import db  # Cambiar la importación para evitar dependencia circular
 from app.models.usuario import Usuario
-from app.extensions import redis_client  # Asegurar que redis_client esté disponible
+from app.auth.revocation import RevocacionError, revocaciones
 from . import auth_bp
 from app.schemas import UsuarioRegistroSchema, UsuarioLoginSchema, MensajeSchema
+from app.auth.services import claims_de_autorizacion, publicar_version_token
+from app.auth.user_cache import precargar_perfil
+from app.utils.rate_limit import limitar_tasa
+from app.utils.conditional import respuesta_condicional
+from app.services.hashing_service import servicio_hashing
+from app.services.ultimo_acceso_service import buffer_ultimo_acceso
 from flask_jwt_extended import (
     create_access_token,
     create_refresh_token,
     jwt_required,
     get_jwt_identity,
     get_jwt,
+    current_user,
 )
 from marshmallow import ValidationError
+from sqlalchemy import select
 import datetime
 
 # Inicializar esquemas con sesión de SQLAlchemy si usan load_instance
@@ -22,6 +30,9 @@ mensaje_schema = MensajeSchema()
 
 
 @auth_bp.route("/register", methods=["POST"])
+@limitar_tasa(
+    "registro", ip="RATELIMIT_REGISTRO_IP", correo="RATELIMIT_REGISTRO_CORREO"
+)
 def register_user():
     print("[DEBUG] /register endpoint called")
     print("[DEBUG] request.get_json():", request.get_json())
@@ -51,9 +62,17 @@ def register_user():
         # establece un buen patrón si se añadieran más (ej. crear un perfil asociado).
         # db.session.commit() # <- Commit anterior movido/eliminado
 
-        # Generar tokens
-        access_token = create_access_token(identity=nuevo_usuario.id)
-        refresh_token = create_refresh_token(identity=nuevo_usuario.id)
+        # Obtener el id (y los valores por defecto) antes de firmar los tokens
+        db.session.flush()
+
+        # Generar tokens con los claims de autorización firmados
+        claims = claims_de_autorizacion(nuevo_usuario)
+        access_token = create_access_token(
+            identity=nuevo_usuario.id, additional_claims=claims
+        )
+        refresh_token = create_refresh_token(
+            identity=nuevo_usuario.id, additional_claims=claims
+        )
 
         # BACKEND-REVIEW: 2025-05-22 - DB-SESSION-ATOMICITY-02 - Commit único al final
         # Soluciona: Múltiples commits intermedios que podrían dejar la BD inconsistente.
@@ -83,6 +102,7 @@ def register_user():
 
 
 @auth_bp.route("/login", methods=["POST"])
+@limitar_tasa("login", ip="RATELIMIT_LOGIN_IP", correo="RATELIMIT_LOGIN_CORREO")
 def login():
     data = request.get_json()
     correo_electronico = data.get("correo_electronico")
@@ -96,22 +116,59 @@ def login():
     if not usuario or not usuario.check_password(password):
         return jsonify({"error": "Credenciales inválidas"}), 401
 
-    # Generar token JWT
-    access_token = create_access_token(identity=usuario.id)
+    # Las cuentas importadas en bloque usan un costo bcrypt reducido: se eleva al
+    # configurado en el primer inicio de sesión
+    if servicio_hashing.necesita_rehash(usuario.hashed_password):
+        usuario.set_password(password)
+        db.session.commit()
+
+    # Las siguientes peticiones del usuario resolverán su versión de token sin la BD
+    precargar_perfil(usuario)
+    publicar_version_token(usuario.id, usuario.token_version)
+    # Sin UPDATE por login: la marca se vuelca en lote periódicamente
+    buffer_ultimo_acceso.registrar("inicio_sesion", usuario.id)
+
+    # Generar token JWT con rol, estado y versión de token firmados
+    access_token = create_access_token(
+        identity=usuario.id, additional_claims=claims_de_autorizacion(usuario)
+    )
     return jsonify({"access_token": access_token}), 200
 
 
 @auth_bp.route("/refresh", methods=["POST"])
 @jwt_required(refresh=True)
 def refresh():
-    current_user_id = get_jwt_identity()
-    access_token = create_access_token(identity=current_user_id)
+    # El user loader ya validó la versión del token; el perfil refleja el rol vigente
+    perfil = current_user
+    access_token = create_access_token(
+        identity=perfil.id, additional_claims=claims_de_autorizacion(perfil)
+    )
     return jsonify({"access_token": access_token})
 
 
+def _version_perfil(**kwargs):
+    # Columnas que cambian la respuesta de /me, más el último inicio de sesión
+    # pendiente de volcar
+    usuario_id = get_jwt_identity()
+    fila = db.session.execute(
+        select(Usuario.fecha_actualizacion, Usuario.ultimo_inicio_sesion).where(
+            Usuario.id == usuario_id
+        )
+    ).first()
+    if fila is None:
+        return None
+    ultimo = buffer_ultimo_acceso.valor_vigente(
+        "inicio_sesion", usuario_id, fila.ultimo_inicio_sesion
+    )
+    return ("usuarios", usuario_id, fila.fecha_actualizacion, ultimo), max(
+        filter(None, (fila.fecha_actualizacion, ultimo)), default=None
+    )
+
+
 @auth_bp.route("/me", methods=["GET"])
 @jwt_required()
-def get_current_user():
+@respuesta_condicional(_version_perfil)
+def obtener_usuario_actual():
     current_user_id = get_jwt_identity()
     usuario = Usuario.query.get(current_user_id)
 
@@ -124,10 +181,19 @@ def get_current_user():
             "nombre_completo": usuario.nombre_completo,
             "correo_electronico": usuario.correo_electronico,
             "rol": usuario.rol,
+            "ultimo_inicio_sesion": _fecha_iso(
+                buffer_ultimo_acceso.valor_vigente(
+                    "inicio_sesion", usuario.id, usuario.ultimo_inicio_sesion
+                )
+            ),
         }
     )
 
 
+def _fecha_iso(valor):
+    return valor.isoformat() if valor else None
+
+
 @auth_bp.route("/logout", methods=["POST"])
 @jwt_required(verify_type=False)
 def logout_user():
@@ -138,6 +204,13 @@ def logout_user():
     ttl = exp - int(now.timestamp())
 
     if ttl > 0:
-        redis_client.setex(jti, ttl, "revoked")
+        # Persiste en Redis y notifica a los filtros de Bloom de todos los workers
+        try:
+            revocaciones.revocar(jti, ttl)
+        except RevocacionError as err:
+            return jsonify({"error": err.mensaje}), err.codigo
+    # Descarta los claims cacheados en este worker; en los demás workers el token
+    # se rechaza igualmente por la lista de revocación
+    current_app.extensions["flask-jwt-extended"].descartar(jti)
 
     return jsonify(msg="Tokens revocados exitosamente"), 200
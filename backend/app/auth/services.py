@@ -0,0 +1,113 @@
+# app/auth/services.py
+# Claims de autorización dentro del JWT (rol, activo, token_version).
+#
+# Los tokens llevan firmados el rol, el estado y la versión de token del usuario, de
+# modo que la autorización no necesita consultar la tabla `usuarios`. Un cambio de
+# rol o una desactivación incrementa `Usuario.token_version`; la versión vigente se
+# publica en Redis tras el commit y los tokens con una versión anterior se rechazan
+# con un único GET.
+from flask import current_app, has_app_context
+from redis.exceptions import RedisError
+from sqlalchemy import event, inspect, select
+from sqlalchemy.orm import Session, object_session
+
+from app.auth.user_cache import PerfilUsuario, memorizar_perfil, obtener_perfil
+from app.extensions import db, redis_client
+from app.models.usuario import Usuario
+from app.utils.metrics import metricas
+
+PREFIJO_VERSION = "usuario:token_version:"
+CLAVE_PENDIENTES = "versiones_token_pendientes"
+
+
+def claims_de_autorizacion(usuario):
+    """Claims adicionales que se firman en los tokens de `usuario`."""
+    return {
+        "rol": usuario.rol,
+        "activo": usuario.activo,
+        "tv": usuario.token_version or 0,
+    }
+
+
+def version_token_vigente(user_id):
+    """
+    Devuelve la versión de token vigente del usuario.
+
+    Consulta Redis. Si la clave no existe, lee la versión de la base de datos y la
+    vuelve a publicar: el LRU local puede estar desactualizado respecto a otro
+    worker y no debe republicarse con el TTL de los refresh tokens. Si Redis no
+    responde, recurre a la caché de perfiles sin publicar nada.
+    """
+    try:
+        crudo = redis_client.get(PREFIJO_VERSION + str(user_id))
+    except RedisError:
+        metricas.incrementar("jwt_claims.errores_redis")
+        perfil = obtener_perfil(user_id)
+        return None if perfil is None else perfil.token_version
+    if crudo is not None:
+        return int(crudo)
+
+    fila = db.session.execute(
+        select(Usuario.token_version).where(Usuario.id == int(user_id))
+    ).first()
+    if fila is None:
+        return None
+    version = fila.token_version or 0
+    publicar_version_token(user_id, version)
+    return version
+
+
+def publicar_version_token(user_id, version):
+    ttl = int(current_app.config.get("JWT_REFRESH_TOKEN_EXPIRES", 30 * 24 * 3600))
+    try:
+        redis_client.setex(PREFIJO_VERSION + str(user_id), ttl, version or 0)
+    except RedisError:
+        metricas.incrementar("jwt_claims.errores_redis")
+
+
+def perfil_desde_claims(jwt_data):
+    """
+    Construye el perfil del usuario a partir de los claims firmados del token.
+
+    Devuelve None si el usuario está inactivo o si el token fue emitido con una
+    versión anterior a la vigente (cambio de rol o desactivación posterior).
+    """
+    user_id = int(jwt_data["sub"])
+    if not jwt_data.get("activo", False):
+        return None
+    if jwt_data["tv"] != version_token_vigente(user_id):
+        metricas.incrementar("jwt_claims.tokens_desactualizados")
+        return None
+    metricas.incrementar("jwt_claims.autorizaciones_sin_bd")
+    perfil = PerfilUsuario(
+        id=user_id,
+        rol=jwt_data["rol"],
+        activo=jwt_data["activo"],
+        token_version=jwt_data["tv"],
+    )
+    memorizar_perfil(perfil)
+    return perfil
+
+
+# --- Publicación de la nueva versión tras el commit ---
+
+
+@event.listens_for(Usuario, "after_update")
+def _registrar_version_pendiente(mapper, connection, target):
+    sesion = object_session(target)
+    if inspect(target).attrs.token_version.history.has_changes() and sesion is not None:
+        sesion.info.setdefault(CLAVE_PENDIENTES, {})[target.id] = target.token_version
+
+
+@event.listens_for(Session, "after_commit")
+def _publicar_versiones_pendientes(sesion):
+    pendientes = sesion.info.pop(CLAVE_PENDIENTES, None)
+    if not has_app_context():
+        return
+    for user_id, version in (pendientes or {}).items():
+        publicar_version_token(user_id, version)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _descartar_versiones_pendientes(sesion, transaccion_previa):
+    sesion.info.pop(CLAVE_PENDIENTES, None)
@@ -0,0 +1,258 @@
+# app/auth/user_cache.py
+# Caché de usuarios/roles para los decoradores de autorización y el user loader de JWT.
+#
+# Niveles de búsqueda para un perfil (id, rol, activo, token_version):
+#   1. flask.g          -> memo por request (decorador y user loader lo comparten)
+#   2. LRU por worker   -> TTL corto, evita ir a Redis en ráfagas del mismo usuario
+#   3. Redis            -> compartido entre workers, TTL mayor
+#   4. Base de datos    -> SELECT por clave primaria solo de las columnas necesarias
+#
+# La invalidación ocurre al cambiar `Usuario.rol` o `Usuario.activo` (eventos de
+# SQLAlchemy), después del commit: si se hiciera en el flush, una lectura
+# concurrente entre el flush y el commit volvería a guardar en caché los valores
+# anteriores hasta que expire el TTL. Los LRU de otros workers expiran por su TTL
+# corto.
+import json
+
+from flask import current_app, g, has_app_context
+from redis.exceptions import RedisError
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session, object_session
+
+from app.extensions import db, redis_client
+from app.models.usuario import Usuario
+from app.utils.cache import LRUConTTL
+from app.utils.metrics import metricas
+
+PREFIJO_REDIS = "usuario:perfil:"
+PREFIJO_METRICAS = "usuarios_cache."
+CAMPOS_INVALIDANTES = ("rol", "activo")
+CLAVE_SESION = "usuarios_cache_invalidar"
+
+_lru = LRUConTTL(max_entradas=10000, ttl=30.0)
+
+
+class PerfilUsuario:
+    """
+    Vista ligera del usuario autenticado.
+
+    Expone `id`, `rol`, `activo` y `token_version` sin tocar la base de datos
+    (se construye desde la caché o desde los claims del JWT). Cualquier otro
+    atributo (p. ej. `nombre_completo`) carga la instancia ORM bajo demanda,
+    memorizada en `flask.g` para el resto del request.
+    """
+
+    def __init__(self, id, rol, activo, token_version=0):
+        self.id = id
+        self.rol = rol
+        self.activo = activo
+        self.token_version = token_version
+
+    @property
+    def instancia(self):
+        return obtener_usuario(self.id)
+
+    def __getattr__(self, nombre):
+        # Solo se invoca para atributos que no están en el perfil
+        if nombre.startswith("_"):
+            raise AttributeError(nombre)
+        instancia = self.instancia
+        if instancia is None:
+            raise AttributeError(nombre)
+        return getattr(instancia, nombre)
+
+    def a_dict(self):
+        return {
+            "id": self.id,
+            "rol": self.rol,
+            "activo": self.activo,
+            "token_version": self.token_version,
+        }
+
+    def __repr__(self):
+        return f"<PerfilUsuario {self.id} ({self.rol})>"
+
+
+def init_app(app):
+    """Configura tamaños y TTL de la caché a partir de la configuración de la app."""
+    _lru.max_entradas = app.config.get("USUARIOS_CACHE_MAX_ENTRADAS", 10000)
+    _lru.ttl = app.config.get("USUARIOS_CACHE_TTL_LOCAL", 30)
+    _lru.limpiar()
+
+
+def _normalizar_id(user_id):
+    try:
+        return int(user_id)
+    except (TypeError, ValueError):
+        return None
+
+
+def _memo_request():
+    if "_perfiles_usuario" not in g:
+        g._perfiles_usuario = {}
+    return g._perfiles_usuario
+
+
+def _ttl_redis():
+    return current_app.config.get("USUARIOS_CACHE_TTL_REDIS", 300)
+
+
+def obtener_perfil(user_id):
+    """
+    Devuelve el `PerfilUsuario` para `user_id` o None si el usuario no existe.
+    """
+    user_id = _normalizar_id(user_id)
+    if user_id is None:
+        return None
+
+    memo = _memo_request()
+    if user_id in memo:
+        metricas.incrementar(PREFIJO_METRICAS + "hits_request")
+        return memo[user_id]
+
+    datos = _lru.obtener(user_id)
+    if datos is not None:
+        metricas.incrementar(PREFIJO_METRICAS + "hits_lru")
+    else:
+        datos = _leer_redis(user_id)
+        if datos is not None:
+            metricas.incrementar(PREFIJO_METRICAS + "hits_redis")
+            _lru.guardar(user_id, datos)
+        else:
+            datos = _leer_bd(user_id)
+            if datos is None:
+                return None
+            _guardar(user_id, datos)
+
+    perfil = PerfilUsuario(**datos)
+    memo[user_id] = perfil
+    return perfil
+
+
+def precargar_perfil(usuario):
+    """Guarda en caché el perfil de una instancia ya cargada (p. ej. tras el login)."""
+    datos = PerfilUsuario(
+        usuario.id, usuario.rol, usuario.activo, usuario.token_version or 0
+    ).a_dict()
+    _guardar(usuario.id, datos)
+
+
+def memorizar_perfil(perfil):
+    """Registra en `flask.g` un perfil ya resuelto (p. ej. desde los claims del JWT)."""
+    _memo_request()[perfil.id] = perfil
+
+
+def obtener_usuario(user_id):
+    """Devuelve la instancia ORM de `Usuario`, memorizada durante el request."""
+    user_id = _normalizar_id(user_id)
+    if user_id is None:
+        return None
+    if "_usuarios_orm" not in g:
+        g._usuarios_orm = {}
+    if user_id not in g._usuarios_orm:
+        metricas.incrementar(PREFIJO_METRICAS + "consultas_bd")
+        g._usuarios_orm[user_id] = db.session.get(Usuario, user_id)
+    else:
+        metricas.incrementar(PREFIJO_METRICAS + "hits_request")
+    return g._usuarios_orm[user_id]
+
+
+def invalidar_perfil(user_id):
+    """Elimina el perfil de todos los niveles de caché alcanzables desde este worker."""
+    user_id = _normalizar_id(user_id)
+    if user_id is None:
+        return
+    metricas.incrementar(PREFIJO_METRICAS + "invalidaciones")
+    _lru.invalidar(user_id)
+    if has_app_context():
+        _memo_request().pop(user_id, None)
+        g.get("_usuarios_orm", {}).pop(user_id, None)
+    try:
+        redis_client.delete(PREFIJO_REDIS + str(user_id))
+    except RedisError:
+        metricas.incrementar(PREFIJO_METRICAS + "errores_redis")
+
+
+def estadisticas():
+    """Contadores de la caché, incluido el número de consultas a BD evitadas."""
+    datos = metricas.snapshot(PREFIJO_METRICAS)
+    datos[PREFIJO_METRICAS + "consultas_evitadas"] = sum(
+        datos.get(PREFIJO_METRICAS + nivel, 0)
+        for nivel in ("hits_request", "hits_lru", "hits_redis")
+    )
+    return datos
+
+
+def _leer_redis(user_id):
+    try:
+        crudo = redis_client.get(PREFIJO_REDIS + str(user_id))
+    except RedisError:
+        metricas.incrementar(PREFIJO_METRICAS + "errores_redis")
+        return None
+    return json.loads(crudo) if crudo else None
+
+
+def _leer_bd(user_id):
+    metricas.incrementar(PREFIJO_METRICAS + "consultas_bd")
+    fila = (
+        db.session.query(Usuario.id, Usuario.rol, Usuario.activo, Usuario.token_version)
+        .filter(Usuario.id == user_id)
+        .first()
+    )
+    if fila is None:
+        return None
+    return {
+        "id": fila.id,
+        "rol": fila.rol,
+        "activo": fila.activo,
+        "token_version": fila.token_version,
+    }
+
+
+def _guardar(user_id, datos):
+    _lru.guardar(user_id, datos)
+    try:
+        redis_client.setex(
+            PREFIJO_REDIS + str(user_id), _ttl_redis(), json.dumps(datos)
+        )
+    except RedisError:
+        metricas.incrementar(PREFIJO_METRICAS + "errores_redis")
+
+
+# --- Invalidación por eventos de SQLAlchemy ---
+
+
+def _anotar(target):
+    # Se invalida tras el commit (ver _invalidar_tras_commit)
+    sesion = object_session(target)
+    if sesion is not None:
+        sesion.info.setdefault(CLAVE_SESION, set()).add(target.id)
+
+
+@event.listens_for(Usuario, "after_update")
+def _invalidar_si_cambia_autorizacion(mapper, connection, target):
+    estado = inspect(target)
+    cambios = (
+        estado.attrs[campo].history.has_changes() for campo in CAMPOS_INVALIDANTES
+    )
+    if any(cambios):
+        _anotar(target)
+
+
+@event.listens_for(Usuario, "after_delete")
+def _invalidar_al_eliminar(mapper, connection, target):
+    _anotar(target)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidar_tras_commit(sesion):
+    pendientes = sesion.info.pop(CLAVE_SESION, ())
+    if not has_app_context():
+        return
+    for user_id in pendientes:
+        invalidar_perfil(user_id)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _descartar_tras_rollback(sesion, transaccion_previa):
+    sesion.info.pop(CLAVE_SESION, None)
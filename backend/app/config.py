@@ -34,6 +34,10 @@ class Config:
     JWT_CSRF_IN_COOKIES = True
     JWT_CSRF_CHECK_FORM = True
 
+    # Caché por worker de tokens ya verificados (claims decodificados hasta su exp)
+    JWT_CACHE_HABILITADA = True
+    JWT_CACHE_MAX_ENTRADAS = int(os.getenv("JWT_CACHE_MAX_ENTRADAS", 10000))
+
     # Configuración de base de datos
     DEBUG = False
     TESTING = False
@@ -41,6 +45,124 @@ class Config:
         False  # Desactiva una característica de SQLAlchemy que no necesitamos
     )
 
+    # Redis: pool de conexiones por worker, timeouts y circuit breaker.
+    # REDIS_URL = "memory://" usa fakeredis en memoria, sin servidor.
+    REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+    REDIS_MAX_CONEXIONES = int(os.getenv("REDIS_MAX_CONEXIONES", 20))
+    REDIS_TIMEOUT_CONEXION = 0.5  # segundos
+    REDIS_TIMEOUT_LECTURA = 0.5  # segundos
+    REDIS_HEALTH_CHECK_INTERVALO = 30  # segundos
+    REDIS_CIRCUITO_UMBRAL_FALLOS = 5
+    REDIS_CIRCUITO_TIEMPO_APERTURA = 30  # segundos
+
+    # Caché de perfiles de usuario (rol/activo) para autorización
+    USUARIOS_CACHE_TTL_LOCAL = int(os.getenv("USUARIOS_CACHE_TTL_LOCAL", 30))
+    USUARIOS_CACHE_TTL_REDIS = int(os.getenv("USUARIOS_CACHE_TTL_REDIS", 300))
+    USUARIOS_CACHE_MAX_ENTRADAS = 10000
+
+    # Caché de claves de respuestas compiladas por evaluación (calificación)
+    CLAVES_CACHE_TTL_LOCAL = int(os.getenv("CLAVES_CACHE_TTL_LOCAL", 300))
+    CLAVES_CACHE_TTL_REDIS = int(os.getenv("CLAVES_CACHE_TTL_REDIS", 3600))
+    CLAVES_CACHE_MAX_ENTRADAS = 512
+
+    # Caché del libro de calificaciones por clase (versionada por calificaciones)
+    LIBRO_CALIFICACIONES_TTL_LOCAL = int(
+        os.getenv("LIBRO_CALIFICACIONES_TTL_LOCAL", 300)
+    )
+    LIBRO_CALIFICACIONES_TTL_REDIS = int(
+        os.getenv("LIBRO_CALIFICACIONES_TTL_REDIS", 3600)
+    )
+    LIBRO_CALIFICACIONES_CACHE_MAX_ENTRADAS = 128
+
+    # Análisis de ítems: filas de `respuestas` leídas por bloque
+    ANALISIS_ITEMS_TAMANO_BLOQUE = int(
+        os.getenv("ANALISIS_ITEMS_TAMANO_BLOQUE", 100000)
+    )
+
+    # Documentos subidos por docentes (almacén direccionado por contenido)
+    UPLOAD_FOLDER = os.getenv("UPLOAD_FOLDER", "uploads/")
+    MAX_UPLOAD_SIZE = int(os.getenv("MAX_UPLOAD_SIZE", 10 * 1024 * 1024))
+    CARGAS_TTL = int(os.getenv("CARGAS_TTL", 86400))  # cargas reanudables sin bloques
+
+    # Extracción de texto de documentos: fragmentos (páginas) confirmados por lote
+    # y bytes por fragmento en archivos de texto
+    DOCUMENTOS_FRAGMENTOS_POR_LOTE = int(
+        os.getenv("DOCUMENTOS_FRAGMENTOS_POR_LOTE", 50)
+    )
+    DOCUMENTOS_TAMANO_BLOQUE_TEXTO = 64 * 1024
+
+    # PDF con al menos este número de páginas se extraen por rangos en paralelo:
+    # "procesos" (pool local), "celery" (chord de subtareas; requiere un backend de
+    # resultados y, sin él, se usa el pool local) o "no"
+    DOCUMENTOS_EXTRACCION_PARALELA = os.getenv(
+        "DOCUMENTOS_EXTRACCION_PARALELA", "procesos"
+    )
+    DOCUMENTOS_UMBRAL_PAGINAS_PARALELO = int(
+        os.getenv("DOCUMENTOS_UMBRAL_PAGINAS_PARALELO", 200)
+    )
+    DOCUMENTOS_PAGINAS_POR_RANGO = int(os.getenv("DOCUMENTOS_PAGINAS_POR_RANGO", 50))
+    DOCUMENTOS_PROCESOS_EXTRACCION = None  # None = núcleos disponibles
+    # Una extracción "procesando" sin avance en este tiempo (segundos) se da por
+    # abandonada: las subidas idénticas ya no la esperan y extraen por su cuenta
+    DOCUMENTOS_EXTRACCION_INACTIVA = int(
+        os.getenv("DOCUMENTOS_EXTRACCION_INACTIVA", 600)
+    )
+
+    # Sesiones de examen en curso en Redis (autoguardado de respuestas)
+    SESIONES_EXAMEN_MARGEN_TTL = int(
+        os.getenv("SESIONES_EXAMEN_MARGEN_TTL", 3600)
+    )  # segundos que el borrador sobrevive a la hora límite
+    SESIONES_EXAMEN_TTL_SIN_LIMITE = int(
+        os.getenv("SESIONES_EXAMEN_TTL_SIN_LIMITE", 86400)
+    )
+    SESIONES_EXAMEN_GRACIA = 5  # segundos de tolerancia para autoguardados tardíos
+
+    # Revocación de tokens (filtro de Bloom por worker delante de Redis)
+    JWT_REVOCACION_CAPACIDAD = int(os.getenv("JWT_REVOCACION_CAPACIDAD", 100000))
+    JWT_REVOCACION_TASA_FALSOS_POSITIVOS = 0.001
+    JWT_REVOCACION_INTERVALO_RECONSTRUCCION = 300  # segundos
+    JWT_REVOCACION_PUBSUB = True
+    # Sin filtro cargado y con Redis caído: "permitir" o "rechazar" el token
+    # (ver auth/revocation.py)
+    JWT_REVOCACION_SIN_FILTRO = os.getenv("JWT_REVOCACION_SIN_FILTRO", "permitir")
+    JWT_REVOCACION_REINTENTO = 5  # segundos entre intentos de cargar el filtro
+
+    # Hashing de contraseñas (bcrypt en un pool de procesos acotado por worker).
+    # POOL_PROCESOS + MAX_EN_COLA es el máximo de hashes en curso por máquina,
+    # compartido por los workers a través de Redis
+    BCRYPT_LOG_ROUNDS = 12
+    BCRYPT_MIN_LOG_ROUNDS = 10
+    HASHING_POOL_PROCESOS = int(os.getenv("HASHING_POOL_PROCESOS", 2))
+    HASHING_MAX_EN_COLA = int(os.getenv("HASHING_MAX_EN_COLA", 32))
+    HASHING_TIMEOUT = 10.0  # segundos
+    HASHING_CALIBRAR = False
+    HASHING_OBJETIVO_MS = int(os.getenv("HASHING_OBJETIVO_MS", 250))
+    # Costo bcrypt reducido para importaciones en bloque, solo si se pide de forma
+    # explícita (`flask user import --rondas-reducidas`); esas cuentas se elevan a
+    # BCRYPT_LOG_ROUNDS en su primer inicio de sesión. Por defecto se importa con
+    # BCRYPT_LOG_ROUNDS
+    USUARIOS_IMPORTACION_RONDAS = int(os.getenv("USUARIOS_IMPORTACION_RONDAS", 6))
+
+    # Escritura diferida de últimos accesos (login, visitas a clases)
+    ULTIMO_ACCESO_INTERVALO_VOLCADO = int(
+        os.getenv("ULTIMO_ACCESO_INTERVALO_VOLCADO", 30)
+    )  # segundos
+    ULTIMO_ACCESO_HILO_VOLCADO = True
+
+    # Limitación de tasa: (peticiones, periodo en segundos) por clave
+    RATELIMIT_HABILITADO = True
+    # Una escuela entera puede salir a Internet por una sola IP (NAT o proxy) y
+    # entrar a las 8:00: el límite por IP solo frena abusos masivos; el de cada
+    # cuenta es el que protege contra la fuerza bruta
+    RATELIMIT_LOGIN_IP = (int(os.getenv("RATELIMIT_LOGIN_IP_LIMITE", 600)), 60)
+    RATELIMIT_LOGIN_CORREO = (5, 300)
+    RATELIMIT_REGISTRO_IP = (10, 3600)
+    RATELIMIT_REGISTRO_CORREO = (3, 3600)
+
+    # Proxies de confianza delante de la app (nginx, balanceador): con N > 0 la IP
+    # del cliente se toma de X-Forwarded-For (werkzeug ProxyFix)
+    PROXY_SALTOS = int(os.getenv("PROXY_SALTOS", 0))
+
     # Otras configuraciones globales
     CORS_HEADERS = "Content-Type"
 
@@ -82,6 +204,13 @@ class TestingConfig(Config):
     JWT_CSRF_IN_COOKIES = False
     JWT_CSRF_CHECK_FORM = False
 
+    # Sin servidor Redis ni hilos o procesos de fondo durante las pruebas
+    REDIS_URL = "memory://"
+    JWT_REVOCACION_PUBSUB = False
+    ULTIMO_ACCESO_HILO_VOLCADO = False
+    HASHING_POOL_PROCESOS = 0
+    BCRYPT_LOG_ROUNDS = 4
+
 
 class ProductionConfig(Config):
     """Configuración para el entorno de producción."""
@@ -93,6 +222,9 @@ class ProductionConfig(Config):
     JWT_COOKIE_HTTPONLY = True
     JWT_COOKIE_SAMESITE = "Lax"
 
+    # Ajustar el costo de bcrypt al hardware al arrancar cada worker
+    HASHING_CALIBRAR = True
+
     # Configuración de base de datos desde variables de entorno
     SQLALCHEMY_DATABASE_URI = os.getenv("DATABASE_URL")
 
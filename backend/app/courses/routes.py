@@ -1,11 +1,73 @@
 # backend/app/courses/routes.py
-from flask import jsonify
+from functools import wraps
+
+from flask import Response, jsonify, request, stream_with_context
 from . import courses_bp
 from flask_jwt_extended import jwt_required, get_jwt_identity
+from app.utils.conditional import respuesta_condicional
+from app.services.ultimo_acceso_service import buffer_ultimo_acceso
+from sqlalchemy import select
+from app.extensions import db
+from app.auth.decorators import roles_required
+from app.auth.user_cache import obtener_perfil
+from app.models.clase import Clase
+from app.models.estadisticas import obtener_estadisticas
+from app.models.inscripcion_clase import InscripcionClase
+from app.schemas import ClaseEstadisticasSchema
+from app.services.libro_calificaciones_service import exportar_csv, obtener_libro
+
+clase_estadisticas_schema = ClaseEstadisticasSchema()
+
+
+def _puede_ver_clase(clase):
+    """El docente de la clase, sus inscritos (no abandonados) o un administrador."""
+    perfil = obtener_perfil(get_jwt_identity())
+    if perfil is None or not perfil.activo:
+        return False
+    if perfil.rol == "admin" or clase.docente_id == perfil.id:
+        return True
+    inscripcion = db.session.execute(
+        select(InscripcionClase.id)
+        .where(
+            InscripcionClase.clase_id == clase.id,
+            InscripcionClase.estudiante_id == perfil.id,
+            InscripcionClase.estado != "abandonado",
+        )
+        .limit(1)
+    ).first()
+    return inscripcion is not None
+
+
+def _registrar_acceso_a_clase(vista):
+    """
+    Anota de forma diferida el último acceso de la inscripción del usuario.
+
+    Va debajo de `jwt_required` y encima de `respuesta_condicional`, para que un
+    304 también cuente como visita. Si el usuario no está inscrito en la clase no
+    se anota nada.
+    """
+
+    @wraps(vista)
+    def envoltura(course_id, **kwargs):
+        estudiante_id = int(get_jwt_identity())
+        inscrito = db.session.execute(
+            select(InscripcionClase.id)
+            .where(
+                InscripcionClase.clase_id == course_id,
+                InscripcionClase.estudiante_id == estudiante_id,
+            )
+            .limit(1)
+        ).first()
+        if inscrito is not None:
+            buffer_ultimo_acceso.registrar("inscripcion", (estudiante_id, course_id))
+        return vista(course_id, **kwargs)
+
+    return envoltura
 
 
 @courses_bp.route("/", methods=["GET"])
 @jwt_required()
+@respuesta_condicional()
 def get_courses():
     """Obtener todos los cursos disponibles"""
     # TODO: Implementar lógica para obtener cursos
@@ -17,7 +79,49 @@ def get_courses():
 
 @courses_bp.route("/<int:course_id>", methods=["GET"])
 @jwt_required()
+@_registrar_acceso_a_clase
+@respuesta_condicional()
 def get_course(course_id):
     """Obtener información de un curso específico"""
     # TODO: Implementar lógica para obtener un curso por ID
     return jsonify({"id": course_id, "nombre": f"Curso {course_id}"}), 200
+
+
+@courses_bp.route("/<int:course_id>/estadisticas", methods=["GET"])
+@jwt_required()
+def get_course_statistics(course_id):
+    """Panel de estadísticas de la clase (acumulados precalculados)."""
+    clase = obtener_estadisticas(course_id)
+    if clase is None:
+        return jsonify({"error": "Clase no encontrada"}), 404
+    if not _puede_ver_clase(clase):
+        return jsonify({"error": "No tienes acceso a esta clase"}), 403
+    return jsonify(clase_estadisticas_schema.dump(clase)), 200
+
+
+@courses_bp.route("/<int:course_id>/calificaciones", methods=["GET"])
+@roles_required(["docente", "admin"])
+def get_course_gradebook(course_id):
+    """Libro de calificaciones (estudiantes × evaluaciones); `?formato=csv`."""
+    docente_id = db.session.execute(
+        select(Clase.docente_id).where(Clase.id == course_id)
+    ).scalar_one_or_none()
+    if docente_id is None:
+        return jsonify({"error": "Clase no encontrada"}), 404
+    perfil = obtener_perfil(get_jwt_identity())
+    if perfil.rol != "admin" and docente_id != perfil.id:
+        return jsonify({"error": "Solo el docente de la clase puede verlo"}), 403
+    libro = obtener_libro(course_id)
+    if libro is None:
+        return jsonify({"error": "Clase no encontrada"}), 404
+    if request.args.get("formato") == "csv":
+        return Response(
+            stream_with_context(exportar_csv(libro)),
+            mimetype="text/csv",
+            headers={
+                "Content-Disposition": (
+                    f"attachment; filename=calificaciones_clase_{course_id}.csv"
+                )
+            },
+        )
+    return jsonify(libro), 200
@@ -1,8 +1,26 @@
 from flask import jsonify, request
-from flask_jwt_extended import jwt_required
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from marshmallow import ValidationError
 from . import evaluations_bp
 from app.extensions import db
-from app.models import Question, Answer
+from app.auth.decorators import roles_required
+from app.models import AnalisisEvaluacion, Question, Answer
+from app.schemas import (
+    RespuestaBorradorSchema,
+    RespuestaEnvioSchema,
+    ResultadoEvaluacionSchema,
+)
+from app.services import sesion_examen_service
+from app.services.calificacion_service import (
+    ROLES_ESTUDIANTE,
+    EnvioInvalidoError,
+    enviar_intento,
+)
+from app.services.sesion_examen_service import SesionExamenError
+
+respuesta_envio_schema = RespuestaEnvioSchema()
+resultado_evaluacion_schema = ResultadoEvaluacionSchema()
+respuesta_borrador_schema = RespuestaBorradorSchema()
 
 @evaluations_bp.route('/questions/<int:question_id>/answers', methods=['POST'])
 @jwt_required()
@@ -26,6 +44,102 @@ def add_answer(question_id):
         return jsonify({"error": "Error interno del servidor"}), 500
 
 @evaluations_bp.route('/questions/<int:question_id>/answers', methods=['GET'])
+@jwt_required()
 def get_answers(question_id):
     answers = Answer.query.filter_by(question_id=question_id).all()
-    return jsonify([a.to_dict() for a in answers])
\ No newline at end of file
+    return jsonify([a.to_dict() for a in answers])
+
+
+@evaluations_bp.route("/<int:evaluacion_id>/intentos", methods=["POST"])
+@roles_required(ROLES_ESTUDIANTE)
+def enviar_respuestas(evaluacion_id):
+    """Envía y califica todas las respuestas de un intento en una transacción."""
+    try:
+        envio = respuesta_envio_schema.load(request.get_json() or {})
+    except ValidationError as err:
+        return jsonify({"error": err.messages}), 400
+
+    try:
+        resultado = enviar_intento(evaluacion_id, int(get_jwt_identity()), envio)
+    except EnvioInvalidoError as err:
+        return jsonify({"error": err.mensaje}), err.codigo
+    return jsonify(resultado_evaluacion_schema.dump(resultado)), 201
+
+
+@evaluations_bp.route("/<int:evaluacion_id>/analisis", methods=["GET"])
+@roles_required(["docente", "admin"])
+def obtener_analisis(evaluacion_id):
+    """Último análisis de ítems calculado para la evaluación."""
+    analisis = db.session.get(AnalisisEvaluacion, evaluacion_id)
+    if analisis is None:
+        return jsonify({"error": "La evaluación aún no tiene análisis de ítems"}), 404
+    return jsonify(analisis.to_dict()), 200
+
+
+def _sesion_json(sesion):
+    sesion = dict(sesion)
+    for campo in ("fecha_inicio", "fecha_limite"):
+        if sesion[campo] is not None:
+            sesion[campo] = sesion[campo].isoformat()
+    return sesion
+
+
+@evaluations_bp.route("/<int:evaluacion_id>/sesion", methods=["POST"])
+@jwt_required()
+def iniciar_sesion_examen(evaluacion_id):
+    """Inicia el siguiente intento o devuelve la sesión en curso."""
+    try:
+        sesion, creada = sesion_examen_service.iniciar_sesion(
+            evaluacion_id, int(get_jwt_identity())
+        )
+    except SesionExamenError as err:
+        return jsonify({"error": err.mensaje}), err.codigo
+    return jsonify(_sesion_json(sesion)), 201 if creada else 200
+
+
+@evaluations_bp.route("/<int:evaluacion_id>/sesion", methods=["GET"])
+@jwt_required()
+def obtener_sesion_examen(evaluacion_id):
+    """Sesión en curso con las respuestas autoguardadas (no consulta la BD)."""
+    try:
+        sesion = sesion_examen_service.obtener_sesion(
+            evaluacion_id, int(get_jwt_identity())
+        )
+    except SesionExamenError as err:
+        return jsonify({"error": err.mensaje}), err.codigo
+    if sesion is None:
+        return jsonify({"error": "No hay una sesión de examen en curso"}), 404
+    return jsonify(_sesion_json(sesion)), 200
+
+
+@evaluations_bp.route(
+    "/<int:evaluacion_id>/sesion/respuestas/<int:pregunta_id>", methods=["PUT"]
+)
+@jwt_required()
+def autoguardar_respuesta(evaluacion_id, pregunta_id):
+    """Autoguarda la respuesta a una pregunta de la sesión en curso."""
+    try:
+        respuesta = respuesta_borrador_schema.load(request.get_json() or {})
+    except ValidationError as err:
+        return jsonify({"error": err.messages}), 400
+
+    try:
+        restantes = sesion_examen_service.guardar_respuesta(
+            evaluacion_id, int(get_jwt_identity()), pregunta_id, respuesta
+        )
+    except SesionExamenError as err:
+        return jsonify({"error": err.mensaje}), err.codigo
+    return jsonify({"guardada": True, "segundos_restantes": restantes}), 200
+
+
+@evaluations_bp.route("/<int:evaluacion_id>/sesion/envio", methods=["POST"])
+@jwt_required()
+def enviar_sesion_examen(evaluacion_id):
+    """Envía y califica el intento con las respuestas autoguardadas."""
+    try:
+        resultado = sesion_examen_service.enviar_sesion(
+            evaluacion_id, int(get_jwt_identity())
+        )
+    except (SesionExamenError, EnvioInvalidoError) as err:
+        return jsonify({"error": err.mensaje}), err.codigo
+    return jsonify(resultado_evaluacion_schema.dump(resultado)), 201
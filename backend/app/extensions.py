@@ -1,13 +1,201 @@
 # backend/app/extensions.py
+import threading
+import time
+
 from flask_sqlalchemy import SQLAlchemy
 from flask_bcrypt import Bcrypt
-from redis import Redis
-from flask_marshmallow import Marshmallow # Added import
+from redis import ConnectionPool, Redis
+from redis.commands.core import Script
+from redis.exceptions import ConnectionError as RedisConnectionError
+from redis.exceptions import RedisError
+from redis.exceptions import TimeoutError as RedisTimeoutError
+from flask_marshmallow import Marshmallow  # Added import
+
+REDIS_URL_POR_DEFECTO = "redis://localhost:6379/0"
+
+
+class CircuitoRedisAbiertoError(RedisConnectionError):
+    """Redis se considera caído: se falla de inmediato sin abrir conexiones."""
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker de tres estados (cerrado, abierto, semiabierto).
+
+    Tras `umbral_fallos` errores de conexión consecutivos se abre durante
+    `tiempo_apertura` segundos; después deja pasar una petición de prueba.
+    """
+
+    def __init__(self, umbral_fallos=5, tiempo_apertura=30.0):
+        self.umbral_fallos = umbral_fallos
+        self.tiempo_apertura = tiempo_apertura
+        self.fallos_consecutivos = 0
+        self.aperturas = 0
+        self._abierto_hasta = 0.0
+        self._prueba_en_curso = False
+        self._lock = threading.Lock()
+
+    @property
+    def estado(self):
+        if self.fallos_consecutivos < self.umbral_fallos:
+            return "cerrado"
+        if time.monotonic() < self._abierto_hasta:
+            return "abierto"
+        return "semiabierto"
+
+    def permitir(self):
+        with self._lock:
+            estado = self.estado
+            if estado == "cerrado":
+                return True
+            if estado == "semiabierto" and not self._prueba_en_curso:
+                self._prueba_en_curso = True
+                return True
+            return False
+
+    def registrar_exito(self):
+        with self._lock:
+            self.fallos_consecutivos = 0
+            self._prueba_en_curso = False
+
+    def liberar_prueba(self):
+        """
+        La petición terminó sin decir nada sobre la conexión (p. ej. un error de
+        argumentos antes de enviarla): otra petición puede hacer la prueba.
+        """
+        with self._lock:
+            self._prueba_en_curso = False
+
+    def registrar_fallo(self):
+        with self._lock:
+            self.fallos_consecutivos += 1
+            self._prueba_en_curso = False
+            if self.fallos_consecutivos >= self.umbral_fallos:
+                if time.monotonic() >= self._abierto_hasta:
+                    self.aperturas += 1
+                self._abierto_hasta = time.monotonic() + self.tiempo_apertura
+
+
+class ClienteRedis:
+    """
+    Cliente Redis configurado por la app y creado de forma perezosa.
+
+    - Pool de conexiones explícito por worker, con timeouts de conexión y lectura
+      y health checks periódicos.
+    - Circuit breaker: con Redis caído los comandos fallan al instante con
+      `CircuitoRedisAbiertoError` (subclase de `redis.ConnectionError`) en lugar
+      de esperar el timeout de TCP en cada petición.
+    - `REDIS_URL = "memory://"` usa fakeredis en memoria (pruebas sin servidor; con
+      lupa instalado también ejecuta los scripts Lua).
+    """
+
+    # Devuelven objetos con conexión propia; no pasan por el circuit breaker
+    SIN_CIRCUITO = {"pipeline", "pubsub", "connection_pool", "get_encoder"}
+
+    def __init__(self):
+        self._config = {}
+        self._cliente = None
+        self._pool = None
+        self._lock = threading.Lock()
+        self.circuito = CircuitBreaker()
+
+    def init_app(self, app):
+        self._config = {
+            "url": app.config.get("REDIS_URL", REDIS_URL_POR_DEFECTO),
+            "max_connections": app.config.get("REDIS_MAX_CONEXIONES", 20),
+            "socket_connect_timeout": app.config.get("REDIS_TIMEOUT_CONEXION", 0.5),
+            "socket_timeout": app.config.get("REDIS_TIMEOUT_LECTURA", 0.5),
+            "health_check_interval": app.config.get("REDIS_HEALTH_CHECK_INTERVALO", 30),
+        }
+        self.circuito = CircuitBreaker(
+            umbral_fallos=app.config.get("REDIS_CIRCUITO_UMBRAL_FALLOS", 5),
+            tiempo_apertura=app.config.get("REDIS_CIRCUITO_TIEMPO_APERTURA", 30),
+        )
+        self._cerrar()
+
+    def _cerrar(self):
+        with self._lock:
+            if self._pool is not None:
+                self._pool.disconnect()
+            self._cliente = None
+            self._pool = None
+
+    def _obtener_cliente(self):
+        if self._cliente is None:
+            with self._lock:
+                if self._cliente is None:
+                    self._cliente = self._crear_cliente()
+        return self._cliente
+
+    def _crear_cliente(self):
+        config = dict(self._config) or {"url": REDIS_URL_POR_DEFECTO}
+        url = config.pop("url")
+        if url.startswith("memory://"):
+            import fakeredis
+
+            # Un servidor por cliente: cada app de pruebas empieza vacía
+            return fakeredis.FakeRedis(
+                server=fakeredis.FakeServer(), decode_responses=True
+            )
+        self._pool = ConnectionPool.from_url(url, decode_responses=True, **config)
+        return Redis(connection_pool=self._pool)
+
+    def register_script(self, script):
+        # El script se ejecuta a través de este proxy, y por tanto del circuito
+        if isinstance(self._obtener_cliente(), Redis):
+            return Script(self, script)
+        return self._obtener_cliente().register_script(script)
+
+    def __getattr__(self, nombre):
+        atributo = getattr(self._obtener_cliente(), nombre)
+        if nombre in self.SIN_CIRCUITO or not callable(atributo):
+            return atributo
+
+        def comando(*args, **kwargs):
+            if not self.circuito.permitir():
+                raise CircuitoRedisAbiertoError("Circuito de Redis abierto")
+            try:
+                resultado = atributo(*args, **kwargs)
+            except (RedisConnectionError, RedisTimeoutError):
+                self.circuito.registrar_fallo()
+                raise
+            except RedisError:
+                # Redis respondió (ResponseError, NoScriptError...): está disponible
+                self.circuito.registrar_exito()
+                raise
+            except BaseException:
+                self.circuito.liberar_prueba()
+                raise
+            self.circuito.registrar_exito()
+            return resultado
+
+        return comando
+
+    def estadisticas(self):
+        """Utilización del pool de conexiones y estado del circuito de este worker."""
+        datos = {
+            "redis.circuito_estado": self.circuito.estado,
+            "redis.circuito_aperturas": self.circuito.aperturas,
+        }
+        pool = self._pool
+        if pool is not None:
+            en_uso = len(pool._in_use_connections)
+            datos.update(
+                {
+                    "redis.pool_max_conexiones": pool.max_connections,
+                    "redis.pool_creadas": pool._created_connections,
+                    "redis.pool_disponibles": len(pool._available_connections),
+                    "redis.pool_en_uso": en_uso,
+                    "redis.pool_utilizacion": en_uso / pool.max_connections,
+                }
+            )
+        return datos
+
 
 # Instancia única de SQLAlchemy
 # Esta instancia debe ser usada en toda la aplicación
 
 db = SQLAlchemy()
 bcrypt = Bcrypt()
-redis_client = Redis(host='localhost', port=6379, decode_responses=True)
-ma = Marshmallow() # Added Marshmallow instance
+redis_client = ClienteRedis()  # Se configura con init_app en create_app
+ma = Marshmallow()  # Added Marshmallow instance
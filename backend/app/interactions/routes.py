@@ -2,10 +2,12 @@
 from flask import jsonify, request
 from . import interactions_bp
 from flask_jwt_extended import jwt_required, get_jwt_identity
+from app.utils.conditional import respuesta_condicional
 
 
 @interactions_bp.route("/messages", methods=["GET"])
 @jwt_required()
+@respuesta_condicional()
 def get_messages():
     """Obtener mensajes de interacción"""
     # TODO: Implementar lógica para obtener mensajes
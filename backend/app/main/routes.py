@@ -1,6 +1,13 @@
 # backend/app/main/routes.py
-from flask import jsonify
+from flask import jsonify, request
+from marshmallow import ValidationError
 from . import main_bp
+from app.auth.decorators import roles_required
+from app.auth.user_cache import obtener_perfil
+from app.schemas.base_schemas import PaginacionSchema
+from app.services.busqueda_service import buscar
+from app.services.calificacion_service import ROLES_ESTUDIANTE
+from flask_jwt_extended import get_jwt_identity
 
 
 @main_bp.route("/")
@@ -15,6 +22,7 @@ def index():
                     "auth": "/api/auth",
                     "cursos": "/api/courses",
                     "interacciones": "/api/interactions",
+                    "busqueda": "/api/search",
                 },
             }
         ),
@@ -26,3 +34,25 @@ def index():
 def status():
     """Verificar el estado de la API"""
     return jsonify({"status": "en línea", "timestamp": "2025-05-19T03:45:00Z"}), 200
+
+
+@main_bp.route("/search", methods=["GET"])
+@roles_required([*ROLES_ESTUDIANTE, "docente", "admin"])
+def search():
+    """Búsqueda de texto completo en las lecciones y documentos del usuario"""
+    texto = request.args.get("q", "").strip()
+    if not texto:
+        return jsonify({"error": "Se requiere el parámetro 'q'"}), 400
+    try:
+        parametros = PaginacionSchema().load(request.args)
+    except ValidationError as err:
+        return jsonify({"error": err.messages}), 400
+    perfil = obtener_perfil(get_jwt_identity())
+    resultado = buscar(
+        texto,
+        perfil.id,
+        perfil.rol,
+        pagina=parametros["pagina"],
+        por_pagina=parametros["por_pagina"],
+    )
+    return jsonify(resultado), 200
@@ -14,5 +14,16 @@ from .leccion import Leccion
 from .modulo import Modulo
 from .question import Question
 from .answer import Answer
+from .estadistica_clase import EstadisticaClase
+from .analisis_evaluacion import AnalisisEvaluacion
+from .fragmento_archivo import FragmentoArchivo
+from .indice_busqueda import IndiceBusqueda
 
-__all__ = ["Usuario", "InscripcionClase", "Clase", "ArchivoCargado", "Mensaje", "Respuesta", "Pregunta", "OpcionRespuesta", "Evaluacion", "Leccion", "Modulo", "Question", "Answer"]
+# Registra los eventos que mantienen los contadores desnormalizados
+from . import contadores  # noqa: E402,F401
+# ... y los acumulados de estadísticas por clase
+from . import estadisticas  # noqa: E402,F401
+# ... y el índice de búsqueda de texto completo
+from . import indexacion  # noqa: E402,F401
+
+__all__ = ["Usuario", "InscripcionClase", "Clase", "ArchivoCargado", "Mensaje", "Respuesta", "Pregunta", "OpcionRespuesta", "Evaluacion", "Leccion", "Modulo", "Question", "Answer", "EstadisticaClase", "AnalisisEvaluacion", "FragmentoArchivo", "IndiceBusqueda"]
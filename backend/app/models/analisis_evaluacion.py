@@ -0,0 +1,45 @@
+# app/models/analisis_evaluacion.py
+# Resultado persistido del análisis de ítems de una evaluación.
+#
+# Lo genera services/analisis_items_service.py (ejecución nocturna); una fila por
+# evaluación, reemplazada en cada ejecución. El detalle por pregunta y por opción
+# se guarda como JSON porque siempre se lee completo junto con la evaluación.
+from datetime import datetime
+
+from app.extensions import db
+
+
+class AnalisisEvaluacion(db.Model):
+    __tablename__ = "analisis_evaluaciones"
+
+    evaluacion_id = db.Column(
+        db.Integer,
+        db.ForeignKey("evaluaciones.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    # Estudiantes incluidos (primer intento de cada uno)
+    examinados = db.Column(db.Integer, nullable=False, default=0)
+    alfa_cronbach = db.Column(db.Float, nullable=True)
+    media_puntaje = db.Column(db.Float, nullable=True)
+    desviacion_puntaje = db.Column(db.Float, nullable=True)
+    # [{pregunta_id, dificultad, discriminacion, omitidas, opciones: [...]}, ...]
+    preguntas = db.Column(db.JSON, nullable=False, default=list)
+    fecha_calculo = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+    evaluacion = db.relationship("Evaluacion")
+
+    def __repr__(self):
+        return f"<AnalisisEvaluacion {self.evaluacion_id}>"
+
+    def to_dict(self):
+        return {
+            "evaluacion_id": self.evaluacion_id,
+            "examinados": self.examinados,
+            "alfa_cronbach": self.alfa_cronbach,
+            "media_puntaje": self.media_puntaje,
+            "desviacion_puntaje": self.desviacion_puntaje,
+            "preguntas": self.preguntas,
+            "fecha_calculo": self.fecha_calculo.isoformat()
+            if self.fecha_calculo
+            else None,
+        }
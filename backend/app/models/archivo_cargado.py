@@ -14,17 +14,41 @@ class ArchivoCargado(db.Model):
     tipo_mime = db.Column(db.String(50), nullable=False)
     tamano = db.Column(db.Integer, nullable=False)
     ruta_almacenamiento = db.Column(db.String(512), nullable=False)
+    # SHA-256 del contenido; las subidas idénticas comparten archivo y texto
+    hash_sha256 = db.Column(db.String(64), nullable=True, index=True)
     usuario_id = db.Column(db.Integer, db.ForeignKey('usuarios.id'), nullable=False)
     clase_id = db.Column(db.Integer, db.ForeignKey('clases.id'), nullable=True)
     fecha_subida = db.Column(db.DateTime, default=datetime.utcnow)
-    estado_procesamiento_texto = db.Column(db.String(20), default='pendiente')  # pendiente, procesado, error
+    estado_procesamiento_texto = db.Column(db.String(20), default='pendiente')  # pendiente, procesando, procesado, error
+    # Solo archivos procesados antes de `fragmentos`; usar iterar_texto()
     texto_extraido = db.Column(db.Text, nullable=True)
+    # Progreso de la extracción (páginas en PDF, bloques en TXT)
+    paginas_procesadas = db.Column(db.Integer, nullable=False, default=0)
+    paginas_totales = db.Column(db.Integer, nullable=True)
     fecha_procesamiento = db.Column(db.DateTime, nullable=True)
+    # Último avance confirmado (inicio o lote) de la extracción en curso
+    fecha_progreso = db.Column(db.DateTime, nullable=True)
     mensaje_error = db.Column(db.Text, nullable=True)
 
     # Relación inversa
     usuario = db.relationship('Usuario', backref='archivos_subidos', lazy=True)
     clase = db.relationship('Clase', back_populates='archivos')
+    fragmentos = db.relationship(
+        'FragmentoArchivo',
+        back_populates='archivo',
+        lazy='dynamic',
+        cascade='all, delete-orphan',
+        passive_deletes=True,
+        order_by='FragmentoArchivo.indice',
+    )
 
     def __repr__(self):
         return f'<ArchivoCargado {self.id} - {self.nombre_original}>'
+
+    def iterar_texto(self, tamano_lote=100):
+        """Texto extraído, fragmento a fragmento y en orden, sin cargarlo completo."""
+        if self.texto_extraido is not None:
+            yield self.texto_extraido
+            return
+        for fragmento in self.fragmentos.yield_per(tamano_lote):
+            yield fragmento.texto
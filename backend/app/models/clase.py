@@ -1,6 +1,7 @@
 # app/models/clase.py
 from typing import TYPE_CHECKING, List, Optional, Any, Dict
 from app.extensions import db  # Importar db desde extensions
+from app.utils.dataloader import cargar_relacion
 from datetime import datetime
 
 # Importaciones de tipos para type checking
@@ -33,6 +34,14 @@ class Clase(db.Model):
         },
     )
 
+    # Contadores desnormalizados (ver models/contadores.py)
+    total_modulos = db.Column(
+        db.Integer, default=0, server_default="0", nullable=False
+    )
+    total_estudiantes = db.Column(
+        db.Integer, default=0, server_default="0", nullable=False
+    )
+
     # Relaciones
     docente_id = db.Column(db.Integer, db.ForeignKey("usuarios.id"), nullable=False)
     docente = db.relationship("Usuario", backref="clases", lazy=True)
@@ -40,13 +49,20 @@ class Clase(db.Model):
     inscripciones = db.relationship("InscripcionClase", back_populates="clase", lazy=True)
     archivos = db.relationship("ArchivoCargado", back_populates="clase", lazy=True)
     modulos = db.relationship("Modulo", back_populates="clase", lazy="dynamic", cascade="all, delete-orphan")
+    # Acumulados del panel de estadísticas (ver models/estadisticas.py)
+    estadisticas = db.relationship(
+        "EstadisticaClase",
+        back_populates="clase",
+        uselist=False,
+        cascade="all, delete-orphan",
+    )
 
     def __repr__(self):
         return f"<Clase {self.id} - {self.nombre}>"
 
-    def to_dict(self):
+    def to_dict(self, incluir_modulos=False):
         """Serialización básica de la clase."""
-        return {
+        data = {
             "id": self.id,
             "nombre": self.nombre,
             "descripcion": self.descripcion,
@@ -55,8 +71,18 @@ class Clase(db.Model):
             "fecha_creacion": self.fecha_creacion,
             "fecha_actualizacion": self.fecha_actualizacion,
             "progreso_grupal": self.progreso_grupal,
+            "total_modulos": self.total_modulos,
+            "total_estudiantes": self.total_estudiantes,
         }
 
+        if incluir_modulos:
+            modulos = cargar_relacion(self, "modulos")
+            data["modulos"] = [
+                modulo.to_dict(incluir_lecciones=True) for modulo in modulos
+            ]
+
+        return data
+
 # --- Agregar relación mensajes después de definir ambas clases ---
 from .mensaje import Mensaje
 Clase.mensajes = db.relationship(
@@ -0,0 +1,155 @@
+# app/models/contadores.py
+# Contadores desnormalizados (total_preguntas, total_lecciones, ...).
+#
+# Evitan un COUNT por objeto al serializar listas (p. ej. 50 módulos = 100 COUNT).
+# Se mantienen con eventos de mapper que ejecutan, dentro del mismo flush y
+# transacción, un UPDATE atómico `columna = columna ± 1` sobre la fila padre, de
+# modo que escrituras concurrentes no se pisan.
+#
+# Las operaciones que no pasan por la unidad de trabajo del ORM (inserciones
+# masivas de Core, SQL manual) no disparan los eventos: tras ellas, o ante
+# cualquier sospecha de deriva, usar `flask contadores reparar`.
+#
+# Un contador puede excluir filas por el valor de un campo (p. ej. las
+# inscripciones abandonadas no cuentan en `total_estudiantes`); cambiar ese campo
+# suma o resta igual que mover la fila a otro padre.
+from sqlalchemy import event, func, inspect, or_, select, update
+from sqlalchemy.orm import object_session
+from sqlalchemy.orm.attributes import set_committed_value
+
+from app.extensions import db
+from .actividad_colaborativa import ActividadColaborativa
+from .clase import Clase
+from .evaluacion import Evaluacion
+from .inscripcion_clase import InscripcionClase
+from .leccion import Leccion
+from .modulo import Modulo
+from .pregunta import Pregunta
+
+
+class Contador:
+    """
+    `padre.columna` cuenta las filas de `hijo` cuyo `hijo.fk` es `padre.id`. Con
+    `excluir=(campo, valores)` no cuentan las filas cuyo `campo` está en `valores`.
+    """
+
+    def __init__(self, hijo, fk, padre, columna, excluir=None):
+        self.hijo = hijo
+        self.fk = fk
+        self.padre = padre
+        self.columna = columna
+        self.excluir = excluir
+
+    def cuenta(self, valor):
+        """Indica si una fila con `valor` en el campo de exclusión se cuenta."""
+        return self.excluir is None or valor not in self.excluir[1]
+
+    def valores(self, objetivo, atributo):
+        """(anterior, actual) de un atributo del hijo durante el flush."""
+        if atributo is None:
+            return None, None
+        historial = inspect(objetivo).attrs[atributo].history
+        actual = getattr(objetivo, atributo)
+        anterior = historial.deleted[0] if historial.deleted else actual
+        return anterior, actual
+
+    def ajustar(self, connection, objetivo, padre_id, delta):
+        if padre_id is None:
+            return
+        columna = getattr(self.padre, self.columna)
+        connection.execute(
+            update(self.padre.__table__)
+            .where(self.padre.__table__.c.id == padre_id)
+            .values({self.columna: columna + delta})
+        )
+        # Mantiene coherente la instancia padre ya cargada en la sesión, si la hay
+        sesion = object_session(objetivo)
+        if sesion is None:
+            return
+        padre = sesion.identity_map.get(sesion.identity_key(self.padre, padre_id))
+        if padre is not None and self.columna in padre.__dict__:
+            actual = padre.__dict__[self.columna] or 0
+            set_committed_value(padre, self.columna, actual + delta)
+
+    def reparar(self):
+        """Recalcula la columna para todas las filas padre en un único UPDATE."""
+        tabla = self.padre.__table__
+        hijos = self.hijo.__table__
+        conteo = (
+            select(func.count())
+            .select_from(hijos)
+            .where(getattr(hijos.c, self.fk) == tabla.c.id)
+        )
+        if self.excluir is not None:
+            campo, excluidos = self.excluir
+            conteo = conteo.where(
+                or_(hijos.c[campo].is_(None), hijos.c[campo].notin_(excluidos))
+            )
+        conteo = conteo.scalar_subquery()
+        resultado = db.session.execute(
+            update(tabla)
+            .where(tabla.c[self.columna] != conteo)
+            .values({self.columna: conteo})
+            .execution_options(synchronize_session=False)
+        )
+        return resultado.rowcount
+
+
+CONTADORES = [
+    Contador(Pregunta, "evaluacion_id", Evaluacion, "total_preguntas"),
+    Contador(Leccion, "modulo_id", Modulo, "total_lecciones"),
+    Contador(ActividadColaborativa, "modulo_id", Modulo, "total_actividades"),
+    Contador(Modulo, "clase_id", Clase, "total_modulos"),
+    Contador(
+        InscripcionClase,
+        "clase_id",
+        Clase,
+        "total_estudiantes",
+        excluir=("estado", ("abandonado",)),
+    ),
+]
+
+
+def _registrar(contador):
+    campo = contador.excluir[0] if contador.excluir is not None else None
+
+    @event.listens_for(contador.hijo, "after_insert")
+    def al_insertar(mapper, connection, target):
+        if contador.cuenta(getattr(target, campo) if campo else None):
+            contador.ajustar(connection, target, getattr(target, contador.fk), 1)
+
+    @event.listens_for(contador.hijo, "after_delete")
+    def al_eliminar(mapper, connection, target):
+        padre_id, _ = contador.valores(target, contador.fk)
+        valor, _ = contador.valores(target, campo)
+        if contador.cuenta(valor):
+            contador.ajustar(connection, target, padre_id, -1)
+
+    @event.listens_for(contador.hijo, "after_update")
+    def al_actualizar(mapper, connection, target):
+        # Mover la fila a otro padre (p. ej. una lección a otro módulo) o cambiar
+        # el campo de exclusión (p. ej. abandonar una inscripción)
+        padre_anterior, padre_nuevo = contador.valores(target, contador.fk)
+        valor_anterior, valor_nuevo = contador.valores(target, campo)
+        contaba = contador.cuenta(valor_anterior)
+        cuenta = contador.cuenta(valor_nuevo)
+        if padre_anterior == padre_nuevo and contaba == cuenta:
+            return
+        if contaba:
+            contador.ajustar(connection, target, padre_anterior, -1)
+        if cuenta:
+            contador.ajustar(connection, target, padre_nuevo, 1)
+
+
+for _contador in CONTADORES:
+    _registrar(_contador)
+
+
+def reparar_contadores():
+    """Recalcula todos los contadores. Devuelve las filas corregidas por columna."""
+    corregidas = {
+        f"{contador.padre.__tablename__}.{contador.columna}": contador.reparar()
+        for contador in CONTADORES
+    }
+    db.session.commit()
+    return corregidas
@@ -0,0 +1,101 @@
+# app/models/estadistica_clase.py
+# Estadísticas agregadas de una clase, mantenidas de forma incremental.
+#
+# En lugar de recorrer inscripciones, lecciones y respuestas en cada lectura del
+# panel, se guardan sumas y conteos acumulados que se actualizan al calificar y al
+# cambiar inscripciones o lecciones (ver models/estadisticas.py). El promedio y la
+# distribución se derivan de esos acumulados, así que leerlos es O(1).
+from datetime import datetime
+
+from app.extensions import db
+
+# Cubetas del histograma de calificaciones (porcentaje 0-100): (etiqueta, mínimo)
+CUBETAS_CALIFICACION = (
+    ("0-59", 0.0),
+    ("60-69", 60.0),
+    ("70-79", 70.0),
+    ("80-89", 80.0),
+    ("90-100", 90.0),
+)
+
+
+def columna_cubeta(etiqueta):
+    return "cubeta_" + etiqueta.replace("-", "_")
+
+
+def cubeta_de(calificacion):
+    """Etiqueta de la cubeta a la que pertenece `calificacion`."""
+    elegida = CUBETAS_CALIFICACION[0][0]
+    for etiqueta, minimo in CUBETAS_CALIFICACION:
+        if calificacion >= minimo:
+            elegida = etiqueta
+    return elegida
+
+
+class EstadisticaClase(db.Model):
+    """Acumulados de una clase; una fila por clase."""
+
+    __tablename__ = "estadisticas_clase"
+
+    clase_id = db.Column(
+        db.Integer, db.ForeignKey("clases.id", ondelete="CASCADE"), primary_key=True
+    )
+    total_lecciones = db.Column(
+        db.Integer, default=0, server_default="0", nullable=False
+    )
+    # Lecciones con evaluación asociada
+    total_evaluaciones = db.Column(
+        db.Integer, default=0, server_default="0", nullable=False
+    )
+    estudiantes_abandonados = db.Column(
+        db.Integer, default=0, server_default="0", nullable=False
+    )
+    # Intentos de evaluación calificados y suma de sus calificaciones (0-100)
+    total_calificaciones = db.Column(
+        db.Integer, default=0, server_default="0", nullable=False
+    )
+    suma_calificaciones = db.Column(
+        db.Float, default=0.0, server_default="0", nullable=False
+    )
+    cubeta_0_59 = db.Column(db.Integer, default=0, server_default="0", nullable=False)
+    cubeta_60_69 = db.Column(db.Integer, default=0, server_default="0", nullable=False)
+    cubeta_70_79 = db.Column(db.Integer, default=0, server_default="0", nullable=False)
+    cubeta_80_89 = db.Column(db.Integer, default=0, server_default="0", nullable=False)
+    cubeta_90_100 = db.Column(db.Integer, default=0, server_default="0", nullable=False)
+    # Se incrementa con cada cambio que altera el libro de calificaciones de la
+    # clase (ver services/libro_calificaciones_service.py)
+    version_calificaciones = db.Column(
+        db.Integer, default=0, server_default="0", nullable=False
+    )
+    # Último recálculo completo (corrección de deriva)
+    fecha_recalculo = db.Column(db.DateTime, default=datetime.utcnow)
+
+    clase = db.relationship("Clase", back_populates="estadisticas")
+
+    def __repr__(self):
+        return f"<EstadisticaClase {self.clase_id}>"
+
+    @property
+    def promedio_calificaciones(self):
+        if not self.total_calificaciones:
+            return None
+        return round(self.suma_calificaciones / self.total_calificaciones, 2)
+
+    @property
+    def distribucion_calificaciones(self):
+        return {
+            etiqueta: getattr(self, columna_cubeta(etiqueta)) or 0
+            for etiqueta, _ in CUBETAS_CALIFICACION
+        }
+
+    def to_dict(self):
+        return {
+            "clase_id": self.clase_id,
+            "total_lecciones": self.total_lecciones,
+            "total_evaluaciones": self.total_evaluaciones,
+            "estudiantes_abandonados": self.estudiantes_abandonados,
+            "total_calificaciones": self.total_calificaciones,
+            "promedio_calificaciones": self.promedio_calificaciones,
+            "distribucion_calificaciones": self.distribucion_calificaciones,
+            "fecha_recalculo": self.fecha_recalculo,
+        }
@@ -0,0 +1,485 @@
+# app/models/estadisticas.py
+# Mantenimiento incremental de `EstadisticaClase` y su recálculo completo.
+#
+# Igual que los contadores (models/contadores.py), cada cambio aplica dentro del
+# mismo flush y transacción un UPDATE atómico `columna = columna ± delta` sobre la
+# fila de la clase:
+#   - lecciones creadas, eliminadas o movidas          -> total_lecciones/evaluaciones
+#   - inscripciones que pasan a (o dejan) 'abandonado' -> estudiantes_abandonados
+#   - intentos calificados (`registrar_calificacion`)  -> suma, conteo e histograma
+#
+# Los mismos eventos, y los cambios de respuestas, preguntas y evaluaciones,
+# incrementan `version_calificaciones`, que versiona la caché del libro de
+# calificaciones de la clase.
+#
+# Los acumulados pueden derivar (SQL manual, inserciones masivas, cambios de
+# puntaje posteriores a la calificación). `recalcular_estadisticas` los reconstruye
+# desde las tablas de origen; se ejecuta periódicamente con
+# `flask estadisticas recalcular` o la tarea Celery
+# `app.tasks.estadisticas.recalcular_estadisticas_clases`.
+from datetime import datetime
+
+from sqlalchemy import (
+    Numeric,
+    and_,
+    case,
+    cast,
+    event,
+    func,
+    insert,
+    inspect,
+    select,
+    update,
+)
+from sqlalchemy.orm import joinedload
+
+from app.extensions import db
+from .clase import Clase
+from .evaluacion import Evaluacion
+from .estadistica_clase import (
+    CUBETAS_CALIFICACION,
+    EstadisticaClase,
+    columna_cubeta,
+    cubeta_de,
+)
+from .inscripcion_clase import InscripcionClase
+from .leccion import Leccion
+from .modulo import Modulo
+from .pregunta import Pregunta
+from .respuesta import Respuesta
+
+TAMANO_LOTE_RECALCULO = 200
+ABANDONADO = "abandonado"
+
+_tabla = EstadisticaClase.__table__
+
+
+def _ajustar(ejecutor, condicion, **deltas):
+    valores = {col: _tabla.c[col] + delta for col, delta in deltas.items() if delta}
+    if valores:
+        ejecutor.execute(update(_tabla).where(condicion).values(valores))
+
+
+def _de_la_clase(clase_id):
+    return _tabla.c.clase_id == clase_id
+
+
+def _de_la_clase_del_modulo(modulo_id):
+    clase = select(Modulo.clase_id).where(Modulo.id == modulo_id).scalar_subquery()
+    return _tabla.c.clase_id == clase
+
+
+def _anterior(target, campo):
+    """Valor de `campo` antes de los cambios pendientes del flush."""
+    historial = inspect(target).attrs[campo].history
+    return historial.deleted[0] if historial.deleted else getattr(target, campo)
+
+
+def _conservar_valor_anterior(*atributos):
+    # Sin historial activo, asignar un atributo expirado (p. ej. tras un commit) no
+    # carga el valor previo y `_anterior` no sabría qué restar
+    for atributo in atributos:
+        event.listen(atributo, "set", lambda *args: None, active_history=True)
+
+
+_conservar_valor_anterior(
+    Leccion.modulo_id,
+    Leccion.evaluacion_id,
+    Modulo.clase_id,
+    InscripcionClase.clase_id,
+    InscripcionClase.estado,
+    Respuesta.evaluacion_id,
+    Pregunta.evaluacion_id,
+)
+
+
+# --- Clases ---
+
+
+@event.listens_for(Clase, "after_insert")
+def _clase_creada(mapper, connection, target):
+    connection.execute(
+        insert(_tabla).values(clase_id=target.id, fecha_recalculo=datetime.utcnow())
+    )
+
+
+# --- Lecciones ---
+
+
+def _ajustar_lecciones(connection, modulo_id, evaluacion_id, signo):
+    _ajustar(
+        connection,
+        _de_la_clase_del_modulo(modulo_id),
+        total_lecciones=signo,
+        total_evaluaciones=signo if evaluacion_id is not None else 0,
+        version_calificaciones=1 if evaluacion_id is not None else 0,
+    )
+
+
+@event.listens_for(Leccion, "after_insert")
+def _leccion_creada(mapper, connection, target):
+    _ajustar_lecciones(connection, target.modulo_id, target.evaluacion_id, 1)
+
+
+@event.listens_for(Leccion, "after_delete")
+def _leccion_eliminada(mapper, connection, target):
+    _ajustar_lecciones(
+        connection,
+        _anterior(target, "modulo_id"),
+        _anterior(target, "evaluacion_id"),
+        -1,
+    )
+
+
+@event.listens_for(Leccion, "after_update")
+def _leccion_actualizada(mapper, connection, target):
+    estado = inspect(target)
+    if not (
+        estado.attrs.modulo_id.history.has_changes()
+        or estado.attrs.evaluacion_id.history.has_changes()
+    ):
+        return
+    _ajustar_lecciones(
+        connection,
+        _anterior(target, "modulo_id"),
+        _anterior(target, "evaluacion_id"),
+        -1,
+    )
+    _ajustar_lecciones(connection, target.modulo_id, target.evaluacion_id, 1)
+
+
+@event.listens_for(Modulo, "after_update")
+def _modulo_movido(mapper, connection, target):
+    # Un módulo que cambia de clase se lleva sus lecciones
+    historial = inspect(target).attrs.clase_id.history
+    if not historial.has_changes():
+        return
+    lecciones, evaluaciones = connection.execute(
+        select(func.count(Leccion.id), func.count(Leccion.evaluacion_id)).where(
+            Leccion.modulo_id == target.id
+        )
+    ).one()
+    for anterior in historial.deleted:
+        _ajustar(
+            connection,
+            _de_la_clase(anterior),
+            total_lecciones=-lecciones,
+            total_evaluaciones=-evaluaciones,
+            version_calificaciones=1,
+        )
+    _ajustar(
+        connection,
+        _de_la_clase(target.clase_id),
+        total_lecciones=lecciones,
+        total_evaluaciones=evaluaciones,
+        version_calificaciones=1,
+    )
+
+
+# --- Inscripciones ---
+
+
+def _ajustar_inscripcion(connection, clase_id, estado, signo, nueva_version=True):
+    # Una inscripción que entra o sale de la clase cambia las filas del libro
+    _ajustar(
+        connection,
+        _de_la_clase(clase_id),
+        estudiantes_abandonados=signo if estado == ABANDONADO else 0,
+        version_calificaciones=1 if nueva_version else 0,
+    )
+
+
+@event.listens_for(InscripcionClase, "after_insert")
+def _inscripcion_creada(mapper, connection, target):
+    _ajustar_inscripcion(connection, target.clase_id, target.estado, 1)
+
+
+@event.listens_for(InscripcionClase, "after_delete")
+def _inscripcion_eliminada(mapper, connection, target):
+    _ajustar_inscripcion(
+        connection, _anterior(target, "clase_id"), _anterior(target, "estado"), -1
+    )
+
+
+@event.listens_for(InscripcionClase, "after_update")
+def _inscripcion_actualizada(mapper, connection, target):
+    antes = (_anterior(target, "clase_id"), _anterior(target, "estado"))
+    if antes == (target.clase_id, target.estado):
+        return
+    movida = antes[0] != target.clase_id
+    _ajustar_inscripcion(connection, *antes, -1, nueva_version=movida)
+    _ajustar_inscripcion(
+        connection, target.clase_id, target.estado, 1, nueva_version=movida
+    )
+
+
+# --- Calificaciones ---
+
+
+def _de_las_clases_de(evaluacion_ids):
+    return _tabla.c.clase_id.in_(
+        select(Modulo.clase_id)
+        .join(Leccion, Leccion.modulo_id == Modulo.id)
+        .where(Leccion.evaluacion_id.in_(evaluacion_ids))
+    )
+
+
+def registrar_calificacion(evaluacion_id, calificacion):
+    """
+    Suma un intento calificado (0-100) a las clases cuyas lecciones usan la
+    evaluación. Se ejecuta en la transacción en curso: se confirma o se descarta
+    junto con las respuestas del intento.
+    """
+    _ajustar(
+        db.session,
+        _de_las_clases_de([evaluacion_id]),
+        total_calificaciones=1,
+        suma_calificaciones=calificacion,
+        version_calificaciones=1,
+        **{columna_cubeta(cubeta_de(calificacion)): 1},
+    )
+
+
+def _nueva_version(connection, *evaluacion_ids):
+    evaluacion_ids = {e for e in evaluacion_ids if e is not None}
+    if evaluacion_ids:
+        _ajustar(
+            connection, _de_las_clases_de(evaluacion_ids), version_calificaciones=1
+        )
+
+
+def _campos_cambiados(target, *campos):
+    estado = inspect(target)
+    return any(estado.attrs[campo].history.has_changes() for campo in campos)
+
+
+# Calificación manual o corrección de respuestas
+@event.listens_for(Respuesta, "after_insert")
+@event.listens_for(Respuesta, "after_delete")
+def _respuesta_creada_o_eliminada(mapper, connection, target):
+    _nueva_version(connection, _anterior(target, "evaluacion_id"))
+
+
+@event.listens_for(Respuesta, "after_update")
+def _respuesta_actualizada(mapper, connection, target):
+    if _campos_cambiados(target, "calificacion", "evaluacion_id", "estudiante_id"):
+        _nueva_version(
+            connection, target.evaluacion_id, _anterior(target, "evaluacion_id")
+        )
+
+
+# Cambios en el puntaje total de una evaluación
+@event.listens_for(Pregunta, "after_insert")
+@event.listens_for(Pregunta, "after_delete")
+def _pregunta_creada_o_eliminada(mapper, connection, target):
+    _nueva_version(connection, _anterior(target, "evaluacion_id"))
+
+
+@event.listens_for(Pregunta, "after_update")
+def _pregunta_actualizada(mapper, connection, target):
+    if _campos_cambiados(target, "puntaje", "evaluacion_id"):
+        _nueva_version(
+            connection, target.evaluacion_id, _anterior(target, "evaluacion_id")
+        )
+
+
+# Columnas del libro: título y calificación aprobatoria
+@event.listens_for(Evaluacion, "after_update")
+def _evaluacion_actualizada(mapper, connection, target):
+    if _campos_cambiados(target, "titulo", "calificacion_aprobatoria"):
+        _nueva_version(connection, target.id)
+
+
+# --- Recálculo completo ---
+
+
+def _calcular_lecciones(lote):
+    filas = db.session.execute(
+        select(
+            Modulo.clase_id,
+            func.count(Leccion.id),
+            func.count(Leccion.evaluacion_id),
+        )
+        .join(Leccion, Leccion.modulo_id == Modulo.id)
+        .where(Modulo.clase_id.in_(lote))
+        .group_by(Modulo.clase_id)
+    )
+    return {
+        clase_id: {"total_lecciones": lecciones, "total_evaluaciones": evaluaciones}
+        for clase_id, lecciones, evaluaciones in filas
+    }
+
+
+def _calcular_abandonos(lote):
+    filas = db.session.execute(
+        select(InscripcionClase.clase_id, func.count())
+        .where(
+            InscripcionClase.clase_id.in_(lote),
+            InscripcionClase.estado == ABANDONADO,
+        )
+        .group_by(InscripcionClase.clase_id)
+    )
+    return {clase_id: {"estudiantes_abandonados": n} for clase_id, n in filas}
+
+
+def _calcular_calificaciones(lote):
+    """
+    Misma calificación que `calificacion_service.enviar_intento`: puntos obtenidos
+    en el intento sobre el puntaje total de la evaluación, en porcentaje con dos
+    decimales.
+    """
+    intentos = (
+        select(
+            Respuesta.evaluacion_id,
+            func.coalesce(func.sum(Respuesta.calificacion), 0.0).label("obtenido"),
+        )
+        .group_by(
+            Respuesta.evaluacion_id, Respuesta.estudiante_id, Respuesta.intento_numero
+        )
+        .subquery()
+    )
+    totales = (
+        select(
+            Pregunta.evaluacion_id,
+            func.sum(func.coalesce(Pregunta.puntaje, 0.0)).label("total"),
+        )
+        .group_by(Pregunta.evaluacion_id)
+        .subquery()
+    )
+    clases = (
+        select(Modulo.clase_id, Leccion.evaluacion_id)
+        .join(Leccion, Leccion.modulo_id == Modulo.id)
+        .where(Modulo.clase_id.in_(lote), Leccion.evaluacion_id.isnot(None))
+        .distinct()
+        .subquery()
+    )
+    porcentaje = case(
+        (
+            totales.c.total > 0,
+            func.round(cast(intentos.c.obtenido * 100.0 / totales.c.total, Numeric), 2),
+        ),
+        else_=0.0,
+    )
+    calificaciones = (
+        select(clases.c.clase_id, porcentaje.label("calificacion"))
+        .join(intentos, intentos.c.evaluacion_id == clases.c.evaluacion_id)
+        .join(totales, totales.c.evaluacion_id == clases.c.evaluacion_id)
+        .subquery()
+    )
+    valor = calificaciones.c.calificacion
+    cubetas = []
+    for i, (etiqueta, minimo) in enumerate(CUBETAS_CALIFICACION):
+        condiciones = []
+        if i > 0:
+            condiciones.append(valor >= minimo)
+        if i + 1 < len(CUBETAS_CALIFICACION):
+            condiciones.append(valor < CUBETAS_CALIFICACION[i + 1][1])
+        cubetas.append(
+            func.sum(case((and_(*condiciones), 1), else_=0)).label(
+                columna_cubeta(etiqueta)
+            )
+        )
+    filas = db.session.execute(
+        select(
+            calificaciones.c.clase_id,
+            func.count().label("total_calificaciones"),
+            func.sum(valor).label("suma_calificaciones"),
+            *cubetas,
+        ).group_by(calificaciones.c.clase_id)
+    )
+    resultado = {}
+    for fila in filas:
+        datos = dict(fila._mapping)
+        clase_id = datos.pop("clase_id")
+        datos["suma_calificaciones"] = float(datos["suma_calificaciones"] or 0.0)
+        resultado[clase_id] = {k: v if v is not None else 0 for k, v in datos.items()}
+    return resultado
+
+
+_CAMPOS_ACUMULADOS = (
+    "total_lecciones",
+    "total_evaluaciones",
+    "estudiantes_abandonados",
+    "total_calificaciones",
+    "suma_calificaciones",
+    *(columna_cubeta(etiqueta) for etiqueta, _ in CUBETAS_CALIFICACION),
+)
+
+
+def _difiere(fila, valores):
+    for campo in _CAMPOS_ACUMULADOS:
+        if abs((getattr(fila, campo) or 0) - valores[campo]) > 1e-6:
+            return True
+    return False
+
+
+def _recalcular_lote(lote):
+    # Bloquea las filas del lote: los ajustes incrementales concurrentes esperan al
+    # commit en lugar de perderse entre la lectura y la escritura
+    existentes = {
+        fila.clase_id: fila
+        for fila in db.session.execute(
+            select(_tabla).where(_tabla.c.clase_id.in_(lote)).with_for_update()
+        )
+    }
+    ahora = datetime.utcnow()
+    valores = {
+        clase_id: {
+            "clase_id": clase_id,
+            "fecha_recalculo": ahora,
+            **{campo: 0 for campo in _CAMPOS_ACUMULADOS},
+        }
+        for clase_id in lote
+    }
+    for parcial in (
+        _calcular_lecciones(lote),
+        _calcular_abandonos(lote),
+        _calcular_calificaciones(lote),
+    ):
+        for clase_id, datos in parcial.items():
+            valores[clase_id].update(datos)
+
+    nuevas = [v for clase_id, v in valores.items() if clase_id not in existentes]
+    actuales = [v for clase_id, v in valores.items() if clase_id in existentes]
+    corregidas = sum(_difiere(existentes[v["clase_id"]], v) for v in actuales)
+    if nuevas:
+        db.session.execute(insert(EstadisticaClase), nuevas)
+    if actuales:
+        db.session.execute(update(EstadisticaClase), actuales)
+    return len(nuevas), corregidas
+
+
+def recalcular_estadisticas(clase_ids=None, tamano_lote=TAMANO_LOTE_RECALCULO):
+    """
+    Reconstruye los acumulados desde las tablas de origen, por lotes de clases con
+    un commit por lote. Devuelve cuántas filas se recalcularon, se crearon (clases
+    sin fila de estadísticas) y se corrigieron (tenían deriva).
+    """
+    if clase_ids is None:
+        clase_ids = db.session.scalars(select(Clase.id).order_by(Clase.id)).all()
+    resumen = {"recalculadas": 0, "creadas": 0, "corregidas": 0}
+    for inicio in range(0, len(clase_ids), tamano_lote):
+        lote = list(clase_ids[inicio : inicio + tamano_lote])
+        creadas, corregidas = _recalcular_lote(lote)
+        db.session.commit()
+        resumen["recalculadas"] += len(lote)
+        resumen["creadas"] += creadas
+        resumen["corregidas"] += corregidas
+    return resumen
+
+
+def obtener_estadisticas(clase_id):
+    """
+    Clase con sus estadísticas cargadas en una sola consulta, o None si no existe.
+    Las clases anteriores a la tabla de estadísticas se calculan la primera vez.
+    """
+    consulta = (
+        select(Clase)
+        .options(joinedload(Clase.estadisticas))
+        .where(Clase.id == clase_id)
+    )
+    clase = db.session.execute(consulta).scalar_one_or_none()
+    if clase is not None and clase.estadisticas is None:
+        recalcular_estadisticas([clase_id])
+        clase = db.session.execute(consulta).scalar_one()
+    return clase
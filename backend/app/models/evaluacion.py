@@ -1,6 +1,7 @@
 # app/models/evaluacion.py
 from typing import TYPE_CHECKING, Optional, List, Any, Dict
 from app.extensions import db  # Importar db desde extensions
+from app.utils.dataloader import cargar_relacion
 from datetime import datetime
 
 # Importaciones de tipos para type checking
@@ -31,6 +32,10 @@ class Evaluacion(db.Model):
     )
     # IA_ASSISTANCE: Criterios para generación de preguntas
     criterios_ia = db.Column(db.Text, nullable=True)
+    # Contador desnormalizado (ver models/contadores.py)
+    total_preguntas = db.Column(
+        db.Integer, default=0, server_default="0", nullable=False
+    )
 
     # Relaciones
     leccion = db.relationship(
@@ -52,9 +57,9 @@ class Evaluacion(db.Model):
     def __repr__(self):
         return f"<Evaluacion {self.id}: {self.titulo}>"
 
-    def to_dict(self):
+    def to_dict(self, incluir_preguntas=False):
         """Convierte el objeto Evaluacion a un diccionario."""
-        return {
+        data = {
             "id": self.id,
             "titulo": self.titulo,
             "descripcion": self.descripcion,
@@ -75,10 +80,18 @@ class Evaluacion(db.Model):
             "fecha_actualizacion": self.fecha_actualizacion.isoformat()
             if self.fecha_actualizacion
             else None,
-            "total_preguntas": self.preguntas.count(),
+            "total_preguntas": self.total_preguntas,
             "criterios_ia": self.criterios_ia,
         }
 
+        if incluir_preguntas:
+            preguntas = cargar_relacion(self, "preguntas")
+            data["preguntas"] = [
+                pregunta.to_dict(incluir_opciones=True) for pregunta in preguntas
+            ]
+
+        return data
+
     @classmethod
     def crear_evaluacion(
         cls,
@@ -0,0 +1,31 @@
+# app/models/fragmento_archivo.py
+# Texto extraído de un archivo cargado, por página (PDF) o por bloque (TXT).
+#
+# Lo escribe services/extraccion_texto_service.py en lotes mientras recorre el
+# documento, así que nunca hace falta tener el texto completo en memoria. El texto
+# del archivo es la concatenación de sus fragmentos en orden de `indice`.
+from app.extensions import db
+
+
+class FragmentoArchivo(db.Model):
+    __tablename__ = "fragmentos_archivo"
+    __table_args__ = (
+        db.UniqueConstraint("archivo_id", "indice", name="uq_fragmento_archivo_indice"),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    archivo_id = db.Column(
+        db.Integer,
+        db.ForeignKey("archivos_cargados.id", ondelete="CASCADE"),
+        nullable=False,
+    )
+    # Posición del fragmento dentro del archivo (0, 1, 2...)
+    indice = db.Column(db.Integer, nullable=False)
+    # Página de origen (1 = primera) en PDF; None en archivos de texto
+    pagina = db.Column(db.Integer, nullable=True)
+    texto = db.Column(db.Text, nullable=False, default="")
+
+    archivo = db.relationship("ArchivoCargado", back_populates="fragmentos")
+
+    def __repr__(self):
+        return f"<FragmentoArchivo {self.archivo_id}:{self.indice}>"
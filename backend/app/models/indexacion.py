@@ -0,0 +1,177 @@
+# app/models/indexacion.py
+# Mantenimiento incremental del índice de búsqueda (models/indice_busqueda.py).
+#
+# Como los contadores y las estadísticas, cada cambio se refleja dentro del mismo
+# flush y transacción:
+#   - lecciones creadas, editadas, movidas o eliminadas -> su fila del índice
+#   - módulos que cambian de clase                      -> clase de sus lecciones
+#   - archivos que cambian de clase o se eliminan       -> clase / filas del archivo
+# Los fragmentos de los archivos se escriben con inserciones masivas que no pasan
+# por el ORM; services/extraccion_texto_service.py y almacen_archivos_service.py
+# llaman a `indexar_fragmentos` después de cada lote.
+#
+# Lo que no pase por estos caminos (SQL manual, datos anteriores al índice) se
+# recupera con `reconstruir_indice` (`flask busqueda reindexar`).
+from sqlalchemy import and_, delete, event, insert, inspect, literal, select, update
+
+from app.extensions import db
+from .archivo_cargado import ArchivoCargado
+from .fragmento_archivo import FragmentoArchivo
+from .indice_busqueda import TIPO_ARCHIVO, TIPO_LECCION, IndiceBusqueda
+from .leccion import Leccion
+from .modulo import Modulo
+
+_tabla = IndiceBusqueda.__table__
+_COLUMNAS = ["tipo", "objeto_id", "indice", "clase_id", "pagina", "titulo", "contenido"]
+
+
+def _de(tipo, objeto_id):
+    return and_(_tabla.c.tipo == tipo, _tabla.c.objeto_id == objeto_id)
+
+
+def _select_lecciones():
+    return select(
+        literal(TIPO_LECCION),
+        Leccion.id,
+        literal(0),
+        Modulo.clase_id,
+        literal(None),
+        Leccion.titulo,
+        Leccion.contenido,
+    ).join(Modulo, Modulo.id == Leccion.modulo_id)
+
+
+def _select_fragmentos():
+    return select(
+        literal(TIPO_ARCHIVO),
+        FragmentoArchivo.archivo_id,
+        FragmentoArchivo.indice,
+        ArchivoCargado.clase_id,
+        FragmentoArchivo.pagina,
+        ArchivoCargado.nombre_original,
+        FragmentoArchivo.texto,
+    ).join(ArchivoCargado, ArchivoCargado.id == FragmentoArchivo.archivo_id)
+
+
+def indexar_fragmentos(ejecutor, archivo_id, desde=0, hasta=None):
+    """
+    Sincroniza con `fragmentos_archivo` las filas del índice del archivo con
+    `desde <= indice < hasta` (`hasta` None = hasta el final): reemplaza las que
+    existan por los fragmentos actuales del rango, o solo las elimina si el rango
+    ya no tiene fragmentos.
+    """
+    condicion = and_(_de(TIPO_ARCHIVO, archivo_id), _tabla.c.indice >= desde)
+    fragmentos = select(FragmentoArchivo.id).where(
+        FragmentoArchivo.archivo_id == archivo_id, FragmentoArchivo.indice >= desde
+    )
+    if hasta is not None:
+        condicion = and_(condicion, _tabla.c.indice < hasta)
+        fragmentos = fragmentos.where(FragmentoArchivo.indice < hasta)
+    ejecutor.execute(delete(_tabla).where(condicion))
+    ejecutor.execute(
+        insert(_tabla).from_select(
+            _COLUMNAS,
+            _select_fragmentos().where(FragmentoArchivo.id.in_(fragmentos)),
+        )
+    )
+
+
+# --- Lecciones ---
+
+
+def _indexar_leccion(connection, leccion_id):
+    connection.execute(delete(_tabla).where(_de(TIPO_LECCION, leccion_id)))
+    connection.execute(
+        insert(_tabla).from_select(
+            _COLUMNAS, _select_lecciones().where(Leccion.id == leccion_id)
+        )
+    )
+
+
+@event.listens_for(Leccion, "after_insert")
+def _leccion_creada(mapper, connection, target):
+    _indexar_leccion(connection, target.id)
+
+
+@event.listens_for(Leccion, "after_update")
+def _leccion_actualizada(mapper, connection, target):
+    estado = inspect(target)
+    if any(
+        estado.attrs[campo].history.has_changes()
+        for campo in ("titulo", "contenido", "modulo_id")
+    ):
+        _indexar_leccion(connection, target.id)
+
+
+@event.listens_for(Leccion, "after_delete")
+def _leccion_eliminada(mapper, connection, target):
+    connection.execute(delete(_tabla).where(_de(TIPO_LECCION, target.id)))
+
+
+@event.listens_for(Modulo, "after_update")
+def _modulo_movido(mapper, connection, target):
+    if not inspect(target).attrs.clase_id.history.has_changes():
+        return
+    lecciones = select(Leccion.id).where(Leccion.modulo_id == target.id)
+    connection.execute(
+        update(_tabla)
+        .where(_tabla.c.tipo == TIPO_LECCION, _tabla.c.objeto_id.in_(lecciones))
+        .values(clase_id=target.clase_id)
+    )
+
+
+# --- Archivos ---
+
+
+@event.listens_for(ArchivoCargado, "after_update")
+def _archivo_actualizado(mapper, connection, target):
+    estado = inspect(target)
+    valores = {
+        campo: getattr(target, atributo)
+        for campo, atributo in (("clase_id", "clase_id"), ("titulo", "nombre_original"))
+        if estado.attrs[atributo].history.has_changes()
+    }
+    if valores:
+        connection.execute(
+            update(_tabla).where(_de(TIPO_ARCHIVO, target.id)).values(valores)
+        )
+
+
+@event.listens_for(ArchivoCargado, "after_delete")
+def _archivo_eliminado(mapper, connection, target):
+    connection.execute(delete(_tabla).where(_de(TIPO_ARCHIVO, target.id)))
+
+
+# --- Reconstrucción completa ---
+
+
+def reconstruir_indice():
+    """
+    Vuelve a generar todo el índice desde lecciones y fragmentos. Los archivos
+    extraídos antes de `fragmentos_archivo` (solo `texto_extraido`) se indexan
+    como un único fragmento. Devuelve cuántas filas tiene el índice.
+    """
+    db.session.execute(delete(_tabla))
+    db.session.execute(insert(_tabla).from_select(_COLUMNAS, _select_lecciones()))
+    db.session.execute(insert(_tabla).from_select(_COLUMNAS, _select_fragmentos()))
+    sin_fragmentos = (
+        ~select(FragmentoArchivo.id)
+        .where(FragmentoArchivo.archivo_id == ArchivoCargado.id)
+        .exists()
+    )
+    db.session.execute(
+        insert(_tabla).from_select(
+            _COLUMNAS,
+            select(
+                literal(TIPO_ARCHIVO),
+                ArchivoCargado.id,
+                literal(0),
+                ArchivoCargado.clase_id,
+                literal(None),
+                ArchivoCargado.nombre_original,
+                ArchivoCargado.texto_extraido,
+            ).where(ArchivoCargado.texto_extraido.isnot(None), sin_fragmentos),
+        )
+    )
+    db.session.commit()
+    return db.session.query(IndiceBusqueda).count()
@@ -0,0 +1,86 @@
+# app/models/indice_busqueda.py
+# Índice de búsqueda de texto completo sobre lecciones y documentos extraídos.
+#
+# Cada fila es una unidad que se puede encontrar: una lección completa (`indice`
+# 0) o un fragmento (página o bloque) de un archivo cargado, con la clase a la
+# que pertenece para filtrar por permisos sin joins. La tabla la mantienen los
+# eventos de models/indexacion.py; el índice de texto se construye en la BD:
+#   - PostgreSQL: columna generada `documento` (tsvector con la configuración
+#     'spanish'; el título pesa más que el contenido) con un índice GIN.
+#   - SQLite (desarrollo y pruebas): tabla virtual FTS5 de contenido externo
+#     `indice_busqueda_fts`, sincronizada con triggers.
+# Las consultas están en services/busqueda_service.py.
+from sqlalchemy import DDL, event
+
+from app.extensions import db
+
+TABLA_FTS = "indice_busqueda_fts"
+
+TIPO_LECCION = "leccion"
+TIPO_ARCHIVO = "archivo"
+
+
+class IndiceBusqueda(db.Model):
+    __tablename__ = "indice_busqueda"
+    __table_args__ = (
+        db.UniqueConstraint(
+            "tipo", "objeto_id", "indice", name="uq_indice_busqueda_objeto"
+        ),
+        db.Index("ix_indice_busqueda_clase_id", "clase_id"),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    # 'leccion' o 'archivo'; `objeto_id` es el id de la lección o del archivo
+    tipo = db.Column(db.String(20), nullable=False)
+    objeto_id = db.Column(db.Integer, nullable=False)
+    # Índice del fragmento dentro del archivo; 0 para lecciones
+    indice = db.Column(db.Integer, nullable=False, default=0)
+    # Sin clase (archivos sueltos) la fila no aparece en ninguna búsqueda
+    clase_id = db.Column(db.Integer, nullable=True)
+    pagina = db.Column(db.Integer, nullable=True)
+    titulo = db.Column(db.String(255), nullable=False, default="")
+    contenido = db.Column(db.Text, nullable=False, default="")
+
+    def __repr__(self):
+        return f"<IndiceBusqueda {self.tipo}:{self.objeto_id}:{self.indice}>"
+
+
+_tabla = IndiceBusqueda.__table__
+
+_DDL_POSTGRESQL = (
+    "ALTER TABLE indice_busqueda ADD COLUMN documento tsvector GENERATED ALWAYS AS ("
+    "setweight(to_tsvector('spanish', coalesce(titulo, '')), 'A') || "
+    "setweight(to_tsvector('spanish', coalesce(contenido, '')), 'B')) STORED",
+    "CREATE INDEX ix_indice_busqueda_documento ON indice_busqueda "
+    "USING GIN (documento)",
+)
+
+_DDL_SQLITE = (
+    f"CREATE VIRTUAL TABLE {TABLA_FTS} USING fts5(titulo, contenido, "
+    "content='indice_busqueda', content_rowid='id', "
+    "tokenize='unicode61 remove_diacritics 2')",
+    f"CREATE TRIGGER indice_busqueda_ai AFTER INSERT ON indice_busqueda BEGIN "
+    f"INSERT INTO {TABLA_FTS}(rowid, titulo, contenido) "
+    "VALUES (new.id, new.titulo, new.contenido); END",
+    f"CREATE TRIGGER indice_busqueda_ad AFTER DELETE ON indice_busqueda BEGIN "
+    f"INSERT INTO {TABLA_FTS}({TABLA_FTS}, rowid, titulo, contenido) "
+    "VALUES ('delete', old.id, old.titulo, old.contenido); END",
+    "CREATE TRIGGER indice_busqueda_au AFTER UPDATE OF titulo, contenido "
+    "ON indice_busqueda BEGIN "
+    f"INSERT INTO {TABLA_FTS}({TABLA_FTS}, rowid, titulo, contenido) "
+    "VALUES ('delete', old.id, old.titulo, old.contenido); "
+    f"INSERT INTO {TABLA_FTS}(rowid, titulo, contenido) "
+    "VALUES (new.id, new.titulo, new.contenido); END",
+)
+
+for _sentencia in _DDL_POSTGRESQL:
+    event.listen(
+        _tabla, "after_create", DDL(_sentencia).execute_if(dialect="postgresql")
+    )
+for _sentencia in _DDL_SQLITE:
+    event.listen(_tabla, "after_create", DDL(_sentencia).execute_if(dialect="sqlite"))
+event.listen(
+    _tabla,
+    "before_drop",
+    DDL(f"DROP TABLE IF EXISTS {TABLA_FTS}").execute_if(dialect="sqlite"),
+)
@@ -29,6 +29,14 @@ class InscripcionClase(db.Model):
         index=True
     )
 
+    # 'activo', 'completado' o 'abandonado' (ver schemas/inscripcion_schemas.py)
+    estado = db.Column(
+        db.String(20), default="activo", server_default="activo", nullable=False
+    )
+
+    # Se actualiza de forma diferida (ver services/ultimo_acceso_service.py)
+    ultimo_acceso = db.Column(db.DateTime, nullable=True)
+
     estudiante = db.relationship(
         "Usuario",
         foreign_keys=[estudiante_id],
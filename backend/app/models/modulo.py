@@ -1,6 +1,7 @@
 # app/models/modulo.py
 from typing import TYPE_CHECKING, List, Optional, Any, Dict
 from app.extensions import db  # Importar db desde el módulo base
+from app.utils.dataloader import cargar_relacion
 from datetime import datetime, timedelta
 
 # Importaciones de tipos para type checking
@@ -30,6 +31,13 @@ class Modulo(db.Model):
     metadatos_colaboracion = db.Column(
         db.JSON, default=lambda: {"comentarios": [], "archivos_vinculados": []}
     )
+    # Contadores desnormalizados (ver models/contadores.py)
+    total_lecciones = db.Column(
+        db.Integer, default=0, server_default="0", nullable=False
+    )
+    total_actividades = db.Column(
+        db.Integer, default=0, server_default="0", nullable=False
+    )
 
     # Relaciones
     clase = db.relationship("Clase", back_populates="modulos")
@@ -40,9 +48,9 @@ class Modulo(db.Model):
     def __repr__(self):
         return f"<Módulo {self.titulo} (Clase: {self.clase_id})>"
 
-    def to_dict(self):
+    def to_dict(self, incluir_lecciones=False):
         """Convierte el objeto Modulo a un diccionario."""
-        return {
+        data = {
             "id": self.id,
             "titulo": self.titulo,
             "descripcion": self.descripcion,
@@ -58,10 +66,16 @@ class Modulo(db.Model):
             if self.ultima_actualizacion
             else None,
             "metadatos_colaboracion": self.metadatos_colaboracion,
-            "total_lecciones": self.lecciones.count(),
-            "total_actividades": self.actividades.count(),
+            "total_lecciones": self.total_lecciones,
+            "total_actividades": self.total_actividades,
         }
 
+        if incluir_lecciones:
+            lecciones = cargar_relacion(self, "lecciones")
+            data["lecciones"] = [leccion.to_dict() for leccion in lecciones]
+
+        return data
+
     @classmethod
     def crear_modulo(cls, titulo, clase_id, descripcion=None, orden=1):
         """Método de ayuda para crear un nuevo módulo."""
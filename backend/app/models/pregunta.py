@@ -1,6 +1,7 @@
 # app/models/pregunta.py
 from typing import TYPE_CHECKING, Optional, List, Any, Dict
 from app.extensions import db  # Importar db desde extensions
+from app.utils.dataloader import cargar_relacion
 from datetime import datetime
 
 # Importaciones de tipos para type checking
@@ -62,7 +63,9 @@ class Pregunta(db.Model):
         }
 
         if incluir_opciones:
-            data["opciones"] = [opcion.to_dict() for opcion in self.opciones.all()]
+            # En lote con el resto de preguntas registradas (ver utils/dataloader.py)
+            opciones = cargar_relacion(self, "opciones")
+            data["opciones"] = [opcion.to_dict() for opcion in opciones]
 
         return data
 
@@ -13,6 +13,23 @@ if TYPE_CHECKING:
 
 class Respuesta(db.Model):
     __tablename__ = "respuestas"
+    # Una respuesta por pregunta en cada intento: un doble envío no se duplica
+    __table_args__ = (
+        db.UniqueConstraint(
+            "estudiante_id",
+            "evaluacion_id",
+            "intento_numero",
+            "pregunta_id",
+            name="uq_respuesta_intento_pregunta",
+        ),
+        # Lectura por evaluación e intento ordenada por estudiante (análisis de ítems)
+        db.Index(
+            "ix_respuesta_evaluacion_intento_estudiante",
+            "evaluacion_id",
+            "intento_numero",
+            "estudiante_id",
+        ),
+    )
 
     id = db.Column(db.Integer, primary_key=True, autoincrement=True)
     texto_respuesta = db.Column(db.Text)
@@ -1,7 +1,8 @@
 # app/models/usuario.py
 from app.extensions import db  # Usar la instancia centralizada de `db`
 from datetime import datetime, date
-from app.extensions import bcrypt
+from sqlalchemy import event, inspect
+from app.services.hashing_service import servicio_hashing
 from app.models.inscripcion_clase import InscripcionClase
 
 
@@ -18,10 +19,13 @@ class Usuario(db.Model):
         db.String(50), nullable=False, default="estudiante"
     )  # 'estudiante', 'docente' o 'admin'
     activo = db.Column(db.Boolean, default=True, nullable=False)
+    # Se incrementa al cambiar rol/activo para invalidar los JWT emitidos antes
+    token_version = db.Column(db.Integer, default=0, nullable=False)
     fecha_creacion = db.Column(db.DateTime, default=datetime.utcnow)
     fecha_actualizacion = db.Column(
         db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow
     )
+    # Se actualiza de forma diferida (ver services/ultimo_acceso_service.py)
     ultimo_inicio_sesion = db.Column(db.DateTime)
     # PRIVACY_FEATURE: Campo para protección de menores
     fecha_nacimiento = db.Column(db.Date, nullable=True)
@@ -63,12 +67,12 @@ class Usuario(db.Model):
         return f"<Usuario {self.id}: {self.correo_electronico} ({self.rol})>"
 
     def set_password(self, password):
-        """Crea un hash seguro para la contraseña."""
-        self.hashed_password = bcrypt.generate_password_hash(password).decode("utf-8")
+        """Crea un hash seguro para la contraseña (en el pool de hashing)."""
+        self.hashed_password = servicio_hashing.generar_hash(password)
 
     def check_password(self, password):
-        """Verifica la contraseña contra el hash almacenado."""
-        return bcrypt.check_password_hash(self.hashed_password, password)
+        """Verifica la contraseña contra el hash almacenado (en el pool de hashing)."""
+        return servicio_hashing.verificar(self.hashed_password, password)
 
     def to_dict(self):
         """Convierte el objeto Usuario a un diccionario."""
@@ -98,6 +102,14 @@ class Usuario(db.Model):
         )
 
 
+@event.listens_for(Usuario, "before_update")
+def incrementar_token_version(mapper, connection, target):
+    """Invalida los tokens emitidos cuando cambian los claims de autorización."""
+    estado = inspect(target)
+    if any(estado.attrs[campo].history.has_changes() for campo in ("rol", "activo")):
+        target.token_version = (target.token_version or 0) + 1
+
+
 # Configuración de relaciones dinámicas
 def setup_relationships():
     """Configura las relaciones después de que todos los modelos estén definidos."""
@@ -1,26 +1,31 @@
 # app/routes/documents.py
 # BACKEND-REVIEW: 2025-05-20 - FEATURE-UPLOAD-01 - Endpoint para subida de documentos
 # Permite a los docentes subir archivos PDF/TXT, valida y delega el procesamiento a Celery.
+# Los archivos se guardan por contenido (SHA-256): ver services/almacen_archivos_service.py.
+# Cargas reanudables por bloques (estilo tus): ver services/carga_reanudable_service.py.
 
-import os
-import uuid
 from flask import Blueprint, request, jsonify, current_app
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from werkzeug.utils import secure_filename
-from app.models import db, ArchivoCargado, Clase
 from app.schemas import ArchivoCargadoSchema
+from app.services import carga_reanudable_service
+from app.services.almacen_archivos_service import (
+    ArchivoDemasiadoGrandeError,
+    guardar_contenido,
+    registrar_archivo,
+)
+from app.services.carga_reanudable_service import CargaError
 from app.tasks.document_processing import extraer_texto_archivo
 
 ALLOWED_MIME_TYPES = {"application/pdf", "text/plain"}
-MAX_UPLOAD_SIZE = int(os.getenv("MAX_UPLOAD_SIZE", 10 * 1024 * 1024))  # 10MB por defecto
-UPLOAD_FOLDER = os.getenv("UPLOAD_FOLDER", "uploads/")
+TUS_VERSION = "1.0.0"
 
 documents_bp = Blueprint("documents", __name__, url_prefix="/api/v1/documents")
 
 @documents_bp.route("/upload", methods=["POST"])
 @jwt_required()
 def upload_document():
-    user_id = get_jwt_identity()
+    user_id = int(get_jwt_identity())
     file = request.files.get("file")
     clase_id = request.form.get("clase_id")
 
@@ -31,36 +36,137 @@ def upload_document():
     if file.mimetype not in ALLOWED_MIME_TYPES:
         return jsonify({"error": "Tipo de archivo no permitido."}), 400
 
-    # Validar tamaño
-    file.seek(0, os.SEEK_END)
-    size = file.tell()
-    file.seek(0)
-    if size > MAX_UPLOAD_SIZE:
-        return jsonify({"error": "El archivo excede el tamaño máximo permitido."}), 400
-
-    # Sanitizar nombre
-    original_filename = secure_filename(file.filename)
-    unique_id = str(uuid.uuid4())
-    server_filename = f"{unique_id}_{original_filename}"
-    save_path = os.path.join(UPLOAD_FOLDER, server_filename)
-    os.makedirs(UPLOAD_FOLDER, exist_ok=True)
-    file.save(save_path)
-
-    # Crear registro en la base de datos
-    archivo = ArchivoCargado(
-        nombre_original=original_filename,
-        nombre_servidor=server_filename,
+    # Guardar en el almacén por contenido: SHA-256 y tamaño se calculan al copiar
+    try:
+        hash_sha256, size, save_path = guardar_contenido(
+            file.stream, current_app.config["MAX_UPLOAD_SIZE"]
+        )
+    except ArchivoDemasiadoGrandeError as err:
+        return jsonify({"error": str(err)}), 400
+
+    # Crear registro en la base de datos (reutiliza el texto de una copia idéntica)
+    archivo, requiere_extraccion = registrar_archivo(
+        nombre_original=secure_filename(file.filename),
         tipo_mime=file.mimetype,
+        hash_sha256=hash_sha256,
         tamano=size,
-        ruta_almacenamiento=save_path,
+        ruta=save_path,
         usuario_id=user_id,
-        clase_id=clase_id if clase_id else None,
-        estado_procesamiento_texto="pendiente"
+        clase_id=int(clase_id) if clase_id else None,
     )
-    db.session.add(archivo)
-    db.session.commit()
 
-    # Lanzar tarea asíncrona
-    extraer_texto_archivo.delay(archivo.id)
+    # Lanzar tarea asíncrona solo si nadie extrajo (ni está extrayendo) este contenido
+    if requiere_extraccion:
+        extraer_texto_archivo.delay(archivo.id)
+
+    return jsonify(ArchivoCargadoSchema().dump(archivo)), 201
+
+
+# --- Cargas reanudables (estilo tus) ---
+
+def _respuesta_tus(cuerpo="", codigo=204, **cabeceras):
+    respuesta = current_app.response_class(cuerpo, status=codigo)
+    respuesta.headers["Tus-Resumable"] = TUS_VERSION
+    respuesta.headers["Cache-Control"] = "no-store"
+    for nombre, valor in cabeceras.items():
+        respuesta.headers[nombre.replace("_", "-")] = str(valor)
+    return respuesta
+
+
+def _error_carga(err):
+    respuesta = jsonify({"error": err.mensaje})
+    respuesta.headers["Tus-Resumable"] = TUS_VERSION
+    return respuesta, err.codigo
+
+
+def _entero(valor):
+    try:
+        return int(valor)
+    except (TypeError, ValueError):
+        return None
+
+
+@documents_bp.route("/uploads", methods=["POST"])
+@jwt_required()
+def create_upload():
+    """Crea una carga reanudable; el tamaño va en Upload-Length (o en `tamano`)."""
+    datos = request.get_json(silent=True) or {}
+    clase_id = _entero(datos.get("clase_id"))
+    try:
+        carga_id = carga_reanudable_service.crear_carga(
+            int(get_jwt_identity()),
+            secure_filename(datos.get("nombre_original") or "") or "archivo",
+            datos.get("tipo_mime"),
+            _entero(request.headers.get("Upload-Length", datos.get("tamano"))),
+            clase_id,
+        )
+    except CargaError as err:
+        return _error_carga(err)
+    return _respuesta_tus(
+        codigo=201,
+        Location=f"{documents_bp.url_prefix}/uploads/{carga_id}",
+        Upload_Offset=0,
+    )
 
-    return ArchivoCargadoSchema().jsonify(archivo), 201
+
+@documents_bp.route("/uploads/<carga_id>", methods=["HEAD"])
+@jwt_required()
+def upload_offset(carga_id):
+    """Desplazamiento actual de la carga, para reanudarla."""
+    try:
+        estado = carga_reanudable_service.estado_carga(
+            carga_id, int(get_jwt_identity())
+        )
+    except CargaError as err:
+        return _respuesta_tus(codigo=err.codigo)
+    return _respuesta_tus(
+        codigo=200,
+        Upload_Offset=estado["desplazamiento"],
+        Upload_Length=estado["tamano"],
+    )
+
+
+@documents_bp.route("/uploads/<carga_id>", methods=["PATCH"])
+@jwt_required()
+def upload_chunk(carga_id):
+    """Escribe un bloque a partir de Upload-Offset directamente a disco."""
+    if request.mimetype != "application/offset+octet-stream":
+        return _error_carga(
+            CargaError("Content-Type debe ser application/offset+octet-stream", 415)
+        )
+    desplazamiento = _entero(request.headers.get("Upload-Offset"))
+    if desplazamiento is None:
+        return _error_carga(CargaError("Falta la cabecera Upload-Offset"))
+    try:
+        nuevo = carga_reanudable_service.escribir_bloque(
+            carga_id, int(get_jwt_identity()), desplazamiento, request.stream
+        )
+    except CargaError as err:
+        return _error_carga(err)
+    return _respuesta_tus(Upload_Offset=nuevo)
+
+
+@documents_bp.route("/uploads/<carga_id>/finalizar", methods=["POST"])
+@jwt_required()
+def finish_upload(carga_id):
+    """Registra el archivo de una carga completa y encola su extracción."""
+    try:
+        archivo, requiere_extraccion = carga_reanudable_service.finalizar_carga(
+            carga_id, int(get_jwt_identity())
+        )
+    except CargaError as err:
+        return _error_carga(err)
+    if requiere_extraccion:
+        extraer_texto_archivo.delay(archivo.id)
+    return jsonify(ArchivoCargadoSchema().dump(archivo)), 201
+
+
+@documents_bp.route("/uploads/<carga_id>", methods=["DELETE"])
+@jwt_required()
+def cancel_upload(carga_id):
+    """Descarta una carga sin terminar."""
+    try:
+        carga_reanudable_service.cancelar_carga(carga_id, int(get_jwt_identity()))
+    except CargaError as err:
+        return _error_carga(err)
+    return _respuesta_tus()
@@ -56,6 +56,8 @@ from .respuesta_schemas import (
     RespuestaSchema,
     RespuestaCreateSchema,
     RespuestaEnvioSchema,
+    RespuestaEnvioItemSchema,
+    RespuestaBorradorSchema,
     RespuestaCalificacionSchema,
 )
 
@@ -71,6 +73,9 @@ from .archivo_cargado_schemas import ArchivoCargadoSchema, ArchivoCargadoCreateS
 
 from .mensaje_schemas import MensajeSchema # Added import for MensajeSchema
 
+# Carga anticipada guiada por los campos Nested de un esquema
+from .plan_carga import plan_query
+
 # Exportar todos los esquemas para facilitar las importaciones
 __all__ = [
     # Esquemas base
@@ -116,6 +121,8 @@ __all__ = [
     "RespuestaSchema",
     "RespuestaCreateSchema",
     "RespuestaEnvioSchema",
+    "RespuestaEnvioItemSchema",
+    "RespuestaBorradorSchema",
     "RespuestaCalificacionSchema",
     # Inscripciones
     "InscripcionClaseSchema",
@@ -128,4 +135,6 @@ __all__ = [
     "ArchivoCargadoCreateSchema",
     # Mensajes
     "MensajeSchema", # Added MensajeSchema to __all__
+    # Planificador de carga
+    "plan_query",
 ]
@@ -20,11 +20,14 @@ class ArchivoCargadoSchema(BaseSQLAlchemySchema):
     tipo_mime = auto_field(required=True)
     tamano = auto_field(required=True)
     ruta_almacenamiento = auto_field(dump_only=True)
+    hash_sha256 = auto_field(dump_only=True)
     usuario_id = auto_field(required=True)
     clase_id = auto_field(allow_none=True)
     fecha_subida = auto_field(dump_only=True)
     estado_procesamiento_texto = auto_field(dump_only=True)
     texto_extraido = auto_field(dump_only=True)
+    paginas_procesadas = auto_field(dump_only=True)
+    paginas_totales = auto_field(dump_only=True)
     fecha_procesamiento = auto_field(dump_only=True)
     mensaje_error = auto_field(dump_only=True)
 
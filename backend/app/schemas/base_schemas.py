@@ -6,9 +6,12 @@ from marshmallow import (
     validates_schema,
     ValidationError,
     EXCLUDE,
+    pre_dump,
 )
 from marshmallow_sqlalchemy import SQLAlchemyAutoSchema, auto_field
 from datetime import datetime
+from app.utils.dataloader import cargador_actual
+from app.utils.paginacion import MODOS_TOTAL
 from .validators import validate_date_not_in_past, validate_positive_number
 
 
@@ -51,10 +54,23 @@ class PaginacionSchema(BaseSchema):
             error="El número de elementos por página debe estar entre 1 y 100",
         ),
     )
-    total = fields.Int(dump_only=True)
+    # Paginación por clave (ver utils/paginacion.py): si llega `cursor` se ignora
+    # `pagina` y no hay OFFSET
+    cursor = fields.Str(load_only=True, load_default=None)
+    # Total opcional: sin conteo (por defecto), "exacto" o "estimado"
+    conteo = fields.Str(
+        load_only=True,
+        load_default=None,
+        validate=validate.OneOf(
+            MODOS_TOTAL, error="El conteo debe ser 'exacto' o 'estimado'"
+        ),
+    )
+    total = fields.Int(dump_only=True, allow_none=True)
     paginas = fields.Int(dump_only=True)
     tiene_siguiente = fields.Bool(dump_only=True)
     tiene_anterior = fields.Bool(dump_only=True)
+    siguiente_cursor = fields.Str(dump_only=True, allow_none=True)
+    anterior_cursor = fields.Str(dump_only=True, allow_none=True)
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
@@ -82,6 +98,27 @@ class BaseSQLAlchemySchema(SQLAlchemyAutoSchema):
     fecha_creacion = fields.DateTime(dump_only=True, format="iso")
     fecha_actualizacion = fields.DateTime(dump_only=True, format="iso")
 
+    # Las relaciones (campos Nested y Related) se resuelven con el cargador por
+    # lotes de la petición: una consulta IN por relación y nivel, no una por fila.
+    @pre_dump(pass_many=True)
+    def registrar_en_cargador(self, data, many, **kwargs):
+        cargador = cargador_actual()
+        if cargador is None:
+            return data
+        if many:
+            # Materializa consultas (p. ej. relaciones dinámicas) una sola vez
+            data = list(data)
+            cargador.registrar(data)
+        else:
+            cargador.registrar([data])
+        return data
+
+    def get_attribute(self, obj, attr, default):
+        cargador = cargador_actual()
+        if cargador is not None and cargador.es_relacion(obj, attr):
+            return cargador.cargar(obj, attr)
+        return super().get_attribute(obj, attr, default)
+
     def handle_error(self, error, data, **kwargs):
         """
         Maneja los errores de validación de manera consistente.
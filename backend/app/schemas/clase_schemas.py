@@ -17,6 +17,8 @@ class ClaseSchema(BaseSQLAlchemySchema):
         load_instance = True
         include_fk = True
         unknown = EXCLUDE
+        # Contadores mantenidos por la BD
+        dump_only = ("total_modulos", "total_estudiantes")
 
     id = auto_field(dump_only=True)
     nombre = auto_field(
@@ -143,8 +145,16 @@ class ClaseConModulosSchema(ClaseSchema):
 class ClaseEstadisticasSchema(ClaseSchema):
     """
     Esquema que incluye estadísticas de la clase.
+
+    Se serializa una `Clase` con su relación `estadisticas` cargada (ver
+    `models.estadisticas.obtener_estadisticas`): todos los valores son acumulados
+    ya calculados, sin consultas adicionales.
     """
 
+    class Meta(ClaseSchema.Meta):
+        # Campos que no son relevantes para las estadísticas
+        exclude = ("docente", "modulos", "estudiantes")
+
     total_estudiantes = fields.Int(
         dump_only=True,
         validate=validate.Range(
@@ -160,6 +170,7 @@ class ClaseEstadisticasSchema(ClaseSchema):
     )
 
     total_lecciones = fields.Int(
+        attribute="estadisticas.total_lecciones",
         dump_only=True,
         validate=validate.Range(
             min=0, error="El total de lecciones no puede ser negativo"
@@ -167,6 +178,7 @@ class ClaseEstadisticasSchema(ClaseSchema):
     )
 
     total_evaluaciones = fields.Int(
+        attribute="estadisticas.total_evaluaciones",
         dump_only=True,
         validate=validate.Range(
             min=0, error="El total de evaluaciones no puede ser negativo"
@@ -174,7 +186,9 @@ class ClaseEstadisticasSchema(ClaseSchema):
     )
 
     promedio_calificaciones = fields.Float(
+        attribute="estadisticas.promedio_calificaciones",
         dump_only=True,
+        allow_none=True,
         validate=validate.Range(
             min=0,
             max=100,
@@ -182,10 +196,21 @@ class ClaseEstadisticasSchema(ClaseSchema):
         ),
     )
 
-    # Sobrescribir los campos que no son relevantes para las estadísticas
-    modulos = None
-    estudiantes = None
-    docente = None
+    total_calificaciones = fields.Int(
+        attribute="estadisticas.total_calificaciones", dump_only=True
+    )
+
+    estudiantes_abandonados = fields.Int(
+        attribute="estadisticas.estudiantes_abandonados", dump_only=True
+    )
+
+    # Distribución de calificaciones
+    distribucion_calificaciones = fields.Dict(
+        attribute="estadisticas.distribucion_calificaciones",
+        keys=fields.Str(),
+        values=fields.Int(),
+        dump_only=True,
+    )
 
 
 class ClasePaginacionSchema(PaginacionSchema):
@@ -194,10 +219,3 @@ class ClasePaginacionSchema(PaginacionSchema):
     """
 
     items = fields.Nested(ClaseSchema, many=True, dump_only=True)
-    estudiantes_abandonados = fields.Int(required=True)
-    calificacion_promedio = fields.Float(required=True, allow_none=True)
-
-    # Distribución de calificaciones
-    distribucion_calificaciones = fields.Dict(
-        keys=fields.Str(), values=fields.Int(), required=True
-    )
@@ -20,6 +20,8 @@ class EvaluacionSchema(BaseSQLAlchemySchema):
         model = Evaluacion
         load_instance = True
         include_fk = True
+        # Contador mantenido por la BD
+        dump_only = ("total_preguntas",)
         unknown = EXCLUDE
 
     id = auto_field(dump_only=True)
@@ -1,5 +1,5 @@
 # app/schemas/inscripcion_schemas.py
-from marshmallow import fields, validate, validates_schema, ValidationError
+from marshmallow import fields, post_dump, validate, validates_schema, ValidationError
 from ..models import InscripcionClase
 from .base_schemas import BaseSQLAlchemySchema, BaseSchema, validar_porcentaje
 
@@ -41,7 +41,7 @@ class InscripcionClaseSchema(BaseSQLAlchemySchema):
     )
     clase = fields.Nested(
         "ClaseSchema",
-        only=("id", "titulo", "descripcion", "imagen_url"),
+        only=("id", "nombre", "descripcion", "imagen_url"),
         dump_only=True,
     )
 
@@ -53,6 +53,21 @@ class InscripcionClaseSchema(BaseSQLAlchemySchema):
         # Dependerá de cómo se registre el tiempo de estudio en tu aplicación
         return 0  # Implementar según la lógica de negocio
 
+    @post_dump(pass_original=True)
+    def fusionar_ultimo_acceso(self, data, original, **kwargs):
+        """Incluye el último acceso pendiente de volcar a la BD (escritura diferida)."""
+        if "ultimo_acceso" not in data:
+            return data
+        from app.services.ultimo_acceso_service import buffer_ultimo_acceso
+
+        vigente = buffer_ultimo_acceso.valor_vigente(
+            "inscripcion",
+            (original.estudiante_id, original.clase_id),
+            original.ultimo_acceso,
+        )
+        data["ultimo_acceso"] = vigente.isoformat() if vigente else None
+        return data
+
 
 class InscripcionCreateSchema(BaseSchema):
     """
@@ -80,7 +80,9 @@ class LeccionSchema(BaseSQLAlchemySchema):
     )
 
     evaluacion = fields.Nested(
-        "EvaluacionSchema", only=("id", "titulo", "puntaje_aprobacion"), dump_only=True
+        "EvaluacionSchema",
+        only=("id", "titulo", "calificacion_aprobatoria"),
+        dump_only=True,
     )
 
     # Validaciones personalizadas
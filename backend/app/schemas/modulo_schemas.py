@@ -16,6 +16,8 @@ class ModuloSchema(BaseSQLAlchemySchema):
         model = Modulo
         load_instance = True
         include_fk = True
+        # Contadores mantenidos por la BD
+        dump_only = ("total_lecciones", "total_actividades")
         unknown = EXCLUDE
 
     id = auto_field(dump_only=True)
@@ -51,7 +53,7 @@ class ModuloSchema(BaseSQLAlchemySchema):
     clase_id = auto_field(required=True, load_only=True)
 
     clase = fields.Nested(
-        "ClaseSchema", only=("id", "titulo", "imagen_url"), dump_only=True
+        "ClaseSchema", only=("id", "nombre", "imagen_url"), dump_only=True
     )
 
     lecciones = fields.Nested(
@@ -0,0 +1,157 @@
+# app/schemas/plan_carga.py
+# Planificador de carga anticipada a partir de los campos Nested de un esquema.
+#
+# Un esquema como ClaseConModulosSchema -> ModuloConLeccionesSchema describe
+# exactamente qué relaciones necesita la respuesta. `plan_query` recorre sus campos
+# Nested (respetando only/exclude) y prepara la consulta para traer todo el árbol
+# con un número constante de consultas:
+#
+#   - relaciones normales: selectinload (colecciones) o joinedload (escalares);
+#   - relaciones `lazy="dynamic"`, que el ORM no permite cargar de forma
+#     anticipada: se precargan con el cargador por lotes de la petición
+#     (utils/dataloader.py) justo después de ejecutar la consulta, un IN (...) por
+#     relación y nivel, y el dump posterior las lee de ahí.
+#
+# Uso:
+#     clases = plan_query(Clase.query, ClaseConModulosSchema).all()
+#     datos = ClaseConModulosSchema(many=True).dump(clases)
+from functools import lru_cache
+
+from marshmallow import fields
+from sqlalchemy import Row, event, inspect
+from sqlalchemy.orm import Session, joinedload, selectinload
+
+from app.utils.dataloader import cargador_actual
+
+# Evita recorrer indefinidamente esquemas que se anidan entre sí
+PROFUNDIDAD_MAXIMA = 6
+
+OPCION_PLAN = "plan_carga"
+
+
+class NodoPlan:
+    """Relación `nombre` a cargar y las que cuelgan de ella."""
+
+    def __init__(self, nombre, dinamica):
+        self.nombre = nombre
+        self.dinamica = dinamica
+        self.hijos = []
+
+
+class PlanCarga:
+    def __init__(self, modelo, hijos):
+        self.modelo = modelo
+        self.hijos = hijos
+        self.opciones = []
+        self.requiere_precarga = False
+        for nodo in hijos:
+            self._generar_opciones(getattr(modelo, nodo.nombre), nodo, None)
+
+    def _generar_opciones(self, atributo, nodo, padre):
+        if nodo.dinamica:
+            # Ni esta relación ni su subárbol admiten opciones de carga
+            self.requiere_precarga = True
+            return
+        coleccion = atributo.property.uselist
+        if padre is None:
+            opcion = selectinload(atributo) if coleccion else joinedload(atributo)
+        else:
+            opcion = (
+                padre.selectinload(atributo)
+                if coleccion
+                else padre.joinedload(atributo)
+            )
+        self.opciones.append(opcion)
+        destino = atributo.property.mapper.class_
+        for hijo in nodo.hijos:
+            self._generar_opciones(getattr(destino, hijo.nombre), hijo, opcion)
+
+    def precargar(self, objetos):
+        """Resuelve por lotes las relaciones dinámicas del árbol para `objetos`."""
+        cargador = cargador_actual()
+        if cargador is None or not self.requiere_precarga:
+            return
+        cargador.registrar(objetos)
+        self._precargar_nivel(cargador, objetos, self.hijos)
+
+    def _precargar_nivel(self, cargador, objetos, nodos):
+        for nodo in nodos:
+            siguientes = []
+            for objeto in objetos:
+                # Las relaciones ya cargadas con selectin/joined no generan consulta
+                valor = cargador.cargar(objeto, nodo.nombre)
+                if isinstance(valor, list):
+                    siguientes.extend(valor)
+                elif valor is not None:
+                    siguientes.append(valor)
+            if nodo.hijos and siguientes:
+                self._precargar_nivel(cargador, siguientes, nodo.hijos)
+
+
+def _esquema_anidado(campo):
+    if isinstance(campo, fields.List):
+        campo = campo.inner
+    if isinstance(campo, (fields.Nested, fields.Pluck)):
+        return campo.schema
+    return None
+
+
+def _recorrer(esquema, modelo, profundidad, ruta):
+    mapper = inspect(modelo)
+    nodos = []
+    for nombre, campo in esquema.dump_fields.items():
+        relacion = mapper.relationships.get(campo.attribute or nombre)
+        anidado = _esquema_anidado(campo)
+        if relacion is None or anidado is None:
+            continue
+        paso = (relacion.parent.class_, relacion.key)
+        if paso in ruta or profundidad >= PROFUNDIDAD_MAXIMA:
+            continue
+        nodo = NodoPlan(relacion.key, relacion.lazy == "dynamic")
+        nodo.hijos = _recorrer(
+            anidado, relacion.mapper.class_, profundidad + 1, ruta | {paso}
+        )
+        nodos.append(nodo)
+    return nodos
+
+
+@lru_cache(maxsize=128)
+def _plan_por_clase(clase_esquema):
+    return planificar(clase_esquema())
+
+
+def planificar(esquema):
+    """Plan de carga para una instancia de esquema (con su only/exclude)."""
+    modelo = esquema.opts.model
+    return PlanCarga(modelo, _recorrer(esquema, modelo, 0, frozenset()))
+
+
+def plan_query(consulta, esquema):
+    """
+    Añade a `consulta` (Query o select()) las opciones de carga que requiere
+    `esquema` (clase o instancia). Los planes de clases de esquema se cachean.
+    """
+    plan = (
+        _plan_por_clase(esquema) if isinstance(esquema, type) else planificar(esquema)
+    )
+    if plan.opciones:
+        consulta = consulta.options(*plan.opciones)
+    if plan.requiere_precarga:
+        consulta = consulta.execution_options(**{OPCION_PLAN: plan})
+    return consulta
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _precargar_relaciones_dinamicas(estado):
+    plan = estado.execution_options.get(OPCION_PLAN)
+    if plan is None or not estado.is_select or estado.is_relationship_load:
+        return None
+    resultado = estado.invoke_statement().freeze()
+    objetos = []
+    for fila in resultado.data:
+        # Query de una sola entidad devuelve instancias; select() devuelve filas
+        entidad = fila[0] if isinstance(fila, Row) else fila
+        if isinstance(entidad, plan.modelo):
+            objetos.append(entidad)
+    plan.precargar(objetos)
+    return resultado()
@@ -121,7 +121,7 @@ class PreguntaSchema(BaseSQLAlchemySchema):
     )
 
     opciones = fields.Nested(
-        "OpcionRespuestaSchema", many=True, exclude=("pregunta",), dump_only=True
+        "OpcionRespuestaSchema", many=True, dump_only=True
     )
 
     # Validaciones personalizadas
@@ -362,7 +362,7 @@ class PreguntaConOpcionesSchema(PreguntaSchema):
     """
 
     opciones = fields.Nested(
-        OpcionRespuestaSchema, many=True, exclude=("pregunta",), dump_only=True
+        OpcionRespuestaSchema, many=True, dump_only=True
     )
 
 
@@ -91,6 +91,14 @@ class RespuestaCreateSchema(BaseSchema):
             )
 
 
+class RespuestaEnvioItemSchema(RespuestaCreateSchema):
+    """
+    Respuesta a una pregunta dentro del envío de un intento completo.
+    """
+
+    pregunta_id = fields.Int(required=True, validate=validate.Range(min=1))
+
+
 class RespuestaEnvioSchema(BaseSchema):
     """
     Esquema para validar el envío de respuestas a una evaluación.
@@ -98,7 +106,7 @@ class RespuestaEnvioSchema(BaseSchema):
     """
 
     respuestas = fields.List(
-        fields.Nested(RespuestaCreateSchema),
+        fields.Nested(RespuestaEnvioItemSchema),
         required=True,
         validate=validate.Length(
             min=1, error="Debe proporcionar al menos una respuesta"
@@ -122,6 +130,22 @@ class RespuestaEnvioSchema(BaseSchema):
                 "Todas las respuestas deben tener el mismo número de intento"
             )
 
+        preguntas = [r.get("pregunta_id") for r in respuestas]
+        if len(preguntas) != len(set(preguntas)):
+            raise ValidationError("Cada pregunta solo puede responderse una vez")
+
+
+class RespuestaBorradorSchema(RespuestaCreateSchema):
+    """
+    Respuesta guardada automáticamente durante una sesión de examen; el intento lo
+    fija la sesión.
+    """
+
+    tiempo_tomado = fields.Int(missing=0, validate=validate.Range(min=0))
+
+    class Meta(RespuestaCreateSchema.Meta):
+        exclude = ("intento_numero",)
+
 
 class RespuestaCalificacionSchema(BaseSchema):
     """
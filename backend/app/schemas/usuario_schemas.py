@@ -68,7 +68,7 @@ class UsuarioSchema(BaseSQLAlchemySchema):
 
     # Relaciones (solo para serialización)
     clases_impartidas = fields.Nested(
-        "ClaseSchema", many=True, exclude=("profesor",), dump_only=True
+        "ClaseSchema", many=True, exclude=("docente",), dump_only=True
     )
 
     inscripciones = fields.Nested(
@@ -0,0 +1,250 @@
+# backend/app/services/almacen_archivos_service.py
+# Almacenamiento direccionado por contenido de los archivos cargados.
+#
+# Los docentes de un mismo distrito suben una y otra vez los mismos libros de la
+# SEP: guardar cada copia con un nombre nuevo y volver a extraer su texto
+# multiplica el disco y el trabajo de Celery. Aquí:
+#   1. El archivo se copia a disco en bloques mientras se calcula su SHA-256 y se
+#      controla el tamaño máximo; nunca se carga completo en memoria.
+#   2. El contenido se guarda una sola vez en `<UPLOAD_FOLDER>/contenido/ab/cd/
+#      <sha256>`; una copia idéntica descarta el temporal y reutiliza el archivo.
+#   3. Cada subida sigue teniendo su propia fila `ArchivoCargado` (dueño, clase,
+#      nombre original), que apunta al contenido compartido. Si otra fila con el
+#      mismo hash ya tiene el texto extraído, se copian sus fragmentos con un
+#      INSERT ... SELECT en la BD y no se encola la tarea de extracción. Si esa
+#      otra fila se está extrayendo y ha avanzado hace poco
+#      (DOCUMENTOS_EXTRACCION_INACTIVA), la nueva queda pendiente y
+#      `propagar_texto` la completa cuando aquella termina. Una fila pendiente
+#      (su tarea puede haberse perdido) o una extracción detenida no se esperan:
+#      la nueva subida encola su propia extracción, que al terminar completa
+#      también las filas que se hubieran quedado pendientes.
+import hashlib
+import os
+import tempfile
+import uuid
+from datetime import datetime, timedelta
+
+from flask import current_app
+from sqlalchemy import and_, case, insert, literal, or_, select, update
+
+from app.extensions import db
+from app.models.archivo_cargado import ArchivoCargado
+from app.models.fragmento_archivo import FragmentoArchivo
+from app.models.indexacion import indexar_fragmentos
+from app.utils.metrics import metricas
+
+PREFIJO_METRICAS = "almacen_archivos."
+TAMANO_BLOQUE = 64 * 1024
+
+
+class ArchivoDemasiadoGrandeError(Exception):
+    """El archivo supera el tamaño máximo permitido."""
+
+
+def _carpeta():
+    return current_app.config.get("UPLOAD_FOLDER", "uploads/")
+
+
+def ruta_contenido(hash_sha256):
+    """Ruta del contenido con ese hash dentro del almacén."""
+    return os.path.join(
+        _carpeta(), "contenido", hash_sha256[:2], hash_sha256[2:4], hash_sha256
+    )
+
+
+def archivo_temporal():
+    """Abre un temporal dentro del almacén, en el mismo sistema de archivos."""
+    carpeta = os.path.join(_carpeta(), "tmp")
+    os.makedirs(carpeta, exist_ok=True)
+    return tempfile.NamedTemporaryFile(dir=carpeta, delete=False)
+
+
+def guardar_temporal(ruta_temporal, hash_sha256):
+    """
+    Mueve el temporal a su ruta definitiva en el almacén. Si el contenido ya estaba
+    guardado, el temporal se elimina. Devuelve la ruta y si el contenido era nuevo.
+    """
+    destino = ruta_contenido(hash_sha256)
+    if os.path.exists(destino):
+        os.unlink(ruta_temporal)
+        return destino, False
+    os.makedirs(os.path.dirname(destino), exist_ok=True)
+    # os.replace es atómico: dos subidas simultáneas dejan el mismo contenido
+    os.replace(ruta_temporal, destino)
+    return destino, True
+
+
+def guardar_contenido(flujo, limite):
+    """
+    Copia el flujo al almacén calculando su SHA-256. Devuelve `(hash, tamano,
+    ruta)`; lanza ArchivoDemasiadoGrandeError en cuanto se supera `limite`.
+    """
+    calculador = hashlib.sha256()
+    tamano = 0
+    with archivo_temporal() as temporal:
+        try:
+            while True:
+                bloque = flujo.read(TAMANO_BLOQUE)
+                if not bloque:
+                    break
+                tamano += len(bloque)
+                if tamano > limite:
+                    raise ArchivoDemasiadoGrandeError(
+                        "El archivo excede el tamaño máximo permitido."
+                    )
+                calculador.update(bloque)
+                temporal.write(bloque)
+        except BaseException:
+            temporal.close()
+            os.unlink(temporal.name)
+            raise
+    hash_sha256 = calculador.hexdigest()
+    ruta, nuevo = guardar_temporal(temporal.name, hash_sha256)
+    if not nuevo:
+        metricas.incrementar(PREFIJO_METRICAS + "contenidos_deduplicados")
+        metricas.incrementar(PREFIJO_METRICAS + "bytes_ahorrados", tamano)
+    return hash_sha256, tamano, ruta
+
+
+def _copiar_texto(origen, destino):
+    """Copia en la BD los fragmentos (y el estado) de `origen` a `destino`."""
+    columnas = (
+        literal(destino.id),
+        FragmentoArchivo.indice,
+        FragmentoArchivo.pagina,
+        FragmentoArchivo.texto,
+    )
+    db.session.execute(
+        insert(FragmentoArchivo).from_select(
+            ["archivo_id", "indice", "pagina", "texto"],
+            select(*columnas).where(FragmentoArchivo.archivo_id == origen.id),
+        )
+    )
+    indexar_fragmentos(db.session, destino.id)
+    destino.texto_extraido = origen.texto_extraido
+    destino.paginas_procesadas = origen.paginas_procesadas
+    destino.paginas_totales = origen.paginas_totales
+    destino.estado_procesamiento_texto = "procesado"
+    destino.fecha_procesamiento = origen.fecha_procesamiento
+    destino.mensaje_error = None
+    metricas.incrementar(PREFIJO_METRICAS + "extracciones_reutilizadas")
+
+
+def registrar_archivo(
+    nombre_original, tipo_mime, hash_sha256, tamano, ruta, usuario_id, clase_id=None
+):
+    """
+    Crea la fila `ArchivoCargado` de una subida ya guardada en el almacén.
+    Devuelve `(archivo, requiere_extraccion)`: False si se reutilizó (o se
+    reutilizará) el texto de otra fila con el mismo contenido.
+    """
+    # Preferir una fila ya procesada; si no, una cuya extracción esté avanzando
+    inactiva = current_app.config.get("DOCUMENTOS_EXTRACCION_INACTIVA", 600)
+    previo = (
+        ArchivoCargado.query.filter(
+            ArchivoCargado.hash_sha256 == hash_sha256,
+            or_(
+                ArchivoCargado.estado_procesamiento_texto == "procesado",
+                and_(
+                    ArchivoCargado.estado_procesamiento_texto == "procesando",
+                    ArchivoCargado.fecha_progreso
+                    >= datetime.utcnow() - timedelta(seconds=inactiva),
+                ),
+            ),
+        )
+        .order_by(
+            case(
+                (ArchivoCargado.estado_procesamiento_texto == "procesado", 0), else_=1
+            ),
+            ArchivoCargado.id,
+        )
+        .first()
+    )
+    archivo = ArchivoCargado(
+        nombre_original=nombre_original,
+        nombre_servidor=f"{uuid.uuid4()}_{nombre_original}",
+        tipo_mime=tipo_mime,
+        tamano=tamano,
+        ruta_almacenamiento=ruta,
+        hash_sha256=hash_sha256,
+        usuario_id=usuario_id,
+        clase_id=clase_id,
+        estado_procesamiento_texto="pendiente",
+    )
+    db.session.add(archivo)
+    db.session.flush()
+    if previo is not None and previo.estado_procesamiento_texto == "procesado":
+        _copiar_texto(previo, archivo)
+    db.session.commit()
+    if previo is None or archivo.estado_procesamiento_texto != "pendiente":
+        return archivo, previo is None
+    # La extracción de `previo` pudo terminar (y propagar) o fallar antes de este
+    # commit, sin ver todavía la fila nueva
+    db.session.refresh(previo)
+    if previo.estado_procesamiento_texto == "procesado":
+        propagar_texto(previo.id)
+    elif previo.estado_procesamiento_texto == "error":
+        # `_marcar_error` también pudo verla y encolarla: solo uno la reclama
+        return archivo, reclamar_extraccion(archivo.id)
+    return archivo, False
+
+
+def propagar_texto(archivo_id):
+    """
+    Completa las filas pendientes con el mismo contenido que `archivo_id`, recién
+    procesado. Devuelve cuántas se completaron.
+    """
+    origen = db.session.get(ArchivoCargado, archivo_id)
+    if origen is None or origen.hash_sha256 is None:
+        return 0
+    pendientes = ArchivoCargado.query.filter(
+        ArchivoCargado.hash_sha256 == origen.hash_sha256,
+        ArchivoCargado.estado_procesamiento_texto == "pendiente",
+        ArchivoCargado.id != archivo_id,
+    ).all()
+    for archivo in pendientes:
+        _copiar_texto(origen, archivo)
+    db.session.commit()
+    return len(pendientes)
+
+
+def reclamar_extraccion(archivo_id):
+    """
+    Pasa una fila pendiente a "procesando" para que su extracción se encole una
+    sola vez aunque dos caminos la reasignen a la vez. True si la reclamó este
+    llamador (y debe encolarla).
+    """
+    resultado = db.session.execute(
+        update(ArchivoCargado)
+        .where(
+            ArchivoCargado.id == archivo_id,
+            ArchivoCargado.estado_procesamiento_texto == "pendiente",
+        )
+        .values(
+            estado_procesamiento_texto="procesando", fecha_progreso=datetime.utcnow()
+        )
+    )
+    db.session.commit()
+    return resultado.rowcount == 1
+
+
+def siguiente_pendiente(archivo_id):
+    """
+    Si la extracción de `archivo_id` falló, otra fila pendiente con el mismo
+    contenido debe extraerse por su cuenta; la reclama y devuelve su id, o None.
+    """
+    origen = db.session.get(ArchivoCargado, archivo_id)
+    if origen is None or origen.hash_sha256 is None:
+        return None
+    pendiente = db.session.scalar(
+        select(ArchivoCargado.id)
+        .where(
+            ArchivoCargado.hash_sha256 == origen.hash_sha256,
+            ArchivoCargado.estado_procesamiento_texto == "pendiente",
+        )
+        .order_by(ArchivoCargado.id)
+        .limit(1)
+    )
+    if pendiente is None or not reclamar_extraccion(pendiente):
+        return None
+    return pendiente
@@ -0,0 +1,271 @@
+# backend/app/services/analisis_items_service.py
+# Análisis de ítems por evaluación: dificultad, discriminación, distractores y
+# alfa de Cronbach.
+#
+# La ejecución nocturna recorre millones de filas de `respuestas`, así que no se
+# cargan en memoria ni se recorren fila a fila en Python:
+#   - Las respuestas del primer intento se leen en bloques (`yield_per`) ordenadas
+#     por estudiante y cada bloque se convierte en un ndarray (n, 4):
+#     [estudiante_id, pregunta_id, opcion_id, puntos].
+#   - `AcumuladorItems` pivota cada bloque a una matriz estudiantes × preguntas y
+#     acumula estadísticos suficientes (sumas de x, x², x·T, T, T² y, por opción,
+#     elecciones y suma de T), todo con operaciones vectorizadas. La memoria es
+#     O(preguntas + opciones) además del bloque en curso, sin importar cuántas
+#     filas haya.
+#   - Las filas del último estudiante de un bloque se retienen hasta el siguiente,
+#     porque su puntaje total T necesita todas sus respuestas.
+#
+# Definiciones (T = puntaje total del estudiante, x = puntos en la pregunta):
+#   dificultad      media(x) / puntaje de la pregunta (p-value, 0-1)
+#   discriminación  correlación punto-biserial corregida: corr(x, T - x)
+#   opciones        proporción que la elige, media de T de quienes la eligen y su
+#                   punto-biserial con T (un buen distractor la tiene negativa)
+#   alfa            k/(k-1) · (1 - Σ var(x) / var(T))
+# Las preguntas no respondidas cuentan 0 puntos.
+from datetime import datetime
+
+import numpy as np
+from flask import current_app
+from sqlalchemy import distinct, func, select
+
+from app.extensions import db
+from app.models.analisis_evaluacion import AnalisisEvaluacion
+from app.models.respuesta import Respuesta
+from app.services.clave_respuestas_service import obtener_clave
+from app.utils.metrics import metricas
+
+PREFIJO_METRICAS = "analisis_items."
+# Solo el primer intento: los reintentos no son independientes de la pregunta
+INTENTO_ANALIZADO = 1
+
+
+def _posiciones(ids_ordenados, valores):
+    """Índice de cada valor en `ids_ordenados` y máscara de los encontrados."""
+    if len(ids_ordenados) == 0:
+        return np.zeros(len(valores), np.int64), np.zeros(len(valores), bool)
+    posiciones = np.searchsorted(ids_ordenados, valores)
+    posiciones = np.minimum(posiciones, len(ids_ordenados) - 1)
+    return posiciones, ids_ordenados[posiciones] == valores
+
+
+def _nulo(valor):
+    valor = float(valor)
+    return None if np.isnan(valor) else round(valor, 4)
+
+
+class AcumuladorItems:
+    """
+    Estadísticos suficientes del análisis de ítems de una evaluación.
+
+    `agregar` recibe bloques (n, 4) [estudiante_id, pregunta_id, opcion_id,
+    puntos] ordenados por estudiante; `finalizar` devuelve los resultados.
+    """
+
+    def __init__(self, preguntas, opciones):
+        # preguntas: {pregunta_id: puntaje}
+        # opciones: {opcion_id: (pregunta_id, es_correcta)}
+        self.pregunta_ids = np.array(sorted(preguntas), dtype=np.int64)
+        self.puntajes = np.array(
+            [preguntas[p] or 0.0 for p in self.pregunta_ids], dtype=np.float64
+        )
+        self.opcion_ids = np.array(sorted(opciones), dtype=np.int64)
+        self.opcion_correcta = np.array(
+            [bool(opciones[o][1]) for o in self.opcion_ids], dtype=bool
+        )
+        self.opcion_pregunta, _ = _posiciones(
+            self.pregunta_ids,
+            np.array([opciones[o][0] for o in self.opcion_ids], dtype=np.int64),
+        )
+
+        total_preguntas, total_opciones = len(self.pregunta_ids), len(self.opcion_ids)
+        self.examinados = 0
+        self.suma_x = np.zeros(total_preguntas)
+        self.suma_x2 = np.zeros(total_preguntas)
+        self.suma_xt = np.zeros(total_preguntas)
+        self.suma_t = 0.0
+        self.suma_t2 = 0.0
+        self.elecciones = np.zeros(total_opciones)
+        self.suma_t_opcion = np.zeros(total_opciones)
+        self._pendiente = None
+
+    @classmethod
+    def desde_clave(cls, clave):
+        """A partir de la `ClaveRespuestas` compilada de la evaluación."""
+        return cls(
+            {pregunta_id: datos[1] for pregunta_id, datos in clave.preguntas.items()},
+            {opcion_id: datos[:2] for opcion_id, datos in clave.opciones.items()},
+        )
+
+    def agregar(self, bloque):
+        if len(bloque) == 0:
+            return
+        if self._pendiente is not None:
+            bloque = np.concatenate((self._pendiente, bloque))
+        # El último estudiante puede continuar en el bloque siguiente
+        corte = np.searchsorted(bloque[:, 0], bloque[-1, 0], side="left")
+        self._pendiente = bloque[corte:]
+        if corte:
+            self._procesar(bloque[:corte])
+
+    def _procesar(self, bloque):
+        estudiantes = bloque[:, 0]
+        nuevo = np.empty(len(bloque), dtype=bool)
+        nuevo[0] = True
+        np.not_equal(estudiantes[1:], estudiantes[:-1], out=nuevo[1:])
+        fila = np.cumsum(nuevo) - 1
+        examinados = int(fila[-1]) + 1
+
+        columna, valida = _posiciones(self.pregunta_ids, bloque[:, 1].astype(np.int64))
+        matriz = np.zeros((examinados, len(self.pregunta_ids)))
+        matriz[fila[valida], columna[valida]] = bloque[valida, 3]
+        totales = matriz.sum(axis=1)
+
+        self.examinados += examinados
+        self.suma_x += matriz.sum(axis=0)
+        self.suma_x2 += np.einsum("ij,ij->j", matriz, matriz)
+        self.suma_xt += totales @ matriz
+        self.suma_t += totales.sum()
+        self.suma_t2 += totales @ totales
+
+        opcion, elegida = _posiciones(self.opcion_ids, bloque[:, 2].astype(np.int64))
+        opcion, fila_opcion = opcion[elegida], fila[elegida]
+        minimo = len(self.opcion_ids)
+        self.elecciones += np.bincount(opcion, minlength=minimo)
+        self.suma_t_opcion += np.bincount(
+            opcion, weights=totales[fila_opcion], minlength=minimo
+        )
+
+    def finalizar(self):
+        if self._pendiente is not None and len(self._pendiente):
+            self._procesar(self._pendiente)
+        self._pendiente = None
+
+        n = self.examinados
+        if n == 0:
+            return {
+                "examinados": 0,
+                "alfa_cronbach": None,
+                "media_puntaje": None,
+                "desviacion_puntaje": None,
+                "preguntas": [],
+            }
+        media_t = self.suma_t / n
+        var_t = max(self.suma_t2 / n - media_t**2, 0.0)
+        media_x = self.suma_x / n
+        var_x = np.maximum(self.suma_x2 / n - media_x**2, 0.0)
+        cov_xt = self.suma_xt / n - media_x * media_t
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            dificultad = np.where(self.puntajes > 0, media_x / self.puntajes, np.nan)
+            # Correlación con el resto de la prueba (sin la propia pregunta)
+            cov_resto = cov_xt - var_x
+            var_resto = np.maximum(var_t - 2 * cov_xt + var_x, 0.0)
+            denominador = np.sqrt(var_x * var_resto)
+            discriminacion = np.where(denominador > 0, cov_resto / denominador, np.nan)
+
+            proporcion = self.elecciones / n
+            media_opcion = np.where(
+                self.elecciones > 0, self.suma_t_opcion / self.elecciones, np.nan
+            )
+            desviacion_t = np.sqrt(var_t)
+            biserial_opcion = np.where(
+                (proporcion > 0) & (proporcion < 1) & (desviacion_t > 0),
+                (media_opcion - media_t)
+                / desviacion_t
+                * np.sqrt(proporcion / (1 - proporcion)),
+                np.nan,
+            )
+
+        k = len(self.pregunta_ids)
+        alfa = None
+        if k > 1 and var_t > 0:
+            alfa = k / (k - 1) * (1 - var_x.sum() / var_t)
+
+        respondidas = np.bincount(
+            self.opcion_pregunta, weights=self.elecciones, minlength=k
+        )
+        con_opciones = np.bincount(self.opcion_pregunta, minlength=k) > 0
+        opciones_por_pregunta = [[] for _ in range(k)]
+        for i, opcion_id in enumerate(self.opcion_ids.tolist()):
+            opciones_por_pregunta[self.opcion_pregunta[i]].append(
+                {
+                    "opcion_id": opcion_id,
+                    "es_correcta": bool(self.opcion_correcta[i]),
+                    "proporcion": _nulo(proporcion[i]),
+                    "media_puntaje": _nulo(media_opcion[i]),
+                    "discriminacion": _nulo(biserial_opcion[i]),
+                }
+            )
+        preguntas = [
+            {
+                "pregunta_id": pregunta_id,
+                "dificultad": _nulo(dificultad[j]),
+                "discriminacion": _nulo(discriminacion[j]),
+                "omitidas": int(n - respondidas[j]) if con_opciones[j] else None,
+                "opciones": opciones_por_pregunta[j],
+            }
+            for j, pregunta_id in enumerate(self.pregunta_ids.tolist())
+        ]
+        return {
+            "examinados": n,
+            "alfa_cronbach": None if alfa is None else round(float(alfa), 4),
+            "media_puntaje": round(float(media_t), 4),
+            "desviacion_puntaje": round(float(desviacion_t), 4),
+            "preguntas": preguntas,
+        }
+
+
+def _bloques(evaluacion_id, tamano):
+    consulta = (
+        select(
+            Respuesta.estudiante_id,
+            Respuesta.pregunta_id,
+            func.coalesce(Respuesta.opcion_seleccionada_id, 0),
+            func.coalesce(Respuesta.calificacion, 0.0),
+        )
+        .where(
+            Respuesta.evaluacion_id == evaluacion_id,
+            Respuesta.intento_numero == INTENTO_ANALIZADO,
+        )
+        .order_by(Respuesta.estudiante_id)
+        .execution_options(yield_per=tamano)
+    )
+    for particion in db.session.execute(consulta).partitions():
+        yield np.asarray(particion, dtype=np.float64)
+
+
+def analizar_evaluacion(evaluacion_id, tamano_bloque=None):
+    """Calcula y guarda el análisis de ítems de la evaluación."""
+    tamano = tamano_bloque or current_app.config.get(
+        "ANALISIS_ITEMS_TAMANO_BLOQUE", 100_000
+    )
+    acumulador = AcumuladorItems.desde_clave(obtener_clave(evaluacion_id))
+    for bloque in _bloques(evaluacion_id, tamano):
+        acumulador.agregar(bloque)
+        metricas.incrementar(PREFIJO_METRICAS + "filas", len(bloque))
+    resultado = acumulador.finalizar()
+
+    analisis = db.session.get(AnalisisEvaluacion, evaluacion_id)
+    if analisis is None:
+        analisis = AnalisisEvaluacion(evaluacion_id=evaluacion_id)
+        db.session.add(analisis)
+    for campo, valor in resultado.items():
+        setattr(analisis, campo, valor)
+    analisis.fecha_calculo = datetime.utcnow()
+    db.session.commit()
+    metricas.incrementar(PREFIJO_METRICAS + "evaluaciones")
+    return analisis
+
+
+def analizar_evaluaciones(evaluacion_ids=None, tamano_bloque=None):
+    """
+    Ejecución completa (nocturna): analiza cada evaluación con respuestas, con un
+    commit por evaluación. Devuelve el número de evaluaciones analizadas.
+    """
+    if evaluacion_ids is None:
+        evaluacion_ids = db.session.scalars(
+            select(distinct(Respuesta.evaluacion_id)).order_by(Respuesta.evaluacion_id)
+        ).all()
+    for evaluacion_id in evaluacion_ids:
+        analizar_evaluacion(evaluacion_id, tamano_bloque)
+    return len(evaluacion_ids)
@@ -0,0 +1,196 @@
+# backend/app/services/busqueda_service.py
+# Búsqueda de texto completo en lecciones y documentos extraídos.
+#
+# Consulta el índice de models/indice_busqueda.py con el motor de la BD:
+#   - PostgreSQL: `websearch_to_tsquery('spanish', ...)` contra la columna
+#     `documento` (índice GIN), ordenado por `ts_rank_cd` y con el fragmento
+#     resaltado por `ts_headline`. El resaltado solo se calcula para las filas de
+#     la página, no para todas las coincidencias.
+#   - SQLite: MATCH sobre la tabla FTS5, ordenado por `bm25` (título con más peso)
+#     y resaltado con `snippet`.
+# Los resultados se limitan a las clases del usuario: las que imparte y aquellas
+# en las que está inscrito (los administradores ven todo). La paginación pide una
+# fila de más para saber si hay página siguiente, sin COUNT.
+#
+# El contenido indexado es texto de docentes y de PDF subidos, no HTML: ambos
+# motores marcan las coincidencias con caracteres de uso privado de Unicode y
+# `_fragmento` escapa el texto antes de convertir esas marcas en <mark>, así que
+# el fragmento solo puede contener esas etiquetas.
+import html
+import re
+
+from sqlalchemy import column, func, literal_column, select, table, union
+
+from app.extensions import db
+from app.models.clase import Clase
+from app.models.indice_busqueda import TABLA_FTS, IndiceBusqueda
+from app.models.inscripcion_clase import InscripcionClase
+from app.utils.metrics import metricas
+
+PREFIJO_METRICAS = "busqueda."
+INICIO_RESALTADO = "<mark>"
+FIN_RESALTADO = "</mark>"
+# Marcas que devuelven `snippet` y `ts_headline`; no aparecen en texto normal
+_MARCA_INICIO = "\ue000"
+_MARCA_FIN = "\ue001"
+PALABRAS_FRAGMENTO = 24
+# En SQLite el título cuenta diez veces más que el contenido (igual que el peso
+# 'A' frente a 'B' en PostgreSQL)
+PESO_TITULO = 10.0
+
+_tabla = IndiceBusqueda.__table__
+
+
+def consulta_fts5(texto):
+    """
+    Convierte el texto del usuario en una consulta FTS5 segura: cada palabra entre
+    comillas (sin operadores ni sintaxis del usuario), todas requeridas, y la
+    última como prefijo para las búsquedas mientras se escribe. None si no hay
+    palabras.
+    """
+    palabras = re.findall(r"\w+", texto)
+    if not palabras:
+        return None
+    terminos = [f'"{palabra}"' for palabra in palabras]
+    terminos[-1] += "*"
+    return " ".join(terminos)
+
+
+def _fragmento(crudo):
+    """Fragmento HTML seguro: el texto escapado y solo las coincidencias marcadas."""
+    if crudo is None:
+        return None
+    return (
+        html.escape(crudo, quote=False)
+        .replace(_MARCA_INICIO, INICIO_RESALTADO)
+        .replace(_MARCA_FIN, FIN_RESALTADO)
+    )
+
+
+def _clases_visibles(usuario_id, rol):
+    """Subconsulta con los ids de clase visibles; None si no hay restricción."""
+    if rol == "admin":
+        return None
+    return union(
+        select(Clase.id).where(Clase.docente_id == usuario_id),
+        select(InscripcionClase.clase_id).where(
+            InscripcionClase.estudiante_id == usuario_id,
+            InscripcionClase.estado != "abandonado",
+        ),
+    )
+
+
+def _filtrar(consulta, clases):
+    consulta = consulta.where(_tabla.c.clase_id.isnot(None))
+    if clases is not None:
+        consulta = consulta.where(_tabla.c.clase_id.in_(clases))
+    return consulta
+
+
+def _columnas():
+    return (
+        _tabla.c.id,
+        _tabla.c.tipo,
+        _tabla.c.objeto_id,
+        _tabla.c.clase_id,
+        _tabla.c.pagina,
+        _tabla.c.titulo,
+    )
+
+
+def _buscar_sqlite(texto, clases, limite, desplazamiento):
+    consulta = consulta_fts5(texto)
+    if consulta is None:
+        return []
+    fts = table(TABLA_FTS, column("rowid"))
+    tabla_fts = literal_column(TABLA_FTS)
+    # bm25 es menor cuanto más relevante; se invierte para la respuesta
+    rango = func.bm25(tabla_fts, PESO_TITULO, 1.0)
+    sentencia = (
+        select(
+            *_columnas(),
+            func.snippet(
+                tabla_fts,
+                -1,
+                _MARCA_INICIO,
+                _MARCA_FIN,
+                "…",
+                PALABRAS_FRAGMENTO,
+            ).label("fragmento"),
+            (-rango).label("puntuacion"),
+        )
+        .select_from(fts)
+        .join(_tabla, _tabla.c.id == fts.c.rowid)
+        .where(tabla_fts.op("MATCH")(consulta))
+        .order_by(rango, _tabla.c.id)
+        .limit(limite)
+        .offset(desplazamiento)
+    )
+    return db.session.execute(_filtrar(sentencia, clases)).all()
+
+
+def _consulta_postgresql(texto, clases, limite, desplazamiento):
+    consulta = func.websearch_to_tsquery("spanish", texto)
+    documento = literal_column("indice_busqueda.documento")
+    rango = func.ts_rank_cd(documento, consulta)
+    pagina = (
+        select(*_columnas(), _tabla.c.contenido, rango.label("puntuacion"))
+        .where(documento.op("@@")(consulta))
+        .order_by(rango.desc(), _tabla.c.id)
+        .limit(limite)
+        .offset(desplazamiento)
+    )
+    pagina = _filtrar(pagina, clases).subquery()
+    opciones = (
+        f"StartSel={_MARCA_INICIO}, StopSel={_MARCA_FIN}, "
+        f"MaxWords={PALABRAS_FRAGMENTO}, MinWords=8, MaxFragments=2"
+    )
+    return select(
+        pagina.c.tipo,
+        pagina.c.objeto_id,
+        pagina.c.clase_id,
+        pagina.c.pagina,
+        pagina.c.titulo,
+        func.ts_headline("spanish", pagina.c.contenido, consulta, opciones).label(
+            "fragmento"
+        ),
+        pagina.c.puntuacion,
+    ).order_by(pagina.c.puntuacion.desc(), pagina.c.id)
+
+
+def _buscar_postgresql(texto, clases, limite, desplazamiento):
+    sentencia = _consulta_postgresql(texto, clases, limite, desplazamiento)
+    return db.session.execute(sentencia).all()
+
+
+def buscar(texto, usuario_id, rol, pagina=1, por_pagina=10):
+    """
+    Busca `texto` en las lecciones y documentos de las clases del usuario. Devuelve
+    los resultados de la página, del más al menos relevante, y si hay más páginas.
+    """
+    clases = _clases_visibles(usuario_id, rol)
+    desplazamiento = (pagina - 1) * por_pagina
+    if db.engine.dialect.name == "postgresql":
+        filas = _buscar_postgresql(texto, clases, por_pagina + 1, desplazamiento)
+    else:
+        filas = _buscar_sqlite(texto, clases, por_pagina + 1, desplazamiento)
+    metricas.incrementar(PREFIJO_METRICAS + "consultas")
+    resultados = [
+        {
+            "tipo": fila.tipo,
+            "id": fila.objeto_id,
+            "clase_id": fila.clase_id,
+            "titulo": fila.titulo,
+            "pagina": fila.pagina,
+            "fragmento": _fragmento(fila.fragmento),
+            "puntuacion": round(float(fila.puntuacion), 6),
+        }
+        for fila in filas[:por_pagina]
+    ]
+    return {
+        "resultados": resultados,
+        "pagina": pagina,
+        "por_pagina": por_pagina,
+        "tiene_siguiente": len(filas) > por_pagina,
+        "tiene_anterior": pagina > 1,
+    }
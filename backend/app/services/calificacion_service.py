@@ -0,0 +1,183 @@
+# backend/app/services/calificacion_service.py
+# Envío y calificación de un intento completo de evaluación en una transacción.
+#
+# `Respuesta.registrar_respuesta` consulta la pregunta y la opción y confirma por
+# cada respuesta: un cuestionario de 40 preguntas son ~120 viajes a la BD y 40
+# commits por estudiante. Aquí, para todo el intento:
+#   1. Se lee la evaluación, se comprueba que quien envía es un estudiante inscrito
+#      en una clase que la usa y se leen sus intentos previos.
+#   2. Se obtiene la clave de respuestas compilada (caché; ver
+#      clave_respuestas_service.py), sin tocar las tablas de preguntas.
+#   3. Se califica en memoria.
+#   4. Se insertan todas las filas `Respuesta` con una sola sentencia (executemany)
+#      y se suma la calificación a las estadísticas de la clase
+#      (models/estadisticas.py), con un único commit.
+#
+# La restricción única (estudiante, evaluación, intento, pregunta) impide que un
+# doble envío del mismo intento se registre dos veces.
+from datetime import datetime
+
+from sqlalchemy import exists, func, insert, select
+from sqlalchemy.exc import IntegrityError
+
+from app.extensions import db
+from app.models.estadisticas import registrar_calificacion
+from app.models.evaluacion import Evaluacion
+from app.models.inscripcion_clase import InscripcionClase
+from app.models.leccion import Leccion
+from app.models.modulo import Modulo
+from app.models.respuesta import Respuesta
+from app.models.usuario import Usuario
+from app.services.clave_respuestas_service import obtener_clave
+
+
+class EnvioInvalidoError(Exception):
+    """El envío no puede registrarse; `codigo` es el estado HTTP sugerido."""
+
+    def __init__(self, mensaje, codigo=400):
+        super().__init__(mensaje)
+        self.mensaje = mensaje
+        self.codigo = codigo
+
+
+# 'alumno' es el rol con el que se registran las cuentas desde /api/auth/register
+ROLES_ESTUDIANTE = ("estudiante", "alumno")
+
+
+def verificar_estudiante(evaluacion_id, estudiante_id):
+    """
+    Comprueba, en una sola consulta, que el usuario es un estudiante activo con
+    una inscripción activa en alguna clase que usa la evaluación.
+    """
+    inscrito = exists(
+        select(InscripcionClase.id)
+        .join(Modulo, Modulo.clase_id == InscripcionClase.clase_id)
+        .join(Leccion, Leccion.modulo_id == Modulo.id)
+        .where(
+            Leccion.evaluacion_id == evaluacion_id,
+            InscripcionClase.estudiante_id == estudiante_id,
+            InscripcionClase.estado == "activo",
+        )
+    )
+    fila = db.session.execute(
+        select(Usuario.rol, Usuario.activo, inscrito).where(Usuario.id == estudiante_id)
+    ).first()
+    if fila is None or not fila.activo or fila.rol not in ROLES_ESTUDIANTE:
+        raise EnvioInvalidoError("Solo los estudiantes pueden enviar evaluaciones", 403)
+    if not fila[2]:
+        raise EnvioInvalidoError(
+            "No estás inscrito en ninguna clase que use esta evaluación", 403
+        )
+
+
+def _validar_intento(evaluacion, estudiante_id, intento):
+    previo = db.session.execute(
+        select(func.max(Respuesta.intento_numero)).where(
+            Respuesta.evaluacion_id == evaluacion.id,
+            Respuesta.estudiante_id == estudiante_id,
+        )
+    ).scalar()
+    esperado = (previo or 0) + 1
+    permitidos = evaluacion.intentos_permitidos or 1
+    if esperado > permitidos:
+        raise EnvioInvalidoError("No quedan intentos disponibles", 403)
+    if intento != esperado:
+        raise EnvioInvalidoError(
+            f"El intento enviado ({intento}) no es el siguiente ({esperado})", 409
+        )
+    return permitidos
+
+
+def enviar_intento(evaluacion_id, estudiante_id, envio, desde_sesion=False):
+    """
+    Registra y califica un intento completo. `envio` son los datos ya validados por
+    `RespuestaEnvioSchema`. Devuelve el diccionario de `ResultadoEvaluacionSchema`.
+
+    Las evaluaciones con tiempo límite solo se aceptan desde una sesión de examen
+    (`desde_sesion`, ver sesion_examen_service.py), que es quien controla la hora
+    de inicio y la hora límite.
+    """
+    evaluacion = db.session.get(Evaluacion, evaluacion_id)
+    if evaluacion is None:
+        raise EnvioInvalidoError("Evaluación no encontrada", 404)
+    if evaluacion.tiempo_limite_minutos and not desde_sesion:
+        raise EnvioInvalidoError(
+            "Las evaluaciones con tiempo límite se envían desde su sesión de examen",
+            409,
+        )
+    verificar_estudiante(evaluacion_id, estudiante_id)
+    intento = envio["intento_numero"]
+    permitidos = _validar_intento(evaluacion, estudiante_id, intento)
+    aprobatoria = evaluacion.calificacion_aprobatoria
+    if aprobatoria is None:
+        aprobatoria = 70.0
+
+    # Una sola instantánea de la clave para todo el intento (ver sello de versión)
+    clave = obtener_clave(evaluacion_id)
+    ahora = datetime.utcnow()
+    filas, detalles = [], []
+    obtenido, correctas = 0.0, 0
+    for respuesta in envio["respuestas"]:
+        pregunta_id = respuesta["pregunta_id"]
+        opcion_id = respuesta.get("opcion_seleccionada_id")
+        if pregunta_id not in clave.preguntas:
+            raise EnvioInvalidoError(
+                f"La pregunta {pregunta_id} no pertenece a la evaluación"
+            )
+        opcion = clave.opciones.get(opcion_id)
+        if opcion_id is not None and (opcion is None or opcion[0] != pregunta_id):
+            raise EnvioInvalidoError(
+                f"La opción {opcion_id} no pertenece a la pregunta {pregunta_id}"
+            )
+
+        calificacion, correcta, retroalimentacion = clave.calificar(
+            pregunta_id, opcion_id
+        )
+        obtenido += calificacion or 0.0
+        correctas += 1 if correcta else 0
+        filas.append(
+            {
+                "pregunta_id": pregunta_id,
+                "estudiante_id": estudiante_id,
+                "evaluacion_id": evaluacion_id,
+                "opcion_seleccionada_id": opcion_id,
+                "texto_respuesta": respuesta.get("texto_respuesta"),
+                "calificacion": calificacion,
+                "retroalimentacion": retroalimentacion,
+                "tiempo_tomado": respuesta["tiempo_tomado"],
+                "intento_numero": intento,
+                "fecha_respuesta": ahora,
+            }
+        )
+        detalles.append(
+            {
+                "pregunta_id": pregunta_id,
+                "opcion_seleccionada_id": opcion_id,
+                "correcta": correcta,
+                "calificacion": calificacion,
+                "puntaje": clave.preguntas[pregunta_id][1],
+                "retroalimentacion": retroalimentacion,
+            }
+        )
+
+    total = clave.puntaje_total
+    calificacion = round(obtenido * 100.0 / total, 2) if total else 0.0
+    try:
+        db.session.execute(insert(Respuesta), filas)
+        registrar_calificacion(evaluacion_id, calificacion)
+        db.session.commit()
+    except IntegrityError:
+        db.session.rollback()
+        raise EnvioInvalidoError("Este intento ya fue registrado", 409)
+
+    return {
+        "intento_actual": intento,
+        "intentos_restantes": max(permitidos - intento, 0),
+        "calificacion": calificacion,
+        "aprobado": calificacion >= aprobatoria,
+        "respuestas_correctas": correctas,
+        "total_preguntas": len(clave.preguntas),
+        "fecha_completado": ahora,
+        "tiempo_tomado": envio["tiempo_total"],
+        "detalles_preguntas": detalles,
+    }
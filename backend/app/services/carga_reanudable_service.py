@@ -0,0 +1,250 @@
+# backend/app/services/carga_reanudable_service.py
+# Cargas reanudables de documentos, al estilo del protocolo tus.
+#
+# Con una sola petición multipart, una conexión rural que se corta a mitad de un
+# PDF de 9 MB obliga a empezar de cero, y el tamaño solo se comprueba después de
+# que Werkzeug almacenó el archivo completo. En su lugar:
+#   1. `crear_carga` registra la carga (dueño, nombre, tipo, tamaño declarado) en
+#      el hash de Redis `carga:<id>`, con TTL, y crea el archivo parcial vacío en
+#      `<UPLOAD_FOLDER>/tmp/cargas/<id>`.
+#   2. Cada bloque (PATCH) se escribe directamente a disco mientras se lee la
+#      petición. El desplazamiento actual es el tamaño del archivo parcial, así que
+#      lo que alcanzó a llegar antes de un corte se conserva y cualquier worker
+#      puede atender el siguiente bloque. El tamaño declarado (y con él
+#      MAX_UPLOAD_SIZE) se controla bloque a bloque.
+#   3. `finalizar_carga` calcula el SHA-256 del archivo completo, lo mueve al
+#      almacén por contenido y registra el `ArchivoCargado`
+#      (ver almacen_archivos_service.py); quien llama encola la extracción.
+# Un candado en Redis por carga impide escribir dos bloques a la vez.
+import hashlib
+import os
+import re
+import time
+import uuid
+
+from flask import current_app
+from redis.exceptions import RedisError
+
+from app.extensions import redis_client
+from app.services.almacen_archivos_service import (
+    TAMANO_BLOQUE,
+    guardar_temporal,
+    registrar_archivo,
+)
+from app.utils.metrics import metricas
+
+PREFIJO_REDIS = "carga:"
+PREFIJO_METRICAS = "cargas."
+TIPOS_PERMITIDOS = {"application/pdf", "text/plain"}
+
+
+class CargaError(Exception):
+    """La operación sobre la carga no es posible; `codigo` es el estado HTTP."""
+
+    def __init__(self, mensaje, codigo=400):
+        super().__init__(mensaje)
+        self.mensaje = mensaje
+        self.codigo = codigo
+
+
+def _carpeta_cargas():
+    carpeta = os.path.join(
+        current_app.config.get("UPLOAD_FOLDER", "uploads/"), "tmp", "cargas"
+    )
+    os.makedirs(carpeta, exist_ok=True)
+    return carpeta
+
+
+def _ruta_parcial(carga_id):
+    return os.path.join(_carpeta_cargas(), carga_id)
+
+
+def _ttl():
+    return current_app.config.get("CARGAS_TTL", 86400)
+
+
+def _redis_no_disponible():
+    metricas.incrementar(PREFIJO_METRICAS + "errores_redis")
+    return CargaError("El servicio de cargas no está disponible", 503)
+
+
+def _leer(carga_id, usuario_id):
+    if not re.fullmatch(r"[0-9a-f]{32}", carga_id):
+        raise CargaError("Carga no encontrada", 404)
+    try:
+        datos = redis_client.hgetall(PREFIJO_REDIS + carga_id)
+    except RedisError:
+        raise _redis_no_disponible()
+    ruta = _ruta_parcial(carga_id)
+    # Las cargas ajenas se tratan como inexistentes
+    if not datos or int(datos["usuario_id"]) != usuario_id or not os.path.exists(ruta):
+        raise CargaError("Carga no encontrada", 404)
+    datos["tamano"] = int(datos["tamano"])
+    datos["desplazamiento"] = os.path.getsize(ruta)
+    return datos
+
+
+class _Candado:
+    """Candado por carga (SET NX con expiración) durante una escritura."""
+
+    def __init__(self, carga_id):
+        self.clave = f"{PREFIJO_REDIS}{carga_id}:candado"
+        self.token = uuid.uuid4().hex
+
+    def __enter__(self):
+        try:
+            adquirido = redis_client.set(self.clave, self.token, nx=True, ex=300)
+        except RedisError:
+            raise _redis_no_disponible()
+        if not adquirido:
+            raise CargaError("Otra petición está escribiendo en esta carga", 423)
+        return self
+
+    def __exit__(self, *exc):
+        try:
+            if redis_client.get(self.clave) == self.token:
+                redis_client.delete(self.clave)
+        except RedisError:
+            metricas.incrementar(PREFIJO_METRICAS + "errores_redis")
+
+
+def crear_carga(usuario_id, nombre_original, tipo_mime, tamano, clase_id=None):
+    """Registra una carga nueva y devuelve su id."""
+    if tipo_mime not in TIPOS_PERMITIDOS:
+        raise CargaError("Tipo de archivo no permitido.")
+    if tamano is None or tamano <= 0:
+        raise CargaError("Se debe indicar el tamaño del archivo (Upload-Length).")
+    if tamano > current_app.config.get("MAX_UPLOAD_SIZE", 10 * 1024 * 1024):
+        raise CargaError("El archivo excede el tamaño máximo permitido.", 413)
+
+    carga_id = uuid.uuid4().hex
+    datos = {
+        "usuario_id": usuario_id,
+        "nombre_original": nombre_original,
+        "tipo_mime": tipo_mime,
+        "tamano": tamano,
+        "clase_id": clase_id or "",
+        "creada": repr(time.time()),
+    }
+    try:
+        pipe = redis_client.pipeline()
+        pipe.hset(PREFIJO_REDIS + carga_id, mapping=datos)
+        pipe.expire(PREFIJO_REDIS + carga_id, _ttl())
+        pipe.execute()
+    except RedisError:
+        raise _redis_no_disponible()
+    open(_ruta_parcial(carga_id), "wb").close()
+    metricas.incrementar(PREFIJO_METRICAS + "creadas")
+    return carga_id
+
+
+def estado_carga(carga_id, usuario_id):
+    """Desplazamiento actual y tamaño declarado de la carga."""
+    datos = _leer(carga_id, usuario_id)
+    return {"desplazamiento": datos["desplazamiento"], "tamano": datos["tamano"]}
+
+
+def escribir_bloque(carga_id, usuario_id, desplazamiento, flujo):
+    """
+    Agrega a la carga los bytes de `flujo` a partir de `desplazamiento`, que debe
+    coincidir con lo ya recibido. Devuelve el nuevo desplazamiento.
+    """
+    with _Candado(carga_id):
+        datos = _leer(carga_id, usuario_id)
+        actual, tamano = datos["desplazamiento"], datos["tamano"]
+        if desplazamiento != actual:
+            raise CargaError(
+                f"El desplazamiento ({desplazamiento}) no coincide con el de la "
+                f"carga ({actual})",
+                409,
+            )
+        escritos = 0
+        with open(_ruta_parcial(carga_id), "ab") as parcial:
+            while True:
+                bloque = flujo.read(TAMANO_BLOQUE)
+                if not bloque:
+                    break
+                if actual + escritos + len(bloque) > tamano:
+                    # Se descarta el bloque completo: la carga vuelve a `actual`
+                    parcial.truncate(actual)
+                    raise CargaError(
+                        "El bloque excede el tamaño declarado de la carga.", 413
+                    )
+                # Lo recibido queda en disco aunque la conexión se corte después
+                parcial.write(bloque)
+                escritos += len(bloque)
+        try:
+            redis_client.expire(PREFIJO_REDIS + carga_id, _ttl())
+        except RedisError:
+            metricas.incrementar(PREFIJO_METRICAS + "errores_redis")
+    metricas.incrementar(PREFIJO_METRICAS + "bytes_recibidos", escritos)
+    return actual + escritos
+
+
+def finalizar_carga(carga_id, usuario_id):
+    """
+    Cierra una carga completa y registra su `ArchivoCargado`. Devuelve
+    `(archivo, requiere_extraccion)` como `registrar_archivo`.
+    """
+    with _Candado(carga_id):
+        datos = _leer(carga_id, usuario_id)
+        if datos["desplazamiento"] != datos["tamano"]:
+            raise CargaError(
+                f"La carga está incompleta ({datos['desplazamiento']} de "
+                f"{datos['tamano']} bytes)",
+                409,
+            )
+        ruta_parcial = _ruta_parcial(carga_id)
+        calculador = hashlib.sha256()
+        with open(ruta_parcial, "rb") as parcial:
+            for bloque in iter(lambda: parcial.read(TAMANO_BLOQUE), b""):
+                calculador.update(bloque)
+        hash_sha256 = calculador.hexdigest()
+        ruta, _ = guardar_temporal(ruta_parcial, hash_sha256)
+        try:
+            redis_client.delete(PREFIJO_REDIS + carga_id)
+        except RedisError:
+            metricas.incrementar(PREFIJO_METRICAS + "errores_redis")
+        archivo, requiere_extraccion = registrar_archivo(
+            nombre_original=datos["nombre_original"],
+            tipo_mime=datos["tipo_mime"],
+            hash_sha256=hash_sha256,
+            tamano=datos["tamano"],
+            ruta=ruta,
+            usuario_id=usuario_id,
+            clase_id=int(datos["clase_id"]) if datos["clase_id"] else None,
+        )
+    metricas.incrementar(PREFIJO_METRICAS + "finalizadas")
+    return archivo, requiere_extraccion
+
+
+def cancelar_carga(carga_id, usuario_id):
+    """Descarta una carga sin terminar."""
+    with _Candado(carga_id):
+        _leer(carga_id, usuario_id)
+        try:
+            redis_client.delete(PREFIJO_REDIS + carga_id)
+        except RedisError:
+            raise _redis_no_disponible()
+        os.unlink(_ruta_parcial(carga_id))
+    metricas.incrementar(PREFIJO_METRICAS + "canceladas")
+
+
+def limpiar_cargas_abandonadas():
+    """
+    Elimina los archivos parciales cuya carga ya expiró en Redis (o que llevan
+    más del TTL sin recibir bloques). Devuelve cuántos se eliminaron.
+    """
+    limite = time.time() - _ttl()
+    eliminados = 0
+    carpeta = _carpeta_cargas()
+    for nombre in os.listdir(carpeta):
+        ruta = os.path.join(carpeta, nombre)
+        try:
+            vigente = redis_client.exists(PREFIJO_REDIS + nombre)
+        except RedisError:
+            raise _redis_no_disponible()
+        if not vigente or os.path.getmtime(ruta) < limite:
+            os.unlink(ruta)
+            eliminados += 1
+    return eliminados
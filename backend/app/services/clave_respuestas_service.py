@@ -0,0 +1,259 @@
+# backend/app/services/clave_respuestas_service.py
+# Claves de respuestas compiladas por evaluación, con caché de dos niveles.
+#
+# Calificar necesita, por pregunta, su tipo, puntaje y retroalimentación, y por
+# opción a qué pregunta pertenece y si es correcta. Esa información se compila en
+# una estructura inmutable (`ClaveRespuestas`) con una sola consulta y se cachea:
+#   1. LRU por worker  -> sin red ni BD en el caso común
+#   2. Redis           -> compartido entre workers
+#   3. Base de datos   -> una consulta (preguntas LEFT JOIN opciones)
+#
+# Sello de versión: cada evaluación tiene un contador en Redis que se incrementa al
+# cambiar sus preguntas u opciones. Las entradas se guardan bajo (evaluación,
+# versión), así que un intento que ya obtuvo su clave la usa completa aunque se
+# invalide a mitad de la calificación, y una clave compilada con datos viejos
+# nunca se publica bajo la versión nueva.
+#
+# La invalidación ocurre en el commit de la transacción que modifica `Pregunta` u
+# `OpcionRespuesta` (eventos de SQLAlchemy). Las escrituras que no pasan por el
+# ORM (SQL manual) requieren `invalidar_clave(evaluacion_id)`.
+import json
+from types import MappingProxyType
+
+from flask import current_app
+from redis.exceptions import RedisError
+from sqlalchemy import event, inspect, select
+from sqlalchemy.orm import Session, object_session
+
+from app.extensions import db, redis_client
+from app.models.opcion_respuesta import OpcionRespuesta
+from app.models.pregunta import Pregunta
+from app.utils.cache import LRUConTTL
+from app.utils.metrics import metricas
+
+PREFIJO_REDIS = "clave_respuestas:"
+PREFIJO_METRICAS = "claves_cache."
+CLAVE_SESION = "claves_respuestas_invalidadas"
+
+# Tipos de pregunta que se califican automáticamente por la opción elegida
+TIPOS_CON_OPCIONES = ("opcion_multiple", "verdadero_falso")
+# Columnas que forman parte de la clave: cambiar otras (p. ej. el enunciado) no
+# invalida
+CAMPOS_PREGUNTA = ("tipo", "puntaje", "retroalimentacion", "evaluacion_id")
+CAMPOS_OPCION = ("es_correcta", "retroalimentacion", "pregunta_id")
+
+_lru = LRUConTTL(max_entradas=512, ttl=300.0)
+# Versiones locales si Redis no está disponible (solo coherentes en este worker)
+_versiones_locales = {}
+
+
+class ClaveRespuestas:
+    """Clave de respuestas inmutable de una evaluación en una versión concreta."""
+
+    __slots__ = ("evaluacion_id", "version", "preguntas", "opciones", "puntaje_total")
+
+    def __init__(self, evaluacion_id, version, preguntas, opciones):
+        # pregunta_id -> (tipo, puntaje, retroalimentacion)
+        # opcion_id -> (pregunta_id, es_correcta, retroalimentacion)
+        object.__setattr__(self, "evaluacion_id", evaluacion_id)
+        object.__setattr__(self, "version", version)
+        object.__setattr__(self, "preguntas", MappingProxyType(dict(preguntas)))
+        object.__setattr__(self, "opciones", MappingProxyType(dict(opciones)))
+        object.__setattr__(
+            self,
+            "puntaje_total",
+            sum(puntaje or 0.0 for _, puntaje, _ in self.preguntas.values()),
+        )
+
+    def __setattr__(self, nombre, valor):
+        raise AttributeError("ClaveRespuestas es inmutable")
+
+    def calificar(self, pregunta_id, opcion_id):
+        """Devuelve `(calificacion, correcta, retroalimentacion)`."""
+        tipo, puntaje, retroalimentacion = self.preguntas[pregunta_id]
+        if tipo not in TIPOS_CON_OPCIONES or opcion_id is None:
+            # Respuesta abierta: queda pendiente de calificación manual
+            return None, None, None
+        _, es_correcta, retro_opcion = self.opciones[opcion_id]
+        calificacion = (puntaje or 0.0) if es_correcta else 0.0
+        return calificacion, es_correcta, retro_opcion or retroalimentacion
+
+    def a_json(self):
+        return json.dumps(
+            {
+                "preguntas": [[ident, *d] for ident, d in self.preguntas.items()],
+                "opciones": [[ident, *d] for ident, d in self.opciones.items()],
+            }
+        )
+
+    @classmethod
+    def desde_json(cls, evaluacion_id, version, crudo):
+        datos = json.loads(crudo)
+        return cls(
+            evaluacion_id,
+            version,
+            {fila[0]: tuple(fila[1:]) for fila in datos["preguntas"]},
+            {fila[0]: tuple(fila[1:]) for fila in datos["opciones"]},
+        )
+
+
+def init_app(app):
+    """Configura tamaños y TTL de la caché a partir de la configuración de la app."""
+    _lru.max_entradas = app.config.get("CLAVES_CACHE_MAX_ENTRADAS", 512)
+    _lru.ttl = app.config.get("CLAVES_CACHE_TTL_LOCAL", 300)
+    _lru.limpiar()
+    _versiones_locales.clear()
+
+
+def _ttl_redis():
+    return current_app.config.get("CLAVES_CACHE_TTL_REDIS", 3600)
+
+
+def compilar_clave(evaluacion_id, version=0):
+    """Compila la clave de la evaluación con una única consulta."""
+    metricas.incrementar(PREFIJO_METRICAS + "compilaciones")
+    filas = db.session.execute(
+        select(
+            Pregunta.id,
+            Pregunta.tipo,
+            Pregunta.puntaje,
+            Pregunta.retroalimentacion,
+            OpcionRespuesta.id.label("opcion_id"),
+            OpcionRespuesta.es_correcta,
+            OpcionRespuesta.retroalimentacion.label("opcion_retroalimentacion"),
+        )
+        .outerjoin(OpcionRespuesta, OpcionRespuesta.pregunta_id == Pregunta.id)
+        .where(Pregunta.evaluacion_id == evaluacion_id)
+    )
+    preguntas, opciones = {}, {}
+    for fila in filas:
+        preguntas[fila.id] = (fila.tipo, fila.puntaje, fila.retroalimentacion)
+        if fila.opcion_id is not None:
+            opciones[fila.opcion_id] = (
+                fila.id,
+                fila.es_correcta,
+                fila.opcion_retroalimentacion,
+            )
+    return ClaveRespuestas(evaluacion_id, version, preguntas, opciones)
+
+
+def version_actual(evaluacion_id):
+    try:
+        return int(redis_client.get(f"{PREFIJO_REDIS}version:{evaluacion_id}") or 0)
+    except RedisError:
+        metricas.incrementar(PREFIJO_METRICAS + "errores_redis")
+        return _versiones_locales.get(evaluacion_id, 0)
+
+
+def obtener_clave(evaluacion_id):
+    """Devuelve la `ClaveRespuestas` vigente de la evaluación."""
+    version = version_actual(evaluacion_id)
+    clave = _lru.obtener((evaluacion_id, version))
+    if clave is not None:
+        metricas.incrementar(PREFIJO_METRICAS + "hits_lru")
+        return clave
+
+    clave_redis = f"{PREFIJO_REDIS}{evaluacion_id}:{version}"
+    try:
+        crudo = redis_client.get(clave_redis)
+    except RedisError:
+        metricas.incrementar(PREFIJO_METRICAS + "errores_redis")
+        crudo = None
+    if crudo:
+        metricas.incrementar(PREFIJO_METRICAS + "hits_redis")
+        clave = ClaveRespuestas.desde_json(evaluacion_id, version, crudo)
+    else:
+        clave = compilar_clave(evaluacion_id, version)
+        try:
+            redis_client.setex(clave_redis, _ttl_redis(), clave.a_json())
+        except RedisError:
+            metricas.incrementar(PREFIJO_METRICAS + "errores_redis")
+    _lru.guardar((evaluacion_id, version), clave)
+    return clave
+
+
+def invalidar_clave(evaluacion_id):
+    """Publica una versión nueva; las entradas de la anterior dejan de leerse."""
+    metricas.incrementar(PREFIJO_METRICAS + "invalidaciones")
+    _versiones_locales[evaluacion_id] = _versiones_locales.get(evaluacion_id, 0) + 1
+    try:
+        redis_client.incr(f"{PREFIJO_REDIS}version:{evaluacion_id}")
+    except RedisError:
+        metricas.incrementar(PREFIJO_METRICAS + "errores_redis")
+
+
+def estadisticas():
+    """Contadores de la caché, incluido el número de compilaciones evitadas."""
+    datos = metricas.snapshot(PREFIJO_METRICAS)
+    datos[PREFIJO_METRICAS + "compilaciones_evitadas"] = sum(
+        datos.get(PREFIJO_METRICAS + nivel, 0) for nivel in ("hits_lru", "hits_redis")
+    )
+    return datos
+
+
+# --- Invalidación por eventos de SQLAlchemy ---
+#
+# Durante el flush solo se anotan las evaluaciones afectadas; la versión se
+# incrementa tras el commit. Invalidar antes permitiría que otra petición
+# recompilase con los datos aún sin confirmar y los publicara bajo la versión nueva.
+
+
+def _anotar(target, *evaluaciones):
+    sesion = object_session(target)
+    if sesion is None:
+        return
+    pendientes = sesion.info.setdefault(CLAVE_SESION, set())
+    pendientes.update(e for e in evaluaciones if e is not None)
+
+
+def _cambio_relevante(target, campos):
+    estado = inspect(target)
+    return any(estado.attrs[campo].history.has_changes() for campo in campos)
+
+
+def _evaluaciones_de_pregunta(target):
+    historial = inspect(target).attrs.evaluacion_id.history
+    return [target.evaluacion_id, *historial.deleted]
+
+
+def _evaluaciones_de_opcion(connection, target):
+    historial = inspect(target).attrs.pregunta_id.history
+    preguntas = {target.pregunta_id, *historial.deleted} - {None}
+    return connection.execute(
+        select(Pregunta.evaluacion_id).where(Pregunta.id.in_(preguntas))
+    ).scalars()
+
+
+@event.listens_for(Pregunta, "after_insert")
+@event.listens_for(Pregunta, "after_delete")
+def _pregunta_creada_o_eliminada(mapper, connection, target):
+    _anotar(target, *_evaluaciones_de_pregunta(target))
+
+
+@event.listens_for(Pregunta, "after_update")
+def _pregunta_actualizada(mapper, connection, target):
+    if _cambio_relevante(target, CAMPOS_PREGUNTA):
+        _anotar(target, *_evaluaciones_de_pregunta(target))
+
+
+@event.listens_for(OpcionRespuesta, "after_insert")
+@event.listens_for(OpcionRespuesta, "after_delete")
+def _opcion_creada_o_eliminada(mapper, connection, target):
+    _anotar(target, *_evaluaciones_de_opcion(connection, target))
+
+
+@event.listens_for(OpcionRespuesta, "after_update")
+def _opcion_actualizada(mapper, connection, target):
+    if _cambio_relevante(target, CAMPOS_OPCION):
+        _anotar(target, *_evaluaciones_de_opcion(connection, target))
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidar_tras_commit(sesion):
+    for evaluacion_id in sesion.info.pop(CLAVE_SESION, ()):
+        invalidar_clave(evaluacion_id)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _descartar_tras_rollback(sesion, transaccion_previa):
+    sesion.info.pop(CLAVE_SESION, None)
@@ -0,0 +1,286 @@
+# backend/app/services/extraccion_texto_service.py
+# Extracción de texto de archivos cargados como flujo por páginas.
+#
+# Concatenar el texto de todo el documento (`texto += page.get_text()`) copia la
+# cadena completa en cada página y mantiene el libro entero en memoria: un PDF de
+# 600 páginas puede superar el límite de memoria del worker de Celery. Aquí:
+#   1. El documento se recorre página a página (PDF) o en bloques de bytes (TXT);
+#      cada página se convierte en una fila `FragmentoArchivo`.
+#   2. Los fragmentos se insertan en lotes (un INSERT executemany por lote) y cada
+#      lote se confirma junto con el progreso (`paginas_procesadas`), visible para
+#      otras sesiones mientras la extracción avanza.
+#   3. La memoria máxima es un lote de páginas, sin importar el tamaño del archivo.
+#
+# Si la tarea se reintenta tras un fallo, un PDF continúa desde la primera página
+# que falte (los rangos en paralelo se confirman en cualquier orden, así que
+# `paginas_procesadas` no indica hasta dónde llegan las páginas contiguas); un TXT
+# se vuelve a extraer desde el principio.
+#
+# Los PDF con al menos DOCUMENTOS_UMBRAL_PAGINAS_PARALELO páginas se dividen en
+# rangos de DOCUMENTOS_PAGINAS_POR_RANGO que se extraen en paralelo, cada uno
+# abriendo el archivo por su cuenta:
+#   - "celery": un chord de subtareas `extraer_rango_paginas` (cada una escribe
+#     sus páginas) y un callback que cierra la extracción.
+#   - "procesos": un ProcessPoolExecutor local; las páginas vuelven en orden y se
+#     escriben como en la extracción secuencial.
+import codecs
+import math
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from itertools import islice
+
+import fitz  # PyMuPDF
+from flask import current_app
+from sqlalchemy import delete, exists, func, insert, select, update
+from sqlalchemy.orm import aliased
+
+from app.extensions import db
+from app.models.archivo_cargado import ArchivoCargado
+from app.models.fragmento_archivo import FragmentoArchivo
+from app.models.indexacion import indexar_fragmentos
+from app.services.almacen_archivos_service import propagar_texto
+from app.utils.metrics import metricas
+
+PREFIJO_METRICAS = "extraccion_texto."
+
+
+def _limpiar(texto):
+    # PostgreSQL no admite el carácter NUL en columnas de texto
+    return texto.replace("\x00", "")
+
+
+def paginas_pdf(ruta, inicio=0, fin=None):
+    """Genera `(pagina, texto)` de las páginas [inicio, fin) de un PDF."""
+    with fitz.open(ruta) as documento:
+        fin = documento.page_count if fin is None else min(fin, documento.page_count)
+        for numero in range(inicio, fin):
+            pagina = documento.load_page(numero)
+            yield numero + 1, _limpiar(pagina.get_text())
+
+
+def bloques_texto(ruta, tamano):
+    """Genera `(None, texto)` de un archivo UTF-8 leído en bloques de `tamano` bytes."""
+    decodificador = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    with open(ruta, "rb") as archivo:
+        while True:
+            crudo = archivo.read(tamano)
+            final = len(crudo) < tamano
+            # Un carácter partido entre bloques se completa en el siguiente
+            texto = decodificador.decode(crudo, final=final)
+            if texto or not final:
+                yield None, _limpiar(texto)
+            if final:
+                return
+
+
+def _extraer_rango(ruta, inicio, fin):
+    # Se ejecuta en un proceso hijo: abre el PDF por su cuenta
+    return list(paginas_pdf(ruta, inicio, fin))
+
+
+def rangos_paginas(inicio, fin, por_rango):
+    """Divide las páginas [inicio, fin) en rangos consecutivos de `por_rango`."""
+    return [(a, min(a + por_rango, fin)) for a in range(inicio, fin, por_rango)]
+
+
+def paginas_pdf_paralelo(ruta, inicio, fin, procesos, por_rango):
+    """
+    Como `paginas_pdf`, pero cada rango de páginas se extrae en un proceso del
+    pool. Las páginas se entregan en orden y solo hay `2 * procesos` rangos en
+    vuelo, así que la memoria sigue acotada.
+    """
+    rangos = iter(rangos_paginas(inicio, fin, por_rango))
+    with ProcessPoolExecutor(max_workers=procesos) as pool:
+        en_vuelo = deque(
+            pool.submit(_extraer_rango, ruta, *rango)
+            for rango in islice(rangos, 2 * procesos)
+        )
+        while en_vuelo:
+            paginas = en_vuelo.popleft().result()
+            rango = next(rangos, None)
+            if rango is not None:
+                en_vuelo.append(pool.submit(_extraer_rango, ruta, *rango))
+            yield from paginas
+
+
+def total_paginas(archivo):
+    """Páginas (PDF) o bloques (TXT) que tendrá la extracción del archivo."""
+    if archivo.tipo_mime == "application/pdf":
+        with fitz.open(archivo.ruta_almacenamiento) as documento:
+            return documento.page_count
+    if archivo.tipo_mime == "text/plain":
+        tamano = current_app.config.get("DOCUMENTOS_TAMANO_BLOQUE_TEXTO", 64 * 1024)
+        return max(math.ceil(os.path.getsize(archivo.ruta_almacenamiento) / tamano), 1)
+    raise ValueError(f"Tipo de archivo no soportado: {archivo.tipo_mime}")
+
+
+def debe_dividirse(archivo, total):
+    """Si el archivo es lo bastante grande para extraerse por rangos en paralelo."""
+    umbral = current_app.config.get("DOCUMENTOS_UMBRAL_PAGINAS_PARALELO", 200)
+    return archivo.tipo_mime == "application/pdf" and total >= umbral
+
+
+def _generador(archivo, total, inicio, procesos):
+    ruta = archivo.ruta_almacenamiento
+    if archivo.tipo_mime == "text/plain":
+        tamano = current_app.config.get("DOCUMENTOS_TAMANO_BLOQUE_TEXTO", 64 * 1024)
+        return bloques_texto(ruta, tamano)
+    if procesos and procesos > 1 and debe_dividirse(archivo, total - inicio):
+        por_rango = current_app.config.get("DOCUMENTOS_PAGINAS_POR_RANGO", 50)
+        return paginas_pdf_paralelo(ruta, inicio, total, procesos, por_rango)
+    return paginas_pdf(ruta, inicio)
+
+
+def _fila(archivo_id, indice, pagina, texto):
+    return {
+        "archivo_id": archivo_id,
+        "indice": indice,
+        "pagina": pagina,
+        "texto": texto,
+    }
+
+
+def _confirmar_lote(archivo_id, lote, procesadas=None):
+    if lote:
+        db.session.execute(insert(FragmentoArchivo), lote)
+        # El lote queda buscable en la misma transacción que lo confirma
+        indexar_fragmentos(
+            db.session, archivo_id, lote[0]["indice"], lote[-1]["indice"] + 1
+        )
+    # Sin `procesadas` (rangos en paralelo) el progreso se suma de forma atómica
+    progreso = (
+        ArchivoCargado.paginas_procesadas + len(lote)
+        if procesadas is None
+        else procesadas
+    )
+    db.session.execute(
+        update(ArchivoCargado)
+        .where(ArchivoCargado.id == archivo_id)
+        .values(paginas_procesadas=progreso, fecha_progreso=datetime.utcnow())
+    )
+    db.session.commit()
+    metricas.incrementar(PREFIJO_METRICAS + "fragmentos", len(lote))
+
+
+def paginas_contiguas(archivo_id):
+    """Número de fragmentos confirmados sin huecos desde el índice 0."""
+    fragmento = FragmentoArchivo
+    if not db.session.execute(
+        select(
+            exists().where(fragmento.archivo_id == archivo_id, fragmento.indice == 0)
+        )
+    ).scalar():
+        return 0
+    siguiente = aliased(FragmentoArchivo)
+    # El primer fragmento cuyo sucesor falta marca el final del tramo contiguo
+    return db.session.execute(
+        select(func.min(fragmento.indice + 1)).where(
+            fragmento.archivo_id == archivo_id,
+            ~exists().where(
+                siguiente.archivo_id == archivo_id,
+                siguiente.indice == fragmento.indice + 1,
+            ),
+        )
+    ).scalar()
+
+
+def iniciar_extraccion(archivo, total, inicio=0):
+    """
+    Marca el archivo como en proceso y descarta los fragmentos desde `inicio` (los
+    anteriores ya están confirmados si se reanuda).
+    """
+    db.session.execute(
+        delete(FragmentoArchivo).where(
+            FragmentoArchivo.archivo_id == archivo.id,
+            FragmentoArchivo.indice >= inicio,
+        )
+    )
+    indexar_fragmentos(db.session, archivo.id, inicio)
+    archivo.estado_procesamiento_texto = "procesando"
+    archivo.fecha_progreso = datetime.utcnow()
+    archivo.paginas_totales = total
+    archivo.paginas_procesadas = inicio
+    archivo.texto_extraido = None
+    archivo.mensaje_error = None
+    db.session.commit()
+
+
+def finalizar_extraccion(archivo_id, fragmentos=None):
+    """Marca el archivo como procesado. Devuelve su número de fragmentos."""
+    if fragmentos is None:
+        fragmentos = (
+            db.session.query(FragmentoArchivo)
+            .filter(FragmentoArchivo.archivo_id == archivo_id)
+            .count()
+        )
+    archivo = db.session.get(ArchivoCargado, archivo_id)
+    archivo.paginas_totales = fragmentos
+    archivo.paginas_procesadas = fragmentos
+    archivo.estado_procesamiento_texto = "procesado"
+    archivo.fecha_procesamiento = datetime.utcnow()
+    db.session.commit()
+    # Las subidas del mismo contenido que esperaban esta extracción
+    propagar_texto(archivo_id)
+    metricas.incrementar(PREFIJO_METRICAS + "archivos")
+    return fragmentos
+
+
+def extraer_fragmentos(archivo, procesos=None):
+    """
+    Extrae el texto del archivo a `fragmentos_archivo` en lotes, registrando el
+    progreso. Con `procesos` > 1, los PDF grandes se extraen por rangos de páginas
+    en un pool de procesos local. Devuelve el número de fragmentos del archivo.
+    """
+    por_lote = current_app.config.get("DOCUMENTOS_FRAGMENTOS_POR_LOTE", 50)
+    archivo_id = archivo.id
+    total = total_paginas(archivo)
+    reanudar = (
+        archivo.tipo_mime == "application/pdf"
+        and archivo.estado_procesamiento_texto == "procesando"
+    )
+    inicio = paginas_contiguas(archivo_id) if reanudar else 0
+    iniciar_extraccion(archivo, total, inicio)
+
+    indice, lote = inicio, []
+    for pagina, texto in _generador(archivo, total, inicio, procesos):
+        lote.append(_fila(archivo_id, indice, pagina, texto))
+        indice += 1
+        if len(lote) >= por_lote:
+            _confirmar_lote(archivo_id, lote, indice)
+            lote = []
+            # Libera las páginas que MuPDF conserva en su caché interna
+            fitz.TOOLS.store_shrink(100)
+    _confirmar_lote(archivo_id, lote, indice)
+    return finalizar_extraccion(archivo_id, indice)
+
+
+def extraer_rango(archivo_id, inicio, fin):
+    """
+    Extrae y guarda las páginas [inicio, fin) de un PDF; lo usa cada subtarea de
+    la extracción en paralelo con Celery. El índice de cada fragmento es su número
+    de página, así que los rangos pueden terminar en cualquier orden. Devuelve el
+    número de páginas escritas.
+    """
+    por_lote = current_app.config.get("DOCUMENTOS_FRAGMENTOS_POR_LOTE", 50)
+    ruta = db.session.get(ArchivoCargado, archivo_id).ruta_almacenamiento
+    # Un reintento de la subtarea reemplaza lo que hubiera escrito antes
+    db.session.execute(
+        delete(FragmentoArchivo).where(
+            FragmentoArchivo.archivo_id == archivo_id,
+            FragmentoArchivo.indice >= inicio,
+            FragmentoArchivo.indice < fin,
+        )
+    )
+    indexar_fragmentos(db.session, archivo_id, inicio, fin)
+    escritas, lote = 0, []
+    for pagina, texto in paginas_pdf(ruta, inicio, fin):
+        lote.append(_fila(archivo_id, pagina - 1, pagina, texto))
+        if len(lote) >= por_lote:
+            escritas += len(lote)
+            _confirmar_lote(archivo_id, lote)
+            lote = []
+    escritas += len(lote)
+    _confirmar_lote(archivo_id, lote)
+    return escritas
@@ -0,0 +1,266 @@
+# backend/app/services/hashing_service.py
+# Servicio de hashing de contraseñas con bcrypt fuera del worker HTTP.
+#
+# bcrypt es deliberadamente costoso en CPU. Ejecutarlo dentro del worker de gunicorn
+# bloquea al resto de endpoints durante picos de login (p. ej. toda una escuela a
+# las 8:00). Este servicio lo delega a un pool de procesos acotado y limita la cola:
+# cuando está llena se rechaza la petición con 503 y Retry-After en lugar de apilar
+# trabajo que el cliente ya habrá abandonado.
+#
+# El límite de hashes en curso (HASHING_POOL_PROCESOS + HASHING_MAX_EN_COLA) es por
+# máquina, compartido por todos los workers de gunicorn en el conjunto ordenado de
+# Redis `hashing:en_curso:<host>` (un ticket por hash, con su hora de inicio; los
+# tickets más viejos que 2 × HASHING_TIMEOUT se descartan por si un worker murió
+# sin liberarlos). Un semáforo local aplica el mismo límite por worker si Redis no
+# está disponible.
+#
+# Para que el pool libere al worker mientras bcrypt corre, gunicorn debe usar
+# workers con hilos (`--worker-class gthread`, ver Dockerfile): con workers sync
+# cada worker atiende una sola petición, la espera ocurre en la cola del socket y
+# ningún límite dentro de la app llega a llenarse.
+import hmac
+import math
+import os
+import socket
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FuturoTimeoutError
+from itertools import repeat
+
+import bcrypt as _bcrypt
+from redis.exceptions import RedisError
+
+from app.extensions import redis_client
+from app.utils.metrics import metricas
+
+PREFIJO_METRICAS = "hashing."
+PREFIJO_REDIS = "hashing:en_curso:"
+# bcrypt solo utiliza los primeros 72 bytes de la contraseña
+LONGITUD_MAXIMA_BYTES = 72
+
+
+class HashingSaturadoError(Exception):
+    """La cola del pool de hashing está llena; el cliente debe reintentar."""
+
+    def __init__(self, retry_after):
+        super().__init__("Servicio de autenticación saturado, intente más tarde.")
+        self.retry_after = retry_after
+
+
+def _a_bytes(password):
+    if isinstance(password, str):
+        password = password.encode("utf-8")
+    return password[:LONGITUD_MAXIMA_BYTES]
+
+
+def _generar_hash(password, rondas):
+    """Se ejecuta en el proceso del pool: debe ser una función de módulo."""
+    return _bcrypt.hashpw(_a_bytes(password), _bcrypt.gensalt(rondas)).decode("utf-8")
+
+
+def _verificar_hash(hashed_password, password):
+    """Se ejecuta en el proceso del pool: debe ser una función de módulo."""
+    hashed_password = hashed_password.encode("utf-8")
+    return hmac.compare_digest(
+        _bcrypt.hashpw(_a_bytes(password), hashed_password), hashed_password
+    )
+
+
+def rondas_de_hash(hashed_password):
+    """Costo con el que se generó un hash bcrypt (`$2b$<rondas>$...`)."""
+    try:
+        return int(hashed_password.split("$")[2])
+    except (AttributeError, IndexError, ValueError):
+        return None
+
+
+def calibrar_rondas(objetivo_ms, minimo=10, maximo=15):
+    """
+    Elige el mayor costo de bcrypt cuyo tiempo estimado no supere `objetivo_ms`.
+
+    Mide una sola vez con el costo mínimo; cada ronda adicional duplica el tiempo.
+    """
+    inicio = time.perf_counter()
+    _generar_hash("calibracion", minimo)
+    base_ms = (time.perf_counter() - inicio) * 1000
+    rondas = minimo
+    while rondas < maximo and base_ms * 2 ** (rondas + 1 - minimo) <= objetivo_ms:
+        rondas += 1
+    return rondas, base_ms * 2 ** (rondas - minimo)
+
+
+class ServicioHashing:
+    def __init__(self):
+        self.rondas = 12
+        self.num_procesos = 2
+        self.max_en_cola = 32
+        self.timeout = 10.0
+        self._ms_promedio = 250.0
+        self._pool = None
+        self._pid = None
+        self._cupos = threading.BoundedSemaphore(self.num_procesos + self.max_en_cola)
+        self._lock = threading.Lock()
+        self._clave_compartida = PREFIJO_REDIS + socket.gethostname()
+
+    @property
+    def cupos(self):
+        """Hashes en curso (en el pool o esperando) permitidos en la máquina."""
+        return self.num_procesos + self.max_en_cola
+
+    def init_app(self, app):
+        self.configurar(
+            rondas=app.config.get("BCRYPT_LOG_ROUNDS", 12),
+            num_procesos=app.config.get("HASHING_POOL_PROCESOS", 2),
+            max_en_cola=app.config.get("HASHING_MAX_EN_COLA", 32),
+        )
+        self.timeout = app.config.get("HASHING_TIMEOUT", 10.0)
+
+        if app.config.get("HASHING_CALIBRAR", False):
+            self.rondas, self._ms_promedio = calibrar_rondas(
+                app.config.get("HASHING_OBJETIVO_MS", 250),
+                minimo=app.config.get("BCRYPT_MIN_LOG_ROUNDS", 10),
+            )
+            app.config["BCRYPT_LOG_ROUNDS"] = self.rondas
+            print(
+                f"INFO: bcrypt calibrado a {self.rondas} rondas "
+                f"(~{self._ms_promedio:.0f} ms por hash)"
+            )
+
+    def configurar(self, rondas, num_procesos, max_en_cola):
+        """Ajusta el costo, el tamaño del pool y el límite de tareas pendientes."""
+        self.rondas = rondas
+        self.num_procesos = num_procesos
+        self.max_en_cola = max_en_cola
+        self._cupos = threading.BoundedSemaphore(self.cupos)
+
+    # --- API pública ---
+
+    def generar_hash(self, password):
+        return self._ejecutar(_generar_hash, password, self.rondas)
+
+    def verificar(self, hashed_password, password):
+        if not hashed_password:
+            return False
+        return self._ejecutar(_verificar_hash, hashed_password, password)
+
+    def generar_hashes(self, passwords, rondas=None, ejecutor=None):
+        """
+        Hashea un lote completo de contraseñas (importaciones masivas).
+
+        Usa el `ejecutor` indicado (p. ej. un ProcessPoolExecutor con todos los
+        núcleos, propio del comando) en lugar del pool acotado de los workers HTTP.
+        """
+        rondas = rondas or self.rondas
+        if ejecutor is None:
+            return [_generar_hash(password, rondas) for password in passwords]
+        trozo = max(1, len(passwords) // (4 * (os.cpu_count() or 1)))
+        return list(
+            ejecutor.map(_generar_hash, passwords, repeat(rondas), chunksize=trozo)
+        )
+
+    def necesita_rehash(self, hashed_password):
+        """Indica si el hash se generó con un costo menor al configurado."""
+        rondas = rondas_de_hash(hashed_password)
+        return rondas is not None and rondas < self.rondas
+
+    def estadisticas(self):
+        datos = metricas.snapshot(PREFIJO_METRICAS)
+        datos[PREFIJO_METRICAS + "rondas"] = self.rondas
+        datos[PREFIJO_METRICAS + "ms_promedio"] = round(self._ms_promedio, 1)
+        return datos
+
+    # --- Ejecución ---
+
+    def _ejecutar(self, funcion, *args):
+        if self.num_procesos <= 0:
+            # Modo en línea (pruebas o despliegues sin pool)
+            return self._medir(funcion, *args)
+
+        if not self._cupos.acquire(blocking=False):
+            metricas.incrementar(PREFIJO_METRICAS + "rechazos")
+            raise HashingSaturadoError(self._estimar_espera())
+        try:
+            ticket = self._reservar_cupo_compartido()
+            try:
+                metricas.incrementar(PREFIJO_METRICAS + "tareas")
+                inicio = time.perf_counter()
+                futuro = self._obtener_pool().submit(funcion, *args)
+                try:
+                    resultado = futuro.result(timeout=self.timeout)
+                except FuturoTimeoutError:
+                    # El pool no dio abasto a tiempo: se trata como saturación y
+                    # los cupos se liberan en los finally
+                    futuro.cancel()
+                    metricas.incrementar(PREFIJO_METRICAS + "timeouts")
+                    raise HashingSaturadoError(self._estimar_espera()) from None
+                self._registrar_duracion(time.perf_counter() - inicio)
+                return resultado
+            finally:
+                self._liberar_cupo_compartido(ticket)
+        finally:
+            self._cupos.release()
+
+    def _reservar_cupo_compartido(self):
+        """
+        Registra un hash en curso en el límite de la máquina. Devuelve el ticket, o
+        None si Redis no responde (queda solo el límite local). Lanza
+        HashingSaturadoError si el límite está lleno.
+        """
+        ticket = uuid.uuid4().hex
+        ahora = time.time()
+        try:
+            pipe = redis_client.pipeline()
+            pipe.zremrangebyscore(
+                self._clave_compartida, "-inf", ahora - 2 * self.timeout
+            )
+            pipe.zadd(self._clave_compartida, {ticket: ahora})
+            pipe.zcard(self._clave_compartida)
+            pipe.expire(self._clave_compartida, max(1, math.ceil(2 * self.timeout)))
+            en_curso = pipe.execute()[2]
+        except RedisError:
+            metricas.incrementar(PREFIJO_METRICAS + "errores_redis")
+            return None
+        if en_curso > self.cupos:
+            self._liberar_cupo_compartido(ticket)
+            metricas.incrementar(PREFIJO_METRICAS + "rechazos")
+            raise HashingSaturadoError(self._estimar_espera())
+        return ticket
+
+    def _liberar_cupo_compartido(self, ticket):
+        if ticket is None:
+            return
+        try:
+            redis_client.zrem(self._clave_compartida, ticket)
+        except RedisError:
+            # El ticket se descarta solo al superar 2 × HASHING_TIMEOUT
+            metricas.incrementar(PREFIJO_METRICAS + "errores_redis")
+
+    def _medir(self, funcion, *args):
+        inicio = time.perf_counter()
+        resultado = funcion(*args)
+        self._registrar_duracion(time.perf_counter() - inicio)
+        return resultado
+
+    def _registrar_duracion(self, segundos):
+        # Media móvil exponencial, usada para estimar el Retry-After
+        self._ms_promedio = 0.9 * self._ms_promedio + 0.1 * segundos * 1000
+
+    def _estimar_espera(self):
+        pendientes = self.cupos
+        segundos = pendientes * self._ms_promedio / 1000 / max(self.num_procesos, 1)
+        return max(1, math.ceil(segundos))
+
+    def _obtener_pool(self):
+        # Un pool por proceso: tras el fork de gunicorn no se hereda el del maestro
+        if self._pid != os.getpid():
+            with self._lock:
+                if self._pid != os.getpid():
+                    self._pool = ProcessPoolExecutor(max_workers=self.num_procesos)
+                    self._pid = os.getpid()
+        return self._pool
+
+
+# Instancia única por proceso
+servicio_hashing = ServicioHashing()
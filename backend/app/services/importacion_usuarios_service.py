@@ -0,0 +1,266 @@
+# backend/app/services/importacion_usuarios_service.py
+# Importación masiva de usuarios desde CSV (alta de una escuela completa).
+#
+# El CSV se lee en streaming y se procesa por lotes. Para cada lote:
+#   1. Se validan las filas (campos obligatorios, correo, rol, contraseña) y se
+#      descartan los correos repetidos dentro del propio archivo.
+#   2. Se consultan en una sola sentencia los correos que ya existen en la BD.
+#   3. Se hashean las contraseñas en paralelo con todos los núcleos, con el costo
+#      configurado salvo que se pida uno reducido.
+#   4. Se inserta el lote completo: COPY en PostgreSQL, inserción masiva de
+#      SQLAlchemy en el resto. Cada lote se confirma por separado.
+#
+# Las filas rechazadas se escriben en un CSV de errores (línea, correo, motivo).
+import csv
+import io
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime
+
+from marshmallow import ValidationError
+from sqlalchemy import func, insert, select
+from sqlalchemy.exc import IntegrityError
+
+from app.extensions import db
+from app.models.usuario import Usuario
+from app.schemas.validators import validate_email, validate_password
+from app.services.hashing_service import servicio_hashing
+
+ROLES_VALIDOS = ("estudiante", "alumno", "docente", "admin")
+COLUMNAS_OBLIGATORIAS = ("nombre_completo", "correo_electronico", "password")
+# Columnas que se escriben en cada inserción (COPY requiere valores explícitos)
+COLUMNAS_INSERCION = (
+    "nombre_completo",
+    "correo_electronico",
+    "hashed_password",
+    "rol",
+    "activo",
+    "token_version",
+    "fecha_creacion",
+    "fecha_actualizacion",
+    "fecha_nacimiento",
+)
+
+
+class ResumenImportacion:
+    def __init__(self):
+        self.leidas = 0
+        self.creadas = 0
+        self.errores = 0
+        self.inicio = time.perf_counter()
+
+    @property
+    def segundos(self):
+        return time.perf_counter() - self.inicio
+
+    @property
+    def filas_por_segundo(self):
+        return self.leidas / self.segundos if self.segundos else 0.0
+
+
+class ImportadorUsuarios:
+    """
+    Importa usuarios desde un CSV con las columnas `nombre_completo`,
+    `correo_electronico`, `password` y, opcionalmente, `rol` y `fecha_nacimiento`.
+    """
+
+    def __init__(
+        self,
+        tamano_lote=1000,
+        procesos=None,
+        rondas=None,
+        rol_por_defecto="estudiante",
+        usar_copy=None,
+        progreso=None,
+    ):
+        self.tamano_lote = tamano_lote
+        self.procesos = procesos if procesos is not None else os.cpu_count() or 1
+        self.rondas = rondas
+        self.rol_por_defecto = rol_por_defecto
+        # None: COPY solo si el motor es PostgreSQL
+        self.usar_copy = usar_copy
+        self.progreso = progreso
+        self._escritor_errores = None
+
+    # --- API pública ---
+
+    def importar(self, archivo, archivo_errores=None):
+        """
+        Importa el CSV abierto en `archivo`. Si se indica `archivo_errores` (abierto
+        para escritura), se registra en él cada fila rechazada.
+        """
+        if archivo_errores is not None:
+            self._escritor_errores = csv.writer(archivo_errores)
+            self._escritor_errores.writerow(["linea", "correo_electronico", "error"])
+
+        if self.usar_copy is None:
+            self.usar_copy = db.engine.dialect.name == "postgresql"
+
+        resumen = ResumenImportacion()
+        lector = csv.DictReader(archivo)
+        columnas = lector.fieldnames or []
+        faltantes = [c for c in COLUMNAS_OBLIGATORIAS if c not in columnas]
+        if faltantes:
+            raise ValueError(f"Faltan columnas en el CSV: {', '.join(faltantes)}")
+
+        vistos = set()
+        ejecutor = ProcessPoolExecutor(self.procesos) if self.procesos > 1 else None
+        try:
+            lote = []
+            # La línea 1 es la cabecera
+            for linea, fila in enumerate(lector, start=2):
+                resumen.leidas += 1
+                registro = self._validar(linea, fila, vistos, resumen)
+                if registro is not None:
+                    lote.append(registro)
+                if len(lote) >= self.tamano_lote:
+                    self._procesar_lote(lote, ejecutor, resumen)
+                    lote = []
+            if lote:
+                self._procesar_lote(lote, ejecutor, resumen)
+        finally:
+            if ejecutor is not None:
+                ejecutor.shutdown()
+        return resumen
+
+    # --- Validación ---
+
+    def _validar(self, linea, fila, vistos, resumen):
+        correo = (fila.get("correo_electronico") or "").strip()
+        try:
+            for columna in COLUMNAS_OBLIGATORIAS:
+                if not (fila.get(columna) or "").strip():
+                    raise ValidationError(f"El campo '{columna}' es obligatorio")
+            validate_email(correo)
+            validate_password(fila["password"])
+            rol = (fila.get("rol") or "").strip() or self.rol_por_defecto
+            if rol not in ROLES_VALIDOS:
+                raise ValidationError(f"Rol inválido: '{rol}'")
+            fecha_nacimiento = None
+            if (fila.get("fecha_nacimiento") or "").strip():
+                try:
+                    fecha_nacimiento = date.fromisoformat(
+                        fila["fecha_nacimiento"].strip()
+                    )
+                except ValueError:
+                    raise ValidationError("Formato de fecha_nacimiento inválido")
+            if correo.lower() in vistos:
+                raise ValidationError("Correo electrónico repetido en el archivo")
+        except ValidationError as error:
+            self._registrar_error(linea, correo, error.messages[0], resumen)
+            return None
+
+        vistos.add(correo.lower())
+        return {
+            "linea": linea,
+            "nombre_completo": fila["nombre_completo"].strip(),
+            "correo_electronico": correo,
+            "password": fila["password"],
+            "rol": rol,
+            "fecha_nacimiento": fecha_nacimiento,
+        }
+
+    def _registrar_error(self, linea, correo, mensaje, resumen):
+        resumen.errores += 1
+        if self._escritor_errores is not None:
+            self._escritor_errores.writerow([linea, correo, mensaje])
+
+    # --- Lotes ---
+
+    def _procesar_lote(self, lote, ejecutor, resumen):
+        # Sin distinguir mayúsculas, igual que la detección de repetidos del archivo
+        correos = [registro["correo_electronico"].lower() for registro in lote]
+        existentes = set(
+            db.session.execute(
+                select(func.lower(Usuario.correo_electronico)).where(
+                    func.lower(Usuario.correo_electronico).in_(correos)
+                )
+            ).scalars()
+        )
+        nuevos = []
+        for registro in lote:
+            if registro["correo_electronico"].lower() in existentes:
+                self._registrar_error(
+                    registro["linea"],
+                    registro["correo_electronico"],
+                    "El correo electrónico ya está registrado",
+                    resumen,
+                )
+            else:
+                nuevos.append(registro)
+
+        if nuevos:
+            hashes = servicio_hashing.generar_hashes(
+                [registro["password"] for registro in nuevos],
+                rondas=self.rondas,
+                ejecutor=ejecutor,
+            )
+            ahora = datetime.utcnow()
+            filas = [
+                {
+                    "nombre_completo": registro["nombre_completo"],
+                    "correo_electronico": registro["correo_electronico"],
+                    "hashed_password": hashed,
+                    "rol": registro["rol"],
+                    "activo": True,
+                    "token_version": 0,
+                    "fecha_creacion": ahora,
+                    "fecha_actualizacion": ahora,
+                    "fecha_nacimiento": registro["fecha_nacimiento"],
+                }
+                for registro, hashed in zip(nuevos, hashes)
+            ]
+            try:
+                self._insertar(filas)
+                db.session.commit()
+                resumen.creadas += len(filas)
+            except IntegrityError:
+                # Otro proceso registró alguno de los correos entre la consulta y la
+                # inserción: se reintenta fila a fila para aislar los conflictos
+                db.session.rollback()
+                self._insertar_fila_a_fila(nuevos, filas, resumen)
+
+        if self.progreso is not None:
+            self.progreso(resumen)
+
+    def _insertar(self, filas):
+        if self.usar_copy:
+            self._insertar_con_copy(filas)
+        else:
+            db.session.execute(insert(Usuario), filas)
+
+    def _insertar_con_copy(self, filas):
+        buffer = io.StringIO()
+        escritor = csv.writer(buffer)
+        for fila in filas:
+            escritor.writerow(
+                [
+                    "" if fila[columna] is None else fila[columna]
+                    for columna in COLUMNAS_INSERCION
+                ]
+            )
+        buffer.seek(0)
+        # Conexión DBAPI (psycopg2) de la transacción actual de la sesión
+        conexion = db.session.connection().connection
+        with conexion.cursor() as cursor:
+            cursor.copy_expert(
+                f"COPY {Usuario.__tablename__} ({', '.join(COLUMNAS_INSERCION)}) "
+                "FROM STDIN WITH (FORMAT csv)",
+                buffer,
+            )
+
+    def _insertar_fila_a_fila(self, registros, filas, resumen):
+        for registro, fila in zip(registros, filas):
+            try:
+                db.session.execute(insert(Usuario), [fila])
+                db.session.commit()
+                resumen.creadas += 1
+            except IntegrityError:
+                db.session.rollback()
+                self._registrar_error(
+                    registro["linea"],
+                    registro["correo_electronico"],
+                    "El correo electrónico ya está registrado",
+                    resumen,
+                )
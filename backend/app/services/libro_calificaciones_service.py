@@ -0,0 +1,326 @@
+# backend/app/services/libro_calificaciones_service.py
+# Libro de calificaciones de una clase: matriz estudiantes × evaluaciones.
+#
+# Cada celda es el mejor intento del estudiante en la evaluación, en porcentaje,
+# y si alcanza `Evaluacion.calificacion_aprobatoria`. En lugar de recorrer
+# `Respuesta.to_dict()` (40 estudiantes × 30 evaluaciones × 40 preguntas), se
+# resuelve con:
+#   1. Dos consultas pequeñas para los ejes (inscritos y evaluaciones de la clase).
+#   2. Una única consulta agregada sobre `respuestas`: puntos por intento, el mejor
+#      por (estudiante, evaluación), y el puntaje total de cada evaluación.
+#   3. Pivote a una matriz densa de NumPy (NaN = sin intentos) y estadísticas por
+#      fila y columna vectorizadas.
+#
+# El resultado se cachea (LRU por worker + Redis) bajo la versión de
+# calificaciones de la clase (`EstadisticaClase.version_calificaciones`), que se
+# incrementa en la misma transacción que cualquier cambio que altere el libro
+# (ver models/estadisticas.py). Una versión nueva deja de leer las entradas viejas.
+import csv
+import io
+import json
+
+import numpy as np
+from flask import current_app
+from redis.exceptions import RedisError
+from sqlalchemy import func, select
+
+from app.extensions import db, redis_client
+from app.models.clase import Clase
+from app.models.estadistica_clase import EstadisticaClase
+from app.models.estadisticas import recalcular_estadisticas
+from app.models.evaluacion import Evaluacion
+from app.models.inscripcion_clase import InscripcionClase
+from app.models.leccion import Leccion
+from app.models.modulo import Modulo
+from app.models.pregunta import Pregunta
+from app.models.respuesta import Respuesta
+from app.models.usuario import Usuario
+from app.utils.cache import LRUConTTL
+from app.utils.metrics import metricas
+
+PREFIJO_REDIS = "libro_calificaciones:"
+PREFIJO_METRICAS = "libro_calificaciones."
+# Misma calificación aprobatoria por defecto que calificacion_service.py
+APROBATORIA_POR_DEFECTO = 70.0
+
+_lru = LRUConTTL(max_entradas=128, ttl=300.0)
+
+
+def init_app(app):
+    """Configura tamaño y TTL de la caché a partir de la configuración de la app."""
+    _lru.max_entradas = app.config.get("LIBRO_CALIFICACIONES_CACHE_MAX_ENTRADAS", 128)
+    _lru.ttl = app.config.get("LIBRO_CALIFICACIONES_TTL_LOCAL", 300)
+    _lru.limpiar()
+
+
+def _version(clase_id):
+    """Versión de calificaciones de la clase, o None si la clase no existe."""
+    fila = db.session.execute(
+        select(Clase.id, EstadisticaClase.version_calificaciones)
+        .outerjoin(EstadisticaClase, EstadisticaClase.clase_id == Clase.id)
+        .where(Clase.id == clase_id)
+    ).first()
+    if fila is None:
+        return None
+    if fila.version_calificaciones is None:
+        # Clase anterior a la tabla de estadísticas
+        recalcular_estadisticas([clase_id])
+        return 0
+    return fila.version_calificaciones
+
+
+# --- Consultas ---
+
+
+def _estudiantes(clase_id):
+    return db.session.execute(
+        select(Usuario.id, Usuario.nombre_completo)
+        .join(InscripcionClase, InscripcionClase.estudiante_id == Usuario.id)
+        .where(InscripcionClase.clase_id == clase_id)
+        .order_by(Usuario.nombre_completo, Usuario.id)
+    ).all()
+
+
+def _evaluaciones(clase_id):
+    filas = db.session.execute(
+        select(Evaluacion.id, Evaluacion.titulo, Evaluacion.calificacion_aprobatoria)
+        .join(Leccion, Leccion.evaluacion_id == Evaluacion.id)
+        .join(Modulo, Modulo.id == Leccion.modulo_id)
+        .where(Modulo.clase_id == clase_id)
+        .order_by(Modulo.orden, Leccion.orden, Evaluacion.id)
+    ).all()
+    # Una evaluación usada en varias lecciones aparece una sola vez
+    vistas = set()
+    return [f for f in filas if not (f.id in vistas or vistas.add(f.id))]
+
+
+def _mejores_intentos(clase_id):
+    """(estudiante_id, evaluacion_id, mejor puntaje, intentos, puntaje total)."""
+    estudiante_ids = select(InscripcionClase.estudiante_id).where(
+        InscripcionClase.clase_id == clase_id
+    )
+    evaluacion_ids = (
+        select(Leccion.evaluacion_id)
+        .join(Modulo, Modulo.id == Leccion.modulo_id)
+        .where(Modulo.clase_id == clase_id)
+    )
+    intentos = (
+        select(
+            Respuesta.estudiante_id,
+            Respuesta.evaluacion_id,
+            func.coalesce(func.sum(Respuesta.calificacion), 0.0).label("obtenido"),
+        )
+        .where(
+            Respuesta.evaluacion_id.in_(evaluacion_ids),
+            Respuesta.estudiante_id.in_(estudiante_ids),
+        )
+        .group_by(
+            Respuesta.estudiante_id, Respuesta.evaluacion_id, Respuesta.intento_numero
+        )
+        .subquery()
+    )
+    totales = (
+        select(
+            Pregunta.evaluacion_id,
+            func.sum(func.coalesce(Pregunta.puntaje, 0.0)).label("total"),
+        )
+        .where(Pregunta.evaluacion_id.in_(evaluacion_ids))
+        .group_by(Pregunta.evaluacion_id)
+        .subquery()
+    )
+    return db.session.execute(
+        select(
+            intentos.c.estudiante_id,
+            intentos.c.evaluacion_id,
+            func.max(intentos.c.obtenido),
+            func.count(),
+            func.max(totales.c.total),
+        )
+        .join(totales, totales.c.evaluacion_id == intentos.c.evaluacion_id)
+        .group_by(intentos.c.estudiante_id, intentos.c.evaluacion_id)
+    ).all()
+
+
+# --- Matriz ---
+
+
+def _pivotar(estudiantes, evaluaciones, filas):
+    """Matrices densas (estudiantes × evaluaciones) de porcentaje e intentos."""
+    porcentajes = np.full((len(estudiantes), len(evaluaciones)), np.nan)
+    intentos = np.zeros(porcentajes.shape, dtype=np.int64)
+    if filas:
+        indice_fila = {e.id: i for i, e in enumerate(estudiantes)}
+        indice_columna = {e.id: j for j, e in enumerate(evaluaciones)}
+        datos = np.array([(o, n, t) for _, _, o, n, t in filas], dtype=np.float64)
+        i = np.fromiter((indice_fila[f[0]] for f in filas), np.int64, len(filas))
+        j = np.fromiter((indice_columna[f[1]] for f in filas), np.int64, len(filas))
+        obtenido, total = datos[:, 0], datos[:, 2]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            porcentajes[i, j] = np.where(total > 0, obtenido * 100.0 / total, 0.0)
+        intentos[i, j] = datos[:, 1]
+    return np.round(porcentajes, 2), intentos
+
+
+def _media(valores, presentes, eje):
+    suma = np.where(presentes, valores, 0.0).sum(axis=eje)
+    cuenta = presentes.sum(axis=eje)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(cuenta > 0, suma / cuenta, np.nan), cuenta
+
+
+def _lista(arreglo):
+    """ndarray -> lista JSON con None en lugar de NaN."""
+    return [
+        None if isinstance(v, float) and np.isnan(v) else v
+        for v in np.round(arreglo, 2).tolist()
+    ]
+
+
+def _matriz(arreglo, presentes):
+    return [
+        [v if p else None for v, p in zip(fila, fila_presentes)]
+        for fila, fila_presentes in zip(arreglo.tolist(), presentes.tolist())
+    ]
+
+
+def construir_libro(clase_id, version=0):
+    """Construye el libro de calificaciones de la clase (sin caché)."""
+    metricas.incrementar(PREFIJO_METRICAS + "construcciones")
+    estudiantes = _estudiantes(clase_id)
+    evaluaciones = _evaluaciones(clase_id)
+    filas = []
+    if estudiantes and evaluaciones:
+        filas = _mejores_intentos(clase_id)
+    porcentajes, intentos = _pivotar(estudiantes, evaluaciones, filas)
+    presentes = ~np.isnan(porcentajes)
+
+    aprobatorias = np.array(
+        [
+            APROBATORIA_POR_DEFECTO
+            if e.calificacion_aprobatoria is None
+            else e.calificacion_aprobatoria
+            for e in evaluaciones
+        ],
+        dtype=np.float64,
+    )
+    aprobados = presentes & (np.nan_to_num(porcentajes) >= aprobatorias)
+
+    promedio_estudiantes, presentadas = _media(porcentajes, presentes, 1)
+    promedio_evaluaciones, presentados = _media(porcentajes, presentes, 0)
+    minimos = np.where(presentes, porcentajes, np.inf).min(axis=0, initial=np.inf)
+    maximos = np.where(presentes, porcentajes, -np.inf).max(axis=0, initial=-np.inf)
+    minimos = np.where(presentados > 0, minimos, np.nan)
+    maximos = np.where(presentados > 0, maximos, np.nan)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        tasa_aprobacion = np.where(
+            presentados > 0, aprobados.sum(axis=0) * 100.0 / presentados, np.nan
+        )
+
+    return {
+        "clase_id": clase_id,
+        "version": version,
+        "estudiantes": [
+            {"id": e.id, "nombre_completo": e.nombre_completo} for e in estudiantes
+        ],
+        "evaluaciones": [
+            {
+                "id": e.id,
+                "titulo": e.titulo,
+                "calificacion_aprobatoria": float(aprobatorias[j]),
+            }
+            for j, e in enumerate(evaluaciones)
+        ],
+        "calificaciones": _matriz(porcentajes, presentes),
+        "aprobados": _matriz(aprobados, presentes),
+        "intentos": intentos.tolist(),
+        "estadisticas_estudiantes": [
+            {
+                "promedio": promedio,
+                "evaluaciones_presentadas": int(n),
+                "evaluaciones_aprobadas": int(a),
+            }
+            for promedio, n, a in zip(
+                _lista(promedio_estudiantes), presentadas, aprobados.sum(axis=1)
+            )
+        ],
+        "estadisticas_evaluaciones": [
+            {
+                "promedio": promedio,
+                "minimo": minimo,
+                "maximo": maximo,
+                "presentados": int(n),
+                "tasa_aprobacion": tasa,
+            }
+            for promedio, minimo, maximo, n, tasa in zip(
+                _lista(promedio_evaluaciones),
+                _lista(minimos),
+                _lista(maximos),
+                presentados,
+                _lista(tasa_aprobacion),
+            )
+        ],
+    }
+
+
+# --- Caché ---
+
+
+def obtener_libro(clase_id):
+    """Libro de calificaciones vigente de la clase, o None si no existe."""
+    version = _version(clase_id)
+    if version is None:
+        return None
+    libro = _lru.obtener((clase_id, version))
+    if libro is not None:
+        metricas.incrementar(PREFIJO_METRICAS + "hits_lru")
+        return libro
+
+    clave_redis = f"{PREFIJO_REDIS}{clase_id}:{version}"
+    try:
+        crudo = redis_client.get(clave_redis)
+    except RedisError:
+        metricas.incrementar(PREFIJO_METRICAS + "errores_redis")
+        crudo = None
+    if crudo:
+        metricas.incrementar(PREFIJO_METRICAS + "hits_redis")
+        libro = json.loads(crudo)
+    else:
+        libro = construir_libro(clase_id, version)
+        try:
+            redis_client.setex(
+                clave_redis,
+                current_app.config.get("LIBRO_CALIFICACIONES_TTL_REDIS", 3600),
+                json.dumps(libro),
+            )
+        except RedisError:
+            metricas.incrementar(PREFIJO_METRICAS + "errores_redis")
+    _lru.guardar((clase_id, version), libro)
+    return libro
+
+
+# --- Exportación ---
+
+
+def _linea_csv(valores):
+    buffer = io.StringIO()
+    csv.writer(buffer).writerow(valores)
+    return buffer.getvalue()
+
+
+def exportar_csv(libro):
+    """Genera el libro como CSV, una línea por estudiante (para streaming)."""
+    yield _linea_csv(
+        ["estudiante_id", "nombre_completo"]
+        + [e["titulo"] for e in libro["evaluaciones"]]
+        + ["promedio"]
+    )
+    for estudiante, calificaciones, resumen in zip(
+        libro["estudiantes"],
+        libro["calificaciones"],
+        libro["estadisticas_estudiantes"],
+    ):
+        yield _linea_csv(
+            [estudiante["id"], estudiante["nombre_completo"]]
+            + ["" if c is None else c for c in calificaciones]
+            + ["" if resumen["promedio"] is None else resumen["promedio"]]
+        )
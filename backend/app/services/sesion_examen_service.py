@@ -0,0 +1,348 @@
+# backend/app/services/sesion_examen_service.py
+# Sesiones de examen en curso en Redis: autoguardado y un único volcado al enviar.
+#
+# Mientras el estudiante responde, cada autoguardado sería un INSERT/UPDATE sobre
+# `respuestas` y reanudar el intento (recarga, otro dispositivo) una consulta más.
+# En su lugar:
+#   1. Al iniciar (solo estudiantes inscritos en una clase que usa la evaluación)
+#      se crea el hash `sesion_examen:<evaluacion>:<estudiante>` con el intento, el
+#      inicio y la hora límite (`_intento`, `_inicio`, `_limite`), su TTL y una
+#      entrada en el conjunto ordenado `sesion_examen:vencimientos` con la hora
+#      límite como puntaje, todo en un único MULTI/EXEC: no puede quedar un hash a
+#      medio crear y sin TTL.
+#   2. Cada autoguardado es un HSET del campo `r:<pregunta_id>` (JSON); reanudar es
+#      un HGETALL. Ninguna de las dos operaciones consulta la BD.
+#   3. Al enviar, el hash se toma con RENAME (atómico, como en
+#      ultimo_acceso_service.py): si el estudiante y el barrido de vencidas envían
+#      a la vez, solo uno lo obtiene. El borrador se vuelca con
+#      `calificacion_service.enviar_intento` (un INSERT executemany y un commit) y
+#      la restricción única de `respuestas` descarta cualquier reenvío.
+#   4. `enviar_vencidas` (Celery beat o `flask examenes enviar-vencidas`) envía
+#      automáticamente las sesiones cuya hora límite ya pasó.
+#
+# El TTL del hash es el tiempo límite más SESIONES_EXAMEN_MARGEN_TTL: si expirara
+# justo al vencer, el barrido ya no encontraría el borrador que debe enviar. Las
+# evaluaciones sin tiempo límite usan un TTL deslizante que renueva cada
+# autoguardado.
+import json
+import time
+import uuid
+from datetime import datetime
+
+from flask import current_app
+from redis.exceptions import RedisError, ResponseError
+from sqlalchemy import func, select
+
+from app.extensions import db, redis_client
+from app.models.evaluacion import Evaluacion
+from app.models.respuesta import Respuesta
+from app.services.calificacion_service import (
+    EnvioInvalidoError,
+    enviar_intento,
+    verificar_estudiante,
+)
+from app.services.clave_respuestas_service import obtener_clave
+from app.utils.metrics import metricas
+
+PREFIJO_REDIS = "sesion_examen:"
+CLAVE_VENCIMIENTOS = PREFIJO_REDIS + "vencimientos"
+PREFIJO_METRICAS = "sesion_examen."
+PREFIJO_RESPUESTA = "r:"
+
+
+class SesionExamenError(Exception):
+    """La operación sobre la sesión no es posible; `codigo` es el estado HTTP."""
+
+    def __init__(self, mensaje, codigo=400):
+        super().__init__(mensaje)
+        self.mensaje = mensaje
+        self.codigo = codigo
+
+
+def _clave(evaluacion_id, estudiante_id):
+    return f"{PREFIJO_REDIS}{evaluacion_id}:{estudiante_id}"
+
+
+def _miembro(evaluacion_id, estudiante_id):
+    return f"{evaluacion_id}:{estudiante_id}"
+
+
+def _config(nombre, defecto):
+    return current_app.config.get(nombre, defecto)
+
+
+def _redis_no_disponible():
+    metricas.incrementar(PREFIJO_METRICAS + "errores_redis")
+    return SesionExamenError("El servicio de sesiones no está disponible", 503)
+
+
+def _sesion(evaluacion_id, crudo, ahora=None):
+    """Convierte el hash de Redis en la respuesta de la API."""
+    ahora = time.time() if ahora is None else ahora
+    limite = float(crudo.get("_limite") or 0) or None
+    respuestas = []
+    for campo, valor in crudo.items():
+        if campo.startswith(PREFIJO_RESPUESTA):
+            respuesta = json.loads(valor)
+            respuesta["pregunta_id"] = int(campo[len(PREFIJO_RESPUESTA) :])
+            respuestas.append(respuesta)
+    respuestas.sort(key=lambda r: r["pregunta_id"])
+    return {
+        "evaluacion_id": evaluacion_id,
+        "intento_numero": int(crudo["_intento"]),
+        "fecha_inicio": datetime.utcfromtimestamp(float(crudo["_inicio"])),
+        "fecha_limite": datetime.utcfromtimestamp(limite) if limite else None,
+        "segundos_restantes": max(int(limite - ahora), 0) if limite else None,
+        "vencida": bool(limite) and ahora > limite,
+        "respuestas": respuestas,
+    }
+
+
+def _leer(clave):
+    try:
+        crudo = redis_client.hgetall(clave)
+    except RedisError:
+        raise _redis_no_disponible()
+    # Un hash sin `_inicio` es un borrador huérfano o una sesión a medio crear
+    return crudo if crudo.get("_inicio") else None
+
+
+def iniciar_sesion(evaluacion_id, estudiante_id):
+    """
+    Inicia el siguiente intento del estudiante o devuelve la sesión en curso.
+    Devuelve `(sesion, creada)`.
+    """
+    clave = _clave(evaluacion_id, estudiante_id)
+    crudo = _leer(clave)
+    if crudo is not None:
+        metricas.incrementar(PREFIJO_METRICAS + "reanudadas")
+        return _sesion(evaluacion_id, crudo), False
+
+    evaluacion = db.session.get(Evaluacion, evaluacion_id)
+    if evaluacion is None:
+        raise SesionExamenError("Evaluación no encontrada", 404)
+    try:
+        verificar_estudiante(evaluacion_id, estudiante_id)
+    except EnvioInvalidoError as err:
+        raise SesionExamenError(err.mensaje, err.codigo)
+    previo = db.session.execute(
+        select(func.max(Respuesta.intento_numero)).where(
+            Respuesta.evaluacion_id == evaluacion_id,
+            Respuesta.estudiante_id == estudiante_id,
+        )
+    ).scalar()
+    intento = (previo or 0) + 1
+    if intento > (evaluacion.intentos_permitidos or 1):
+        raise SesionExamenError("No quedan intentos disponibles", 403)
+
+    inicio = time.time()
+    if evaluacion.tiempo_limite_minutos:
+        limite = inicio + evaluacion.tiempo_limite_minutos * 60
+        ttl = int(limite - inicio) + _config("SESIONES_EXAMEN_MARGEN_TTL", 3600)
+    else:
+        limite = 0
+        ttl = _config("SESIONES_EXAMEN_TTL_SIN_LIMITE", 86400)
+    try:
+        # Un solo MULTI/EXEC: si llegan dos inicios a la vez, el HSETNX de `_inicio`
+        # decide quién crea la sesión y los demás campos del perdedor no pisan los
+        # del ganador (el EXPIRE solo prolonga el TTL unos milisegundos)
+        pipe = redis_client.pipeline()
+        pipe.hsetnx(clave, "_inicio", repr(inicio))
+        pipe.hsetnx(clave, "_intento", intento)
+        pipe.hsetnx(clave, "_limite", repr(limite))
+        pipe.expire(clave, ttl)
+        if limite:
+            pipe.zadd(
+                CLAVE_VENCIMIENTOS,
+                {_miembro(evaluacion_id, estudiante_id): limite},
+                nx=True,
+            )
+        creada = pipe.execute()[0]
+        if not creada:
+            crudo = _leer(clave)
+            if crudo is None:
+                raise SesionExamenError("La sesión se está iniciando", 409)
+            return _sesion(evaluacion_id, crudo), False
+    except RedisError:
+        raise _redis_no_disponible()
+    metricas.incrementar(PREFIJO_METRICAS + "iniciadas")
+    crudo = {"_intento": intento, "_inicio": inicio, "_limite": limite}
+    return _sesion(evaluacion_id, crudo, inicio), True
+
+
+def obtener_sesion(evaluacion_id, estudiante_id):
+    """Sesión en curso para reanudar el intento (solo Redis) o None."""
+    crudo = _leer(_clave(evaluacion_id, estudiante_id))
+    if crudo is None:
+        return None
+    metricas.incrementar(PREFIJO_METRICAS + "reanudadas")
+    return _sesion(evaluacion_id, crudo)
+
+
+def guardar_respuesta(evaluacion_id, estudiante_id, pregunta_id, respuesta):
+    """
+    Autoguarda la respuesta a una pregunta (datos validados por
+    `RespuestaBorradorSchema`). Devuelve los segundos restantes o None.
+    """
+    clave_respuestas = obtener_clave(evaluacion_id)
+    if pregunta_id not in clave_respuestas.preguntas:
+        raise SesionExamenError(
+            f"La pregunta {pregunta_id} no pertenece a la evaluación", 404
+        )
+    opcion_id = respuesta.get("opcion_seleccionada_id")
+    opcion = clave_respuestas.opciones.get(opcion_id)
+    if opcion_id is not None and (opcion is None or opcion[0] != pregunta_id):
+        raise SesionExamenError(
+            f"La opción {opcion_id} no pertenece a la pregunta {pregunta_id}"
+        )
+
+    clave = _clave(evaluacion_id, estudiante_id)
+    campo = f"{PREFIJO_RESPUESTA}{pregunta_id}"
+    valor = json.dumps(
+        {
+            "opcion_seleccionada_id": opcion_id,
+            "texto_respuesta": respuesta.get("texto_respuesta"),
+            "tiempo_tomado": respuesta.get("tiempo_tomado", 0),
+        }
+    )
+    ahora = time.time()
+    try:
+        limite = redis_client.hget(clave, "_limite")
+        if limite is None:
+            raise SesionExamenError("No hay una sesión de examen en curso", 404)
+        limite = float(limite)
+        if limite and ahora > limite + _config("SESIONES_EXAMEN_GRACIA", 5):
+            raise SesionExamenError("El tiempo de la evaluación terminó", 409)
+
+        pipe = redis_client.pipeline()
+        pipe.hget(clave, "_intento")
+        pipe.hset(clave, campo, valor)
+        if not limite:
+            pipe.expire(clave, _config("SESIONES_EXAMEN_TTL_SIN_LIMITE", 86400))
+        intento = pipe.execute()[0]
+        if intento is None:
+            # El intento se envió entre la lectura y la escritura: el HSET creó un
+            # hash nuevo que solo contiene este campo
+            redis_client.hdel(clave, campo)
+            raise SesionExamenError("No hay una sesión de examen en curso", 404)
+    except RedisError:
+        raise _redis_no_disponible()
+    metricas.incrementar(PREFIJO_METRICAS + "autoguardados")
+    return max(int(limite - ahora), 0) if limite else None
+
+
+def _envio(crudo, clave_respuestas, ahora):
+    """Datos de `enviar_intento` a partir del borrador."""
+    guardadas = {}
+    for campo, valor in crudo.items():
+        if campo.startswith(PREFIJO_RESPUESTA):
+            guardadas[int(campo[len(PREFIJO_RESPUESTA) :])] = json.loads(valor)
+    # Las preguntas sin responder se registran vacías para que el intento cuente
+    # aunque el estudiante no haya contestado nada
+    respuestas = []
+    for pregunta_id in sorted(clave_respuestas.preguntas):
+        respuesta = guardadas.get(pregunta_id) or {
+            "opcion_seleccionada_id": None,
+            "texto_respuesta": None,
+            "tiempo_tomado": 0,
+        }
+        respuestas.append({"pregunta_id": pregunta_id, **respuesta})
+    inicio = float(crudo["_inicio"])
+    limite = float(crudo.get("_limite") or 0)
+    fin = min(ahora, limite) if limite else ahora
+    return {
+        "respuestas": respuestas,
+        "tiempo_total": max(int(fin - inicio), 0),
+        "intento_numero": int(crudo["_intento"]),
+    }
+
+
+def enviar_sesion(evaluacion_id, estudiante_id, automatico=False):
+    """
+    Vuelca el borrador a `respuestas` y califica el intento (exactamente una vez).
+    Devuelve el diccionario de `ResultadoEvaluacionSchema`.
+    """
+    clave = _clave(evaluacion_id, estudiante_id)
+    temporal = f"{clave}:enviando:{uuid.uuid4().hex}"
+    miembro = _miembro(evaluacion_id, estudiante_id)
+    try:
+        redis_client.rename(clave, temporal)
+    except ResponseError:
+        # Otro envío (o el barrido) ya tomó la sesión
+        raise SesionExamenError("No hay una sesión de examen en curso", 404)
+    except RedisError:
+        raise _redis_no_disponible()
+
+    try:
+        crudo = redis_client.hgetall(temporal)
+        if not crudo.get("_inicio"):
+            raise SesionExamenError("No hay una sesión de examen en curso", 404)
+        envio = _envio(crudo, obtener_clave(evaluacion_id), time.time())
+        resultado = enviar_intento(
+            evaluacion_id, estudiante_id, envio, desde_sesion=True
+        )
+    except (EnvioInvalidoError, SesionExamenError):
+        # Rechazo definitivo (intento ya registrado, sin intentos...): reintentarlo
+        # daría el mismo resultado, así que la sesión se descarta
+        _descartar(temporal, miembro)
+        metricas.incrementar(PREFIJO_METRICAS + "descartadas")
+        raise
+    except Exception:
+        # Error transitorio (BD, Redis): el borrador vuelve a su clave
+        try:
+            redis_client.rename(temporal, clave)
+        except RedisError:
+            metricas.incrementar(PREFIJO_METRICAS + "errores_redis")
+        raise
+
+    _descartar(temporal, miembro)
+    metricas.incrementar(
+        PREFIJO_METRICAS + ("enviadas_automaticamente" if automatico else "enviadas")
+    )
+    return resultado
+
+
+def _descartar(temporal, miembro):
+    try:
+        pipe = redis_client.pipeline()
+        pipe.delete(temporal)
+        pipe.zrem(CLAVE_VENCIMIENTOS, miembro)
+        pipe.execute()
+    except RedisError:
+        metricas.incrementar(PREFIJO_METRICAS + "errores_redis")
+
+
+def enviar_vencidas(ahora=None, limite=500):
+    """
+    Envía automáticamente las sesiones cuya hora límite ya pasó (más la gracia de
+    los autoguardados). Devuelve el número de intentos enviados.
+    """
+    ahora = time.time() if ahora is None else ahora
+    corte = ahora - _config("SESIONES_EXAMEN_GRACIA", 5)
+    try:
+        miembros = redis_client.zrangebyscore(
+            CLAVE_VENCIMIENTOS, "-inf", corte, start=0, num=limite
+        )
+    except RedisError:
+        raise _redis_no_disponible()
+
+    enviadas = 0
+    for miembro in miembros:
+        evaluacion_id, estudiante_id = (int(parte) for parte in miembro.split(":"))
+        try:
+            enviar_sesion(evaluacion_id, estudiante_id, automatico=True)
+            enviadas += 1
+        except (EnvioInvalidoError, SesionExamenError) as err:
+            if getattr(err, "codigo", None) == 503:
+                raise
+            # Sesión ya enviada, expirada o rechazada: deja de estar pendiente
+            try:
+                redis_client.zrem(CLAVE_VENCIMIENTOS, miembro)
+            except RedisError:
+                metricas.incrementar(PREFIJO_METRICAS + "errores_redis")
+        except Exception:
+            db.session.rollback()
+            current_app.logger.exception(
+                "No se pudo enviar la sesión de examen vencida %s", miembro
+            )
+    return enviadas
@@ -0,0 +1,226 @@
+# backend/app/services/ultimo_acceso_service.py
+# Escritura diferida (write-behind) de marcas de último acceso.
+#
+# `Usuario.ultimo_inicio_sesion` y `InscripcionClase.ultimo_acceso` cambian en cada
+# login o visita. Escribirlas con un UPDATE + commit por request amplifica las
+# escrituras y provoca contención de bloqueos sobre filas muy concurridas. En su
+# lugar:
+#   1. Cada acceso se anota en un hash de Redis (`ultimo_acceso:<destino>`), donde
+#      los accesos repetidos a la misma fila se fusionan (gana la última escritura).
+#      Si Redis no responde se anota en un diccionario local del worker.
+#   2. Un hilo por worker vuelca periódicamente lo acumulado con un único UPDATE por
+#      lote (executemany) y destino. El UPDATE nunca retrocede una marca ya escrita.
+#   3. Las lecturas combinan el valor de la BD con el pendiente de volcar.
+import atexit
+import os
+import threading
+import time
+import uuid
+from datetime import datetime
+
+from redis.exceptions import RedisError
+from sqlalchemy import and_, bindparam, or_, update
+
+from app.extensions import db, redis_client
+from app.utils.metrics import metricas
+
+PREFIJO_REDIS = "ultimo_acceso:"
+PREFIJO_METRICAS = "ultimo_acceso."
+
+
+class Destino:
+    """Columna de marca temporal que se actualiza de forma diferida."""
+
+    def __init__(self, tabla, columnas_clave, columna):
+        self.tabla = tabla
+        self.columnas_clave = columnas_clave
+        self.columna = columna
+
+    def sentencia_update(self):
+        columna = self.tabla.c[self.columna]
+        condiciones = [
+            self.tabla.c[nombre] == bindparam(f"clave_{nombre}")
+            for nombre in self.columnas_clave
+        ]
+        # Gana la marca más reciente aunque los volcados lleguen desordenados
+        condiciones.append(or_(columna.is_(None), columna < bindparam("valor")))
+        return (
+            update(self.tabla)
+            .where(and_(*condiciones))
+            .values({self.columna: bindparam("valor")})
+        )
+
+
+def _serializar_clave(clave):
+    if not isinstance(clave, tuple):
+        clave = (clave,)
+    return ":".join(str(parte) for parte in clave)
+
+
+class BufferUltimoAcceso:
+    def __init__(self):
+        self.destinos = {}
+        self.intervalo = 30
+        self.hilo_habilitado = True
+        self._app = None
+        self._local = {}
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        from app.models.inscripcion_clase import InscripcionClase
+        from app.models.usuario import Usuario
+
+        self.destinos = {
+            "inicio_sesion": Destino(
+                Usuario.__table__, ("id",), "ultimo_inicio_sesion"
+            ),
+            "inscripcion": Destino(
+                InscripcionClase.__table__,
+                ("estudiante_id", "clase_id"),
+                "ultimo_acceso",
+            ),
+        }
+        self.intervalo = app.config.get("ULTIMO_ACCESO_INTERVALO_VOLCADO", 30)
+        self.hilo_habilitado = app.config.get("ULTIMO_ACCESO_HILO_VOLCADO", True)
+        self._app = app
+        self._local = {}
+        self._pid = None
+
+    # --- API pública ---
+
+    def registrar(self, destino, clave, momento=None):
+        """Anota un acceso a la fila `clave` (id o tupla de ids) del destino."""
+        self._asegurar_hilo()
+        momento = time.time() if momento is None else momento
+        campo = _serializar_clave(clave)
+        try:
+            redis_client.hset(PREFIJO_REDIS + destino, campo, repr(momento))
+        except RedisError:
+            metricas.incrementar(PREFIJO_METRICAS + "fallback_memoria")
+            with self._lock:
+                pendientes = self._local.setdefault(destino, {})
+                pendientes[campo] = max(momento, pendientes.get(campo, 0))
+        metricas.incrementar(PREFIJO_METRICAS + "registrados")
+
+    def valor_vigente(self, destino, clave, valor_bd):
+        """Combina el valor de la BD con el pendiente de volcar, si es posterior."""
+        campo = _serializar_clave(clave)
+        pendiente = self._local.get(destino, {}).get(campo)
+        try:
+            crudo = redis_client.hget(PREFIJO_REDIS + destino, campo)
+        except RedisError:
+            crudo = None
+        if crudo is not None:
+            pendiente = max(float(crudo), pendiente or 0)
+        if pendiente is None:
+            return valor_bd
+        pendiente = datetime.utcfromtimestamp(pendiente)
+        if valor_bd is None or pendiente > valor_bd:
+            return pendiente
+        return valor_bd
+
+    def volcar(self):
+        """
+        Escribe en la BD los accesos pendientes y devuelve las filas volcadas.
+
+        Cada destino se escribe en su propia transacción: si uno falla, sus marcas
+        vuelven al buffer, los demás se vuelcan igualmente y el primer error se
+        relanza al final.
+        """
+        total = 0
+        errores = []
+        for nombre, destino in self.destinos.items():
+            pendientes = self._tomar_redis(nombre)
+            with self._lock:
+                for campo, momento in self._local.pop(nombre, {}).items():
+                    pendientes[campo] = max(momento, pendientes.get(campo, 0))
+            if not pendientes:
+                continue
+            filas = []
+            for campo, momento in pendientes.items():
+                fila = dict(
+                    zip(
+                        (f"clave_{c}" for c in destino.columnas_clave),
+                        (int(parte) for parte in campo.split(":")),
+                    )
+                )
+                fila["valor"] = datetime.utcfromtimestamp(momento)
+                filas.append(fila)
+            try:
+                db.session.execute(destino.sentencia_update(), filas)
+                db.session.commit()
+            except Exception as error:
+                db.session.rollback()
+                self._devolver(nombre, pendientes)
+                metricas.incrementar(PREFIJO_METRICAS + "errores_destino")
+                errores.append(error)
+                continue
+            total += len(filas)
+        metricas.incrementar(PREFIJO_METRICAS + "volcados")
+        metricas.incrementar(PREFIJO_METRICAS + "filas_volcadas", total)
+        if errores:
+            raise errores[0]
+        return total
+
+    # --- Internos ---
+
+    def _tomar_redis(self, nombre):
+        # RENAME es atómico: los accesos que llegan durante el volcado van al hash
+        # nuevo y se escriben en el siguiente intervalo
+        clave = PREFIJO_REDIS + nombre
+        temporal = f"{clave}:volcando:{uuid.uuid4().hex}"
+        try:
+            if not redis_client.exists(clave):
+                return {}
+            redis_client.rename(clave, temporal)
+            crudos = redis_client.hgetall(temporal)
+            redis_client.delete(temporal)
+        except RedisError:
+            metricas.incrementar(PREFIJO_METRICAS + "errores_redis")
+            return {}
+        return {campo: float(valor) for campo, valor in crudos.items()}
+
+    def _devolver(self, nombre, pendientes):
+        # Si el UPDATE falla, las marcas vuelven al buffer sin pisar otras más nuevas
+        try:
+            pipe = redis_client.pipeline()
+            for campo, momento in pendientes.items():
+                pipe.hsetnx(PREFIJO_REDIS + nombre, campo, repr(momento))
+            pipe.execute()
+        except RedisError:
+            with self._lock:
+                locales = self._local.setdefault(nombre, {})
+                for campo, momento in pendientes.items():
+                    locales[campo] = max(momento, locales.get(campo, 0))
+
+    def _asegurar_hilo(self):
+        # Un hilo por worker (gunicorn crea los workers con fork)
+        if not self.hilo_habilitado or self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            hilo = threading.Thread(
+                target=self._bucle_volcado, name="ultimo-acceso", daemon=True
+            )
+            hilo.start()
+            atexit.register(self._volcar_en_contexto)
+
+    def _bucle_volcado(self):
+        while True:
+            time.sleep(self.intervalo)
+            self._volcar_en_contexto()
+
+    def _volcar_en_contexto(self):
+        try:
+            with self._app.app_context():
+                self.volcar()
+        except Exception as error:
+            metricas.incrementar(PREFIJO_METRICAS + "errores_volcado")
+            print(f"ERROR: No se pudieron volcar los últimos accesos: {error}")
+
+
+# Instancia única por proceso
+buffer_ultimo_acceso = BufferUltimoAcceso()
@@ -0,0 +1,11 @@
+# app/tasks/analisis_items.py
+# Análisis de ítems nocturno (ver services/analisis_items_service.py).
+# Programarlo con Celery beat o, sin Celery, con cron: `flask analisis items`.
+from celery import shared_task
+
+from app.services.analisis_items_service import analizar_evaluaciones
+
+
+@shared_task
+def analizar_items_evaluaciones(evaluacion_ids=None):
+    return analizar_evaluaciones(evaluacion_ids)
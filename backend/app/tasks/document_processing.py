@@ -1,32 +1,93 @@
 # app/tasks/document_processing.py
 # BACKEND-REVIEW: 2025-05-20 - FEATURE-UPLOAD-02 - Tarea Celery para extracción de texto
 # Procesa archivos PDF/TXT de forma asíncrona usando PyMuPDF.
+# El texto se escribe por páginas en `fragmentos_archivo`; los PDF grandes se
+# extraen por rangos de páginas en paralelo
+# (ver services/extraccion_texto_service.py).
 
-import fitz  # PyMuPDF
-from celery import shared_task
-from app.models import db, ArchivoCargado
+import multiprocessing
+import os
+
+from celery import chord, shared_task
+from celery.backends.base import DisabledBackend
+from flask import current_app
+from app.extensions import db
+from app.models import ArchivoCargado
+from app.services import almacen_archivos_service, extraccion_texto_service
 from datetime import datetime
 
+
+def _marcar_error(archivo_id, error):
+    db.session.rollback()
+    archivo = db.session.get(ArchivoCargado, archivo_id)
+    archivo.estado_procesamiento_texto = "error"
+    archivo.mensaje_error = str(error)
+    archivo.fecha_procesamiento = datetime.utcnow()
+    db.session.commit()
+    # Otra subida del mismo contenido esperaba esta extracción: que lo intente ella
+    pendiente = almacen_archivos_service.siguiente_pendiente(archivo_id)
+    if pendiente is not None:
+        extraer_texto_archivo.delay(pendiente)
+
+
+def _procesos_locales():
+    # Los workers prefork de Celery son procesos daemon y no pueden crear hijos
+    if multiprocessing.current_process().daemon:
+        return None
+    return current_app.config.get("DOCUMENTOS_PROCESOS_EXTRACCION") or os.cpu_count()
+
+
+def _chord_disponible():
+    # Sin backend de resultados Celery no puede iniciar un chord
+    # (NotImplementedError) y el archivo quedaría en error
+    return not isinstance(extraer_texto_archivo.app.backend, DisabledBackend)
+
+
 @shared_task
 def extraer_texto_archivo(archivo_id):
-    archivo = ArchivoCargado.query.get(archivo_id)
+    archivo = db.session.get(ArchivoCargado, archivo_id)
     if not archivo:
         return
     try:
-        texto = ""
-        if archivo.tipo_mime == "application/pdf":
-            with fitz.open(archivo.ruta_almacenamiento) as doc:
-                for page in doc:
-                    texto += page.get_text()
-        elif archivo.tipo_mime == "text/plain":
-            with open(archivo.ruta_almacenamiento, "r", encoding="utf-8") as f:
-                texto = f.read()
-        archivo.texto_extraido = texto
-        archivo.estado_procesamiento_texto = "procesado"
-        archivo.fecha_procesamiento = datetime.utcnow()
-        archivo.mensaje_error = None
+        modo = current_app.config.get("DOCUMENTOS_EXTRACCION_PARALELA", "procesos")
+        if modo == "celery" and not _chord_disponible():
+            current_app.logger.warning(
+                "Extracción con chord sin backend de resultados en Celery; "
+                "se usa el pool de procesos local"
+            )
+            modo = "procesos"
+        total = extraccion_texto_service.total_paginas(archivo)
+        if modo == "celery" and extraccion_texto_service.debe_dividirse(
+            archivo, total
+        ):
+            por_rango = current_app.config.get("DOCUMENTOS_PAGINAS_POR_RANGO", 50)
+            extraccion_texto_service.iniciar_extraccion(archivo, total)
+            chord(
+                extraer_rango_paginas.s(archivo_id, inicio, fin)
+                for inicio, fin in extraccion_texto_service.rangos_paginas(
+                    0, total, por_rango
+                )
+            )(ensamblar_extraccion.s(archivo_id))
+            return
+        procesos = _procesos_locales() if modo == "procesos" else None
+        extraccion_texto_service.extraer_fragmentos(archivo, procesos=procesos)
     except Exception as e:
-        archivo.estado_procesamiento_texto = "error"
-        archivo.mensaje_error = str(e)
-        archivo.fecha_procesamiento = datetime.utcnow()
-    db.session.commit()
+        _marcar_error(archivo_id, e)
+
+
+@shared_task
+def extraer_rango_paginas(archivo_id, inicio, fin):
+    """Subtarea del chord: extrae y guarda las páginas [inicio, fin)."""
+    try:
+        return extraccion_texto_service.extraer_rango(archivo_id, inicio, fin)
+    except Exception as e:
+        _marcar_error(archivo_id, e)
+        raise
+
+
+@shared_task
+def ensamblar_extraccion(paginas_por_rango, archivo_id):
+    """Callback del chord: todas las páginas están escritas, en orden por índice."""
+    return extraccion_texto_service.finalizar_extraccion(
+        archivo_id, sum(paginas_por_rango)
+    )
@@ -0,0 +1,15 @@
+# app/tasks/estadisticas.py
+# Recálculo periódico de las estadísticas por clase.
+#
+# Los acumulados se mantienen de forma incremental (ver models/estadisticas.py);
+# esta tarea los reconstruye desde las tablas de origen para corregir la deriva.
+# Programarla con Celery beat (p. ej. cada noche) o, sin Celery, con cron:
+#     flask estadisticas recalcular
+from celery import shared_task
+
+from app.models.estadisticas import recalcular_estadisticas
+
+
+@shared_task
+def recalcular_estadisticas_clases(clase_ids=None):
+    return recalcular_estadisticas(clase_ids)
@@ -0,0 +1,12 @@
+# app/tasks/sesiones_examen.py
+# Envío automático de las sesiones de examen vencidas
+# (ver services/sesion_examen_service.py). Programarlo cada minuto con Celery beat
+# o, sin Celery, con cron: `flask examenes enviar-vencidas`.
+from celery import shared_task
+
+from app.services.sesion_examen_service import enviar_vencidas
+
+
+@shared_task
+def enviar_sesiones_vencidas():
+    return enviar_vencidas()
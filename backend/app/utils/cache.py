@@ -0,0 +1,56 @@
+# app/utils/cache.py
+# Utilidades de caché en memoria compartidas por los distintos servicios.
+import threading
+import time
+from collections import OrderedDict
+
+_AUSENTE = object()
+
+
+class LRUConTTL:
+    """
+    Caché LRU local al proceso (worker) con expiración por entrada.
+
+    Es segura para hilos y pensada para valores pequeños e inmutables
+    (diccionarios simples, tuplas); no debe usarse para instancias ORM.
+    """
+
+    def __init__(self, max_entradas=1024, ttl=30.0):
+        self.max_entradas = max_entradas
+        self.ttl = ttl
+        self._datos = OrderedDict()
+        self._lock = threading.Lock()
+
+    def obtener(self, clave, default=None):
+        """Devuelve el valor vigente para `clave` o `default` si no existe o expiró."""
+        ahora = time.monotonic()
+        with self._lock:
+            entrada = self._datos.get(clave, _AUSENTE)
+            if entrada is _AUSENTE:
+                return default
+            valor, expira = entrada
+            if expira <= ahora:
+                del self._datos[clave]
+                return default
+            self._datos.move_to_end(clave)
+            return valor
+
+    def guardar(self, clave, valor, ttl=None):
+        """Guarda `valor` con el TTL indicado (o el TTL por defecto de la caché)."""
+        expira = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._datos[clave] = (valor, expira)
+            self._datos.move_to_end(clave)
+            while len(self._datos) > self.max_entradas:
+                self._datos.popitem(last=False)
+
+    def invalidar(self, clave):
+        with self._lock:
+            self._datos.pop(clave, None)
+
+    def limpiar(self):
+        with self._lock:
+            self._datos.clear()
+
+    def __len__(self):
+        return len(self._datos)
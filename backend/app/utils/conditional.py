@@ -0,0 +1,117 @@
+# app/utils/conditional.py
+# Peticiones condicionales (ETag / Last-Modified) para endpoints de lectura.
+#
+# Muchos estudiantes usan datos móviles: si el recurso no cambió desde la última
+# vez que el cliente lo pidió, se responde 304 sin cuerpo. Con un validador, la
+# versión del recurso se obtiene con una consulta mínima ANTES de ejecutar la vista,
+# así que un 304 evita también la carga completa y la serialización.
+#
+# Uso:
+#     @courses_bp.route("/<int:clase_id>")
+#     @jwt_required()
+#     @respuesta_condicional(version_de_fila(Clase, "clase_id"))
+#     def obtener_clase(clase_id): ...
+#
+# Sin validador, el ETag se calcula a partir del cuerpo ya generado (ahorra ancho de
+# banda, pero no CPU).
+import hashlib
+from datetime import timezone
+from functools import wraps
+
+from flask import make_response, request
+from sqlalchemy import select
+
+from app.extensions import db
+
+
+def etag_debil(*partes):
+    """ETag débil (sin comillas ni prefijo) derivado de los valores de versión."""
+    return hashlib.blake2b(repr(partes).encode("utf-8"), digest_size=12).hexdigest()
+
+
+def version_de_fila(modelo, parametro="id", columnas=("fecha_actualizacion",)):
+    """
+    Validador que lee solo las columnas de versión de la fila `modelo` cuya clave
+    primaria llega en el argumento de ruta `parametro`. Si la fila no existe
+    devuelve None y la vista decide (normalmente con un 404).
+    """
+    seleccion = [getattr(modelo, columna) for columna in columnas]
+
+    def validador(**kwargs):
+        fila = db.session.execute(
+            select(*seleccion).where(modelo.id == kwargs[parametro])
+        ).first()
+        if fila is None:
+            return None
+        ultima_modificacion = None
+        if "fecha_actualizacion" in columnas:
+            ultima_modificacion = fila[columnas.index("fecha_actualizacion")]
+        return (modelo.__tablename__, kwargs[parametro], *fila), ultima_modificacion
+
+    return validador
+
+
+def _a_segundos(fecha):
+    # Las fechas del modelo son UTC sin zona horaria
+    if fecha.tzinfo is None:
+        fecha = fecha.replace(tzinfo=timezone.utc)
+    return int(fecha.timestamp())
+
+
+def _no_modificado(etag, ultima_modificacion):
+    # If-None-Match tiene prioridad sobre If-Modified-Since (RFC 7232, 6)
+    if request.if_none_match:
+        return request.if_none_match.contains_weak(etag)
+    if ultima_modificacion is not None and request.if_modified_since is not None:
+        return _a_segundos(ultima_modificacion) <= _a_segundos(
+            request.if_modified_since
+        )
+    return False
+
+
+def _agregar_validadores(respuesta, etag, ultima_modificacion):
+    respuesta.set_etag(etag, weak=True)
+    if ultima_modificacion is not None:
+        respuesta.last_modified = ultima_modificacion.replace(tzinfo=timezone.utc)
+    # Las respuestas dependen del usuario autenticado: solo caché privada y siempre
+    # revalidando
+    respuesta.headers["Cache-Control"] = "private, no-cache"
+    respuesta.vary.update(("Authorization", "Cookie"))
+    return respuesta
+
+
+def respuesta_condicional(validador=None):
+    """
+    Decorador para rutas GET que responde 304 cuando el cliente ya tiene la versión
+    vigente. `validador(**kwargs_de_ruta)` devuelve `(partes_de_version,
+    ultima_modificacion)` o None.
+    """
+
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            if request.method not in ("GET", "HEAD"):
+                return fn(*args, **kwargs)
+
+            version = validador(**kwargs) if validador is not None else None
+            if version is not None:
+                partes, ultima_modificacion = version
+                etag = etag_debil(*partes)
+                if _no_modificado(etag, ultima_modificacion):
+                    return _agregar_validadores(
+                        make_response("", 304), etag, ultima_modificacion
+                    )
+
+            respuesta = make_response(fn(*args, **kwargs))
+            if respuesta.status_code != 200:
+                return respuesta
+
+            if version is None:
+                etag, ultima_modificacion = etag_debil(respuesta.get_data()), None
+                if _no_modificado(etag, None):
+                    respuesta = make_response("", 304)
+            return _agregar_validadores(respuesta, etag, ultima_modificacion)
+
+        return wrapper
+
+    return decorator
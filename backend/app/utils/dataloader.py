@@ -0,0 +1,241 @@
+# app/utils/dataloader.py
+# Cargador por lotes de relaciones (patrón DataLoader), con alcance de petición.
+#
+# Casi todas las relaciones de los modelos son `lazy="dynamic"`: serializar una lista
+# de N módulos con sus lecciones ejecuta 1 + N consultas, y cada nivel anidado
+# multiplica. El cargador registra los objetos que se van a serializar y, la primera
+# vez que se pide una relación de uno de ellos, la resuelve para TODOS los registrados
+# de la misma clase con una única consulta `IN (...)`. Los hijos obtenidos se
+# registran a su vez, de modo que cada nivel del árbol cuesta una consulta por
+# relación, independientemente del número de filas.
+#
+# Uso con marshmallow: automático en los esquemas que heredan de
+# BaseSQLAlchemySchema (ver base_schemas.py).
+#
+# Uso con to_dict():
+#     modulos = Modulo.query.filter_by(clase_id=clase_id).all()
+#     registrar(modulos)
+#     datos = [m.to_dict(incluir_lecciones=True) for m in modulos]
+#
+# El cargador vive en `flask.g` y se descarta al terminar la petición y tras cada
+# commit o rollback, así que nunca devuelve datos de otra transacción.
+from collections import defaultdict
+
+from flask import g, has_app_context
+from sqlalchemy import event, inspect, select
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import set_committed_value
+from sqlalchemy.orm.interfaces import MANYTOONE, ONETOMANY
+
+from app.extensions import db
+from app.utils.metrics import metricas
+
+PREFIJO_METRICAS = "dataloader."
+
+# Límite de parámetros por IN (SQLite admite 999 variables por sentencia)
+TAMANO_LOTE_IN = 500
+
+
+def _identidad(objeto):
+    estado = inspect(objeto)
+    if estado.identity is None:
+        return None
+    return estado.identity[0] if len(estado.identity) == 1 else estado.identity
+
+
+def _relacion(objeto, nombre):
+    mapper = inspect(type(objeto), raiseerr=False)
+    if mapper is None:
+        return None
+    return mapper.relationships.get(nombre)
+
+
+def _valor_perezoso(objeto, nombre):
+    # Acceso normal al atributo; las relaciones dinámicas devuelven una consulta
+    valor = getattr(objeto, nombre)
+    if hasattr(valor, "all") and hasattr(valor, "filter"):
+        return valor.all()
+    return valor
+
+
+class CargadorRelaciones:
+    """
+    Resuelve relaciones de muchos objetos con una consulta por (clase, relación).
+    Admite uno-a-muchos (dinámicas o no) y muchos-a-uno con clave simple; las
+    relaciones con tabla secundaria se cargan de forma perezosa.
+    """
+
+    def __init__(self, sesion=None):
+        self.sesion = sesion or db.session
+        # clase del modelo -> {identidad: objeto}
+        self._registrados = defaultdict(dict)
+        # (clase que define la relación, nombre) -> {identidad: valor}
+        self._resueltos = defaultdict(dict)
+        self.consultas = 0
+
+    def registrar(self, objetos):
+        for objeto in objetos:
+            if objeto is None or inspect(type(objeto), raiseerr=False) is None:
+                continue
+            identidad = _identidad(objeto)
+            if identidad is not None:
+                self._registrados[type(objeto)][identidad] = objeto
+
+    def es_relacion(self, objeto, nombre):
+        return _relacion(objeto, nombre) is not None
+
+    def cargar(self, objeto, nombre):
+        """Valor de `objeto.<nombre>` (lista para colecciones, objeto o None)."""
+        propiedad = _relacion(objeto, nombre)
+        identidad = _identidad(objeto)
+        if propiedad is None or identidad is None or propiedad.secondary is not None:
+            return _valor_perezoso(objeto, nombre)
+
+        clave = (propiedad.parent.class_, nombre)
+        resueltos = self._resueltos[clave]
+        if identidad not in resueltos:
+            self.registrar([objeto])
+            pendientes = {
+                ident: obj
+                for clase, registrados in self._registrados.items()
+                if issubclass(clase, propiedad.parent.class_)
+                for ident, obj in registrados.items()
+                if ident not in resueltos
+            }
+            self._resolver(propiedad, pendientes, resueltos)
+        return resueltos[identidad]
+
+    def _resolver(self, propiedad, pendientes, resueltos):
+        dinamica = propiedad.lazy == "dynamic"
+        por_cargar = {}
+        for identidad, objeto in pendientes.items():
+            # Relaciones no dinámicas ya cargadas (p. ej. con joinedload): sin consulta
+            if not dinamica and propiedad.key in objeto.__dict__:
+                resueltos[identidad] = objeto.__dict__[propiedad.key]
+            else:
+                por_cargar[identidad] = objeto
+
+        if propiedad.direction is ONETOMANY:
+            valores = self._uno_a_muchos(propiedad, por_cargar)
+        elif propiedad.direction is MANYTOONE:
+            valores = self._muchos_a_uno(propiedad, por_cargar)
+        else:
+            valores = {
+                ident: _valor_perezoso(obj, propiedad.key)
+                for ident, obj in por_cargar.items()
+            }
+
+        for identidad, objeto in por_cargar.items():
+            valor = valores[identidad]
+            resueltos[identidad] = valor
+            if not dinamica:
+                # Evita la carga perezosa si después se accede al atributo
+                set_committed_value(objeto, propiedad.key, valor)
+
+    def _consultar(self, modelo, columna, valores, orden=()):
+        filas = []
+        valores = list(valores)
+        for inicio in range(0, len(valores), TAMANO_LOTE_IN):
+            lote = valores[inicio : inicio + TAMANO_LOTE_IN]
+            consulta = select(modelo).where(columna.in_(lote)).order_by(*orden)
+            filas.extend(self.sesion.execute(consulta).scalars().all())
+            self.consultas += 1
+            metricas.incrementar(PREFIJO_METRICAS + "consultas")
+        self.registrar(filas)
+        return filas
+
+    def _uno_a_muchos(self, propiedad, objetos):
+        ((columna_local, columna_remota),) = propiedad.local_remote_pairs
+        hijo = propiedad.mapper
+        atributo_local = propiedad.parent.get_property_by_column(columna_local).key
+        atributo_remoto = hijo.get_property_by_column(columna_remota).key
+
+        padres = defaultdict(list)
+        for identidad, objeto in objetos.items():
+            padres[getattr(objeto, atributo_local)].append(identidad)
+        valores = {identidad: [] for identidad in objetos}
+        if not padres:
+            return valores
+
+        orden = propiedad.order_by or hijo.primary_key
+        for fila in self._consultar(hijo.class_, columna_remota, padres, orden):
+            for identidad in padres[getattr(fila, atributo_remoto)]:
+                valores[identidad].append(fila)
+        if not propiedad.uselist:
+            valores = {
+                ident: (filas[0] if filas else None) for ident, filas in valores.items()
+            }
+        return valores
+
+    def _muchos_a_uno(self, propiedad, objetos):
+        ((columna_local, columna_remota),) = propiedad.local_remote_pairs
+        destino = propiedad.mapper
+        atributo_local = propiedad.parent.get_property_by_column(columna_local).key
+        atributo_remoto = destino.get_property_by_column(columna_remota).key
+        por_clave = tuple(destino.primary_key) == (columna_remota,)
+
+        encontrados, faltantes = {}, set()
+        for objeto in objetos.values():
+            valor = getattr(objeto, atributo_local)
+            if valor is None or valor in encontrados:
+                continue
+            existente = None
+            if por_clave:
+                # Los padres ya presentes en la sesión no se vuelven a consultar
+                existente = self.sesion.identity_map.get(
+                    self.sesion.identity_key(destino.class_, valor)
+                )
+            if existente is not None:
+                encontrados[valor] = existente
+            else:
+                faltantes.add(valor)
+
+        if faltantes:
+            for fila in self._consultar(destino.class_, columna_remota, faltantes):
+                encontrados[getattr(fila, atributo_remoto)] = fila
+        return {
+            identidad: encontrados.get(getattr(objeto, atributo_local))
+            for identidad, objeto in objetos.items()
+        }
+
+
+def cargador_actual():
+    """Cargador de la petición en curso (se crea al primer uso), o None sin app."""
+    if not has_app_context():
+        return None
+    cargador = g.get("_cargador_relaciones")
+    if cargador is None:
+        cargador = g._cargador_relaciones = CargadorRelaciones()
+    return cargador
+
+
+def descartar():
+    if has_app_context():
+        g.pop("_cargador_relaciones", None)
+
+
+def registrar(objetos):
+    """Registra objetos cuyas relaciones se van a leer en lote."""
+    objetos = list(objetos)
+    cargador = cargador_actual()
+    if cargador is not None:
+        cargador.registrar(objetos)
+    return objetos
+
+
+def cargar_relacion(objeto, nombre):
+    """`objeto.<nombre>` resuelto por lotes (o de forma perezosa sin contexto)."""
+    cargador = cargador_actual()
+    if cargador is None:
+        return _valor_perezoso(objeto, nombre)
+    return cargador.cargar(objeto, nombre)
+
+
+@event.listens_for(Session, "after_commit")
+@event.listens_for(Session, "after_soft_rollback")
+def _descartar_tras_transaccion(sesion, *args):
+    descartar()
+
+
+def init_app(app):
+    app.teardown_request(lambda exc: descartar())
@@ -0,0 +1,37 @@
+# app/utils/metrics.py
+# Contadores de proceso para observar el comportamiento de cachés y servicios.
+# Se exponen en /api/metrics; cada worker de gunicorn reporta sus propios valores.
+import threading
+
+
+class RegistroMetricas:
+    """Registro de contadores con nombre, seguro para hilos."""
+
+    def __init__(self):
+        self._contadores = {}
+        self._lock = threading.Lock()
+
+    def incrementar(self, nombre, cantidad=1):
+        with self._lock:
+            self._contadores[nombre] = self._contadores.get(nombre, 0) + cantidad
+
+    def valor(self, nombre):
+        return self._contadores.get(nombre, 0)
+
+    def snapshot(self, prefijo=""):
+        """Devuelve una copia de los contadores cuyo nombre empieza por `prefijo`."""
+        with self._lock:
+            return {
+                nombre: valor
+                for nombre, valor in self._contadores.items()
+                if nombre.startswith(prefijo)
+            }
+
+    def reiniciar(self, prefijo=""):
+        with self._lock:
+            for nombre in [n for n in self._contadores if n.startswith(prefijo)]:
+                del self._contadores[nombre]
+
+
+# Instancia única para toda la aplicación
+metricas = RegistroMetricas()
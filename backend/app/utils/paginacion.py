@@ -0,0 +1,238 @@
+# app/utils/paginacion.py
+# Paginación por clave (keyset / cursor) para listados grandes.
+#
+# La paginación por número de página usa OFFSET: la BD recorre y descarta todas las
+# filas anteriores, así que las páginas profundas son cada vez más lentas, y cada
+# página necesita además un COUNT del total. Aquí la página siguiente se pide
+# "a partir de" los valores de orden de la última fila vista:
+#
+#     WHERE (fecha_creacion, id) < (:ultima_fecha, :ultimo_id)
+#     ORDER BY fecha_creacion DESC, id DESC
+#     LIMIT por_pagina + 1
+#
+# que con un índice sobre las columnas de orden cuesta lo mismo en cualquier página.
+# Esos valores viajan al cliente como un cursor opaco y firmado.
+#
+# Uso:
+#     parametros = PaginacionSchema().load(request.args)
+#     pagina = paginar_keyset(
+#         Clase.query.filter_by(activa=True),
+#         orden=(Clase.fecha_creacion.desc(), Clase.id.desc()),
+#         por_pagina=parametros["por_pagina"],
+#         cursor=parametros.get("cursor"),
+#         total=parametros.get("conteo"),
+#     )
+#     return jsonify(ClasePaginacionSchema().dump(pagina))
+#
+# La última columna de `orden` debe ser única (normalmente la clave primaria) para
+# que el orden sea total. Las columnas de orden no deben admitir NULL.
+import base64
+from datetime import date, datetime
+from decimal import Decimal
+
+from flask import current_app
+from itsdangerous import BadSignature, URLSafeSerializer
+from sqlalchemy import Select, and_, func, or_, select, tuple_
+from sqlalchemy.sql import operators
+from sqlalchemy.sql.elements import UnaryExpression
+
+from app.extensions import db
+
+SAL_CURSOR = "paginacion-keyset"
+SIGUIENTE, ANTERIOR = "s", "a"
+MODOS_TOTAL = ("exacto", "estimado")
+
+
+class CursorInvalidoError(ValueError):
+    """El cursor recibido no es válido (manipulado o de otro listado)."""
+
+
+class PaginaKeyset:
+    """Página de resultados; sus atributos coinciden con `PaginacionSchema`."""
+
+    def __init__(self, items, por_pagina, siguiente_cursor, anterior_cursor, total):
+        self.items = items
+        self.por_pagina = por_pagina
+        self.siguiente_cursor = siguiente_cursor
+        self.anterior_cursor = anterior_cursor
+        self.tiene_siguiente = siguiente_cursor is not None
+        self.tiene_anterior = anterior_cursor is not None
+        self.total = total
+
+
+def _columnas_orden(orden):
+    """[(columna, descendente)] a partir de expresiones como `Clase.id.desc()`."""
+    columnas = []
+    for expresion in orden:
+        descendente = False
+        if isinstance(expresion, UnaryExpression) and expresion.modifier in (
+            operators.desc_op,
+            operators.asc_op,
+        ):
+            descendente = expresion.modifier is operators.desc_op
+            expresion = expresion.element
+        columnas.append((expresion, descendente))
+    if not columnas:
+        raise ValueError("La paginación por clave necesita al menos una columna")
+    desempate = getattr(columnas[-1][0], "expression", columnas[-1][0])
+    if not (
+        getattr(desempate, "primary_key", False) or getattr(desempate, "unique", False)
+    ):
+        raise ValueError("La última columna de orden debe ser única (desempate)")
+    return columnas
+
+
+# --- Cursores ---
+
+
+def _serializador():
+    return URLSafeSerializer(current_app.config["SECRET_KEY"], salt=SAL_CURSOR)
+
+
+def _codificar_valor(valor):
+    if isinstance(valor, datetime):
+        return {"dt": valor.isoformat()}
+    if isinstance(valor, date):
+        return {"d": valor.isoformat()}
+    if isinstance(valor, Decimal):
+        return {"n": str(valor)}
+    if isinstance(valor, bytes):
+        return {"b": base64.b64encode(valor).decode("ascii")}
+    return valor
+
+
+def _decodificar_valor(valor):
+    if isinstance(valor, dict):
+        if "dt" in valor:
+            return datetime.fromisoformat(valor["dt"])
+        if "d" in valor:
+            return date.fromisoformat(valor["d"])
+        if "n" in valor:
+            return Decimal(valor["n"])
+        if "b" in valor:
+            return base64.b64decode(valor["b"])
+    return valor
+
+
+def codificar_cursor(valores, direccion=SIGUIENTE):
+    return _serializador().dumps(
+        {"v": [_codificar_valor(v) for v in valores], "d": direccion}
+    )
+
+
+def decodificar_cursor(cursor, columnas):
+    try:
+        datos = _serializador().loads(cursor)
+        valores = [_decodificar_valor(v) for v in datos["v"]]
+        direccion = datos["d"]
+    except (BadSignature, KeyError, TypeError, ValueError):
+        raise CursorInvalidoError("Cursor de paginación inválido")
+    if len(valores) != len(columnas) or direccion not in (SIGUIENTE, ANTERIOR):
+        raise CursorInvalidoError("Cursor de paginación inválido")
+    return valores, direccion
+
+
+# --- Consulta ---
+
+
+def _predicado(columnas, valores, hacia_atras):
+    """Filas estrictamente posteriores (o anteriores) a `valores` en el orden dado."""
+    direcciones = {descendente for _, descendente in columnas}
+    if len(direcciones) == 1:
+        # Mismo sentido en todas las columnas: comparación de tuplas (usa el índice)
+        descendente = direcciones.pop() != hacia_atras
+        fila = tuple_(*(columna for columna, _ in columnas))
+        return fila < tuple_(*valores) if descendente else fila > tuple_(*valores)
+
+    alternativas = []
+    for i, (columna, descendente) in enumerate(columnas):
+        iguales = [c == v for (c, _), v in zip(columnas[:i], valores[:i])]
+        menor = descendente != hacia_atras
+        siguiente = columna < valores[i] if menor else columna > valores[i]
+        alternativas.append(and_(*iguales, siguiente))
+    return or_(*alternativas)
+
+
+def _ordenar(columnas, hacia_atras):
+    return [
+        columna.desc() if descendente != hacia_atras else columna.asc()
+        for columna, descendente in columnas
+    ]
+
+
+def _ejecutar(consulta, filtro, orden, limite):
+    consulta = consulta.order_by(None)
+    if filtro is not None:
+        consulta = consulta.where(filtro)
+    consulta = consulta.order_by(*orden).limit(limite)
+    if isinstance(consulta, Select):
+        return db.session.scalars(consulta).all()
+    return consulta.all()
+
+
+def _sentencia(consulta):
+    return consulta if isinstance(consulta, Select) else consulta.statement
+
+
+def contar_exacto(consulta):
+    sentencia = _sentencia(consulta).order_by(None)
+    return db.session.scalar(select(func.count()).select_from(sentencia.subquery()))
+
+
+def contar_estimado(consulta):
+    """
+    Estimación del planificador de PostgreSQL (EXPLAIN, sin ejecutar la consulta).
+    En otros motores se usa el conteo exacto.
+    """
+    sentencia = _sentencia(consulta).order_by(None)
+    conexion = db.session.connection()
+    if conexion.dialect.name != "postgresql":
+        return contar_exacto(consulta)
+    compilada = sentencia.compile(dialect=conexion.dialect)
+    plan = conexion.exec_driver_sql(
+        "EXPLAIN (FORMAT JSON) " + str(compilada), compilada.params
+    ).scalar()
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+def paginar_keyset(consulta, orden, por_pagina=10, cursor=None, total=None):
+    """
+    Devuelve una `PaginaKeyset` de `consulta` (Query o select()) ordenada por
+    `orden`. `total` puede ser None (sin conteo), "exacto" o "estimado".
+    """
+    if total is not None and total not in MODOS_TOTAL:
+        raise ValueError(f"Modo de total no válido: {total}")
+    columnas = _columnas_orden(orden)
+    hacia_atras, filtro = False, None
+    if cursor:
+        valores, direccion = decodificar_cursor(cursor, columnas)
+        hacia_atras = direccion == ANTERIOR
+        filtro = _predicado(columnas, valores, hacia_atras)
+
+    filas = _ejecutar(consulta, filtro, _ordenar(columnas, hacia_atras), por_pagina + 1)
+    hay_mas = len(filas) > por_pagina
+    filas = filas[:por_pagina]
+    if hacia_atras:
+        filas.reverse()
+
+    def valores_de(fila):
+        return [getattr(fila, columna.key) for columna, _ in columnas]
+
+    siguiente = anterior = None
+    if filas and hacia_atras:
+        siguiente = codificar_cursor(valores_de(filas[-1]), SIGUIENTE)
+        if hay_mas:
+            anterior = codificar_cursor(valores_de(filas[0]), ANTERIOR)
+    elif filas:
+        if hay_mas:
+            siguiente = codificar_cursor(valores_de(filas[-1]), SIGUIENTE)
+        if cursor:
+            # Se llegó desde otra página: hay filas antes de esta
+            anterior = codificar_cursor(valores_de(filas[0]), ANTERIOR)
+
+    conteo = None
+    if total == "exacto":
+        conteo = contar_exacto(consulta)
+    elif total == "estimado":
+        conteo = contar_estimado(consulta)
+    return PaginaKeyset(filas, por_pagina, siguiente, anterior, conteo)
@@ -0,0 +1,189 @@
+# app/utils/rate_limit.py
+# Limitador de tasa GCRA (Generic Cell Rate Algorithm) compartido vía Redis.
+#
+# Cada regla admite `limite` peticiones por `periodo` segundos y por clave (IP,
+# correo, ...). El estado de cada clave es un único timestamp (TAT) y todas las reglas
+# de una petición se evalúan y actualizan de forma atómica en un solo script Lua.
+# Si Redis no está disponible se usa un almacén en memoria por worker. Un error del
+# propio script (ResponseError) también cae al almacén en memoria, pero se registra
+# en el log: es un defecto, no una caída de Redis.
+#
+# La clave "ip" es `request.remote_addr`: detrás de un proxy debe configurarse
+# PROXY_SALTOS para que sea la IP del cliente y no la del proxy.
+#
+# Uso:
+#     @auth_bp.route("/login", methods=["POST"])
+#     @limitar_tasa("login", ip="RATELIMIT_LOGIN_IP", correo="RATELIMIT_LOGIN_CORREO")
+#     def login(): ...
+import math
+import threading
+import time
+from functools import wraps
+
+from flask import current_app, jsonify, request
+from redis.exceptions import RedisError, ResponseError
+
+from app.extensions import redis_client
+from app.utils.metrics import metricas
+
+PREFIJO_REDIS = "ratelimit:"
+PREFIJO_METRICAS = "rate_limit."
+
+# KEYS: claves a limitar; ARGV: pares (intervalo_ms, periodo_ms) por clave.
+# Devuelve 0 si se admite la petición o los milisegundos de espera si se rechaza.
+SCRIPT_GCRA = """
+if redis.replicate_commands then redis.replicate_commands() end
+local t = redis.call('TIME')
+local ahora = tonumber(t[1]) * 1000 + math.floor(tonumber(t[2]) / 1000)
+local espera = 0
+local nuevos = {}
+for i, clave in ipairs(KEYS) do
+  local intervalo = tonumber(ARGV[2 * i - 1])
+  local periodo = tonumber(ARGV[2 * i])
+  local tat = tonumber(redis.call('GET', clave) or ahora)
+  if tat < ahora then tat = ahora end
+  nuevos[i] = tat + intervalo
+  local exceso = nuevos[i] - ahora - periodo
+  if exceso > espera then espera = exceso end
+end
+if espera > 0 then return espera end
+for i, clave in ipairs(KEYS) do
+  redis.call('SET', clave, nuevos[i], 'PX', nuevos[i] - ahora)
+end
+return 0
+"""
+
+
+def clave_ip():
+    return request.remote_addr
+
+
+def clave_correo():
+    datos = request.get_json(silent=True) or {}
+    correo = datos.get("correo_electronico")
+    if not isinstance(correo, str) or not correo.strip():
+        return None
+    return correo.strip().lower()
+
+
+# Extractores disponibles para las reglas del decorador
+EXTRACTORES = {"ip": clave_ip, "correo": clave_correo}
+
+
+class AlmacenMemoria:
+    """Implementación GCRA local, usada cuando Redis no responde."""
+
+    def __init__(self):
+        self._tat = {}
+        self._lock = threading.Lock()
+
+    def evaluar(self, reglas):
+        ahora = time.monotonic() * 1000
+        with self._lock:
+            espera = 0
+            nuevos = []
+            for clave, intervalo, periodo in reglas:
+                tat = max(self._tat.get(clave, ahora), ahora)
+                nuevo = tat + intervalo
+                espera = max(espera, nuevo - ahora - periodo)
+                nuevos.append((clave, nuevo))
+            if espera > 0:
+                return espera
+            for clave, nuevo in nuevos:
+                self._tat[clave] = nuevo
+            if len(self._tat) > 50000:
+                self._purgar(ahora)
+            return 0
+
+    def _purgar(self, ahora):
+        self._tat = {clave: tat for clave, tat in self._tat.items() if tat > ahora}
+
+    def limpiar(self):
+        with self._lock:
+            self._tat.clear()
+
+
+_memoria = AlmacenMemoria()
+_script = None
+
+
+def init_app(app):
+    global _script
+    _memoria.limpiar()
+    # Siempre se registra de nuevo: el script queda ligado al cliente de esta app
+    _script = redis_client.register_script(SCRIPT_GCRA)
+
+
+def _evaluar_redis(reglas):
+    argumentos = []
+    for _, intervalo, periodo in reglas:
+        argumentos.extend([int(math.ceil(intervalo)), int(periodo)])
+    return int(_script(keys=[clave for clave, _, _ in reglas], args=argumentos))
+
+
+def _resolver_limite(valor):
+    if isinstance(valor, str):
+        valor = current_app.config.get(valor)
+    return valor
+
+
+def limitar_tasa(nombre, **reglas):
+    """
+    Decorador que rechaza con 429 las peticiones que exceden alguna de las reglas.
+
+    Cada regla es `extractor=(limite, periodo_segundos)` o el nombre de una clave de
+    configuración con esa tupla. Los extractores que devuelven None se omiten.
+    """
+
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not current_app.config.get("RATELIMIT_HABILITADO", True):
+                return fn(*args, **kwargs)
+
+            evaluar = []
+            for extractor, valor in reglas.items():
+                limite = _resolver_limite(valor)
+                clave = EXTRACTORES[extractor]()
+                if not limite or clave is None:
+                    continue
+                maximo, periodo = limite
+                periodo_ms = periodo * 1000
+                evaluar.append(
+                    (
+                        f"{PREFIJO_REDIS}{nombre}:{extractor}:{clave}",
+                        periodo_ms / maximo,
+                        periodo_ms,
+                    )
+                )
+
+            if evaluar:
+                try:
+                    espera_ms = _evaluar_redis(evaluar)
+                except ResponseError:
+                    metricas.incrementar(PREFIJO_METRICAS + "errores_script")
+                    current_app.logger.exception("Error en el script GCRA de Redis")
+                    espera_ms = _memoria.evaluar(evaluar)
+                except RedisError:
+                    metricas.incrementar(PREFIJO_METRICAS + "fallback_memoria")
+                    espera_ms = _memoria.evaluar(evaluar)
+
+                if espera_ms > 0:
+                    metricas.incrementar(PREFIJO_METRICAS + f"rechazos.{nombre}")
+                    respuesta = jsonify(
+                        {
+                            "error": "Demasiadas solicitudes, intente más tarde",
+                            "status": 429,
+                        }
+                    )
+                    respuesta.status_code = 429
+                    respuesta.headers["Retry-After"] = str(
+                        max(1, math.ceil(espera_ms / 1000))
+                    )
+                    return respuesta
+
+            return fn(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Benchmark del motor de análisis de ítems: filas de respuestas por segundo.
+
+Genera respuestas sintéticas (modelo logístico de un parámetro) por bloques, ya
+ordenadas por estudiante como las entrega la consulta, y las pasa por
+`AcumuladorItems`. Mide solo el cálculo; la lectura de la BD depende del motor.
+
+Uso:
+    python benchmarks/bench_analisis_items.py [--respuestas 10000000]
+        [--preguntas 40] [--opciones 4] [--bloque 100000]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.analisis_items_service import AcumuladorItems  # noqa: E402
+
+
+def generar_bloques(estudiantes, preguntas, opciones, filas_por_bloque, semilla=1):
+    azar = np.random.default_rng(semilla)
+    dificultad = np.linspace(-2, 2, preguntas)
+    por_bloque = max(filas_por_bloque // preguntas, 1)
+    for inicio in range(0, estudiantes, por_bloque):
+        n = min(por_bloque, estudiantes - inicio)
+        habilidad = azar.normal(size=(n, 1))
+        correcta = azar.random((n, preguntas)) < 1 / (
+            1 + np.exp(dificultad - habilidad)
+        )
+        elegida = np.where(correcta, 0, azar.integers(1, opciones, size=(n, preguntas)))
+        bloque = np.empty((n * preguntas, 4))
+        bloque[:, 0] = np.repeat(np.arange(inicio + 1, inicio + n + 1), preguntas)
+        bloque[:, 1] = np.tile(np.arange(1, preguntas + 1), n)
+        bloque[:, 2] = bloque[:, 1] * opciones + elegida.ravel()
+        bloque[:, 3] = correcta.ravel()
+        yield bloque
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--respuestas", type=int, default=10_000_000)
+    parser.add_argument("--preguntas", type=int, default=40)
+    parser.add_argument("--opciones", type=int, default=4)
+    parser.add_argument("--bloque", type=int, default=100_000)
+    args = parser.parse_args()
+
+    estudiantes = args.respuestas // args.preguntas
+    acumulador = AcumuladorItems(
+        {p: 1.0 for p in range(1, args.preguntas + 1)},
+        {
+            p * args.opciones + o: (p, o == 0)
+            for p in range(1, args.preguntas + 1)
+            for o in range(args.opciones)
+        },
+    )
+    print(
+        f"{estudiantes * args.preguntas} respuestas: {estudiantes} estudiantes × "
+        f"{args.preguntas} preguntas, bloques de {args.bloque} filas"
+    )
+
+    calculo = 0.0
+    inicio_total = time.perf_counter()
+    for bloque in generar_bloques(
+        estudiantes, args.preguntas, args.opciones, args.bloque
+    ):
+        inicio = time.perf_counter()
+        acumulador.agregar(bloque)
+        calculo += time.perf_counter() - inicio
+    inicio = time.perf_counter()
+    resultado = acumulador.finalizar()
+    calculo += time.perf_counter() - inicio
+    total = time.perf_counter() - inicio_total
+
+    filas = estudiantes * args.preguntas
+    print(f"examinados={resultado['examinados']} alfa={resultado['alfa_cronbach']}")
+    print(f"cálculo: {calculo:.2f} s ({filas / calculo:,.0f} filas/s)")
+    print(f"total con generación: {total:.2f} s")
+
+
+if __name__ == "__main__":
+    main()
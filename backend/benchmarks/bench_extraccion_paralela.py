@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Benchmark de la extracción de texto de PDF: secuencial frente a rangos de páginas
+en un pool de procesos, para distintos números de procesos.
+
+Genera un PDF sintético con texto denso en cada página y mide solo la extracción
+(`paginas_pdf` / `paginas_pdf_paralelo`); la escritura en la BD es la misma en
+ambos casos. La aceleración está limitada por los núcleos disponibles.
+
+Uso:
+    python benchmarks/bench_extraccion_paralela.py [--paginas 600]
+        [--por-rango 50] [--procesos 1 2 4 8]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import fitz
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.extraccion_texto_service import (  # noqa: E402
+    paginas_pdf,
+    paginas_pdf_paralelo,
+)
+
+PARRAFO = (
+    "La fotosíntesis es el proceso mediante el cual las plantas transforman la "
+    "energía luminosa en energía química. "
+) * 6
+
+
+def generar_pdf(ruta, paginas):
+    documento = fitz.open()
+    for numero in range(paginas):
+        pagina = documento.new_page()
+        pagina.insert_textbox(
+            fitz.Rect(50, 50, 550, 800), f"Página {numero + 1}\n" + PARRAFO * 4
+        )
+    documento.save(ruta)
+    documento.close()
+
+
+def medir(generador):
+    inicio = time.perf_counter()
+    caracteres = sum(len(texto) for _, texto in generador)
+    return time.perf_counter() - inicio, caracteres
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--paginas", type=int, default=600)
+    parser.add_argument("--por-rango", type=int, default=50)
+    parser.add_argument("--procesos", type=int, nargs="+", default=[1, 2, 4, 8])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directorio:
+        ruta = os.path.join(directorio, "libro.pdf")
+        generar_pdf(ruta, args.paginas)
+        print(
+            f"{args.paginas} páginas, rangos de {args.por_rango}, "
+            f"{os.cpu_count()} núcleos disponibles"
+        )
+
+        base, caracteres = medir(paginas_pdf(ruta))
+        print(f"secuencial: {base:.2f} s ({args.paginas / base:,.0f} páginas/s)")
+        for procesos in args.procesos:
+            segundos, extraidos = medir(
+                paginas_pdf_paralelo(ruta, 0, args.paginas, procesos, args.por_rango)
+            )
+            assert extraidos == caracteres
+            print(
+                f"{procesos} procesos: {segundos:.2f} s "
+                f"({args.paginas / segundos:,.0f} páginas/s, "
+                f"aceleración {base / segundos:.2f}x)"
+            )
+
+
+if __name__ == "__main__":
+    main()
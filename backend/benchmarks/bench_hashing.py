@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Benchmark del servicio de hashing: inicios de sesión por segundo y por núcleo.
+
+Simula una ráfaga de logins (verificaciones bcrypt) con distintos tamaños de pool.
+
+Uso:
+    python benchmarks/bench_hashing.py [--rondas 12] [--logins 200]
+"""
+
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.hashing_service import ServicioHashing, _generar_hash  # noqa: E402
+
+
+def medir(num_procesos, rondas, logins):
+    servicio = ServicioHashing()
+    # Cola sin límite efectivo: se mide capacidad, no admisión
+    servicio.configurar(rondas=rondas, num_procesos=num_procesos, max_en_cola=logins)
+    hash_guardado = _generar_hash("Secreto1!", rondas)
+
+    # Calentar el pool para no medir el arranque de los procesos
+    servicio.verificar(hash_guardado, "Secreto1!")
+
+    inicio = time.perf_counter()
+    # Hilos que simulan peticiones concurrentes del worker HTTP
+    with ThreadPoolExecutor(max_workers=max(num_procesos * 2, 1)) as hilos:
+        resultados = list(
+            hilos.map(
+                lambda _: servicio.verificar(hash_guardado, "Secreto1!"),
+                range(logins),
+            )
+        )
+    duracion = time.perf_counter() - inicio
+    assert all(resultados)
+    return logins / duracion
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rondas", type=int, default=12)
+    parser.add_argument("--logins", type=int, default=200)
+    args = parser.parse_args()
+
+    nucleos = os.cpu_count() or 1
+    print(f"bcrypt rondas={args.rondas}, logins={args.logins}, núcleos={nucleos}")
+    print(f"{'procesos':>8} {'logins/s':>10} {'logins/s/núcleo':>16}")
+    procesos = 1
+    while procesos <= nucleos:
+        por_segundo = medir(procesos, args.rondas, args.logins)
+        print(f"{procesos:>8} {por_segundo:>10.1f} {por_segundo / procesos:>16.1f}")
+        procesos *= 2
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Benchmark de la caché de JWT verificados: tiempo de decodificación por petición.
+
+Decodifica repetidamente el mismo access token (como hace la SPA al consultar
+varios endpoints) con el JWTManager estándar y con JWTManagerConCache.
+
+Uso:
+    python benchmarks/bench_jwt_cache.py [--peticiones 20000]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask  # noqa: E402
+from flask_jwt_extended import JWTManager, create_access_token  # noqa: E402
+from flask_jwt_extended.utils import decode_token  # noqa: E402
+
+from app.auth.jwt_cache import JWTManagerConCache  # noqa: E402
+
+
+def medir(clase_manager, peticiones):
+    app = Flask(__name__)
+    app.config["JWT_SECRET_KEY"] = "benchmark"
+    clase_manager(app)
+
+    with app.test_request_context():
+        token = create_access_token(
+            identity=1, additional_claims={"rol": "alumno", "activo": True, "tv": 0}
+        )
+        decode_token(token)  # calentamiento
+        inicio = time.perf_counter()
+        for _ in range(peticiones):
+            decode_token(token)
+        duracion = time.perf_counter() - inicio
+    return duracion / peticiones * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--peticiones", type=int, default=20000)
+    args = parser.parse_args()
+
+    sin_cache = medir(JWTManager, args.peticiones)
+    con_cache = medir(JWTManagerConCache, args.peticiones)
+    print(f"peticiones={args.peticiones}")
+    print(f"{'manager':>20} {'µs/decodificación':>18}")
+    print(f"{'JWTManager':>20} {sin_cache:>18.2f}")
+    print(f"{'JWTManagerConCache':>20} {con_cache:>18.2f}")
+    print(f"aceleración: x{sin_cache / con_cache:.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -60,7 +60,150 @@ def create_admin(nombre, email, password):
     click.echo(f"Admin {email} creado")
 
 
+@user_cli.command("import")
+@click.argument("archivo_csv", type=click.File("r", encoding="utf-8-sig"))
+@click.option(
+    "--errores",
+    type=click.File("w", encoding="utf-8"),
+    default=None,
+    help="CSV donde se escriben las filas rechazadas y su motivo",
+)
+@click.option("--lote", default=1000, show_default=True, help="Filas por lote")
+@click.option(
+    "--procesos",
+    type=int,
+    default=None,
+    help="Procesos para hashear contraseñas (por defecto, todos los núcleos)",
+)
+@click.option(
+    "--rondas",
+    type=int,
+    default=None,
+    help="Costo bcrypt (por defecto BCRYPT_LOG_ROUNDS)",
+)
+@click.option(
+    "--rondas-reducidas",
+    is_flag=True,
+    help="Hashea con USUARIOS_IMPORTACION_RONDAS; el costo se eleva al iniciar sesión",
+)
+@click.option("--rol", default="estudiante", show_default=True)
+def import_users(archivo_csv, errores, lote, procesos, rondas, rondas_reducidas, rol):
+    """Importa usuarios en bloque desde un CSV."""
+    from app.services.importacion_usuarios_service import ImportadorUsuarios
+
+    def progreso(resumen):
+        click.echo(
+            f"  {resumen.leidas} filas leídas, {resumen.creadas} creadas, "
+            f"{resumen.errores} errores ({resumen.filas_por_segundo:.0f} filas/s)"
+        )
+
+    if rondas is None and rondas_reducidas:
+        rondas = app.config.get("USUARIOS_IMPORTACION_RONDAS")
+    importador = ImportadorUsuarios(
+        tamano_lote=lote,
+        procesos=procesos,
+        rondas=rondas,
+        rol_por_defecto=rol,
+        progreso=progreso,
+    )
+    try:
+        resumen = importador.importar(archivo_csv, archivo_errores=errores)
+    except ValueError as error:
+        raise click.ClickException(str(error))
+    click.echo(
+        f"Importación terminada en {resumen.segundos:.1f} s: "
+        f"{resumen.creadas} usuarios creados, {resumen.errores} filas con errores"
+    )
+
+
+# Grupo de comandos para los contadores desnormalizados
+contadores_cli = AppGroup("contadores", help="Mantenimiento de contadores")
+
+
+@contadores_cli.command("reparar")
+def reparar():
+    """Recalcula total_preguntas, total_lecciones, total_modulos, etc."""
+    from app.models.contadores import reparar_contadores
+
+    for columna, filas in reparar_contadores().items():
+        click.echo(f"{columna}: {filas} filas corregidas")
+
+
+# Grupo de comandos para las estadísticas por clase
+estadisticas_cli = AppGroup("estadisticas", help="Mantenimiento de estadísticas")
+
+
+@estadisticas_cli.command("recalcular")
+@click.option("--clase", "clases", multiple=True, type=int, help="ID de clase")
+def recalcular(clases):
+    """Reconstruye los acumulados de estadísticas (programar de forma periódica)."""
+    from app.models.estadisticas import recalcular_estadisticas
+
+    resumen = recalcular_estadisticas(list(clases) or None)
+    click.echo(
+        f"{resumen['recalculadas']} clases recalculadas: "
+        f"{resumen['creadas']} creadas, {resumen['corregidas']} con deriva corregida"
+    )
+
+
+# Grupo de comandos para el análisis de ítems
+analisis_cli = AppGroup("analisis", help="Análisis de ítems de evaluaciones")
+
+
+@analisis_cli.command("items")
+@click.option("--evaluacion", "evaluaciones", multiple=True, type=int)
+@click.option("--bloque", type=int, default=None, help="Filas leídas por bloque")
+def analizar_items(evaluaciones, bloque):
+    """Dificultad, discriminación, distractores y alfa (ejecución nocturna)."""
+    from app.services.analisis_items_service import analizar_evaluaciones
+
+    total = analizar_evaluaciones(list(evaluaciones) or None, tamano_bloque=bloque)
+    click.echo(f"{total} evaluaciones analizadas")
+
+
+# Grupo de comandos para las sesiones de examen en curso
+examenes_cli = AppGroup("examenes", help="Sesiones de examen en curso")
+
+
+@examenes_cli.command("enviar-vencidas")
+def enviar_vencidas():
+    """Envía las sesiones cuyo tiempo límite terminó (programar cada minuto)."""
+    from app.services.sesion_examen_service import enviar_vencidas
+
+    click.echo(f"{enviar_vencidas()} intentos enviados automáticamente")
+
+
+# Grupo de comandos para los documentos subidos
+documentos_cli = AppGroup("documentos", help="Documentos subidos por docentes")
+
+
+@documentos_cli.command("limpiar-cargas")
+def limpiar_cargas():
+    """Elimina los archivos parciales de cargas reanudables abandonadas."""
+    from app.services.carga_reanudable_service import limpiar_cargas_abandonadas
+
+    click.echo(f"{limpiar_cargas_abandonadas()} cargas abandonadas eliminadas")
+
+
+# Grupo de comandos para el índice de búsqueda
+busqueda_cli = AppGroup("busqueda", help="Índice de búsqueda de texto completo")
+
+
+@busqueda_cli.command("reindexar")
+def reindexar():
+    """Reconstruye el índice de búsqueda desde lecciones y documentos."""
+    from app.models.indexacion import reconstruir_indice
+
+    click.echo(f"{reconstruir_indice()} filas indexadas")
+
+
 app.cli.add_command(user_cli)
+app.cli.add_command(contadores_cli)
+app.cli.add_command(estadisticas_cli)
+app.cli.add_command(analisis_cli)
+app.cli.add_command(examenes_cli)
+app.cli.add_command(documentos_cli)
+app.cli.add_command(busqueda_cli)
 
 if __name__ == "__main__":
     # Este bloque solo se ejecuta si corres 'python manage.py' directamente.
@@ -0,0 +1,88 @@
+# Fixtures compartidas para las pruebas del backend
+import pytest
+from sqlalchemy import event
+
+from app import create_app
+from app.extensions import db as _db
+from app.models.usuario import Usuario
+
+PASSWORD_PRUEBAS = "Secreto1!"
+
+
+@pytest.fixture
+def app():
+    app = create_app("testing")
+    with app.app_context():
+        _db.create_all()
+        yield app
+        _db.session.remove()
+        _db.drop_all()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def db(app):
+    return _db
+
+
+@pytest.fixture
+def contar_consultas(db):
+    """
+    Registra las sentencias SQL que se ejecutan desde la llamada. Por defecto
+    guarda el texto de cada sentencia; `extraer(sentencia, parametros, varias)`
+    permite guardar otra cosa. Los listeners se retiran al terminar la prueba.
+    """
+    escuchas = []
+
+    def empezar(extraer=None):
+        sentencias = []
+
+        def escuchar(conn, cursor, sentencia, parametros, contexto, varias):
+            if extraer is None:
+                sentencias.append(sentencia)
+            else:
+                sentencias.append(extraer(sentencia, parametros, varias))
+
+        event.listen(db.engine, "before_cursor_execute", escuchar)
+        escuchas.append(escuchar)
+        return sentencias
+
+    yield empezar
+    for escuchar in escuchas:
+        event.remove(db.engine, "before_cursor_execute", escuchar)
+
+
+@pytest.fixture
+def crear_usuario(db):
+    """Crea y confirma un usuario con la contraseña de pruebas."""
+
+    def crear(correo="a@b.com", rol="estudiante", nombre="Ana Prueba"):
+        usuario = Usuario(nombre_completo=nombre, correo_electronico=correo, rol=rol)
+        usuario.set_password(PASSWORD_PRUEBAS)
+        db.session.add(usuario)
+        db.session.commit()
+        return usuario
+
+    return crear
+
+
+@pytest.fixture
+def auth_headers(client, crear_usuario):
+    """
+    Inicia sesión por /api/auth/login y devuelve la cabecera Authorization. Si no
+    existe un usuario con ese correo, lo crea con el rol indicado.
+    """
+
+    def cabeceras(rol="estudiante", correo="a@b.com"):
+        if Usuario.query.filter_by(correo_electronico=correo).first() is None:
+            crear_usuario(correo, rol)
+        credenciales = {"correo_electronico": correo, "password": PASSWORD_PRUEBAS}
+        respuesta = client.post("/api/auth/login", json=credenciales)
+        assert respuesta.status_code == 200
+        return {"Authorization": f"Bearer {respuesta.get_json()['access_token']}"}
+
+    return cabeceras
@@ -0,0 +1,172 @@
+# TEST: Pruebas unitarias para la deduplicación de archivos por contenido
+import hashlib
+import io
+import os
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.models import ArchivoCargado, Usuario
+from app.services import almacen_archivos_service
+from app.tasks import document_processing
+from app.tasks.document_processing import extraer_texto_archivo
+
+CONTENIDO = ("Libro de texto gratuito de la SEP. " * 500).encode("utf-8")
+
+
+@pytest.fixture
+def encolados(app, tmp_path, monkeypatch):
+    app.config["UPLOAD_FOLDER"] = str(tmp_path)
+    lista = []
+    monkeypatch.setattr(extraer_texto_archivo, "delay", lista.append)
+    return lista
+
+
+def _subir(client, cabeceras, nombre, contenido=CONTENIDO):
+    datos = {"file": (io.BytesIO(contenido), nombre, "text/plain")}
+    return client.post(
+        "/api/v1/documents/upload",
+        data=datos,
+        headers=cabeceras,
+        content_type="multipart/form-data",
+    )
+
+
+def _en_curso(db, archivo_id, hace=0):
+    """Marca la extracción del archivo como en curso, con su último avance."""
+    archivo = db.session.get(ArchivoCargado, archivo_id)
+    archivo.estado_procesamiento_texto = "procesando"
+    archivo.fecha_progreso = datetime.utcnow() - timedelta(seconds=hace)
+    db.session.commit()
+
+
+def _archivos_en(carpeta):
+    return [
+        os.path.join(raiz, nombre)
+        for raiz, _, nombres in os.walk(carpeta)
+        for nombre in nombres
+    ]
+
+
+def test_subidas_identicas_comparten_contenido_y_texto(
+    app, client, db, tmp_path, encolados, auth_headers
+):
+    cabeceras = auth_headers(rol="docente")
+    primera = _subir(client, cabeceras, "libro.txt")
+    assert primera.status_code == 201
+    datos = primera.get_json()
+    assert datos["hash_sha256"] == hashlib.sha256(CONTENIDO).hexdigest()
+    assert encolados == [datos["id"]]
+
+    # Mientras la primera se extrae, la copia queda pendiente y no se encola
+    _en_curso(db, datos["id"])
+    segunda = _subir(client, cabeceras, "copia.txt").get_json()
+    assert encolados == [datos["id"]]
+    assert segunda["ruta_almacenamiento"] == datos["ruta_almacenamiento"]
+    assert segunda["estado_procesamiento_texto"] == "pendiente"
+    assert _archivos_en(tmp_path / "contenido") == [datos["ruta_almacenamiento"]]
+
+    # Al terminar la extracción, el texto se copia a la fila pendiente
+    extraer_texto_archivo(datos["id"])
+    copia = db.session.get(ArchivoCargado, segunda["id"])
+    assert copia.estado_procesamiento_texto == "procesado"
+    assert "".join(copia.iterar_texto()) == CONTENIDO.decode("utf-8")
+
+    # Con el texto ya extraído, una nueva copia sale procesada de inmediato
+    tercera = _subir(client, cabeceras, "otra.txt").get_json()
+    assert tercera["estado_procesamiento_texto"] == "procesado"
+    assert encolados == [datos["id"]]
+    assert _archivos_en(tmp_path / "tmp") == []
+
+
+def test_limite_de_tamano_durante_la_copia(
+    app, client, db, tmp_path, encolados, auth_headers
+):
+    cabeceras = auth_headers(rol="docente")
+    app.config["MAX_UPLOAD_SIZE"] = 1000
+    respuesta = _subir(client, cabeceras, "grande.txt")
+    assert respuesta.status_code == 400
+    assert ArchivoCargado.query.count() == 0
+    assert _archivos_en(tmp_path) == []
+    assert encolados == []
+
+
+def test_fallo_de_extraccion_reasigna_a_una_copia(app, db, tmp_path, encolados):
+    usuario = Usuario(nombre_completo="Docente", correo_electronico="d@b.com")
+    usuario.set_password("Secreto1!")
+    db.session.add(usuario)
+    db.session.commit()
+    hash_sha256, tamano, ruta = almacen_archivos_service.guardar_contenido(
+        io.BytesIO(CONTENIDO), 10**6
+    )
+    original, requiere = almacen_archivos_service.registrar_archivo(
+        "a.txt", "text/plain", hash_sha256, tamano, ruta, usuario.id
+    )
+    _en_curso(db, original.id)
+    copia, requiere_copia = almacen_archivos_service.registrar_archivo(
+        "b.txt", "text/plain", hash_sha256, tamano, ruta, usuario.id
+    )
+    assert requiere and not requiere_copia
+
+    document_processing._marcar_error(original.id, RuntimeError("PDF dañado"))
+    assert encolados == [copia.id]
+
+
+def test_no_espera_extracciones_detenidas(app, db, tmp_path, encolados):
+    usuario = Usuario(nombre_completo="Docente", correo_electronico="d@b.com")
+    usuario.set_password("Secreto1!")
+    db.session.add(usuario)
+    db.session.commit()
+    hash_sha256, tamano, ruta = almacen_archivos_service.guardar_contenido(
+        io.BytesIO(CONTENIDO), 10**6
+    )
+
+    def registrar(nombre):
+        return almacen_archivos_service.registrar_archivo(
+            nombre, "text/plain", hash_sha256, tamano, ruta, usuario.id
+        )
+
+    # Pendiente (su tarea pudo perderse) o procesando sin avance reciente: la
+    # nueva subida extrae por su cuenta
+    detenida, _ = registrar("a.txt")
+    esperando, requiere = registrar("b.txt")
+    assert requiere
+    _en_curso(db, detenida.id, hace=3600)
+    nueva, requiere = registrar("c.txt")
+    assert requiere
+
+    # Su extracción completa también las filas que se habían quedado pendientes
+    extraer_texto_archivo(nueva.id)
+    db.session.refresh(esperando)
+    assert esperando.estado_procesamiento_texto == "procesado"
+    assert "".join(esperando.iterar_texto()) == CONTENIDO.decode("utf-8")
+
+
+def test_fallo_antes_del_commit_de_la_copia(app, db, tmp_path, encolados, monkeypatch):
+    usuario = Usuario(nombre_completo="Docente", correo_electronico="d@b.com")
+    usuario.set_password("Secreto1!")
+    db.session.add(usuario)
+    db.session.commit()
+    hash_sha256, tamano, ruta = almacen_archivos_service.guardar_contenido(
+        io.BytesIO(CONTENIDO), 10**6
+    )
+    original, _ = almacen_archivos_service.registrar_archivo(
+        "a.txt", "text/plain", hash_sha256, tamano, ruta, usuario.id
+    )
+    _en_curso(db, original.id)
+
+    # La extracción de `original` falla justo después de elegirla como previa
+    commit = db.session.commit
+
+    def commit_y_fallo():
+        commit()
+        monkeypatch.setattr(db.session, "commit", commit)
+        document_processing._marcar_error(original.id, RuntimeError("PDF dañado"))
+
+    monkeypatch.setattr(db.session, "commit", commit_y_fallo)
+    copia, requiere = almacen_archivos_service.registrar_archivo(
+        "b.txt", "text/plain", hash_sha256, tamano, ruta, usuario.id
+    )
+    # `_marcar_error` ya vio la copia y la encoló: no se encola otra vez
+    assert not requiere and encolados == [copia.id]
+    assert copia.estado_procesamiento_texto == "procesando"
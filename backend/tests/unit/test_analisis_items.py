@@ -0,0 +1,140 @@
+# TEST: Pruebas unitarias para el motor de análisis de ítems
+import numpy as np
+import pytest
+
+from app.models import AnalisisEvaluacion, Evaluacion, OpcionRespuesta, Pregunta
+from app.models import Clase, InscripcionClase, Leccion, Modulo, Usuario
+from app.services.analisis_items_service import AcumuladorItems, analizar_evaluacion
+from app.services.calificacion_service import enviar_intento
+
+
+def _datos_sinteticos(estudiantes=60, preguntas=5, opciones=3, semilla=7):
+    """Respuestas (estudiante, pregunta, opción, puntos) y la matriz de puntos."""
+    azar = np.random.default_rng(semilla)
+    habilidad = azar.normal(size=estudiantes)
+    dificultad = np.linspace(-1, 1, preguntas)
+    correcta = azar.random((estudiantes, preguntas)) < 1 / (
+        1 + np.exp(dificultad - habilidad[:, None])
+    )
+    elegida = np.where(
+        correcta, 0, azar.integers(1, opciones, size=(estudiantes, preguntas))
+    )
+    filas = []
+    for e in range(estudiantes):
+        for p in range(preguntas):
+            filas.append((e + 1, p + 1, (p + 1) * 10 + elegida[e, p], correcta[e, p]))
+    preguntas_clave = {p + 1: 1.0 for p in range(preguntas)}
+    opciones_clave = {
+        (p + 1) * 10 + o: (p + 1, o == 0)
+        for p in range(preguntas)
+        for o in range(opciones)
+    }
+    return (
+        np.array(filas, dtype=np.float64),
+        correcta.astype(float),
+        preguntas_clave,
+        opciones_clave,
+    )
+
+
+def test_coincide_con_el_calculo_directo(app):
+    filas, matriz, preguntas, opciones = _datos_sinteticos()
+    acumulador = AcumuladorItems(preguntas, opciones)
+    acumulador.agregar(filas)
+    resultado = acumulador.finalizar()
+
+    totales = matriz.sum(axis=1)
+    k = matriz.shape[1]
+    alfa = k / (k - 1) * (1 - matriz.var(axis=0).sum() / totales.var())
+    assert resultado["examinados"] == 60
+    assert resultado["alfa_cronbach"] == pytest.approx(alfa, abs=1e-4)
+    for j, pregunta in enumerate(resultado["preguntas"]):
+        resto = totales - matriz[:, j]
+        esperado = np.corrcoef(matriz[:, j], resto)[0, 1]
+        assert pregunta["dificultad"] == pytest.approx(matriz[:, j].mean(), abs=1e-4)
+        assert pregunta["discriminacion"] == pytest.approx(esperado, abs=1e-4)
+        assert pregunta["omitidas"] == 0
+        proporciones = sum(o["proporcion"] for o in pregunta["opciones"])
+        assert proporciones == pytest.approx(1.0, abs=1e-3)
+        correcta = next(o for o in pregunta["opciones"] if o["es_correcta"])
+        assert correcta["proporcion"] == pytest.approx(matriz[:, j].mean(), abs=1e-4)
+
+
+def test_resultado_no_depende_del_tamano_de_bloque(app):
+    filas, _, preguntas, opciones = _datos_sinteticos()
+    completo = AcumuladorItems(preguntas, opciones)
+    completo.agregar(filas)
+    por_bloques = AcumuladorItems(preguntas, opciones)
+    # Bloques de 7 filas: los estudiantes quedan partidos entre bloques
+    for inicio in range(0, len(filas), 7):
+        por_bloques.agregar(filas[inicio : inicio + 7])
+    assert por_bloques.finalizar() == completo.finalizar()
+
+
+def test_analisis_persistido_desde_respuestas(app, client, db):
+    evaluacion = Evaluacion(titulo="Examen", intentos_permitidos=2)
+    for p in range(3):
+        pregunta = Pregunta(
+            enunciado="¿?", tipo="opcion_multiple", orden=p, evaluacion=evaluacion
+        )
+        db.session.add_all(
+            OpcionRespuesta(texto=f"{o}", es_correcta=o == 0, pregunta=pregunta)
+            for o in range(3)
+        )
+    docente = Usuario(
+        nombre_completo="Docente", correo_electronico="doc@b.com", rol="docente"
+    )
+    docente.set_password("Secreto1!")
+    clase = Clase(nombre="Álgebra", docente=docente)
+    modulo = Modulo(titulo="Módulo 1", orden=1, clase=clase)
+    db.session.add(
+        Leccion(
+            titulo="Examen",
+            contenido="...",
+            tipo="evaluacion",
+            orden=1,
+            modulo=modulo,
+            evaluacion=evaluacion,
+        )
+    )
+    estudiantes = []
+    for i in range(4):
+        usuario = Usuario(nombre_completo="Ana Prueba", correo_electronico=f"{i}@b.com")
+        usuario.set_password("Secreto1!")
+        estudiantes.append(usuario)
+    db.session.add_all(estudiantes)
+    db.session.flush()
+    db.session.add_all(
+        InscripcionClase(clase_id=clase.id, estudiante_id=e.id, usuario_id=e.id)
+        for e in estudiantes
+    )
+    db.session.commit()
+
+    preguntas = evaluacion.preguntas.order_by(Pregunta.id).all()
+    opciones = [p.opciones.order_by(OpcionRespuesta.id).all() for p in preguntas]
+    # Estudiante i acierta las primeras i preguntas; el resto elige la opción 1
+    for i, estudiante in enumerate(estudiantes):
+        respuestas = [
+            {
+                "pregunta_id": pregunta.id,
+                "opcion_seleccionada_id": opciones[j][0 if j < i else 1].id,
+                "tiempo_tomado": 5,
+            }
+            for j, pregunta in enumerate(preguntas)
+        ]
+        envio = {"respuestas": respuestas, "tiempo_total": 15, "intento_numero": 1}
+        enviar_intento(evaluacion.id, estudiante.id, envio)
+    evaluacion_id = evaluacion.id
+
+    analisis = analizar_evaluacion(evaluacion_id, tamano_bloque=5)
+    assert analisis.examinados == 4
+    assert [p["dificultad"] for p in analisis.preguntas] == [0.75, 0.5, 0.25]
+    assert all(p["discriminacion"] > 0 for p in analisis.preguntas)
+    distractor = analisis.preguntas[0]["opciones"][1]
+    assert distractor["proporcion"] == 0.25 and distractor["discriminacion"] < 0
+    # Patrón de Guttman perfecto: 3/2 · (1 - 0.625 / 1.25)
+    assert analisis.alfa_cronbach == pytest.approx(0.75)
+
+    # Una segunda ejecución reemplaza la fila
+    analizar_evaluacion(evaluacion_id)
+    assert AnalisisEvaluacion.query.count() == 1
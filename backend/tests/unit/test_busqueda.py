@@ -0,0 +1,202 @@
+# TEST: Pruebas unitarias para la búsqueda de texto completo
+import fitz
+from sqlalchemy.dialects import postgresql
+
+from app.models import (
+    ArchivoCargado,
+    Clase,
+    IndiceBusqueda,
+    InscripcionClase,
+    Leccion,
+    Modulo,
+    Usuario,
+)
+from app.models.indexacion import reconstruir_indice
+from app.services import busqueda_service
+from app.services.busqueda_service import buscar, consulta_fts5
+from app.tasks.document_processing import extraer_texto_archivo
+
+
+def _usuario(db, correo, rol):
+    usuario = Usuario(nombre_completo=correo, correo_electronico=correo, rol=rol)
+    usuario.set_password("Secreto1!")
+    db.session.add(usuario)
+    return usuario
+
+
+def _escenario(db):
+    docente = _usuario(db, "d@b.com", "docente")
+    otro = _usuario(db, "o@b.com", "docente")
+    alumno = _usuario(db, "a@b.com", "estudiante")
+    propia = Clase(nombre="Biología", docente=docente)
+    ajena = Clase(nombre="Química", docente=otro)
+    modulo = Modulo(titulo="Plantas", orden=1, clase=propia)
+    lejano = Modulo(titulo="Reacciones", orden=1, clase=ajena)
+    db.session.add_all(
+        [
+            Leccion(
+                titulo="La fotosíntesis",
+                contenido="Las plantas producen su alimento con luz solar.",
+                tipo="teoria",
+                orden=1,
+                modulo=modulo,
+            ),
+            Leccion(
+                titulo="Raíces",
+                contenido="Las raíces absorben agua; sin ella no hay fotosíntesis.",
+                tipo="teoria",
+                orden=2,
+                modulo=modulo,
+            ),
+            Leccion(
+                titulo="Fotosíntesis artificial",
+                contenido="Catalizadores que imitan a las hojas.",
+                tipo="teoria",
+                orden=1,
+                modulo=lejano,
+            ),
+        ]
+    )
+    db.session.commit()
+    db.session.add(
+        InscripcionClase(estudiante_id=alumno.id, usuario_id=alumno.id, clase=propia)
+    )
+    db.session.commit()
+    return docente, alumno, propia, ajena
+
+
+def test_busqueda_limitada_a_las_clases_del_usuario(app, client, db, auth_headers):
+    _, alumno, propia, ajena = _escenario(db)
+    cabeceras = auth_headers()
+
+    # Sin acentos, y el título pesa más que el contenido
+    respuesta = client.get("/api/search?q=fotosintesis", headers=cabeceras)
+    assert respuesta.status_code == 200
+    resultados = respuesta.get_json()["resultados"]
+    assert [r["titulo"] for r in resultados] == ["La fotosíntesis", "Raíces"]
+    assert {r["clase_id"] for r in resultados} == {propia.id}
+    assert "<mark>fotosíntesis</mark>" in resultados[1]["fragmento"]
+
+    # El administrador ve también la clase ajena
+    _usuario(db, "admin@b.com", "admin")
+    db.session.commit()
+    todos = buscar("fotosintesis", None, "admin")["resultados"]
+    assert {r["clase_id"] for r in todos} == {propia.id, ajena.id}
+
+    assert client.get("/api/search", headers=cabeceras).status_code == 400
+    assert client.get("/api/search?q=luz").status_code == 401
+
+
+def test_alumno_autorregistrado_puede_buscar(app, client, db, auth_headers):
+    # /register crea a los estudiantes con el rol "alumno"
+    _, alumno, propia, _ = _escenario(db)
+    alumno.rol = "alumno"
+    db.session.commit()
+
+    respuesta = client.get("/api/search?q=fotosintesis", headers=auth_headers())
+    assert respuesta.status_code == 200
+    resultados = respuesta.get_json()["resultados"]
+    assert {r["clase_id"] for r in resultados} == {propia.id}
+
+
+def test_indice_sigue_los_cambios_de_lecciones(app, db):
+    docente, _, propia, ajena = _escenario(db)
+    leccion = Leccion.query.filter_by(titulo="Raíces").one()
+
+    leccion.contenido = "Los tallos transportan la savia."
+    db.session.commit()
+    assert buscar("absorben", docente.id, "docente")["resultados"] == []
+    assert len(buscar("savia", docente.id, "docente")["resultados"]) == 1
+
+    # Mover el módulo a otra clase se lleva sus lecciones
+    modulo = leccion.modulo
+    modulo.clase_id = ajena.id
+    db.session.commit()
+    assert buscar("savia", docente.id, "docente")["resultados"] == []
+
+    db.session.delete(leccion)
+    db.session.commit()
+    assert IndiceBusqueda.query.filter_by(objeto_id=leccion.id).count() == 0
+
+
+def test_documentos_indexados_por_pagina_durante_la_extraccion(app, db, tmp_path):
+    docente, alumno, propia, _ = _escenario(db)
+    ruta = tmp_path / "guia.pdf"
+    documento = fitz.open()
+    for numero in range(12):
+        texto = "ecosistema del manglar" if numero % 4 == 0 else "ciclo del agua"
+        documento.new_page().insert_text((72, 72), texto)
+    documento.save(ruta)
+    documento.close()
+    archivo = ArchivoCargado(
+        nombre_original="guia.pdf",
+        nombre_servidor="guia.pdf",
+        tipo_mime="application/pdf",
+        tamano=ruta.stat().st_size,
+        ruta_almacenamiento=str(ruta),
+        usuario=docente,
+        clase_id=propia.id,
+    )
+    db.session.add(archivo)
+    db.session.commit()
+    app.config["DOCUMENTOS_FRAGMENTOS_POR_LOTE"] = 5
+
+    extraer_texto_archivo(archivo.id)
+    # Reextraer reemplaza las filas en lugar de duplicarlas
+    extraer_texto_archivo(archivo.id)
+    assert IndiceBusqueda.query.filter_by(tipo="archivo").count() == 12
+
+    pagina = buscar("manglar", alumno.id, "estudiante", por_pagina=2)
+    assert [r["pagina"] for r in pagina["resultados"]] == [1, 5]
+    assert pagina["tiene_siguiente"]
+    siguiente = buscar("manglar", alumno.id, "estudiante", pagina=2, por_pagina=2)
+    assert [r["pagina"] for r in siguiente["resultados"]] == [9]
+    assert not siguiente["tiene_siguiente"]
+    # Prefijo de la última palabra mientras se escribe
+    assert len(buscar("ecosis", alumno.id, "estudiante")["resultados"]) == 3
+
+    # Un archivo sin clase no aparece para nadie que no sea administrador
+    archivo.clase_id = None
+    db.session.commit()
+    assert buscar("manglar", docente.id, "docente")["resultados"] == []
+
+    db.session.delete(archivo)
+    db.session.commit()
+    assert IndiceBusqueda.query.filter_by(tipo="archivo").count() == 0
+    assert reconstruir_indice() == 3
+
+
+def test_consulta_fts5_sin_sintaxis_del_usuario():
+    assert consulta_fts5('agua" OR NEAR(x') == '"agua" "OR" "NEAR" "x"*'
+    assert consulta_fts5("  ¿?  ") is None
+
+
+def test_fragmento_escapa_el_contenido(app, db):
+    docente, alumno, propia, _ = _escenario(db)
+    leccion = Leccion.query.filter_by(titulo="Raíces").one()
+    leccion.contenido = '<img src=x onerror="alert(1)"> La fotosíntesis & el <b>agua'
+    db.session.commit()
+
+    fragmento = buscar("agua", alumno.id, "estudiante")["resultados"][0]["fragmento"]
+    assert "<img" not in fragmento and "<b>" not in fragmento
+    assert "&lt;img src=x onerror=" in fragmento and "&amp;" in fragmento
+    assert "&lt;b&gt;<mark>agua</mark>" in fragmento
+
+
+def test_consulta_postgresql():
+    clases = busqueda_service._clases_visibles(7, "docente")
+    sentencia = busqueda_service._consulta_postgresql("fotosíntesis", clases, 11, 20)
+    compilada = sentencia.compile(dialect=postgresql.dialect())
+    sql = str(compilada)
+    assert "websearch_to_tsquery" in sql and "ts_rank_cd" in sql
+    assert "indice_busqueda.documento @@" in sql
+    # El resaltado se calcula fuera de la subconsulta paginada
+    assert sql.index("ts_headline") < sql.index("LIMIT")
+    opciones = [v for v in compilada.params.values() if "StartSel" in str(v)]
+    assert opciones and "<mark>" not in opciones[0]
+
+    # Lo que devolvería ts_headline: el texto tal cual, con las marcas privadas
+    crudo = "<script>x</script> \ue000fotosíntesis\ue001"
+    assert busqueda_service._fragmento(crudo) == (
+        "&lt;script&gt;x&lt;/script&gt; <mark>fotosíntesis</mark>"
+    )
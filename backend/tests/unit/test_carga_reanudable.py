@@ -0,0 +1,110 @@
+# TEST: Pruebas unitarias para las cargas reanudables de documentos
+import hashlib
+import io
+
+import pytest
+
+from app.models import ArchivoCargado
+from app.tasks.document_processing import extraer_texto_archivo
+
+CONTENIDO = ("Apuntes de la clase de ciencias naturales. " * 300).encode("utf-8")
+BASE = "/api/v1/documents/uploads"
+
+
+@pytest.fixture
+def cabeceras(app, tmp_path, monkeypatch, auth_headers):
+    app.config["UPLOAD_FOLDER"] = str(tmp_path)
+    monkeypatch.setattr(extraer_texto_archivo, "delay", lambda archivo_id: None)
+    return auth_headers(rol="docente", correo="d@b.com")
+
+
+def _crear(client, cabeceras, tamano=len(CONTENIDO)):
+    return client.post(
+        BASE,
+        json={"nombre_original": "apuntes.txt", "tipo_mime": "text/plain"},
+        headers={**cabeceras, "Upload-Length": str(tamano)},
+    )
+
+
+def _bloque(client, cabeceras, url, desplazamiento, datos):
+    return client.patch(
+        url,
+        data=datos,
+        headers={
+            **cabeceras,
+            "Upload-Offset": str(desplazamiento),
+            "Content-Type": "application/offset+octet-stream",
+        },
+    )
+
+
+def test_carga_por_bloques_reanudable(client, cabeceras):
+    creada = _crear(client, cabeceras)
+    assert creada.status_code == 201
+    assert creada.headers["Upload-Offset"] == "0"
+    url = creada.headers["Location"]
+
+    primero = _bloque(client, cabeceras, url, 0, CONTENIDO[:5000])
+    assert primero.status_code == 204
+    assert primero.headers["Upload-Offset"] == "5000"
+
+    # Tras un corte, el cliente consulta el desplazamiento y continúa desde ahí
+    consulta = client.head(url, headers=cabeceras)
+    assert consulta.headers["Upload-Offset"] == "5000"
+    assert consulta.headers["Upload-Length"] == str(len(CONTENIDO))
+    # Un desplazamiento que no coincide se rechaza sin escribir
+    assert _bloque(client, cabeceras, url, 0, CONTENIDO[:10]).status_code == 409
+
+    prematura = client.post(f"{url}/finalizar", headers=cabeceras)
+    assert prematura.status_code == 409
+
+    resto = _bloque(client, cabeceras, url, 5000, CONTENIDO[5000:])
+    assert resto.headers["Upload-Offset"] == str(len(CONTENIDO))
+    final = client.post(f"{url}/finalizar", headers=cabeceras)
+    assert final.status_code == 201
+    archivo = final.get_json()
+    assert archivo["hash_sha256"] == hashlib.sha256(CONTENIDO).hexdigest()
+    assert archivo["tamano"] == len(CONTENIDO)
+    with open(archivo["ruta_almacenamiento"], "rb") as guardado:
+        assert guardado.read() == CONTENIDO
+    # La carga terminada ya no existe
+    assert client.head(url, headers=cabeceras).status_code == 404
+
+
+def test_limites_de_tamano(app, client, cabeceras):
+    app.config["MAX_UPLOAD_SIZE"] = 1000
+    assert _crear(client, cabeceras, tamano=1001).status_code == 413
+
+    url = _crear(client, cabeceras, tamano=100).headers["Location"]
+    _bloque(client, cabeceras, url, 0, b"x" * 60)
+    excedido = _bloque(client, cabeceras, url, 60, b"x" * 60)
+    assert excedido.status_code == 413
+    # El bloque rechazado no deja bytes a medias
+    assert client.head(url, headers=cabeceras).headers["Upload-Offset"] == "60"
+
+    assert client.delete(url, headers=cabeceras).status_code == 204
+    assert client.head(url, headers=cabeceras).status_code == 404
+    assert ArchivoCargado.query.count() == 0
+
+
+def test_flujo_cortado_conserva_lo_recibido(app, cabeceras):
+    from app.services import carga_reanudable_service
+
+    carga_id = carga_reanudable_service.crear_carga(1, "a.txt", "text/plain", 200000)
+
+    class FlujoCortado(io.BytesIO):
+        def read(self, tamano=-1):
+            datos = super().read(tamano)
+            if not datos:
+                raise ConnectionResetError("conexión perdida")
+            return datos
+
+    with pytest.raises(ConnectionResetError):
+        carga_reanudable_service.escribir_bloque(
+            carga_id, 1, 0, FlujoCortado(b"y" * 70000)
+        )
+    estado = carga_reanudable_service.estado_carga(carga_id, 1)
+    assert estado["desplazamiento"] == 70000
+    # Otro usuario no ve la carga
+    with pytest.raises(carga_reanudable_service.CargaError):
+        carga_reanudable_service.estado_carga(carga_id, 2)
@@ -0,0 +1,73 @@
+# TEST: Pruebas unitarias para la caché de claves de respuestas
+import pytest
+
+from app.models import Evaluacion, OpcionRespuesta, Pregunta
+from app.services import clave_respuestas_service as servicio
+
+
+def _evaluacion(db, preguntas=3):
+    evaluacion = Evaluacion(titulo="Examen")
+    db.session.add(evaluacion)
+    for i in range(preguntas):
+        pregunta = Pregunta(
+            enunciado=f"¿{i}?", tipo="opcion_multiple", orden=i, evaluacion=evaluacion
+        )
+        db.session.add_all(
+            OpcionRespuesta(texto=f"Opción {o}", es_correcta=o == 0, pregunta=pregunta)
+            for o in range(3)
+        )
+    db.session.commit()
+    return evaluacion
+
+
+def test_clave_compilada_en_una_consulta_e_inmutable(app, db, contar_consultas):
+    evaluacion_id = _evaluacion(db).id
+    sentencias = contar_consultas()
+    clave = servicio.obtener_clave(evaluacion_id)
+    assert len(sentencias) == 1
+    assert len(clave.preguntas) == 3 and len(clave.opciones) == 9
+    assert clave.puntaje_total == 3.0
+    with pytest.raises(AttributeError):
+        clave.version = 7
+    with pytest.raises(TypeError):
+        clave.preguntas[1] = None
+
+    # Caché caliente: ni LRU ni Redis tocan las tablas de preguntas
+    assert servicio.obtener_clave(evaluacion_id) is clave
+    servicio._lru.limpiar()
+    desde_redis = servicio.obtener_clave(evaluacion_id)
+    assert dict(desde_redis.opciones) == dict(clave.opciones)
+    assert len(sentencias) == 1
+
+
+def test_invalidacion_precisa_tras_commit(app, db):
+    evaluacion = _evaluacion(db)
+    clave = servicio.obtener_clave(evaluacion.id)
+    pregunta = evaluacion.preguntas.first()
+
+    # El enunciado no forma parte de la clave
+    pregunta.enunciado = "¿Otra redacción?"
+    db.session.commit()
+    assert servicio.obtener_clave(evaluacion.id) is clave
+
+    correcta = pregunta.opciones.filter_by(es_correcta=True).first()
+    correcta.es_correcta = False
+    db.session.flush()
+    # Antes del commit la versión publicada no cambia
+    assert servicio.version_actual(evaluacion.id) == clave.version
+    db.session.commit()
+
+    nueva = servicio.obtener_clave(evaluacion.id)
+    assert nueva.version == clave.version + 1
+    assert nueva.opciones[correcta.id][1] is False
+    # La instantánea anterior sigue intacta para una calificación en curso
+    assert clave.opciones[correcta.id][1] is True
+
+
+def test_rollback_no_invalida(app, db):
+    evaluacion = _evaluacion(db)
+    version = servicio.obtener_clave(evaluacion.id).version
+    db.session.delete(evaluacion.preguntas.first())
+    db.session.flush()
+    db.session.rollback()
+    assert servicio.version_actual(evaluacion.id) == version
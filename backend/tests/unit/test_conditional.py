@@ -0,0 +1,45 @@
+# TEST: Pruebas unitarias para las peticiones condicionales (ETag / Last-Modified)
+
+def test_me_responde_304_sin_cargar_el_usuario(
+    app, client, db, crear_usuario, auth_headers, contar_consultas
+):
+    usuario = crear_usuario()
+    cabeceras = auth_headers()
+    primera = client.get("/api/auth/me", headers=cabeceras)
+    assert primera.status_code == 200
+    etag = primera.headers["ETag"]
+    assert etag.startswith('W/"')
+    assert "Last-Modified" in primera.headers
+
+    sentencias = contar_consultas()
+    segunda = client.get("/api/auth/me", headers={**cabeceras, "If-None-Match": etag})
+    assert segunda.status_code == 304
+    assert segunda.get_data() == b""
+    # Solo la consulta de versión, no la carga completa de la fila
+    assert len(sentencias) == 1 and "hashed_password" not in sentencias[0]
+
+    usuario.nombre_completo = "Ana Cambiada"
+    db.session.commit()
+    tercera = client.get("/api/auth/me", headers={**cabeceras, "If-None-Match": etag})
+    assert tercera.status_code == 200
+    assert tercera.get_json()["nombre_completo"] == "Ana Cambiada"
+
+
+def test_if_modified_since(app, client, db, auth_headers):
+    cabeceras = auth_headers()
+    primera = client.get("/api/auth/me", headers=cabeceras)
+    ultima = primera.headers["Last-Modified"]
+    respuesta = client.get(
+        "/api/auth/me", headers={**cabeceras, "If-Modified-Since": ultima}
+    )
+    assert respuesta.status_code == 304
+
+
+def test_etag_por_contenido_sin_validador(app, client, db, auth_headers):
+    cabeceras = auth_headers()
+    primera = client.get("/api/courses/", headers=cabeceras)
+    segunda = client.get(
+        "/api/courses/",
+        headers={**cabeceras, "If-None-Match": primera.headers["ETag"]},
+    )
+    assert segunda.status_code == 304
@@ -0,0 +1,116 @@
+# TEST: Pruebas unitarias para los contadores desnormalizados
+from sqlalchemy import text
+
+from app.models import (
+    Clase,
+    Evaluacion,
+    InscripcionClase,
+    Leccion,
+    Modulo,
+    Pregunta,
+    Usuario,
+)
+from app.models.contadores import reparar_contadores
+
+
+def _clase(db):
+    docente = Usuario(nombre_completo="Doc", correo_electronico="d@b.com")
+    docente.set_password("Secreto1!")
+    alumno = Usuario(nombre_completo="Alumno", correo_electronico="a@b.com")
+    alumno.set_password("Secreto1!")
+    clase = Clase(nombre="Álgebra", docente=docente)
+    db.session.add_all([docente, alumno, clase])
+    db.session.commit()
+    return clase, alumno
+
+
+def test_contadores_se_mantienen_con_eventos(app, db):
+    clase, alumno = _clase(db)
+    modulo = Modulo(titulo="Uno", orden=1, clase=clase)
+    otro = Modulo(titulo="Dos", orden=2, clase=clase)
+    lecciones = [
+        Leccion(titulo=f"L{i}", contenido="...", tipo="teoria", orden=i, modulo=modulo)
+        for i in range(3)
+    ]
+    evaluacion = Evaluacion(titulo="Examen")
+    preguntas = [
+        Pregunta(enunciado="¿?", tipo="verdadero_falso", orden=i, evaluacion=evaluacion)
+        for i in range(2)
+    ]
+    inscripcion = InscripcionClase(
+        estudiante_id=alumno.id, usuario_id=alumno.id, clase=clase
+    )
+    db.session.add_all([modulo, otro, evaluacion, inscripcion, *lecciones, *preguntas])
+    db.session.commit()
+
+    assert (clase.total_modulos, clase.total_estudiantes) == (2, 1)
+    assert (modulo.total_lecciones, modulo.total_actividades) == (3, 0)
+    assert evaluacion.total_preguntas == 2
+
+    # Mover una lección a otro módulo y eliminar una pregunta
+    lecciones[0].modulo = otro
+    db.session.delete(preguntas[0])
+    db.session.commit()
+    assert (modulo.total_lecciones, otro.total_lecciones) == (2, 1)
+    assert evaluacion.total_preguntas == 1
+
+
+def test_to_dict_sin_consultas_count(app, db, contar_consultas):
+    clase, _ = _clase(db)
+    modulos = [Modulo(titulo=f"M{i}", orden=i, clase=clase) for i in range(5)]
+    db.session.add_all(modulos)
+    db.session.commit()
+    cargados = Modulo.query.all()
+
+    sentencias = contar_consultas()
+    datos = [modulo.to_dict() for modulo in cargados]
+    assert all(d["total_lecciones"] == 0 for d in datos)
+    assert not [s for s in sentencias if "count(" in s.lower()]
+
+
+def test_reparar_contadores(app, db):
+    clase, _ = _clase(db)
+    db.session.add(Modulo(titulo="Uno", orden=1, clase=clase))
+    db.session.commit()
+    # Deriva provocada por SQL fuera del ORM
+    db.session.execute(text("UPDATE clases SET total_modulos = 7"))
+    db.session.commit()
+
+    corregidas = reparar_contadores()
+    assert corregidas["clases.total_modulos"] == 1
+    db.session.expire_all()
+    assert clase.total_modulos == 1
+
+
+def test_inscripciones_abandonadas_no_cuentan(app, db):
+    clase, alumno = _clase(db)
+    inscripcion = InscripcionClase(
+        estudiante_id=alumno.id, usuario_id=alumno.id, clase=clase
+    )
+    db.session.add(inscripcion)
+    db.session.commit()
+    assert clase.total_estudiantes == 1
+
+    inscripcion.estado = "abandonado"
+    db.session.commit()
+    assert clase.total_estudiantes == 0
+    # Eliminar una inscripción abandonada no resta otra vez
+    db.session.delete(inscripcion)
+    db.session.commit()
+    assert clase.total_estudiantes == 0
+
+    reinscrita = InscripcionClase(
+        estudiante_id=alumno.id, usuario_id=alumno.id, clase=clase, estado="abandonado"
+    )
+    db.session.add(reinscrita)
+    db.session.commit()
+    assert clase.total_estudiantes == 0
+    reinscrita.estado = "activo"
+    db.session.commit()
+    assert clase.total_estudiantes == 1
+
+    db.session.execute(text("UPDATE inscripciones_clase SET estado = 'abandonado'"))
+    db.session.commit()
+    assert reparar_contadores()["clases.total_estudiantes"] == 1
+    db.session.expire_all()
+    assert clase.total_estudiantes == 0
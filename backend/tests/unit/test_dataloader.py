@@ -0,0 +1,110 @@
+# TEST: Pruebas unitarias para el cargador de relaciones por lotes
+from app.models import (
+    Clase,
+    Evaluacion,
+    Leccion,
+    Modulo,
+    OpcionRespuesta,
+    Pregunta,
+    Usuario,
+)
+from app.schemas import ClaseConModulosSchema, ModuloSchema
+from app.utils import dataloader
+
+
+def _arbol(db, clases=2, modulos=3, lecciones=2):
+    docente = Usuario(nombre_completo="Doc", correo_electronico="d@b.com")
+    docente.set_password("Secreto1!")
+    db.session.add(docente)
+    for c in range(clases):
+        clase = Clase(nombre=f"Clase {c}", docente=docente)
+        for m in range(modulos):
+            modulo = Modulo(titulo=f"Módulo {m}", orden=m + 1, clase=clase)
+            db.session.add_all(
+                Leccion(
+                    titulo=f"L{i}",
+                    contenido="...",
+                    tipo="teoria",
+                    orden=i + 1,
+                    modulo=modulo,
+                )
+                for i in range(lecciones)
+            )
+    db.session.commit()
+
+
+def _sin_cache(db):
+    db.session.expunge_all()
+    dataloader.descartar()
+
+
+def test_nested_una_consulta_por_relacion(app, db, contar_consultas):
+    _arbol(db, clases=3, modulos=4, lecciones=3)
+    _sin_cache(db)
+    sentencias = contar_consultas()
+
+    datos = ModuloSchema(many=True).dump(Modulo.query.all())
+    assert len(datos) == 12
+    assert all(len(m["lecciones"]) == 3 for m in datos)
+    assert {m["clase"]["nombre"] for m in datos} == {"Clase 0", "Clase 1", "Clase 2"}
+    # Módulos + clases IN (...) + lecciones IN (...)
+    assert len(sentencias) == 3
+
+
+def test_arbol_de_la_clase_no_depende_del_tamano(app, db, contar_consultas):
+    _arbol(db, clases=1, modulos=2, lecciones=1)
+    grande = Clase(nombre="Grande", docente=Usuario.query.first())
+    for m in range(10):
+        modulo = Modulo(titulo=f"Módulo {m}", orden=m + 1, clase=grande)
+        db.session.add_all(
+            Leccion(
+                titulo="L", contenido="...", tipo="teoria", orden=i + 1, modulo=modulo
+            )
+            for i in range(8)
+        )
+    db.session.commit()
+
+    consultas = []
+    for nombre in ("Clase 0", "Grande"):
+        _sin_cache(db)
+        sentencias = contar_consultas()
+        datos = ClaseConModulosSchema().dump(Clase.query.filter_by(nombre=nombre).one())
+        consultas.append(len(sentencias))
+    assert sum(len(m["lecciones"]) for m in datos["modulos"]) == 80
+    # Clase + docente + módulos + lecciones, con 2 o con 80 lecciones
+    assert consultas == [4, 4]
+
+
+def test_to_dict_en_lote(app, db, contar_consultas):
+    evaluacion = Evaluacion(titulo="Examen")
+    for p in range(5):
+        pregunta = Pregunta(
+            enunciado="¿?", tipo="opcion_multiple", orden=p, evaluacion=evaluacion
+        )
+        db.session.add_all(
+            OpcionRespuesta(texto=f"Opción {o}", es_correcta=o == 0, pregunta=pregunta)
+            for o in range(4)
+        )
+    db.session.add(evaluacion)
+    db.session.commit()
+    _sin_cache(db)
+    evaluacion = Evaluacion.query.first()
+
+    sentencias = contar_consultas()
+    datos = evaluacion.to_dict(incluir_preguntas=True)
+    assert len(datos["preguntas"]) == 5
+    assert all(len(p["opciones"]) == 4 for p in datos["preguntas"])
+    # Preguntas IN (...) + opciones IN (...), no 1 + 5
+    assert len(sentencias) == 2
+
+
+def test_commit_descarta_el_cargador(app, db):
+    _arbol(db, clases=1, modulos=1, lecciones=1)
+    modulo = Modulo.query.first()
+    assert len(dataloader.cargar_relacion(modulo, "lecciones")) == 1
+
+    db.session.add(
+        Leccion(titulo="Nueva", contenido="...", tipo="teoria", orden=2, modulo=modulo)
+    )
+    db.session.commit()
+    assert len(dataloader.cargar_relacion(modulo, "lecciones")) == 2
@@ -0,0 +1,174 @@
+# TEST: Pruebas unitarias para el envío y calificación de un intento completo
+from app.models import (
+    Clase,
+    Evaluacion,
+    InscripcionClase,
+    Leccion,
+    Modulo,
+    OpcionRespuesta,
+    Pregunta,
+    Respuesta,
+    Usuario,
+)
+
+
+def _evaluacion(db, preguntas=4, estudiante=None):
+    evaluacion = Evaluacion(
+        titulo="Examen", intentos_permitidos=2, calificacion_aprobatoria=60.0
+    )
+    db.session.add(evaluacion)
+    if estudiante is not None:
+        _inscribir(db, estudiante, evaluacion)
+    for i in range(preguntas):
+        pregunta = Pregunta(
+            enunciado=f"¿{i}?", tipo="opcion_multiple", orden=i, evaluacion=evaluacion
+        )
+        db.session.add_all(
+            OpcionRespuesta(texto=f"Opción {o}", es_correcta=o == 0, pregunta=pregunta)
+            for o in range(3)
+        )
+    db.session.commit()
+    return evaluacion
+
+
+def _inscribir(db, estudiante, evaluacion, estado="activo"):
+    """Publica la evaluación en una clase e inscribe en ella al estudiante."""
+    docente = Usuario(
+        nombre_completo="Docente", correo_electronico="doc@b.com", rol="docente"
+    )
+    docente.set_password("Secreto1!")
+    clase = Clase(nombre="Álgebra", docente=docente)
+    modulo = Modulo(titulo="Módulo 1", orden=1, clase=clase)
+    leccion = Leccion(
+        titulo="Examen",
+        contenido="...",
+        tipo="evaluacion",
+        orden=1,
+        modulo=modulo,
+        evaluacion=evaluacion,
+    )
+    db.session.add_all([docente, clase, modulo, leccion])
+    db.session.flush()
+    db.session.add(
+        InscripcionClase(
+            clase_id=clase.id,
+            estudiante_id=estudiante.id,
+            usuario_id=estudiante.id,
+            estado=estado,
+        )
+    )
+    return clase
+
+
+def _envio(evaluacion, aciertos, intento=1):
+    respuestas = []
+    for i, pregunta in enumerate(evaluacion.preguntas.order_by(Pregunta.id)):
+        opciones = pregunta.opciones.order_by(OpcionRespuesta.id).all()
+        elegida = opciones[0] if i < aciertos else opciones[1]
+        respuestas.append(
+            {
+                "pregunta_id": pregunta.id,
+                "opcion_seleccionada_id": elegida.id,
+                "tiempo_tomado": 10,
+                "intento_numero": intento,
+            }
+        )
+    return {"respuestas": respuestas, "tiempo_total": 60, "intento_numero": intento}
+
+
+def test_envio_califica_en_una_transaccion(
+    app, client, db, crear_usuario, auth_headers, contar_consultas
+):
+    usuario = crear_usuario()
+    cabeceras = auth_headers()
+    evaluacion = _evaluacion(db, preguntas=20, estudiante=usuario)
+    envio = _envio(evaluacion, aciertos=15)
+
+    sentencias = contar_consultas()
+    respuesta = client.post(
+        f"/api/evaluations/{evaluacion.id}/intentos", json=envio, headers=cabeceras
+    )
+    assert respuesta.status_code == 201
+    resultado = respuesta.get_json()
+    assert resultado["calificacion"] == 75.0 and resultado["aprobado"]
+    assert resultado["respuestas_correctas"] == 15
+    assert (resultado["intento_actual"], resultado["intentos_restantes"]) == (1, 1)
+    assert len(resultado["detalles_preguntas"]) == 20
+
+    # Evaluación + inscripción + intentos previos + clave (2) + un único INSERT
+    # para las 20 filas
+    inserciones = [s for s in sentencias if s.startswith("INSERT INTO respuestas")]
+    assert len(inserciones) == 1
+    assert len(sentencias) <= 7
+    assert Respuesta.query.filter_by(estudiante_id=usuario.id).count() == 20
+
+
+def test_intento_repetido_o_agotado(app, client, db, crear_usuario, auth_headers):
+    usuario = crear_usuario()
+    cabeceras = auth_headers()
+    evaluacion = _evaluacion(db, estudiante=usuario)
+    url = f"/api/evaluations/{evaluacion.id}/intentos"
+
+    assert (
+        client.post(url, json=_envio(evaluacion, 4), headers=cabeceras).status_code
+        == 201
+    )
+    # El mismo intento otra vez
+    assert (
+        client.post(url, json=_envio(evaluacion, 4), headers=cabeceras).status_code
+        == 409
+    )
+    segundo = _envio(evaluacion, 1, intento=2)
+    resultado = client.post(url, json=segundo, headers=cabeceras).get_json()
+    assert resultado["aprobado"] is False and resultado["intentos_restantes"] == 0
+    tercero = _envio(evaluacion, 4, intento=3)
+    assert client.post(url, json=tercero, headers=cabeceras).status_code == 403
+
+
+def test_envio_invalido_no_registra_nada(app, client, db, crear_usuario, auth_headers):
+    usuario = crear_usuario()
+    cabeceras = auth_headers()
+    evaluacion = _evaluacion(db, estudiante=usuario)
+    otra = _evaluacion(db, preguntas=1)
+    url = f"/api/evaluations/{evaluacion.id}/intentos"
+
+    envio = _envio(evaluacion, 4)
+    # Opción de una pregunta de otra evaluación
+    envio["respuestas"][0]["opcion_seleccionada_id"] = (
+        otra.preguntas.first().opciones.first().id
+    )
+    assert client.post(url, json=envio, headers=cabeceras).status_code == 400
+
+    duplicado = _envio(evaluacion, 4)
+    duplicado["respuestas"].append(duplicado["respuestas"][0])
+    assert client.post(url, json=duplicado, headers=cabeceras).status_code == 400
+    assert Respuesta.query.count() == 0
+
+
+def test_solo_estudiantes_inscritos_envian(
+    app, client, db, crear_usuario, auth_headers
+):
+    usuario = crear_usuario()
+    cabeceras = auth_headers()
+    evaluacion = _evaluacion(db)
+    url = f"/api/evaluations/{evaluacion.id}/intentos"
+    envio = _envio(evaluacion, 4)
+
+    # Sin inscripción, y con una inscripción abandonada
+    assert client.post(url, json=envio, headers=cabeceras).status_code == 403
+    _inscribir(db, usuario, evaluacion, estado="abandonado")
+    db.session.commit()
+    assert client.post(url, json=envio, headers=cabeceras).status_code == 403
+
+    # Un docente no envía intentos aunque figure inscrito
+    InscripcionClase.query.filter_by(estudiante_id=usuario.id).one().estado = "activo"
+    usuario.rol = "docente"
+    db.session.commit()
+    docente = auth_headers()
+    assert client.post(url, json=envio, headers=docente).status_code == 403
+    assert Respuesta.query.count() == 0
+
+    usuario.rol = "estudiante"
+    db.session.commit()
+    estudiante = auth_headers()
+    assert client.post(url, json=envio, headers=estudiante).status_code == 201
@@ -0,0 +1,206 @@
+# TEST: Pruebas unitarias para las estadísticas incrementales por clase
+from sqlalchemy import update
+
+from app.models import (
+    Clase,
+    EstadisticaClase,
+    Evaluacion,
+    InscripcionClase,
+    Leccion,
+    Modulo,
+    OpcionRespuesta,
+    Pregunta,
+    Usuario,
+)
+from app.models.estadisticas import recalcular_estadisticas
+from app.services.calificacion_service import enviar_intento
+
+
+def _usuario(db, correo):
+    usuario = Usuario(nombre_completo="Ana Prueba", correo_electronico=correo)
+    usuario.set_password("Secreto1!")
+    db.session.add(usuario)
+    return usuario
+
+
+def _clase(db):
+    docente = _usuario(db, "doc@b.com")
+    clase = Clase(nombre="Álgebra", docente=docente)
+    modulo = Modulo(titulo="Módulo 1", orden=1, clase=clase)
+    evaluacion = Evaluacion(titulo="Examen", intentos_permitidos=3)
+    for i in range(4):
+        pregunta = Pregunta(
+            enunciado=f"¿{i}?", tipo="opcion_multiple", orden=i, evaluacion=evaluacion
+        )
+        db.session.add_all(
+            OpcionRespuesta(texto=f"Opción {o}", es_correcta=o == 0, pregunta=pregunta)
+            for o in range(2)
+        )
+    db.session.add_all(
+        [
+            Leccion(
+                titulo="L1", contenido="...", tipo="teoria", orden=1, modulo=modulo
+            ),
+            Leccion(
+                titulo="L2",
+                contenido="...",
+                tipo="evaluacion",
+                orden=2,
+                modulo=modulo,
+                evaluacion=evaluacion,
+            ),
+        ]
+    )
+    db.session.commit()
+    return clase, evaluacion
+
+
+def _enviar(evaluacion, estudiante, aciertos, intento=1):
+    respuestas = []
+    for i, pregunta in enumerate(evaluacion.preguntas.order_by(Pregunta.id)):
+        opciones = pregunta.opciones.order_by(OpcionRespuesta.id).all()
+        elegida = opciones[0] if i < aciertos else opciones[1]
+        respuestas.append(
+            {
+                "pregunta_id": pregunta.id,
+                "opcion_seleccionada_id": elegida.id,
+                "tiempo_tomado": 10,
+            }
+        )
+    envio = {"respuestas": respuestas, "tiempo_total": 40, "intento_numero": intento}
+    return enviar_intento(evaluacion.id, estudiante.id, envio)
+
+
+def _estadisticas(db, clase_id):
+    db.session.expire_all()
+    return db.session.get(EstadisticaClase, clase_id)
+
+
+def test_acumulados_incrementales(app, db):
+    clase, evaluacion = _clase(db)
+    estudiantes = [_usuario(db, f"e{i}@b.com") for i in range(3)]
+    db.session.flush()
+    inscripciones = [
+        InscripcionClase(clase_id=clase.id, estudiante_id=e.id, usuario_id=e.id)
+        for e in estudiantes
+    ]
+    db.session.add_all(inscripciones)
+    db.session.commit()
+
+    estadisticas = _estadisticas(db, clase.id)
+    assert (estadisticas.total_lecciones, estadisticas.total_evaluaciones) == (2, 1)
+    assert estadisticas.promedio_calificaciones is None
+
+    _enviar(evaluacion, estudiantes[0], aciertos=4)
+    _enviar(evaluacion, estudiantes[1], aciertos=3)
+    _enviar(evaluacion, estudiantes[2], aciertos=1)
+
+    inscripciones[0].estado = "abandonado"
+    inscripciones[1].estado = "abandonado"
+    db.session.commit()
+    inscripciones[1].estado = "activo"
+    db.session.commit()
+    assert _estadisticas(db, clase.id).estudiantes_abandonados == 1
+    estadisticas = _estadisticas(db, clase.id)
+    assert estadisticas.total_calificaciones == 3
+    assert estadisticas.promedio_calificaciones == round((100 + 75 + 25) / 3, 2)
+    assert estadisticas.distribucion_calificaciones == {
+        "0-59": 1,
+        "60-69": 0,
+        "70-79": 1,
+        "80-89": 0,
+        "90-100": 1,
+    }
+
+    db.session.delete(Leccion.query.filter_by(titulo="L1").one())
+    db.session.commit()
+    assert _estadisticas(db, clase.id).total_lecciones == 1
+
+
+def test_recalculo_corrige_la_deriva(app, db):
+    clase, evaluacion = _clase(db)
+    estudiante = _usuario(db, "e@b.com")
+    db.session.flush()
+    db.session.add(
+        InscripcionClase(
+            clase_id=clase.id, estudiante_id=estudiante.id, usuario_id=estudiante.id
+        )
+    )
+    db.session.commit()
+    _enviar(evaluacion, estudiante, aciertos=2)
+    _enviar(evaluacion, estudiante, aciertos=3, intento=2)
+    esperado = _estadisticas(db, clase.id).to_dict()
+
+    db.session.execute(
+        update(EstadisticaClase)
+        .where(EstadisticaClase.clase_id == clase.id)
+        .values(total_lecciones=9, suma_calificaciones=0, cubeta_90_100=4)
+    )
+    db.session.commit()
+    resumen = recalcular_estadisticas()
+    assert resumen == {"recalculadas": 1, "creadas": 0, "corregidas": 1}
+
+    recalculado = _estadisticas(db, clase.id).to_dict()
+    esperado.pop("fecha_recalculo")
+    recalculado.pop("fecha_recalculo")
+    assert recalculado == esperado
+    assert recalculado["promedio_calificaciones"] == 62.5
+
+
+def test_endpoint_lee_en_tiempo_constante(
+    app, client, db, auth_headers, contar_consultas
+):
+    clase, _ = _clase(db)
+    alumno = _usuario(db, "a@b.com")
+    db.session.flush()
+    db.session.add(
+        InscripcionClase(
+            clase_id=clase.id, estudiante_id=alumno.id, usuario_id=alumno.id
+        )
+    )
+    db.session.commit()
+    cabeceras = auth_headers()
+    clase_id = clase.id
+    db.session.expunge_all()
+
+    sentencias = contar_consultas()
+    respuesta = client.get(f"/api/courses/{clase_id}/estadisticas", headers=cabeceras)
+    assert respuesta.status_code == 200
+    datos = respuesta.get_json()
+    assert datos["total_lecciones"] == 2 and datos["total_evaluaciones"] == 1
+    assert datos["distribucion_calificaciones"]["90-100"] == 0
+    assert "modulos" not in datos and "docente" not in datos
+    # Clase JOIN estadísticas y la inscripción, sin recorrer respuestas
+    assert len(sentencias) == 2
+
+    assert (
+        client.get("/api/courses/999/estadisticas", headers=cabeceras).status_code
+        == 404
+    )
+
+
+def test_endpoint_solo_para_la_clase_propia(app, client, db, auth_headers):
+    clase, _ = _clase(db)
+    _usuario(db, "ajeno@b.com")
+    abandono = _usuario(db, "abandono@b.com")
+    admin = _usuario(db, "admin@b.com")
+    admin.rol = "admin"
+    db.session.flush()
+    db.session.add(
+        InscripcionClase(
+            clase_id=clase.id,
+            estudiante_id=abandono.id,
+            usuario_id=abandono.id,
+            estado="abandonado",
+        )
+    )
+    db.session.commit()
+    url = f"/api/courses/{clase.id}/estadisticas"
+
+    def estado(correo):
+        return client.get(url, headers=auth_headers(correo=correo)).status_code
+
+    assert estado("ajeno@b.com") == 403
+    assert estado("abandono@b.com") == 403
+    assert estado("doc@b.com") == 200
+    assert estado("admin@b.com") == 200
@@ -0,0 +1,199 @@
+# TEST: Pruebas unitarias para la extracción de texto por fragmentos
+import fitz
+
+from app.models import ArchivoCargado, FragmentoArchivo, Usuario
+from app.tasks import document_processing
+from app.tasks.document_processing import extraer_texto_archivo
+
+
+def _pdf(ruta, paginas):
+    documento = fitz.open()
+    for numero in range(paginas):
+        documento.new_page().insert_text((72, 72), f"Página {numero + 1}")
+    documento.save(ruta)
+    documento.close()
+
+
+def _archivo(db, ruta, tipo_mime):
+    usuario = Usuario(nombre_completo="Docente", correo_electronico="d@b.com")
+    usuario.set_password("Secreto1!")
+    archivo = ArchivoCargado(
+        nombre_original=ruta.name,
+        nombre_servidor=ruta.name,
+        tipo_mime=tipo_mime,
+        tamano=ruta.stat().st_size if ruta.exists() else 1,
+        ruta_almacenamiento=str(ruta),
+        usuario=usuario,
+    )
+    db.session.add(archivo)
+    db.session.commit()
+    return archivo.id
+
+
+def test_pdf_por_paginas_en_lotes(app, db, tmp_path, contar_consultas):
+    ruta = tmp_path / "libro.pdf"
+    _pdf(ruta, 7)
+    archivo_id = _archivo(db, ruta, "application/pdf")
+    app.config["DOCUMENTOS_FRAGMENTOS_POR_LOTE"] = 3
+
+    sentencias = contar_consultas()
+    extraer_texto_archivo(archivo_id)
+    inserciones = [
+        s for s in sentencias if s.startswith("INSERT INTO fragmentos_archivo")
+    ]
+    # Lotes de 3 + 3 + 1 páginas
+    assert len(inserciones) == 3
+
+    archivo = db.session.get(ArchivoCargado, archivo_id)
+    assert archivo.estado_procesamiento_texto == "procesado"
+    assert (archivo.paginas_procesadas, archivo.paginas_totales) == (7, 7)
+    assert archivo.texto_extraido is None
+    fragmentos = archivo.fragmentos.all()
+    assert [f.pagina for f in fragmentos] == [1, 2, 3, 4, 5, 6, 7]
+    textos = list(archivo.iterar_texto(tamano_lote=2))
+    assert [t.strip() for t in textos] == [f"Página {n}" for n in range(1, 8)]
+
+
+def test_reanuda_desde_la_ultima_pagina_confirmada(app, db, tmp_path):
+    ruta = tmp_path / "libro.pdf"
+    _pdf(ruta, 5)
+    archivo_id = _archivo(db, ruta, "application/pdf")
+    # Un intento anterior confirmó dos páginas antes de caer
+    db.session.add_all(
+        FragmentoArchivo(archivo_id=archivo_id, indice=i, pagina=i + 1, texto="x")
+        for i in range(2)
+    )
+    archivo = db.session.get(ArchivoCargado, archivo_id)
+    archivo.estado_procesamiento_texto = "procesando"
+    archivo.paginas_procesadas = 2
+    db.session.commit()
+
+    extraer_texto_archivo(archivo_id)
+    textos = [f.texto.strip() for f in archivo.fragmentos]
+    assert textos == ["x", "x", "Página 3", "Página 4", "Página 5"]
+
+
+def test_reanuda_desde_el_primer_hueco_tras_rangos_en_paralelo(app, db, tmp_path):
+    ruta = tmp_path / "libro.pdf"
+    _pdf(ruta, 5)
+    archivo_id = _archivo(db, ruta, "application/pdf")
+    # Un chord anterior confirmó las páginas 1, 2 y 5 (rangos fuera de orden)
+    db.session.add_all(
+        FragmentoArchivo(archivo_id=archivo_id, indice=i, pagina=i + 1, texto="x")
+        for i in (0, 1, 4)
+    )
+    archivo = db.session.get(ArchivoCargado, archivo_id)
+    archivo.estado_procesamiento_texto = "procesando"
+    archivo.paginas_procesadas = 3
+    db.session.commit()
+
+    extraer_texto_archivo(archivo_id)
+    textos = [f.texto.strip() for f in archivo.fragmentos]
+    assert textos == ["x", "x", "Página 3", "Página 4", "Página 5"]
+    assert archivo.paginas_procesadas == 5
+
+
+def test_texto_plano_en_bloques_y_errores(app, db, tmp_path):
+    ruta = tmp_path / "notas.txt"
+    contenido = "áéíóú ñ " * 40
+    ruta.write_text(contenido, encoding="utf-8")
+    archivo_id = _archivo(db, ruta, "text/plain")
+    # Bloques de 7 bytes: los caracteres de 2 bytes quedan partidos entre bloques
+    app.config["DOCUMENTOS_TAMANO_BLOQUE_TEXTO"] = 7
+
+    extraer_texto_archivo(archivo_id)
+    archivo = db.session.get(ArchivoCargado, archivo_id)
+    assert archivo.estado_procesamiento_texto == "procesado"
+    assert "".join(archivo.iterar_texto()) == contenido
+    assert archivo.paginas_procesadas == archivo.fragmentos.count() > 1
+
+    faltante = _archivo_faltante(db, tmp_path)
+    extraer_texto_archivo(faltante)
+    archivo = db.session.get(ArchivoCargado, faltante)
+    assert archivo.estado_procesamiento_texto == "error"
+    assert archivo.mensaje_error
+
+
+def _archivo_faltante(db, tmp_path):
+    archivo = ArchivoCargado(
+        nombre_original="x.pdf",
+        nombre_servidor="x.pdf",
+        tipo_mime="application/pdf",
+        tamano=1,
+        ruta_almacenamiento=str(tmp_path / "no-existe.pdf"),
+        usuario_id=db.session.query(Usuario.id).scalar(),
+    )
+    db.session.add(archivo)
+    db.session.commit()
+    return archivo.id
+
+
+def test_pdf_grande_en_pool_de_procesos(app, db, tmp_path):
+    ruta = tmp_path / "libro.pdf"
+    _pdf(ruta, 9)
+    archivo_id = _archivo(db, ruta, "application/pdf")
+    app.config.update(
+        DOCUMENTOS_EXTRACCION_PARALELA="procesos",
+        DOCUMENTOS_UMBRAL_PAGINAS_PARALELO=4,
+        DOCUMENTOS_PAGINAS_POR_RANGO=2,
+        DOCUMENTOS_PROCESOS_EXTRACCION=2,
+    )
+
+    extraer_texto_archivo(archivo_id)
+    archivo = db.session.get(ArchivoCargado, archivo_id)
+    assert archivo.estado_procesamiento_texto == "procesado"
+    textos = [t.strip() for t in archivo.iterar_texto()]
+    assert textos == [f"Página {n}" for n in range(1, 10)]
+
+
+def test_pdf_grande_en_chord_de_celery(app, db, tmp_path, monkeypatch):
+    ruta = tmp_path / "libro.pdf"
+    _pdf(ruta, 7)
+    archivo_id = _archivo(db, ruta, "application/pdf")
+    app.config.update(
+        DOCUMENTOS_EXTRACCION_PARALELA="celery",
+        DOCUMENTOS_UMBRAL_PAGINAS_PARALELO=4,
+        DOCUMENTOS_PAGINAS_POR_RANGO=3,
+    )
+    monkeypatch.setattr(document_processing, "_chord_disponible", lambda: True)
+    rangos = []
+
+    def chord_local(cabecera):
+        # Ejecuta las subtareas en orden inverso, como si terminaran desordenadas
+        subtareas = list(cabecera)
+        rangos.extend(tuple(s.args[1:]) for s in subtareas)
+
+        def ejecutar(callback):
+            resultados = [s.apply().get() for s in reversed(subtareas)]
+            return callback.apply(args=(resultados,)).get()
+
+        return ejecutar
+
+    monkeypatch.setattr(document_processing, "chord", chord_local)
+    extraer_texto_archivo(archivo_id)
+
+    assert rangos == [(0, 3), (3, 6), (6, 7)]
+    archivo = db.session.get(ArchivoCargado, archivo_id)
+    assert archivo.estado_procesamiento_texto == "procesado"
+    assert (archivo.paginas_procesadas, archivo.paginas_totales) == (7, 7)
+    textos = [t.strip() for t in archivo.iterar_texto()]
+    assert textos == [f"Página {n}" for n in range(1, 8)]
+
+
+def test_pdf_grande_con_la_configuracion_por_defecto(app, db, tmp_path):
+    ruta = tmp_path / "libro.pdf"
+    _pdf(ruta, 210)
+    archivo_id = _archivo(db, ruta, "application/pdf")
+
+    extraer_texto_archivo(archivo_id)
+    archivo = db.session.get(ArchivoCargado, archivo_id)
+    assert archivo.estado_procesamiento_texto == "procesado"
+    assert archivo.paginas_procesadas == 210
+
+    # Con "celery" pero sin backend de resultados no se intenta el chord
+    app.config["DOCUMENTOS_EXTRACCION_PARALELA"] = "celery"
+    extraer_texto_archivo(archivo_id)
+    archivo = db.session.get(ArchivoCargado, archivo_id)
+    assert archivo.estado_procesamiento_texto == "procesado"
+    textos = [t.strip() for t in archivo.iterar_texto()]
+    assert textos == [f"Página {n}" for n in range(1, 211)]
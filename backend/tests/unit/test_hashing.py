@@ -0,0 +1,100 @@
+# TEST: Pruebas unitarias para el servicio de hashing de contraseñas
+import time
+
+import pytest
+from redis.exceptions import ConnectionError as RedisConnectionError
+
+from app.extensions import redis_client
+from app.models import Usuario
+from app.services.hashing_service import (
+    HashingSaturadoError,
+    calibrar_rondas,
+    rondas_de_hash,
+    servicio_hashing,
+)
+from app.utils.metrics import metricas
+
+
+@pytest.fixture
+def pool(app):
+    # Un proceso y un lugar en cola: dos hashes en curso por máquina
+    servicio_hashing.configurar(rondas=4, num_procesos=1, max_en_cola=1)
+    yield servicio_hashing
+    if servicio_hashing._pool is not None:
+        servicio_hashing._pool.shutdown()
+        servicio_hashing._pool = None
+        servicio_hashing._pid = None
+
+
+def _ocupar(cantidad, hace=0.0):
+    inicio = time.time() - hace
+    redis_client.zadd(
+        servicio_hashing._clave_compartida,
+        {f"otro-worker-{i}": inicio for i in range(cantidad)},
+    )
+
+
+def test_hash_y_verificacion_en_el_pool(pool):
+    metricas.reiniciar("hashing.")
+    hashed = pool.generar_hash("Secreto1!")
+    assert rondas_de_hash(hashed) == 4
+    assert pool.verificar(hashed, "Secreto1!")
+    assert not pool.verificar(hashed, "otra")
+    assert metricas.snapshot("hashing.")["hashing.tareas"] == 3
+    # Cada hash libera su cupo en el límite compartido
+    assert redis_client.zcard(pool._clave_compartida) == 0
+
+
+def test_limite_compartido_entre_workers_responde_503(app, client, db, pool):
+    usuario = Usuario(nombre_completo="Ana", correo_electronico="a@b.com")
+    usuario.set_password("Secreto1!")
+    db.session.add(usuario)
+    db.session.commit()
+
+    # Otros workers de la máquina tienen todos los cupos
+    _ocupar(pool.cupos)
+    with pytest.raises(HashingSaturadoError):
+        pool.generar_hash("Secreto1!")
+    assert redis_client.zcard(pool._clave_compartida) == pool.cupos
+
+    credenciales = {"correo_electronico": "a@b.com", "password": "Secreto1!"}
+    respuesta = client.post("/api/auth/login", json=credenciales)
+    assert respuesta.status_code == 503
+    assert int(respuesta.headers["Retry-After"]) >= 1
+
+
+def test_tickets_abandonados_expiran(pool):
+    # Un worker que murió a mitad de un hash no bloquea los cupos para siempre
+    _ocupar(pool.cupos, hace=3 * pool.timeout)
+    assert pool.verificar(pool.generar_hash("x"), "x")
+    assert redis_client.zcard(pool._clave_compartida) == 0
+
+
+def test_sin_redis_se_aplica_el_limite_local(pool, monkeypatch):
+    def fallar(*args, **kwargs):
+        raise RedisConnectionError("Redis no disponible")
+
+    monkeypatch.setattr(redis_client._obtener_cliente(), "pipeline", fallar)
+    assert pool.verificar(pool.generar_hash("x"), "x")
+
+    for _ in range(pool.cupos):
+        pool._cupos.acquire()
+    with pytest.raises(HashingSaturadoError):
+        pool.generar_hash("x")
+
+
+def test_timeout_del_pool_responde_saturado_y_libera_cupos(pool, monkeypatch):
+    monkeypatch.setattr(pool, "timeout", 0)
+    with pytest.raises(HashingSaturadoError) as error:
+        pool.generar_hash("x")
+    assert error.value.retry_after >= 1
+
+    assert redis_client.zcard(pool._clave_compartida) == 0
+    assert all(pool._cupos.acquire(blocking=False) for _ in range(pool.cupos))
+
+
+def test_calibracion_respeta_los_limites():
+    assert calibrar_rondas(0, minimo=4, maximo=6)[0] == 4
+    rondas, estimado_ms = calibrar_rondas(10**6, minimo=4, maximo=6)
+    assert rondas == 6
+    assert estimado_ms > 0
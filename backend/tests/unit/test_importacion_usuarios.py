@@ -0,0 +1,68 @@
+# TEST: Pruebas unitarias para la importación masiva de usuarios desde CSV
+import csv
+import io
+
+from app.models.usuario import Usuario
+from app.services.hashing_service import servicio_hashing
+from app.services.importacion_usuarios_service import ImportadorUsuarios
+
+CSV_USUARIOS = """nombre_completo,correo_electronico,password,rol
+Ana Pérez,ana@escuela.edu,Secreto1!,
+Luis Gómez,luis@escuela.edu,Secreto1!,docente
+Repetida,ANA@escuela.edu,Secreto1!,
+Sin Correo,,Secreto1!,
+Débil,debil@escuela.edu,corta,
+Rol Raro,raro@escuela.edu,Secreto1!,director
+Existente,Existente@Escuela.edu,Secreto1!,
+"""
+
+
+def test_importa_por_lotes_y_reporta_errores(app, db):
+    existente = Usuario(
+        nombre_completo="Existente", correo_electronico="existente@escuela.edu"
+    )
+    existente.set_password("Secreto1!")
+    db.session.add(existente)
+    db.session.commit()
+
+    errores = io.StringIO()
+    avances = []
+    importador = ImportadorUsuarios(
+        tamano_lote=2, procesos=1, rondas=4, progreso=avances.append
+    )
+    resumen = importador.importar(io.StringIO(CSV_USUARIOS), archivo_errores=errores)
+
+    assert (resumen.leidas, resumen.creadas, resumen.errores) == (7, 2, 5)
+    assert len(avances) >= 2
+
+    ana = Usuario.query.filter_by(correo_electronico="ana@escuela.edu").one()
+    assert ana.rol == "estudiante" and ana.activo and ana.token_version == 0
+    assert ana.check_password("Secreto1!")
+    luis = Usuario.query.filter_by(correo_electronico="luis@escuela.edu").one()
+    assert luis.rol == "docente"
+
+    filas = list(csv.DictReader(io.StringIO(errores.getvalue())))
+    assert [int(fila["linea"]) for fila in filas] == [4, 5, 6, 7, 8]
+    assert "ya está registrado" in filas[-1]["error"]
+
+
+def test_login_eleva_costo_de_hash_importado(app, client, db, monkeypatch):
+    monkeypatch.setattr(servicio_hashing, "rondas", 5)
+    csv_ana = "nombre_completo,correo_electronico,password\nAna,ana@e.edu,Secreto1!\n"
+    ImportadorUsuarios(procesos=1, rondas=4).importar(io.StringIO(csv_ana))
+    ana = Usuario.query.filter_by(correo_electronico="ana@e.edu").one()
+    assert ana.hashed_password.startswith("$2b$04$")
+
+    credenciales = {"correo_electronico": "ana@e.edu", "password": "Secreto1!"}
+    assert client.post("/api/auth/login", json=credenciales).status_code == 200
+    db.session.refresh(ana)
+    assert ana.hashed_password.startswith("$2b$05$")
+
+
+def test_importa_con_el_costo_configurado_por_defecto(app, db, monkeypatch):
+    monkeypatch.setattr(servicio_hashing, "rondas", 5)
+    csv_ana = "nombre_completo,correo_electronico,password\nAna,ana@e.edu,Secreto1!\n"
+    ImportadorUsuarios(procesos=1).importar(io.StringIO(csv_ana))
+    ana = Usuario.query.filter_by(correo_electronico="ana@e.edu").one()
+    assert ana.hashed_password.startswith("$2b$05$")
+    assert not servicio_hashing.necesita_rehash(ana.hashed_password)
@@ -0,0 +1,69 @@
+# TEST: Pruebas unitarias para la caché de JWT verificados
+from unittest import mock
+
+from flask_jwt_extended import JWTManager, create_access_token
+
+from app.auth.jwt_cache import JWTManagerConCache
+from app.models.usuario import Usuario
+
+
+def _token(app, db):
+    usuario = Usuario(
+        nombre_completo="Ana Prueba", correo_electronico="a@b.com", rol="docente"
+    )
+    usuario.set_password("Secreto1!")
+    db.session.add(usuario)
+    db.session.commit()
+    with app.test_request_context():
+        return create_access_token(identity=usuario)
+
+
+def test_flask_jwt_extended_usa_el_gancho_sobrescrito(app, client, db):
+    # _decode_jwt_from_config es privado: si una versión nueva de la librería deja
+    # de llamarlo, la caché quedaría desactivada sin ningún error
+    cabeceras = {"Authorization": f"Bearer {_token(app, db)}"}
+    original = JWTManagerConCache._decode_jwt_from_config
+
+    with mock.patch.object(
+        JWTManagerConCache,
+        "_decode_jwt_from_config",
+        autospec=True,
+        side_effect=original,
+    ) as gancho:
+        assert client.get("/api/auth/me", headers=cabeceras).status_code == 200
+
+    assert gancho.call_count == 1
+    assert isinstance(gancho.call_args.args[0], JWTManagerConCache)
+
+
+def test_firma_verificada_una_sola_vez(app, client, db):
+    cabeceras = {"Authorization": f"Bearer {_token(app, db)}"}
+    original = JWTManager._decode_jwt_from_config
+
+    with mock.patch.object(
+        JWTManager, "_decode_jwt_from_config", autospec=True, side_effect=original
+    ) as decodificar:
+        for _ in range(3):
+            assert client.get("/api/auth/me", headers=cabeceras).status_code == 200
+
+    assert decodificar.call_count == 1
+
+
+def test_logout_revoca_token_cacheado(app, client, db):
+    cabeceras = {"Authorization": f"Bearer {_token(app, db)}"}
+    assert client.get("/api/auth/me", headers=cabeceras).status_code == 200
+
+    assert client.post("/api/auth/logout", headers=cabeceras).status_code == 200
+    assert client.get("/api/auth/me", headers=cabeceras).status_code == 401
+
+
+def test_token_alterado_no_usa_la_cache(app, client, db):
+    token = _token(app, db)
+    cabeceras = {"Authorization": f"Bearer {token}"}
+    assert client.get("/api/auth/me", headers=cabeceras).status_code == 200
+
+    alterado = token[:-2] + ("AA" if token[-2:] != "AA" else "BB")
+    respuesta = client.get(
+        "/api/auth/me", headers={"Authorization": f"Bearer {alterado}"}
+    )
+    assert respuesta.status_code == 401
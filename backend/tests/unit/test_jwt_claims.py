@@ -0,0 +1,78 @@
+# TEST: Pruebas unitarias para la autorización basada en claims del JWT
+from flask_jwt_extended import create_refresh_token
+from sqlalchemy import update
+from app.auth.decorators import roles_required
+from app.auth.services import (
+    PREFIJO_VERSION,
+    claims_de_autorizacion,
+    version_token_vigente,
+)
+from app.extensions import redis_client
+from app.models.usuario import Usuario
+
+
+def test_ruta_protegida_sin_consultas_a_usuarios(
+    app, client, db, auth_headers, contar_consultas
+):
+    @app.route("/solo-docentes")
+    @roles_required(["docente"])
+    def solo_docentes():
+        return {"ok": True}
+
+    cabeceras = auth_headers(rol="docente")
+    sentencias = contar_consultas()
+
+    assert client.get("/solo-docentes", headers=cabeceras).status_code == 200
+    assert not [s for s in sentencias if "usuarios" in s]
+
+
+def test_cambio_de_rol_rechaza_tokens_anteriores(
+    app, client, db, crear_usuario, auth_headers
+):
+    usuario = crear_usuario(rol="docente")
+    cabeceras = auth_headers()
+    assert client.get("/api/auth/me", headers=cabeceras).status_code == 200
+
+    usuario.rol = "alumno"
+    db.session.commit()
+    assert usuario.token_version == 1
+
+    respuesta = client.get("/api/auth/me", headers=cabeceras)
+    assert respuesta.status_code == 401
+
+
+def test_version_ausente_en_redis_se_lee_de_la_bd(
+    app, client, db, crear_usuario, auth_headers
+):
+    usuario = crear_usuario(rol="docente")
+    cabeceras = auth_headers()
+    assert client.get("/api/auth/me", headers=cabeceras).status_code == 200
+
+    # Otro worker cambió el rol: este conserva el perfil anterior en su LRU
+    db.session.execute(
+        update(Usuario).where(Usuario.id == usuario.id).values(token_version=1)
+    )
+    db.session.commit()
+    redis_client.delete(PREFIJO_VERSION + str(usuario.id))
+
+    with app.test_request_context():
+        assert version_token_vigente(usuario.id) == 1
+    assert redis_client.get(PREFIJO_VERSION + str(usuario.id)) == "1"
+    assert client.get("/api/auth/me", headers=cabeceras).status_code == 401
+
+
+def test_refresh_emite_access_token_con_el_rol_vigente(app, client, db, crear_usuario):
+    usuario = crear_usuario(rol="docente")
+    with app.test_request_context():
+        refresh_token = create_refresh_token(
+            identity=usuario.id, additional_claims=claims_de_autorizacion(usuario)
+        )
+    cabeceras = {"Authorization": f"Bearer {refresh_token}"}
+
+    respuesta = client.post("/api/auth/refresh", headers=cabeceras)
+
+    assert respuesta.status_code == 200
+    nuevo = {"Authorization": f"Bearer {respuesta.get_json()['access_token']}"}
+    perfil = client.get("/api/auth/me", headers=nuevo)
+    assert perfil.status_code == 200
+    assert perfil.get_json()["rol"] == "docente"
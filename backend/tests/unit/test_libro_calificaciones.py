@@ -0,0 +1,166 @@
+# TEST: Pruebas unitarias para el libro de calificaciones por clase
+from app.models import (
+    Clase,
+    Evaluacion,
+    InscripcionClase,
+    Leccion,
+    Modulo,
+    OpcionRespuesta,
+    Pregunta,
+    Respuesta,
+    Usuario,
+)
+from app.services import libro_calificaciones_service
+from app.services.calificacion_service import enviar_intento
+
+
+def _usuario(db, correo, nombre="Ana Prueba", rol="estudiante"):
+    usuario = Usuario(nombre_completo=nombre, correo_electronico=correo, rol=rol)
+    usuario.set_password("Secreto1!")
+    db.session.add(usuario)
+    return usuario
+
+
+def _clase(db, estudiantes=3, evaluaciones=2, preguntas=4):
+    docente = _usuario(db, "doc@b.com", "Docente", rol="docente")
+    clase = Clase(nombre="Álgebra", docente=docente)
+    modulo = Modulo(titulo="Módulo 1", orden=1, clase=clase)
+    lista = []
+    for e in range(evaluaciones):
+        evaluacion = Evaluacion(
+            titulo=f"Examen {e}", intentos_permitidos=3, calificacion_aprobatoria=60.0
+        )
+        for p in range(preguntas):
+            pregunta = Pregunta(
+                enunciado="¿?", tipo="opcion_multiple", orden=p, evaluacion=evaluacion
+            )
+            db.session.add_all(
+                OpcionRespuesta(texto="x", es_correcta=o == 0, pregunta=pregunta)
+                for o in range(2)
+            )
+        db.session.add(
+            Leccion(
+                titulo=f"L{e}",
+                contenido="...",
+                tipo="evaluacion",
+                orden=e + 1,
+                modulo=modulo,
+                evaluacion=evaluacion,
+            )
+        )
+        lista.append(evaluacion)
+    alumnos = [
+        _usuario(db, f"e{i}@b.com", f"Estudiante {i}") for i in range(estudiantes)
+    ]
+    db.session.flush()
+    db.session.add_all(
+        InscripcionClase(clase_id=clase.id, estudiante_id=a.id, usuario_id=a.id)
+        for a in alumnos
+    )
+    db.session.commit()
+    return clase, lista, alumnos
+
+
+def _enviar(evaluacion, estudiante, aciertos, intento=1):
+    respuestas = []
+    for i, pregunta in enumerate(evaluacion.preguntas.order_by(Pregunta.id)):
+        opciones = pregunta.opciones.order_by(OpcionRespuesta.id).all()
+        elegida = opciones[0] if i < aciertos else opciones[1]
+        respuestas.append(
+            {
+                "pregunta_id": pregunta.id,
+                "opcion_seleccionada_id": elegida.id,
+                "tiempo_tomado": 10,
+            }
+        )
+    envio = {"respuestas": respuestas, "tiempo_total": 40, "intento_numero": intento}
+    enviar_intento(evaluacion.id, estudiante.id, envio)
+
+
+def test_matriz_mejor_intento_y_estadisticas(app, db, contar_consultas):
+    clase, (examen_0, examen_1), (a0, a1, a2) = _clase(db)
+    _enviar(examen_0, a0, aciertos=1)
+    _enviar(examen_0, a0, aciertos=3, intento=2)  # cuenta el mejor: 75 %
+    _enviar(examen_0, a1, aciertos=2)
+    _enviar(examen_1, a1, aciertos=4)
+    clase_id = clase.id
+
+    sentencias = contar_consultas()
+    libro = libro_calificaciones_service.construir_libro(clase_id)
+    # Inscritos + evaluaciones + un único agregado sobre respuestas
+    assert len(sentencias) == 3
+
+    assert [e["nombre_completo"] for e in libro["estudiantes"]] == [
+        "Estudiante 0",
+        "Estudiante 1",
+        "Estudiante 2",
+    ]
+    assert libro["calificaciones"] == [[75.0, None], [50.0, 100.0], [None, None]]
+    assert libro["aprobados"] == [[True, None], [False, True], [None, None]]
+    assert libro["intentos"] == [[2, 0], [1, 1], [0, 0]]
+    assert libro["estadisticas_estudiantes"][1] == {
+        "promedio": 75.0,
+        "evaluaciones_presentadas": 2,
+        "evaluaciones_aprobadas": 1,
+    }
+    assert libro["estadisticas_estudiantes"][2]["promedio"] is None
+    assert libro["estadisticas_evaluaciones"][0] == {
+        "promedio": 62.5,
+        "minimo": 50.0,
+        "maximo": 75.0,
+        "presentados": 2,
+        "tasa_aprobacion": 50.0,
+    }
+
+
+def test_cache_por_version_de_calificaciones(app, db):
+    clase, (examen, _), (alumno, *_) = _clase(db, evaluaciones=2)
+    libro = libro_calificaciones_service.obtener_libro(clase.id)
+    assert libro_calificaciones_service.obtener_libro(clase.id) is libro
+    assert libro["calificaciones"][0] == [None, None]
+
+    # Calificar un intento publica una versión nueva del libro
+    _enviar(examen, alumno, aciertos=4)
+    nuevo = libro_calificaciones_service.obtener_libro(clase.id)
+    assert nuevo["version"] > libro["version"]
+    assert nuevo["calificaciones"][0] == [100.0, None]
+
+    # Una corrección manual de una respuesta también
+    respuesta = Respuesta.query.filter_by(estudiante_id=alumno.id).first()
+    respuesta.calificacion = 0.0
+    db.session.commit()
+    corregido = libro_calificaciones_service.obtener_libro(clase.id)
+    assert corregido["version"] > nuevo["version"]
+    assert corregido["calificaciones"][0] == [75.0, None]
+
+
+def test_endpoint_json_y_csv(app, client, db, auth_headers):
+    clase, (examen, _), (alumno, *_) = _clase(db, estudiantes=2)
+    _enviar(examen, alumno, aciertos=2)
+    cabeceras = auth_headers(correo="doc@b.com")
+    url = f"/api/courses/{clase.id}/calificaciones"
+
+    datos = client.get(url, headers=cabeceras).get_json()
+    assert datos["calificaciones"][0][0] == 50.0
+
+    respuesta = client.get(url + "?formato=csv", headers=cabeceras)
+    assert respuesta.status_code == 200
+    assert respuesta.mimetype == "text/csv"
+    lineas = respuesta.get_data(as_text=True).splitlines()
+    assert lineas[0] == "estudiante_id,nombre_completo,Examen 0,Examen 1,promedio"
+    assert lineas[1] == f"{alumno.id},Estudiante 0,50.0,,50.0"
+    assert len(lineas) == 3
+
+    assert client.get(url, headers=auth_headers(correo="e1@b.com")).status_code == 403
+    # Otro docente tampoco; un administrador sí
+    _usuario(db, "otro@b.com", rol="docente")
+    _usuario(db, "admin@b.com", rol="admin")
+    db.session.commit()
+    assert client.get(url, headers=auth_headers(correo="otro@b.com")).status_code == 403
+    assert (
+        client.get(url, headers=auth_headers(correo="admin@b.com")).status_code == 200
+    )
+    assert (
+        client.get("/api/courses/999/calificaciones", headers=cabeceras).status_code
+        == 404
+    )
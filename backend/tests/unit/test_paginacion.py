@@ -0,0 +1,107 @@
+# TEST: Pruebas unitarias para la paginación por clave (cursores)
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import select
+
+from app.models import Clase, Usuario
+from app.schemas import PaginacionSchema
+from app.schemas.clase_schemas import ClasePaginacionSchema
+from app.schemas.usuario_schemas import UsuarioPaginacionSchema
+from app.utils.paginacion import CursorInvalidoError, paginar_keyset
+
+ORDEN = (Usuario.fecha_creacion.desc(), Usuario.id.desc())
+
+
+def _usuarios(db, cantidad=25):
+    base = datetime(2024, 1, 1)
+    for i in range(cantidad):
+        db.session.add(
+            Usuario(
+                nombre_completo=f"Usuario {i % 5}",
+                correo_electronico=f"u{i}@b.com",
+                hashed_password="x",
+                # Fechas repetidas: el desempate por id decide el orden
+                fecha_creacion=base + timedelta(days=i // 2),
+            )
+        )
+    db.session.commit()
+
+
+def test_recorre_todas_las_paginas_sin_offset_ni_count(app, db, contar_consultas):
+    _usuarios(db)
+    sentencias = contar_consultas(
+        lambda sentencia, parametros, varias: (sentencia, parametros)
+    )
+
+    vistos, cursor, paginas = [], None, 0
+    while True:
+        pagina = paginar_keyset(Usuario.query, ORDEN, por_pagina=10, cursor=cursor)
+        vistos.extend(u.id for u in pagina.items)
+        paginas += 1
+        if not pagina.tiene_siguiente:
+            break
+        cursor = pagina.siguiente_cursor
+
+    esperado = [u.id for u in Usuario.query.order_by(*ORDEN)]
+    assert vistos == esperado and paginas == 3
+    assert pagina.total is None
+    # SQLite siempre escribe "LIMIT ? OFFSET ?"; el desplazamiento debe ser 0
+    assert all(p[-1] == 0 for s, p in sentencias if "OFFSET" in s)
+    assert not [s for s, _ in sentencias if "count(" in s.lower()]
+
+
+def test_pagina_anterior_y_orden_mixto(app, db):
+    _usuarios(db)
+    orden = (Usuario.nombre_completo.asc(), Usuario.id.desc())
+    primera = paginar_keyset(select(Usuario), orden, por_pagina=7)
+    segunda = paginar_keyset(
+        select(Usuario), orden, por_pagina=7, cursor=primera.siguiente_cursor
+    )
+    assert not primera.tiene_anterior and segunda.tiene_anterior
+
+    atras = paginar_keyset(
+        select(Usuario), orden, por_pagina=7, cursor=segunda.anterior_cursor
+    )
+    assert [u.id for u in atras.items] == [u.id for u in primera.items]
+    assert not atras.tiene_anterior and atras.tiene_siguiente
+    esperado = [u.id for u in Usuario.query.order_by(*orden)][7:14]
+    assert [u.id for u in segunda.items] == esperado
+
+
+def test_total_opcional_y_cursor_invalido(app, db):
+    _usuarios(db, cantidad=12)
+    consulta = Usuario.query.filter(Usuario.nombre_completo != "Usuario 0")
+    pagina = paginar_keyset(consulta, ORDEN, por_pagina=5, total="exacto")
+    assert pagina.total == 9
+    # En SQLite la estimación recurre al conteo exacto
+    assert paginar_keyset(consulta, ORDEN, total="estimado").total == 9
+
+    manipulado = pagina.siguiente_cursor[:-2] + "xx"
+    with pytest.raises(CursorInvalidoError):
+        paginar_keyset(consulta, ORDEN, cursor=manipulado)
+    with pytest.raises(ValueError):
+        paginar_keyset(consulta, (Usuario.fecha_creacion.desc(),))
+
+
+def test_esquemas_de_paginacion(app, db):
+    _usuarios(db, cantidad=3)
+    docente = Usuario.query.first()
+    db.session.add_all(Clase(nombre=f"Clase {i}", docente=docente) for i in range(4))
+    db.session.commit()
+
+    parametros = PaginacionSchema().load({"por_pagina": "2", "conteo": "exacto"})
+    assert parametros["cursor"] is None
+    pagina = paginar_keyset(
+        Clase.query,
+        (Clase.id.asc(),),
+        por_pagina=parametros["por_pagina"],
+        total=parametros["conteo"],
+    )
+    datos = ClasePaginacionSchema().dump(pagina)
+    assert len(datos["items"]) == 2 and datos["total"] == 4
+    assert datos["tiene_siguiente"] and datos["siguiente_cursor"]
+    assert "pagina" not in datos
+
+    usuarios = UsuarioPaginacionSchema().dump(paginar_keyset(Usuario.query, ORDEN))
+    assert len(usuarios["items"]) == 3 and usuarios["siguiente_cursor"] is None
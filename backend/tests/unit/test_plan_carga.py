@@ -0,0 +1,94 @@
+# TEST: Pruebas unitarias para el planificador de carga guiado por esquemas
+from app.models import Clase, InscripcionClase, Leccion, Modulo, Usuario
+from app.schemas import (
+    ClaseConModulosSchema,
+    EvaluacionConPreguntasSchema,
+    InscripcionClaseSchema,
+    plan_query,
+)
+from app.schemas.plan_carga import planificar
+from app.utils import dataloader
+
+
+def _clase(db, nombre, docente, modulos, lecciones):
+    clase = Clase(nombre=nombre, docente=docente)
+    for m in range(modulos):
+        modulo = Modulo(titulo=f"Módulo {m}", orden=m + 1, clase=clase)
+        db.session.add_all(
+            Leccion(
+                titulo="L", contenido="...", tipo="teoria", orden=i + 1, modulo=modulo
+            )
+            for i in range(lecciones)
+        )
+    db.session.add(clase)
+    db.session.commit()
+
+
+def test_plan_respeta_only_y_exclude():
+    plan = planificar(InscripcionClaseSchema())
+    # estudiante y clase son muchos-a-uno: joinedload, sin precarga
+    assert len(plan.opciones) == 2 and not plan.requiere_precarga
+
+    sin_modulos = planificar(ClaseConModulosSchema(exclude=("modulos",)))
+    assert [nodo.nombre for nodo in sin_modulos.hijos] == ["docente"]
+
+    completo = planificar(ClaseConModulosSchema())
+    modulos = next(nodo for nodo in completo.hijos if nodo.nombre == "modulos")
+    assert modulos.dinamica and completo.requiere_precarga
+    # ModuloConLeccionesSchema excluye `clase`
+    assert [nodo.nombre for nodo in modulos.hijos] == ["lecciones"]
+
+    evaluacion = planificar(EvaluacionConPreguntasSchema())
+    assert {nodo.nombre for nodo in evaluacion.hijos} >= {"leccion", "preguntas"}
+
+
+def test_arbol_del_curso_en_consultas_constantes(app, db, contar_consultas):
+    docente = Usuario(nombre_completo="Doc", correo_electronico="d@b.com")
+    docente.set_password("Secreto1!")
+    alumno = Usuario(nombre_completo="Alumno", correo_electronico="a@b.com")
+    alumno.set_password("Secreto1!")
+    db.session.add_all([docente, alumno])
+    _clase(db, "Pequeña", docente, modulos=1, lecciones=1)
+    _clase(db, "Grande", docente, modulos=12, lecciones=6)
+
+    consultas = []
+    for nombre in ("Pequeña", "Grande"):
+        db.session.expunge_all()
+        dataloader.descartar()
+        sentencias = contar_consultas()
+        consulta = Clase.query.filter_by(nombre=nombre)
+        clase = plan_query(consulta, ClaseConModulosSchema).one()
+        cargadas = len(sentencias)
+        datos = ClaseConModulosSchema().dump(clase)
+        # El dump no consulta nada: todo llegó con el plan
+        assert len(sentencias) == cargadas
+        consultas.append(cargadas)
+
+    assert sum(len(m["lecciones"]) for m in datos["modulos"]) == 72
+    assert datos["docente"]["nombre_completo"] == "Doc"
+    # Clase + docente (joinedload) | módulos IN | lecciones IN
+    assert consultas == [3, 3]
+
+
+def test_plan_con_select_in_y_joinedload(app, db, contar_consultas):
+    docente = Usuario(nombre_completo="Doc", correo_electronico="d@b.com")
+    docente.set_password("Secreto1!")
+    _clase(db, "Álgebra", docente, modulos=1, lecciones=1)
+    for i in range(5):
+        alumno = Usuario(nombre_completo=f"Alumno {i}", correo_electronico=f"{i}@b.com")
+        alumno.set_password("Secreto1!")
+        db.session.add(alumno)
+        db.session.flush()
+        db.session.add(
+            InscripcionClase(estudiante_id=alumno.id, usuario_id=alumno.id, clase_id=1)
+        )
+    db.session.commit()
+    db.session.expunge_all()
+    dataloader.descartar()
+
+    sentencias = contar_consultas()
+    inscripciones = plan_query(InscripcionClase.query, InscripcionClaseSchema).all()
+    datos = InscripcionClaseSchema(many=True).dump(inscripciones)
+    assert {d["clase"]["nombre"] for d in datos} == {"Álgebra"}
+    assert len({d["estudiante"]["id"] for d in datos}) == 5
+    assert len(sentencias) == 1
@@ -0,0 +1,99 @@
+# TEST: Pruebas unitarias para el limitador de tasa de login/registro
+from redis.exceptions import ResponseError
+
+from app import create_app
+from app.config import TestingConfig
+from app.extensions import db as _db
+from app.extensions import redis_client
+from app.utils import rate_limit
+from app.utils.metrics import metricas
+
+
+def test_login_bloquea_por_correo_con_retry_after(app, client):
+    app.config["RATELIMIT_LOGIN_CORREO"] = (3, 60)
+    credenciales = {"correo_electronico": "Ana@Ejemplo.com", "password": "mala"}
+
+    for _ in range(3):
+        assert client.post("/api/auth/login", json=credenciales).status_code == 401
+
+    # Misma cuenta con otra capitalización: comparte el límite
+    credenciales["correo_electronico"] = "ana@ejemplo.com"
+    respuesta = client.post("/api/auth/login", json=credenciales)
+    assert respuesta.status_code == 429
+    assert int(respuesta.headers["Retry-After"]) >= 1
+
+    # Otra cuenta desde la misma IP sigue permitida
+    otra = {"correo_electronico": "otro@ejemplo.com", "password": "mala"}
+    assert client.post("/api/auth/login", json=otra).status_code == 401
+
+
+def test_limitador_deshabilitado(app, client):
+    app.config["RATELIMIT_HABILITADO"] = False
+    app.config["RATELIMIT_LOGIN_CORREO"] = (1, 60)
+    credenciales = {"correo_electronico": "ana@ejemplo.com", "password": "mala"}
+    for _ in range(3):
+        assert client.post("/api/auth/login", json=credenciales).status_code == 401
+
+
+def test_script_gcra_en_redis_con_lua(app, client):
+    # El backend de pruebas (fakeredis con lupa) ejecuta el script real
+    app.config["RATELIMIT_LOGIN_CORREO"] = (3, 60)
+    metricas.reiniciar(rate_limit.PREFIJO_METRICAS)
+    credenciales = {"correo_electronico": "ana@ejemplo.com", "password": "mala"}
+
+    for _ in range(3):
+        assert client.post("/api/auth/login", json=credenciales).status_code == 401
+    respuesta = client.post("/api/auth/login", json=credenciales)
+    assert respuesta.status_code == 429
+    # 20 s por petición: la cuarta debe esperar a que se libere la primera
+    assert 15 <= int(respuesta.headers["Retry-After"]) <= 20
+
+    clave = "ratelimit:login:correo:ana@ejemplo.com"
+    assert 0 < redis_client.pttl(clave) <= 60000
+    assert redis_client.exists("ratelimit:login:ip:127.0.0.1")
+    # Sin recurrir al almacén en memoria
+    assert metricas.snapshot(rate_limit.PREFIJO_METRICAS) == {
+        "rate_limit.rechazos.login": 1
+    }
+
+
+def test_error_del_script_se_registra(app, client, monkeypatch, caplog):
+    def script_roto(keys=None, args=None, client=None):
+        raise ResponseError("ERR Error compiling script")
+
+    monkeypatch.setattr(rate_limit, "_script", script_roto)
+    metricas.reiniciar(rate_limit.PREFIJO_METRICAS)
+    credenciales = {"correo_electronico": "ana@ejemplo.com", "password": "mala"}
+    assert client.post("/api/auth/login", json=credenciales).status_code == 401
+    datos = metricas.snapshot(rate_limit.PREFIJO_METRICAS)
+    assert datos == {"rate_limit.errores_script": 1}
+    assert "Error en el script GCRA" in caplog.text
+
+
+def test_cada_app_registra_su_script(app):
+    anterior = rate_limit._script
+    create_app("testing")
+    assert rate_limit._script is not anterior
+
+
+def test_ip_del_cliente_detras_del_proxy(monkeypatch):
+    monkeypatch.setattr(TestingConfig, "PROXY_SALTOS", 1)
+    app = create_app("testing")
+    app.config["RATELIMIT_LOGIN_IP"] = (1, 60)
+    app.config["RATELIMIT_LOGIN_CORREO"] = None
+    with app.app_context():
+        _db.create_all()
+        client = app.test_client()
+        credenciales = {"correo_electronico": "ana@ejemplo.com", "password": "mala"}
+        for ip in ("10.0.0.1", "10.0.0.2"):
+            cabeceras = {"X-Forwarded-For": ip}
+            respuesta = client.post(
+                "/api/auth/login", json=credenciales, headers=cabeceras
+            )
+            assert respuesta.status_code == 401
+        respuesta = client.post(
+            "/api/auth/login", json=credenciales, headers={"X-Forwarded-For": ip}
+        )
+        assert respuesta.status_code == 429
+        _db.session.remove()
+        _db.drop_all()
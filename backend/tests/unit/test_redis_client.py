@@ -0,0 +1,84 @@
+# TEST: Pruebas unitarias del cliente Redis (backend en memoria y circuit breaker)
+import fakeredis
+import pytest
+from redis.exceptions import ConnectionError as RedisConnectionError
+from redis.exceptions import NoScriptError
+
+from app.extensions import (
+    CircuitBreaker,
+    CircuitoRedisAbiertoError,
+    ClienteRedis,
+    redis_client,
+)
+
+
+class RedisCaido(fakeredis.FakeRedis):
+    def __init__(self):
+        super().__init__(decode_responses=True)
+        self.llamadas = 0
+
+    def get(self, clave):
+        self.llamadas += 1
+        raise RedisConnectionError("sin conexión")
+
+
+def test_backend_en_memoria_en_pruebas(app):
+    redis_client.setex("prueba:clave", 60, 42)
+    assert redis_client.get("prueba:clave") == "42"
+    assert redis_client.ttl("prueba:clave") > 0
+    assert redis_client.estadisticas()["redis.circuito_estado"] == "cerrado"
+
+
+def test_circuito_se_abre_y_falla_rapido(app):
+    cliente = ClienteRedis()
+    cliente.init_app(app)
+    cliente.circuito.umbral_fallos = 3
+    caido = RedisCaido()
+    cliente._cliente = caido
+
+    for _ in range(3):
+        with pytest.raises(RedisConnectionError):
+            cliente.get("x")
+
+    # Con el circuito abierto no se llega al backend
+    with pytest.raises(CircuitoRedisAbiertoError):
+        cliente.get("x")
+    assert caido.llamadas == 3
+    assert cliente.estadisticas()["redis.circuito_estado"] == "abierto"
+
+    # Pasado el tiempo de apertura se permite una petición de prueba
+    cliente.circuito._abierto_hasta = 0
+    cliente._cliente = fakeredis.FakeRedis(decode_responses=True)
+    assert cliente.get("x") is None
+    assert cliente.estadisticas()["redis.circuito_estado"] == "cerrado"
+
+
+class RedisSinScript(fakeredis.FakeRedis):
+    def evalsha(self, *args, **kwargs):
+        raise NoScriptError("No matching script. Please use EVAL.")
+
+
+def test_error_de_respuesta_en_la_prueba_cierra_el_circuito(app):
+    cliente = ClienteRedis()
+    cliente.init_app(app)
+    cliente.circuito = CircuitBreaker(umbral_fallos=1, tiempo_apertura=0)
+    cliente.circuito.registrar_fallo()
+    assert cliente.circuito.estado == "semiabierto"
+
+    # La petición de prueba llega a Redis y este responde con un error de comando
+    cliente._cliente = RedisSinScript(decode_responses=True)
+    with pytest.raises(NoScriptError):
+        cliente.evalsha("sha", 0)
+    assert cliente.circuito.estado == "cerrado"
+    assert cliente.get("x") is None
+
+
+def test_error_local_en_la_prueba_libera_el_circuito():
+    circuito = CircuitBreaker(umbral_fallos=1, tiempo_apertura=0)
+    circuito.registrar_fallo()
+    assert circuito.permitir()
+    assert not circuito.permitir()
+    circuito.liberar_prueba()
+    # Sigue semiabierto, pero otra petición puede hacer la prueba
+    assert circuito.estado == "semiabierto"
+    assert circuito.permitir()
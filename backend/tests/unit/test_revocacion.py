@@ -0,0 +1,76 @@
+# TEST: Pruebas unitarias para la revocación de tokens con filtro de Bloom
+import pytest
+from redis.exceptions import ConnectionError as RedisConnectionError
+
+from app.auth.revocation import PREFIJO_REDIS, RevocacionError, revocaciones
+from app.extensions import redis_client
+
+
+@pytest.fixture
+def cabeceras(auth_headers):
+    return auth_headers(rol="docente", correo="d@b.com")
+
+
+def _redis_caido(monkeypatch, *comandos):
+    def fallar(*args, **kwargs):
+        raise RedisConnectionError("Redis no disponible")
+
+    cliente = redis_client._obtener_cliente()
+    for comando in comandos:
+        monkeypatch.setattr(cliente, comando, fallar)
+
+
+def test_token_revocado_se_rechaza(client, cabeceras):
+    assert client.get("/api/auth/me", headers=cabeceras).status_code == 200
+    assert client.post("/api/auth/logout", headers=cabeceras).status_code == 200
+    respuesta = client.get("/api/auth/me", headers=cabeceras)
+    assert respuesta.status_code == 401
+    assert respuesta.get_json()["error"] == "Token revocado"
+
+
+def test_reconstruccion_desde_redis(app):
+    redis_client.setex(PREFIJO_REDIS + "jti-de-otro-worker", 60, "revoked")
+    revocaciones.reconstruir()
+    assert "jti-de-otro-worker" in revocaciones._filtro
+    assert revocaciones.esta_revocado("jti-de-otro-worker")
+    # Tras expirar en Redis, una nueva reconstrucción lo descarta del filtro
+    redis_client.delete(PREFIJO_REDIS + "jti-de-otro-worker")
+    revocaciones.reconstruir()
+    assert "jti-de-otro-worker" not in revocaciones._filtro
+    assert not revocaciones.esta_revocado("jti-de-otro-worker")
+
+
+def test_logout_con_redis_caido_responde_503(client, cabeceras, monkeypatch):
+    _redis_caido(monkeypatch, "setex")
+    respuesta = client.post("/api/auth/logout", headers=cabeceras)
+    assert respuesta.status_code == 503
+    with pytest.raises(RevocacionError):
+        revocaciones.revocar("otro-jti", 60)
+
+
+def test_redis_caido_con_filtro_cargado(app, monkeypatch):
+    revocaciones.esta_revocado("inicia-el-worker")
+    revocaciones.revocar("revocado", 60)
+    _redis_caido(monkeypatch, "exists")
+    # Un negativo del filtro no necesita Redis; un positivo sin confirmar se rechaza
+    assert not revocaciones.esta_revocado("vigente")
+    assert revocaciones.esta_revocado("revocado")
+
+
+@pytest.mark.parametrize(
+    "politica, esperado", [("permitir", False), ("rechazar", True)]
+)
+def test_redis_caido_sin_filtro_aplica_la_politica(
+    app, monkeypatch, politica, esperado
+):
+    app.config["JWT_REVOCACION_SIN_FILTRO"] = politica
+    revocaciones.init_app(app)
+    _redis_caido(monkeypatch, "scan_iter", "exists")
+    assert revocaciones.esta_revocado("cualquiera") is esperado
+    assert not revocaciones._listo
+
+    # Cuando Redis vuelve, el filtro se carga en el siguiente reintento
+    monkeypatch.undo()
+    revocaciones._ultimo_intento = 0.0
+    assert not revocaciones.esta_revocado("cualquiera")
+    assert revocaciones._listo
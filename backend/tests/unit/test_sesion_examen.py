@@ -0,0 +1,236 @@
+# TEST: Pruebas unitarias para las sesiones de examen en Redis
+import time
+
+import pytest
+
+from app.extensions import redis_client
+from app.models import (
+    Clase,
+    Evaluacion,
+    InscripcionClase,
+    Leccion,
+    Modulo,
+    OpcionRespuesta,
+    Pregunta,
+    Respuesta,
+    Usuario,
+)
+from app.services import sesion_examen_service
+from app.services.sesion_examen_service import SesionExamenError
+
+
+def _examen(db, tiempo_limite=None, preguntas=3):
+    evaluacion = Evaluacion(
+        titulo="Examen", intentos_permitidos=2, tiempo_limite_minutos=tiempo_limite
+    )
+    for p in range(preguntas):
+        pregunta = Pregunta(
+            enunciado="¿?", tipo="opcion_multiple", orden=p, evaluacion=evaluacion
+        )
+        db.session.add_all(
+            OpcionRespuesta(texto="x", es_correcta=o == 0, pregunta=pregunta)
+            for o in range(2)
+        )
+    estudiante = Usuario(nombre_completo="Ana Prueba", correo_electronico="a@b.com")
+    estudiante.set_password("Secreto1!")
+    docente = Usuario(
+        nombre_completo="Docente", correo_electronico="doc@b.com", rol="docente"
+    )
+    docente.set_password("Secreto1!")
+    modulo = Modulo(
+        titulo="Módulo 1", orden=1, clase=Clase(nombre="Álgebra", docente=docente)
+    )
+    leccion = Leccion(
+        titulo="Examen",
+        contenido="...",
+        tipo="evaluacion",
+        orden=1,
+        modulo=modulo,
+        evaluacion=evaluacion,
+    )
+    db.session.add_all([evaluacion, estudiante, leccion])
+    db.session.flush()
+    db.session.add(
+        InscripcionClase(
+            clase_id=modulo.clase_id,
+            estudiante_id=estudiante.id,
+            usuario_id=estudiante.id,
+        )
+    )
+    db.session.commit()
+    opciones = [
+        p.opciones.order_by(OpcionRespuesta.id).all()
+        for p in evaluacion.preguntas.order_by(Pregunta.id)
+    ]
+    return evaluacion.id, estudiante.id, opciones
+
+
+def test_autoguardado_reanudacion_y_envio(
+    app, client, db, auth_headers, contar_consultas
+):
+    evaluacion_id, estudiante_id, opciones = _examen(db, tiempo_limite=30)
+    cabeceras = auth_headers()
+    base = f"/api/evaluations/{evaluacion_id}/sesion"
+
+    inicio = client.post(base, headers=cabeceras)
+    assert inicio.status_code == 201
+    assert inicio.get_json()["intento_numero"] == 1
+    assert 0 < inicio.get_json()["segundos_restantes"] <= 1800
+    # Iniciar de nuevo devuelve la misma sesión
+    assert client.post(base, headers=cabeceras).status_code == 200
+
+    for i in (0, 1):
+        pregunta_id = opciones[i][0].pregunta_id
+        respuesta = client.put(
+            f"{base}/respuestas/{pregunta_id}",
+            json={"opcion_seleccionada_id": opciones[i][i].id, "tiempo_tomado": 7},
+            headers=cabeceras,
+        )
+        assert respuesta.status_code == 200
+    ajena = client.put(
+        f"{base}/respuestas/{opciones[0][0].pregunta_id}",
+        json={"opcion_seleccionada_id": opciones[1][0].id},
+        headers=cabeceras,
+    )
+    assert ajena.status_code == 400
+
+    # Reanudar no consulta la BD
+    sentencias = contar_consultas()
+    sesion = sesion_examen_service.obtener_sesion(evaluacion_id, estudiante_id)
+    assert sentencias == []
+    assert [r["opcion_seleccionada_id"] for r in sesion["respuestas"]] == [
+        opciones[0][0].id,
+        opciones[1][1].id,
+    ]
+
+    envio = client.post(f"{base}/envio", headers=cabeceras)
+    assert envio.status_code == 201
+    resultado = envio.get_json()
+    assert resultado["respuestas_correctas"] == 1
+    assert resultado["calificacion"] == pytest.approx(33.33)
+    # Las preguntas sin responder también quedan registradas en el intento
+    assert Respuesta.query.filter_by(evaluacion_id=evaluacion_id).count() == 3
+
+    # Exactamente una vez: el segundo envío ya no encuentra la sesión
+    assert client.post(f"{base}/envio", headers=cabeceras).status_code == 404
+    assert Respuesta.query.filter_by(evaluacion_id=evaluacion_id).count() == 3
+    assert client.get(base, headers=cabeceras).status_code == 404
+    # El siguiente inicio corresponde al segundo intento
+    assert client.post(base, headers=cabeceras).get_json()["intento_numero"] == 2
+
+
+def test_envio_automatico_al_vencer(app, db):
+    evaluacion_id, estudiante_id, opciones = _examen(db, tiempo_limite=1)
+    _, creada = sesion_examen_service.iniciar_sesion(evaluacion_id, estudiante_id)
+    assert creada
+    clave = sesion_examen_service._clave(evaluacion_id, estudiante_id)
+    assert 60 < redis_client.ttl(clave) <= 60 + 3600
+    sesion_examen_service.guardar_respuesta(
+        evaluacion_id,
+        estudiante_id,
+        opciones[0][0].pregunta_id,
+        {"opcion_seleccionada_id": opciones[0][0].id, "tiempo_tomado": 3},
+    )
+
+    limite = time.time() + 60
+    assert sesion_examen_service.enviar_vencidas(ahora=limite - 30) == 0
+    assert sesion_examen_service.enviar_vencidas(ahora=limite + 120) == 1
+    filas = Respuesta.query.filter_by(
+        evaluacion_id=evaluacion_id, estudiante_id=estudiante_id
+    ).all()
+    assert len(filas) == 3 and sum(f.calificacion or 0 for f in filas) == 1.0
+    assert sesion_examen_service.enviar_vencidas(ahora=limite + 120) == 0
+
+    with pytest.raises(SesionExamenError) as error:
+        sesion_examen_service.guardar_respuesta(
+            evaluacion_id, estudiante_id, opciones[1][0].pregunta_id, {}
+        )
+    assert error.value.codigo == 404
+    assert not redis_client.exists(clave)
+
+
+def test_autoguardado_tras_la_hora_limite(app, db):
+    evaluacion_id, estudiante_id, opciones = _examen(db, tiempo_limite=5)
+    sesion_examen_service.iniciar_sesion(evaluacion_id, estudiante_id)
+    clave = sesion_examen_service._clave(evaluacion_id, estudiante_id)
+    redis_client.hset(clave, "_limite", "1000.0")
+
+    with pytest.raises(SesionExamenError) as error:
+        sesion_examen_service.guardar_respuesta(
+            evaluacion_id,
+            estudiante_id,
+            opciones[0][0].pregunta_id,
+            {"opcion_seleccionada_id": opciones[0][0].id},
+        )
+    assert error.value.codigo == 409
+    assert sesion_examen_service.obtener_sesion(evaluacion_id, estudiante_id)["vencida"]
+
+
+def test_error_transitorio_conserva_el_borrador(app, db, monkeypatch):
+    evaluacion_id, estudiante_id, opciones = _examen(db)
+    sesion_examen_service.iniciar_sesion(evaluacion_id, estudiante_id)
+    sesion_examen_service.guardar_respuesta(
+        evaluacion_id,
+        estudiante_id,
+        opciones[0][0].pregunta_id,
+        {"opcion_seleccionada_id": opciones[0][0].id},
+    )
+
+    def falla(*args, **kwargs):
+        raise RuntimeError("BD no disponible")
+
+    monkeypatch.setattr(sesion_examen_service, "enviar_intento", falla)
+    with pytest.raises(RuntimeError):
+        sesion_examen_service.enviar_sesion(evaluacion_id, estudiante_id)
+    monkeypatch.undo()
+
+    sesion = sesion_examen_service.obtener_sesion(evaluacion_id, estudiante_id)
+    assert len(sesion["respuestas"]) == 1
+    resultado = sesion_examen_service.enviar_sesion(evaluacion_id, estudiante_id)
+    assert resultado["respuestas_correctas"] == 1
+
+
+def test_inicio_atomico_con_ttl(app, db):
+    evaluacion_id, estudiante_id, _ = _examen(db, tiempo_limite=1)
+    clave = sesion_examen_service._clave(evaluacion_id, estudiante_id)
+    # Resto de un inicio interrumpido antes de este cambio: sin `_inicio` ni TTL
+    redis_client.hset(clave, "_intento", 1)
+
+    sesion, creada = sesion_examen_service.iniciar_sesion(evaluacion_id, estudiante_id)
+    assert creada and sesion["intento_numero"] == 1
+    assert 60 < redis_client.ttl(clave) <= 60 + 3600
+    # Un segundo inicio no pisa la hora de inicio ni la hora límite
+    crudo = redis_client.hgetall(clave)
+    otra, creada = sesion_examen_service.iniciar_sesion(evaluacion_id, estudiante_id)
+    assert not creada
+    assert redis_client.hgetall(clave) == crudo
+    assert otra["fecha_limite"] == sesion["fecha_limite"]
+
+
+def test_solo_estudiantes_inscritos_inician(app, client, db, auth_headers):
+    evaluacion_id, estudiante_id, opciones = _examen(db, tiempo_limite=30)
+    cabeceras = auth_headers()
+    base = f"/api/evaluations/{evaluacion_id}"
+
+    # Con tiempo límite, el envío directo sin sesión se rechaza
+    respuestas = [
+        {
+            "pregunta_id": o[0].pregunta_id,
+            "opcion_seleccionada_id": o[0].id,
+            "tiempo_tomado": 1,
+            "intento_numero": 1,
+        }
+        for o in opciones
+    ]
+    envio = {"respuestas": respuestas, "tiempo_total": 5, "intento_numero": 1}
+    directo = client.post(f"{base}/intentos", json=envio, headers=cabeceras)
+    assert directo.status_code == 409
+    assert Respuesta.query.count() == 0
+
+    InscripcionClase.query.filter_by(
+        estudiante_id=estudiante_id
+    ).one().estado = "abandonado"
+    db.session.commit()
+    assert client.post(f"{base}/sesion", headers=cabeceras).status_code == 403
+    clave = sesion_examen_service._clave(evaluacion_id, estudiante_id)
+    assert not redis_client.exists(clave)
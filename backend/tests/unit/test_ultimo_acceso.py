@@ -0,0 +1,137 @@
+# TEST: Pruebas unitarias para la escritura diferida de últimos accesos
+from datetime import datetime
+
+import pytest
+
+from app.extensions import redis_client
+from app.models import Clase, InscripcionClase
+from app.models.usuario import Usuario
+from app.services.ultimo_acceso_service import PREFIJO_REDIS, buffer_ultimo_acceso
+
+
+def _usuario(db, correo="a@b.com"):
+    usuario = Usuario(nombre_completo="Ana Prueba", correo_electronico=correo)
+    usuario.set_password("Secreto1!")
+    db.session.add(usuario)
+    db.session.commit()
+    return usuario
+
+
+def test_login_no_escribe_y_la_lectura_fusiona_el_buffer(
+    app, client, db, contar_consultas
+):
+    usuario = _usuario(db)
+    sentencias = contar_consultas()
+
+    credenciales = {"correo_electronico": "a@b.com", "password": "Secreto1!"}
+    token = client.post("/api/auth/login", json=credenciales).get_json()["access_token"]
+    assert not [s for s in sentencias if s.startswith("UPDATE")]
+
+    db.session.refresh(usuario)
+    assert usuario.ultimo_inicio_sesion is None
+    me = client.get("/api/auth/me", headers={"Authorization": f"Bearer {token}"})
+    assert me.get_json()["ultimo_inicio_sesion"] is not None
+
+
+def test_volcado_en_lote_gana_la_ultima_marca(app, db, contar_consultas):
+    ana, luis = _usuario(db), _usuario(db, "l@b.com")
+    buffer_ultimo_acceso.registrar("inicio_sesion", ana.id, momento=1_700_000_000)
+    buffer_ultimo_acceso.registrar("inicio_sesion", ana.id, momento=1_700_000_100)
+    buffer_ultimo_acceso.registrar("inicio_sesion", luis.id, momento=1_700_000_050)
+
+    sentencias = contar_consultas(lambda sentencia, parametros, varias: varias)
+    assert buffer_ultimo_acceso.volcar() == 2
+    # Un único executemany para todo el lote
+    assert sentencias == [True]
+
+    db.session.expire_all()
+    assert ana.ultimo_inicio_sesion == datetime.utcfromtimestamp(1_700_000_100)
+    assert luis.ultimo_inicio_sesion == datetime.utcfromtimestamp(1_700_000_050)
+
+    # Una marca anterior volcada después no retrocede la fecha
+    buffer_ultimo_acceso.registrar("inicio_sesion", ana.id, momento=1_600_000_000)
+    buffer_ultimo_acceso.volcar()
+    db.session.expire_all()
+    assert ana.ultimo_inicio_sesion == datetime.utcfromtimestamp(1_700_000_100)
+    assert buffer_ultimo_acceso.volcar() == 0
+
+
+def test_visita_a_la_clase_solo_anota_inscripciones(app, client, db, auth_headers):
+    docente, alumno = _usuario(db), _usuario(db, "l@b.com")
+    clase = Clase(nombre="Álgebra", docente=docente)
+    db.session.add(clase)
+    db.session.flush()
+    db.session.add(
+        InscripcionClase(
+            clase_id=clase.id, estudiante_id=alumno.id, usuario_id=alumno.id
+        )
+    )
+    db.session.commit()
+    pendientes = PREFIJO_REDIS + "inscripcion"
+
+    def visitar(correo, **cabeceras):
+        cabeceras.update(auth_headers(correo=correo))
+        return client.get(f"/api/courses/{clase.id}", headers=cabeceras)
+
+    assert visitar("a@b.com").status_code == 200
+    assert not redis_client.exists(pendientes)
+
+    respuesta = visitar("l@b.com")
+    assert redis_client.hkeys(pendientes) == [f"{alumno.id}:{clase.id}"]
+
+    # Una revalidación con 304 también cuenta como visita
+    redis_client.delete(pendientes)
+    revalidacion = visitar("l@b.com", **{"If-None-Match": respuesta.headers["ETag"]})
+    assert revalidacion.status_code == 304
+    assert redis_client.hkeys(pendientes) == [f"{alumno.id}:{clase.id}"]
+
+
+def test_fallo_de_un_destino_no_pierde_los_demas(app, db, monkeypatch):
+    ana, luis = _usuario(db), _usuario(db, "l@b.com")
+    clase = Clase(nombre="Álgebra", docente=ana)
+    db.session.add(clase)
+    db.session.flush()
+    inscripcion = InscripcionClase(
+        clase_id=clase.id, estudiante_id=luis.id, usuario_id=luis.id
+    )
+    db.session.add(inscripcion)
+    db.session.commit()
+    buffer_ultimo_acceso.registrar("inicio_sesion", ana.id, momento=1_700_000_000)
+    buffer_ultimo_acceso.registrar("inicio_sesion", luis.id, momento=1_700_000_000)
+    buffer_ultimo_acceso.registrar(
+        "inscripcion", (luis.id, clase.id), momento=1_700_000_000
+    )
+
+    def fallar():
+        raise RuntimeError("UPDATE fallido")
+
+    destino = buffer_ultimo_acceso.destinos["inicio_sesion"]
+    monkeypatch.setattr(destino, "sentencia_update", fallar)
+    # Un acceso más reciente que llega durante el volcado no se pisa al devolver la
+    # instantánea
+    original = buffer_ultimo_acceso._tomar_redis
+
+    def tomar_y_registrar(nombre):
+        pendientes = original(nombre)
+        if nombre == "inicio_sesion":
+            buffer_ultimo_acceso.registrar(nombre, ana.id, momento=1_700_000_200)
+        return pendientes
+
+    monkeypatch.setattr(buffer_ultimo_acceso, "_tomar_redis", tomar_y_registrar)
+    with pytest.raises(RuntimeError):
+        buffer_ultimo_acceso.volcar()
+
+    db.session.expire_all()
+    assert inscripcion.ultimo_acceso == datetime.utcfromtimestamp(1_700_000_000)
+    assert ana.ultimo_inicio_sesion is None
+    devueltos = redis_client.hgetall(PREFIJO_REDIS + "inicio_sesion")
+    assert {campo: float(valor) for campo, valor in devueltos.items()} == {
+        str(ana.id): 1_700_000_200,
+        str(luis.id): 1_700_000_000,
+    }
+
+    monkeypatch.undo()
+    assert buffer_ultimo_acceso.volcar() == 2
+    db.session.expire_all()
+    assert ana.ultimo_inicio_sesion == datetime.utcfromtimestamp(1_700_000_200)
+    assert luis.ultimo_inicio_sesion == datetime.utcfromtimestamp(1_700_000_000)
@@ -0,0 +1,88 @@
+# TEST: Pruebas unitarias para la caché de perfiles de usuario
+from flask_jwt_extended import create_access_token
+from app.auth.decorators import roles_required
+from app.auth import user_cache
+from app.models.usuario import Usuario
+from app.utils.metrics import metricas
+
+
+def _crear_usuario(db, rol="docente"):
+    usuario = Usuario(
+        nombre_completo="Docente Prueba", correo_electronico="d@e.com", rol=rol
+    )
+    usuario.hashed_password = "x"
+    db.session.add(usuario)
+    db.session.commit()
+    return usuario
+
+
+def _registrar_ruta(app):
+    @app.route("/solo-docentes")
+    @roles_required(["docente"])
+    def solo_docentes():
+        return {"ok": True}
+
+
+def test_una_consulta_por_request_y_hits_entre_requests(app, client, db):
+    _registrar_ruta(app)
+    usuario = _crear_usuario(db)
+    token = create_access_token(identity=usuario)
+    metricas.reiniciar(user_cache.PREFIJO_METRICAS)
+
+    for _ in range(3):
+        respuesta = client.get(
+            "/solo-docentes", headers={"Authorization": f"Bearer {token}"}
+        )
+        assert respuesta.status_code == 200
+
+    stats = user_cache.estadisticas()
+    assert stats["usuarios_cache.consultas_bd"] == 1
+    assert stats["usuarios_cache.consultas_evitadas"] >= 5
+
+
+def test_cambio_de_rol_invalida_la_cache(app, client, db):
+    _registrar_ruta(app)
+    usuario = _crear_usuario(db)
+    token = create_access_token(identity=usuario)
+    cabeceras = {"Authorization": f"Bearer {token}"}
+    assert client.get("/solo-docentes", headers=cabeceras).status_code == 200
+
+    usuario.rol = "alumno"
+    db.session.commit()
+
+    assert client.get("/solo-docentes", headers=cabeceras).status_code == 403
+
+
+def test_invalidacion_despues_del_commit(app, db):
+    usuario = _crear_usuario(db)
+    assert user_cache.obtener_perfil(usuario.id).rol == "docente"
+
+    usuario.rol = "admin"
+    db.session.flush()
+    # Una lectura concurrente entre el flush y el commit vuelve a cachear el rol
+    # anterior; el commit debe descartarlo
+    anterior = {**user_cache._leer_bd(usuario.id), "rol": "docente"}
+    user_cache._lru.guardar(usuario.id, anterior)
+    db.session.commit()
+    user_cache._memo_request().clear()
+    assert user_cache.obtener_perfil(usuario.id).rol == "admin"
+
+    usuario.activo = False
+    db.session.flush()
+    db.session.rollback()
+    assert user_cache.CLAVE_SESION not in db.session.info
+
+
+def test_metricas_solo_para_administradores(app, client, db):
+    usuario = _crear_usuario(db)
+    assert client.get("/api/metrics").status_code == 401
+    token = create_access_token(identity=usuario)
+    cabeceras = {"Authorization": f"Bearer {token}"}
+    assert client.get("/api/metrics", headers=cabeceras).status_code == 403
+
+    usuario.rol = "admin"
+    db.session.commit()
+    token = create_access_token(identity=usuario)
+    respuesta = client.get("/api/metrics", headers={"Authorization": f"Bearer {token}"})
+    assert respuesta.status_code == 200
+    assert "usuarios_cache.consultas_bd" in respuesta.get_json()